@@ -0,0 +1,12 @@
+from django.contrib import admin
+from .models import ExportCheckpoint
+
+
+@admin.register(ExportCheckpoint)
+class ExportCheckpointAdmin(admin.ModelAdmin):
+    """Suivi de l'avancement des exports analytiques."""
+    list_display = ['dataset', 'high_water_mark', 'last_id', 'rows_exported', 'last_run_at']
+    readonly_fields = ['high_water_mark', 'last_id', 'rows_exported', 'last_run_at', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,285 @@
+"""
+Export incrémental des résultats, pronostics et programmes en fichiers Parquet.
+
+Arborescence (partitionnement Hive, un fichier par jeu et par mois) :
+
+    <ANALYTICS_EXPORT_ROOT>/<jeu de données>/game=<slug>/month=<AAAA-MM>/data.parquet
+
+- Les lignes modifiées depuis le point de reprise (updated_at, id) sont lues par lots
+- Chaque partition touchée est réécrite (fichier temporaire puis renommage atomique)
+  en remplaçant les versions précédentes des mêmes identifiants
+- `outcome_details` est aplati en colonnes typées `outcome__<clé>`
+- Une ligne déplacée vers un autre jeu ou un autre mois, ou supprimée, n'est
+  corrigée que par un export complet (`--full`)
+"""
+import json
+import os
+import re
+import shutil
+from dataclasses import dataclass, field
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from django.apps import apps
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+import logging
+
+from wari.horizon import read_horizon
+from .models import ExportCheckpoint
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+FLATTENED_PREFIX = 'outcome__'
+
+# Type Arrow des champs du modèle (les autres sont exportés en chaîne)
+ARROW_TYPES = {
+    'BigAutoField': pa.int64(),
+    'AutoField': pa.int64(),
+    'BigIntegerField': pa.int64(),
+    'ForeignKey': pa.int64(),
+    'BooleanField': pa.bool_(),
+    'DateTimeField': pa.timestamp('us', tz='UTC'),
+}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    model: str
+    date_field: str
+    fields: tuple
+    flatten: str = None
+    json_fields: tuple = field(default=())
+
+
+DATASETS = {
+    'results': Dataset(
+        name='results',
+        model='results.Result',
+        date_field='result_date',
+        fields=('id', 'game_id', 'result_date', 'status', 'outcome', 'validated_by_id', 'created_at', 'updated_at'),
+        flatten='outcome_details',
+    ),
+    'predictions': Dataset(
+        name='predictions',
+        model='predictions.Prediction',
+        date_field='predicted_at',
+        fields=('id', 'game_id', 'author_id', 'predicted_at', 'is_published', 'description', 'updated_at'),
+        json_fields=('picks',),
+    ),
+    'programmes': Dataset(
+        name='programmes',
+        model='programmes.Program',
+        date_field='event_date',
+        fields=('id', 'game_id', 'event_date', 'is_published', 'details', 'created_at', 'updated_at'),
+    ),
+}
+
+
+def export_root():
+    return Path(getattr(settings, 'ANALYTICS_EXPORT_ROOT', Path(settings.BASE_DIR) / 'exports' / 'analytics'))
+
+
+def dataset_root(name):
+    return export_root() / name
+
+
+# 1. Conversion des lignes en table Arrow
+
+def column_name(key):
+    """Nom de colonne sûr pour une clé de `outcome_details`."""
+    return FLATTENED_PREFIX + (re.sub(r'[^0-9a-z]+', '_', str(key).lower()).strip('_') or 'value')
+
+
+def typed_array(values):
+    """
+    Tableau Arrow typé pour des valeurs JSON hétérogènes :
+    - Booléens, entiers, puis flottants si toutes les valeurs présentes le permettent
+    - Sinon chaîne (listes et objets encodés en JSON)
+    """
+    present = [value for value in values if value is not None]
+    if not present:
+        return pa.nulls(len(values))
+    if all(isinstance(value, bool) for value in present):
+        return pa.array(values, type=pa.bool_())
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        return pa.array(values, type=pa.int64())
+    if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in present):
+        return pa.array([None if value is None else float(value) for value in values], type=pa.float64())
+    return pa.array(
+        [None if value is None else value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+         for value in values],
+        type=pa.string(),
+    )
+
+
+def rows_to_table(dataset, rows):
+    """Table Arrow des lignes exportées (colonnes fixes puis colonnes aplaties triées)."""
+    meta = apps.get_model(dataset.model)._meta
+    columns = {}
+    for name in dataset.fields:
+        kind = ARROW_TYPES.get(meta.get_field(name).get_internal_type(), pa.string())
+        columns[name] = pa.array([row[name] for row in rows], type=kind)
+    for name in dataset.json_fields:
+        columns[name] = pa.array([json.dumps(row[name], ensure_ascii=False) for row in rows], type=pa.string())
+    if dataset.flatten:
+        details = [row[dataset.flatten] if isinstance(row[dataset.flatten], dict) else {} for row in rows]
+        flattened = {}
+        for data in details:
+            for key in data:
+                flattened.setdefault(column_name(key), key)
+        for name in sorted(flattened):
+            columns[name] = typed_array([data.get(flattened[name]) for data in details])
+    return pa.table(columns)
+
+
+def common_type(types):
+    """Type commun de plusieurs versions d'une colonne : identique, flottant si numérique, sinon chaîne."""
+    types = [kind for kind in types if not pa.types.is_null(kind)]
+    if not types:
+        return pa.null()
+    if all(kind == types[0] for kind in types):
+        return types[0]
+    if all(pa.types.is_integer(kind) or pa.types.is_floating(kind) for kind in types):
+        return pa.float64()
+    return pa.string()
+
+
+def unified_schema(schemas):
+    """Union des schémas (ordre de première apparition), types harmonisés avec `common_type`."""
+    names, types = [], {}
+    for schema in schemas:
+        for item in schema:
+            if item.name not in types:
+                names.append(item.name)
+            types.setdefault(item.name, []).append(item.type)
+    return pa.schema([(name, common_type(types[name])) for name in names])
+
+
+def conform(table, schema):
+    """Aligne une table sur un schéma : colonnes manquantes à null, types convertis."""
+    arrays = []
+    for item in schema:
+        if item.name in table.column_names:
+            arrays.append(table[item.name].cast(item.type))
+        else:
+            arrays.append(pa.nulls(len(table), type=item.type))
+    return pa.table(arrays, schema=schema)
+
+
+# 2. Écriture des partitions
+
+def partition_path(dataset, game_slug, value):
+    month = value.astimezone(dt_timezone.utc).strftime('%Y-%m')
+    return dataset_root(dataset.name) / f"game={game_slug}" / f"month={month}" / 'data.parquet'
+
+
+def write_partition(path, dataset, table):
+    """Fusionne `table` dans la partition (remplacement par id) puis la réécrit de façon atomique."""
+    if path.exists():
+        existing = pq.read_table(path, memory_map=True)
+        mask = pc.invert(pc.is_in(existing['id'], value_set=table['id']))
+        existing = existing.filter(mask)
+        schema = unified_schema([existing.schema, table.schema])
+        table = pa.concat_tables([conform(existing, schema), conform(table, schema)])
+    table = table.sort_by([(dataset.date_field, 'ascending'), ('id', 'ascending')])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    pq.write_table(table, tmp, compression='zstd')
+    os.replace(tmp, path)
+
+
+def write_rows(dataset, rows):
+    """Répartit un lot de lignes par jeu et par mois et met à jour chaque partition touchée."""
+    groups = {}
+    for row in rows:
+        path = partition_path(dataset, row['game_slug'], row[dataset.date_field])
+        groups.setdefault(path, []).append(row)
+    for path, group in groups.items():
+        write_partition(path, dataset, rows_to_table(dataset, group))
+    return len(groups)
+
+
+# 3. Export incrémental
+
+class ExportLocked(Exception):
+    """Un autre export du même jeu de données est en cours."""
+
+
+def advisory_lock(name):
+    """Verrou consultatif PostgreSQL de session (un seul export par jeu de données)."""
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s))", [f"analytics-export:{name}"])
+        return cursor.fetchone()[0]
+
+
+def advisory_unlock(name):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", [f"analytics-export:{name}"])
+
+
+def export_dataset(name, batch_size=None, full=False):
+    """
+    Exporte les lignes modifiées depuis le point de reprise d'un jeu de données.
+    - Le point de reprise est enregistré après chaque lot écrit : un export interrompu reprend au lot suivant
+    - Horizon de lecture (wari.horizon) : les lignes modifiées après le début de la plus ancienne
+      transaction d'écriture ouverte, ou depuis moins de ANALYTICS_EXPORT_LAG secondes, attendent
+      le passage suivant (cette transaction peut encore valider une date antérieure au point de reprise)
+    """
+    dataset = DATASETS[name]
+    model = apps.get_model(dataset.model)
+    batch_size = batch_size or getattr(settings, 'ANALYTICS_EXPORT_BATCH_SIZE', 5000)
+    if not advisory_lock(name):
+        raise ExportLocked(f"Export '{name}' déjà en cours.")
+    try:
+        horizon = read_horizon(timezone.now(), getattr(settings, 'ANALYTICS_EXPORT_LAG', 60))
+        checkpoint, _ = ExportCheckpoint.objects.get_or_create(dataset=name)
+        if full:
+            shutil.rmtree(dataset_root(name), ignore_errors=True)
+            checkpoint.high_water_mark, checkpoint.last_id, checkpoint.rows_exported = None, 0, 0
+
+        values = list(dataset.fields) + list(dataset.json_fields) + ([dataset.flatten] if dataset.flatten else [])
+        queryset = (
+            model.objects.filter(updated_at__lte=horizon)
+            .order_by('updated_at', 'id')
+            .values(*values, game_slug=F('game__slug'))
+        )
+        exported = 0
+        while True:
+            batch = queryset
+            if checkpoint.high_water_mark:
+                batch = batch.filter(
+                    Q(updated_at__gt=checkpoint.high_water_mark)
+                    | Q(updated_at=checkpoint.high_water_mark, id__gt=checkpoint.last_id)
+                )
+            rows = list(batch[:batch_size])
+            if not rows:
+                break
+            partitions = write_rows(dataset, rows)
+            checkpoint.high_water_mark, checkpoint.last_id = rows[-1]['updated_at'], rows[-1]['id']
+            checkpoint.rows_exported += len(rows)
+            checkpoint.save()
+            exported += len(rows)
+            logger.info("Export %s : %s lignes, %s partitions réécrites", name, len(rows), partitions)
+            if len(rows) < batch_size:
+                break
+        checkpoint.last_run_at = timezone.now()
+        checkpoint.save()
+        return exported
+    finally:
+        advisory_unlock(name)
+
+
+def export_all(names=None, batch_size=None, full=False):
+    """Exporte les jeux de données demandés (tous par défaut) ; retourne {nom: lignes exportées}."""
+    return {name: export_dataset(name, batch_size=batch_size, full=full) for name in names or DATASETS}
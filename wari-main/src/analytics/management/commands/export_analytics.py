@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.export import DATASETS, ExportLocked, export_all
+from analytics.tasks import schedule_export
+
+
+class Command(BaseCommand):
+    """
+    Export incrémental des données historiques en Parquet (par jeu et par mois).
+
+    Exemples :
+        python manage.py export_analytics                        # tous les jeux de données
+        python manage.py export_analytics --dataset results      # résultats uniquement
+        python manage.py export_analytics --full                 # réexport complet
+        python manage.py export_analytics --schedule             # active l'export périodique (runjobs)
+    """
+    help = "Exporte résultats, pronostics et programmes en fichiers Parquet depuis le dernier point de reprise."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', action='append', choices=sorted(DATASETS), default=None,
+                            help="Jeu de données à exporter (répétable, défaut : tous)")
+        parser.add_argument('--batch-size', type=int, default=None, help="Lignes lues par lot")
+        parser.add_argument('--full', action='store_true', help="Supprime l'export existant et repart de zéro")
+        parser.add_argument('--schedule', action='store_true',
+                            help="Met en file l'export périodique au lieu d'exporter immédiatement")
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            job = schedule_export()
+            self.stdout.write(f"Export planifié (tâche #{job.id}, {job.run_at.isoformat()}).")
+            return
+        try:
+            exported = export_all(options['dataset'], batch_size=options['batch_size'], full=options['full'])
+        except ExportLocked as exc:
+            raise CommandError(str(exc))
+        for name, rows in exported.items():
+            self.stdout.write(f"{name} : {rows} lignes exportées")
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dataset', models.CharField(max_length=50, unique=True, verbose_name='Jeu de données')),
+                ('high_water_mark', models.DateTimeField(blank=True, null=True, verbose_name='Dernière modification exportée')),
+                ('last_id', models.BigIntegerField(default=0, verbose_name='Dernier identifiant exporté')),
+                ('rows_exported', models.BigIntegerField(default=0, verbose_name='Lignes exportées')),
+                ('last_run_at', models.DateTimeField(blank=True, null=True, verbose_name='Dernier export')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour')),
+            ],
+            options={
+                'verbose_name': "Point de reprise d'export",
+                'verbose_name_plural': "Points de reprise d'export",
+                'ordering': ['dataset'],
+            },
+        ),
+    ]
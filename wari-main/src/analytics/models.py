@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class ExportCheckpoint(models.Model):
+    """
+    Point de reprise de l'export incrémental d'un jeu de données.
+    - Les lignes sont exportées dans l'ordre (updated_at, id) : la reprise part
+      strictement après (high_water_mark, last_id)
+    """
+    dataset = models.CharField(max_length=50, unique=True, verbose_name='Jeu de données')
+    high_water_mark = models.DateTimeField(null=True, blank=True, verbose_name='Dernière modification exportée')
+    last_id = models.BigIntegerField(default=0, verbose_name='Dernier identifiant exporté')
+    rows_exported = models.BigIntegerField(default=0, verbose_name='Lignes exportées')
+    last_run_at = models.DateTimeField(null=True, blank=True, verbose_name='Dernier export')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour')
+
+    class Meta:
+        verbose_name = "Point de reprise d'export"
+        verbose_name_plural = "Points de reprise d'export"
+        ordering = ['dataset']
+
+    def __str__(self):
+        mark = self.high_water_mark.isoformat() if self.high_water_mark else 'jamais'
+        return f"{self.dataset} (jusqu'à {mark})"
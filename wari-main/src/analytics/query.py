@@ -0,0 +1,120 @@
+"""
+Requêtes d'agrégation sur les fichiers Parquet exportés (sans accès à PostgreSQL).
+
+- Élagage par chemin : seules les partitions `game=`/`month=` demandées sont ouvertes
+- Lecture en mémoire projetée (memory_map) des seules colonnes utiles
+- Schémas des partitions harmonisés (colonnes aplaties absentes ou de types différents)
+"""
+import re
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from .export import DATASETS, conform, dataset_root, unified_schema
+
+AGGREGATIONS = {'count', 'count_distinct', 'sum', 'mean', 'min', 'max'}
+PARTITION_COLUMNS = ('game', 'month')
+MONTH_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+
+class QueryError(ValueError):
+    """Requête analytique invalide (jeu de données, colonne, agrégat ou filtre inconnu)."""
+
+
+# 1. Sélection des partitions
+
+def partition_files(name, games=None, month_from=None, month_to=None):
+    """Fichiers des partitions retenues : [(slug du jeu, mois, chemin)]."""
+    if name not in DATASETS:
+        raise QueryError(f"Jeu de données inconnu : '{name}'.")
+    for month in (month_from, month_to):
+        if month and not MONTH_PATTERN.match(month):
+            raise QueryError(f"Mois invalide : '{month}' (attendu : AAAA-MM).")
+    files = []
+    for path in sorted(dataset_root(name).glob('game=*/month=*/data.parquet')):
+        game, month = path.parent.parent.name[len('game='):], path.parent.name[len('month='):]
+        if games and game not in games:
+            continue
+        if (month_from and month < month_from) or (month_to and month > month_to):
+            continue
+        files.append((game, month, path))
+    return files
+
+
+def dataset_schema(name, files=None):
+    """Schéma unifié du jeu de données (lecture des seuls pieds de fichiers)."""
+    files = partition_files(name) if files is None else files
+    schema = unified_schema([pq.read_schema(path, memory_map=True) for _, _, path in files])
+    return pa.schema([(column, pa.string()) for column in PARTITION_COLUMNS] + list(schema))
+
+
+# 2. Agrégation
+
+def parse_metric(text):
+    """'count' ou 'fonction:colonne' -> (fonction, colonne)."""
+    function, _, column = text.partition(':')
+    if function not in AGGREGATIONS:
+        raise QueryError(f"Agrégat inconnu : '{function}' ({', '.join(sorted(AGGREGATIONS))}).")
+    if function != 'count' and not column:
+        raise QueryError(f"L'agrégat '{function}' requiert une colonne ('{function}:colonne').")
+    return function, column or None
+
+
+def load_table(files, schema, columns):
+    """Concatène les colonnes demandées des partitions, alignées sur le schéma unifié."""
+    file_columns = [name for name in columns if name not in PARTITION_COLUMNS]
+    target = pa.schema([schema.field(name) for name in file_columns])
+    tables = []
+    for game, month, path in files:
+        available = set(pq.read_schema(path, memory_map=True).names)
+        table = conform(pq.read_table(path, columns=[name for name in file_columns if name in available],
+                                      memory_map=True), target)
+        table = table.append_column('game', pa.array([game] * len(table), type=pa.string()))
+        table = table.append_column('month', pa.array([month] * len(table), type=pa.string()))
+        tables.append(table)
+    if not tables:
+        return pa.table({name: pa.array([], type=schema.field(name).type) for name in columns})
+    return pa.concat_tables(tables).select(columns)
+
+
+def aggregate(name, group_by=(), metrics=('count',), games=None, month_from=None, month_to=None, where=None):
+    """
+    Agrège un jeu de données exporté :
+    - `group_by` : colonnes de regroupement (dont `game` et `month`)
+    - `metrics` : 'count' ou 'fonction:colonne' (count, count_distinct, sum, mean, min, max)
+    - `where` : {colonne: valeur} comparés sous forme de chaîne
+    Retourne une liste de dictionnaires triée par clés de regroupement.
+    """
+    files = partition_files(name, games, month_from, month_to)
+    metrics = [parse_metric(metric) for metric in metrics or ('count',)]
+    if not files:
+        return []
+    schema = dataset_schema(name, files)
+    where = where or {}
+    referenced = list(dict.fromkeys(
+        list(group_by) + [column for _, column in metrics if column] + list(where) + ['id']
+    ))
+    unknown = [column for column in referenced if column not in schema.names]
+    if unknown:
+        raise QueryError(f"Colonnes inconnues : {', '.join(unknown)}.")
+    for function, column in metrics:
+        kind = schema.field(column).type if column else None
+        if function in ('sum', 'mean') and not (pa.types.is_integer(kind) or pa.types.is_floating(kind)):
+            raise QueryError(f"L'agrégat '{function}' requiert une colonne numérique ('{column}').")
+
+    table = load_table(files, schema, referenced)
+    for column, value in where.items():
+        table = table.filter(pc.equal(table[column].cast(pa.string()), str(value)))
+
+    # Colonnes produites par pyarrow : « <colonne>_<fonction> », renommées en « <fonction>_<colonne> »
+    aggregations = list(dict.fromkeys((column or 'id', function) for function, column in metrics))
+    result = table.group_by(list(group_by)).aggregate(aggregations)
+    names = {
+        f"{column}_{function}": 'count' if (column, function) == ('id', 'count') else f"{function}_{column}"
+        for column, function in aggregations
+    }
+    result = result.rename_columns([names.get(column, column) for column in result.column_names])
+    if group_by:
+        result = result.sort_by([(column, 'ascending') for column in group_by])
+    return result.select(list(group_by) + list(dict.fromkeys(names.values()))).to_pylist()
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.registry import enqueue, task
+from .export import export_all
+
+
+@task('analytics.export', max_attempts=3)
+def export_analytics():
+    """Exporte les modifications depuis le dernier passage, puis se replanifie."""
+    schedule_export(delay=timedelta(seconds=getattr(settings, 'ANALYTICS_EXPORT_INTERVAL', 3600)))
+    export_all()
+
+
+def schedule_export(delay=None):
+    """Planifie un export incrémental (une seule occurrence par créneau d'exécution)."""
+    run_at = timezone.now() + (delay or timedelta())
+    interval = getattr(settings, 'ANALYTICS_EXPORT_INTERVAL', 3600)
+    return enqueue('analytics.export', run_at=run_at, dedup_key=f"export:{int(run_at.timestamp() // interval)}")
@@ -0,0 +1,171 @@
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from games.models import Country, GameType, Game
+from results.models import Result
+from . import export
+from .export import DATASETS, common_type, export_dataset, typed_array, write_partition
+from .models import ExportCheckpoint
+from .query import QueryError, aggregate
+
+
+class TempExportRootMixin:
+    """Racine d'export temporaire, supprimée après chaque test."""
+
+    def setUp(self):
+        super().setUp()
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(ANALYTICS_EXPORT_ROOT=str(self.root), ANALYTICS_EXPORT_LAG=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+
+class ArrowConversionTests(SimpleTestCase):
+    """Typage des valeurs JSON hétérogènes et harmonisation des versions d'une colonne."""
+
+    def test_typed_array(self):
+        self.assertEqual(typed_array([1, None, 2]).type, pa.int64())
+        self.assertEqual(typed_array([1, 2.5]).to_pylist(), [1.0, 2.5])
+        self.assertEqual(typed_array([True, None]).type, pa.bool_())
+        self.assertEqual(typed_array([1, True]).type, pa.string())  # Booléen et entier : pas de type commun
+        self.assertEqual(typed_array([[1, 2], 'a', None]).to_pylist(), ['[1, 2]', 'a', None])
+        self.assertTrue(pa.types.is_null(typed_array([None, None]).type))
+
+    def test_common_type(self):
+        self.assertEqual(common_type([pa.int64(), pa.int64()]), pa.int64())
+        self.assertEqual(common_type([pa.null(), pa.int64()]), pa.int64())
+        self.assertEqual(common_type([pa.int64(), pa.float64()]), pa.float64())
+        self.assertEqual(common_type([pa.int64(), pa.string()]), pa.string())
+        self.assertTrue(pa.types.is_null(common_type([pa.null()])))
+
+
+class WritePartitionTests(TempExportRootMixin, SimpleTestCase):
+    """Fusion dans une partition existante : remplacement par id, schémas harmonisés."""
+
+    def table(self, ids, day, **columns):
+        dates = [datetime(2025, 3, day, tzinfo=dt_timezone.utc)] * len(ids)
+        return pa.table({'id': pa.array(ids, type=pa.int64()),
+                         'result_date': pa.array(dates, type=pa.timestamp('us', tz='UTC')), **columns})
+
+    def test_merge_existing_file(self):
+        path = self.root / 'results' / 'game=loto' / 'month=2025-03' / 'data.parquet'
+        write_partition(path, DATASETS['results'], self.table([1, 2], 2, outcome__score=pa.array([1, 2])))
+        write_partition(path, DATASETS['results'], self.table(
+            [2, 3], 1, outcome__score=pa.array([2.5, None]), outcome__winner=pa.array(['A', 'B'])))
+
+        table = pq.read_table(path)
+        self.assertEqual(table.schema.field('outcome__score').type, pa.float64())
+        self.assertEqual(table.select(['id', 'outcome__score', 'outcome__winner']).to_pylist(), [
+            {'id': 2, 'outcome__score': 2.5, 'outcome__winner': 'A'},  # Nouvelle version, triée par date
+            {'id': 3, 'outcome__score': None, 'outcome__winner': 'B'},
+            {'id': 1, 'outcome__score': 1.0, 'outcome__winner': None},
+        ])
+        self.assertEqual([item.name for item in path.parent.iterdir()], ['data.parquet'])  # Pas de fichier temporaire
+
+
+class ExportDatasetTests(TempExportRootMixin, TestCase):
+    """Export incrémental : point de reprise, partitions et agrégation des fichiers produits."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Togo', code='TGO')
+        game_type = GameType.objects.create(name='Loto')
+        cls.loto = Game.objects.create(name='Loto Togo', country=country, game_type=game_type)
+        cls.pmu = Game.objects.create(name='PMU Togo', country=country, game_type=game_type)
+
+    def result(self, game, date, status='pending', **details):
+        return Result.objects.create(game=game, result_date=date, outcome='1-2-3', status=status,
+                                     outcome_details=details)
+
+    def exported_ids(self, game, month):
+        path = self.root / 'results' / f"game={game.slug}" / f"month={month}" / 'data.parquet'
+        return pq.read_table(path, columns=['id'])['id'].to_pylist()
+
+    def test_checkpoint_resume_across_runs(self):
+        first = self.result(self.loto, datetime(2025, 1, 10, tzinfo=dt_timezone.utc), score=1)
+        second = self.result(self.loto, datetime(2025, 2, 10, tzinfo=dt_timezone.utc), score=2)
+        third = self.result(self.pmu, datetime(2025, 2, 11, tzinfo=dt_timezone.utc), score=3)
+
+        # Export interrompu au second lot : le premier lot reste acquis
+        write_rows, calls = export.write_rows, []
+
+        def fail_second_batch(dataset, rows):
+            calls.append(rows)
+            if len(calls) > 1:
+                raise OSError('disque plein')
+            return write_rows(dataset, rows)
+
+        with mock.patch.object(export, 'write_rows', side_effect=fail_second_batch):
+            with self.assertRaises(OSError):
+                export_dataset('results', batch_size=2)
+        checkpoint = ExportCheckpoint.objects.get(dataset='results')
+        self.assertEqual((checkpoint.last_id, checkpoint.rows_exported), (second.id, 2))
+
+        self.assertEqual(export_dataset('results', batch_size=2), 1)
+        self.assertEqual(export_dataset('results', batch_size=2), 0)
+
+        # Modification : seule la ligne modifiée est relue, sa partition réécrite
+        second.outcome_details = {'score': 20}
+        second.save()
+        self.assertEqual(export_dataset('results', batch_size=2), 1)
+        checkpoint.refresh_from_db()
+        self.assertEqual((checkpoint.last_id, checkpoint.rows_exported), (second.id, 4))
+        self.assertEqual(self.exported_ids(self.loto, '2025-01'), [first.id])
+        self.assertEqual(self.exported_ids(self.loto, '2025-02'), [second.id])
+        self.assertEqual(self.exported_ids(self.pmu, '2025-02'), [third.id])
+        path = self.root / 'results' / f"game={self.loto.slug}" / 'month=2025-02' / 'data.parquet'
+        self.assertEqual(pq.read_table(path)['outcome__score'].to_pylist(), [20])
+
+    def test_open_writer_holds_horizon(self):
+        self.result(self.loto, timezone.now() - timedelta(days=1))
+        writer = connections.create_connection('default')
+        try:
+            writer.set_autocommit(False)
+            with writer.cursor() as cursor:
+                cursor.execute("SELECT pg_current_xact_id()")  # xid attribué : transaction d'écriture
+            # Ligne modifiée après le début de la transaction ouverte : elle attend la fin de celle-ci
+            Result.objects.update(updated_at=timezone.now() + timedelta(seconds=1))
+            with connections['default'].cursor() as cursor:
+                cursor.execute("SELECT pg_stat_clear_snapshot()")
+            self.assertEqual(export_dataset('results'), 0)
+        finally:
+            writer.rollback()
+            writer.close()
+        with connections['default'].cursor() as cursor:
+            cursor.execute("SELECT pg_stat_clear_snapshot()")
+        with mock.patch.object(export.timezone, 'now', return_value=timezone.now() + timedelta(seconds=5)):
+            self.assertEqual(export_dataset('results'), 1)
+
+    def test_aggregate_grouping_and_filters(self):
+        self.result(self.loto, datetime(2025, 1, 10, tzinfo=dt_timezone.utc), score=1)
+        self.result(self.loto, datetime(2025, 2, 10, tzinfo=dt_timezone.utc), status='disputed', score=2)
+        self.result(self.loto, datetime(2025, 2, 12, tzinfo=dt_timezone.utc), score=4)
+        self.result(self.pmu, datetime(2025, 2, 11, tzinfo=dt_timezone.utc), score=8)
+        export_dataset('results')
+
+        self.assertEqual(aggregate('results', group_by=['game', 'month'], metrics=['count', 'sum:outcome__score']), [
+            {'game': self.loto.slug, 'month': '2025-01', 'count': 1, 'sum_outcome__score': 1},
+            {'game': self.loto.slug, 'month': '2025-02', 'count': 2, 'sum_outcome__score': 6},
+            {'game': self.pmu.slug, 'month': '2025-02', 'count': 1, 'sum_outcome__score': 8},
+        ])
+        self.assertEqual(aggregate('results', group_by=['status'], games=[self.loto.slug], month_from='2025-02'), [
+            {'status': 'disputed', 'count': 1},
+            {'status': 'pending', 'count': 1},
+        ])
+        self.assertEqual(aggregate('results', metrics=['max:outcome__score'], where={'status': 'pending'}),
+                         [{'max_outcome__score': 8}])
+        self.assertEqual(aggregate('results', month_from='2030-01'), [])
+        with self.assertRaises(QueryError):
+            aggregate('results', group_by=['inconnue'])
+        with self.assertRaises(QueryError):
+            aggregate('results', metrics=['sum:status'])
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import AnalyticsAggregateView, AnalyticsSchemaView
+
+urlpatterns = [
+    path('analytics/<slug:dataset>/schema/', AnalyticsSchemaView.as_view(), name='analytics-schema'),  # /api/admin/analytics/results/schema/
+    path('analytics/<slug:dataset>/aggregate/', AnalyticsAggregateView.as_view(), name='analytics-aggregate'),
+]
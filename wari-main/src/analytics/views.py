@@ -0,0 +1,67 @@
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+import logging
+
+from .export import DATASETS
+from .models import ExportCheckpoint
+from .query import QueryError, aggregate, dataset_schema
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+
+# 1. Schéma d'un jeu de données exporté
+class AnalyticsSchemaView(APIView):
+    """
+    Colonnes disponibles d'un jeu de données exporté et état de l'export (réservé aux administrateurs).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            raise NotFound(f"Jeu de données inconnu : '{dataset}'.")
+        checkpoint = ExportCheckpoint.objects.filter(dataset=dataset).first()
+        return Response({
+            'dataset': dataset,
+            'columns': [{'name': item.name, 'type': str(item.type)} for item in dataset_schema(dataset)],
+            'exported_until': checkpoint.high_water_mark if checkpoint else None,
+        })
+
+
+# 2. Agrégats historiques lus dans les fichiers Parquet
+class AnalyticsAggregateView(APIView):
+    """
+    Agrégats historiques calculés sur les fichiers Parquet, sans requête sur les tables de production :
+    - `group_by=game,month` : colonnes de regroupement
+    - `metric=count` / `metric=mean:outcome__score` (répétable)
+    - `game=<slug>` (répétable), `from=AAAA-MM`, `to=AAAA-MM` : partitions lues
+    - `where=colonne:valeur` (répétable) : filtres d'égalité
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, dataset):
+        if dataset not in DATASETS:
+            raise NotFound(f"Jeu de données inconnu : '{dataset}'.")
+        params = request.query_params
+        group_by = [column for column in params.get('group_by', '').split(',') if column]
+        where = {}
+        for item in params.getlist('where'):
+            column, separator, value = item.partition(':')
+            if not separator:
+                raise ValidationError({'where': f"Filtre invalide : '{item}' (attendu : colonne:valeur)."})
+            where[column] = value
+        try:
+            rows = aggregate(
+                dataset,
+                group_by=group_by,
+                metrics=params.getlist('metric') or ['count'],
+                games=params.getlist('game') or None,
+                month_from=params.get('from'),
+                month_to=params.get('to'),
+                where=where,
+            )
+        except QueryError as exc:
+            raise ValidationError({'detail': str(exc)})
+        return Response({'dataset': dataset, 'group_by': group_by, 'rows': rows})
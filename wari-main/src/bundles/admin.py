@@ -0,0 +1,29 @@
+from django.contrib import admin, messages
+from django.utils.translation import gettext_lazy as _
+from .models import Bundle
+from .build import BundleLocked, build_bundles
+
+@admin.register(Bundle)
+class BundleAdmin(admin.ModelAdmin):
+    """Suivi des paquets statiques (empreinte, taille, fraîcheur)."""
+    list_display = ['country', 'game_type', 'digest', 'size', 'built_at', 'is_stale']
+    list_filter = ['country', 'game_type']
+    list_select_related = ['country', 'game_type']
+    readonly_fields = ['country', 'game_type', 'changes', 'built_changes', 'digest', 'size', 'built_at']
+    list_per_page = 25
+    actions = ['rebuild']
+
+    def is_stale(self, obj):
+        return obj.changes > obj.built_changes
+    is_stale.boolean = True
+    is_stale.short_description = _('Périmé')
+
+    def rebuild(self, request, queryset):
+        """Régénère immédiatement les paquets sélectionnés."""
+        try:
+            written = build_bundles(list(queryset.select_related('country', 'game_type')))
+        except BundleLocked:
+            self.message_user(request, "Une autre génération de paquets est en cours.", messages.WARNING)
+            return
+        self.message_user(request, f"{written} paquets réécrits.")
+    rebuild.short_description = _("Régénérer les paquets")
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class BundlesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'bundles'
+    verbose_name = 'Paquets statiques par pays'
+
+    def ready(self):
+        from .build import connect_bundle_invalidation
+        # Toute modification d'un jeu, programme, résultat ou pronostic marque le paquet concerné
+        connect_bundle_invalidation()
@@ -0,0 +1,311 @@
+"""
+Paquets statiques par pays et type de jeu, servis par le proxy frontal.
+
+Les soirs de tirage, les listes client (jeux, programmes, résultats, pronostics) sont
+lues en masse et identiques pour tous : chaque paquet les précalcule en un fichier
+JSON compressé, lu directement par le proxy sans passer par Django.
+
+Arborescence (BUNDLE_ROOT) :
+
+    manifest.json                          empreinte et fichiers de chaque paquet (écrit en dernier)
+    <pays>/<type>.<empreinte>.json.gz      version immuable (cache long)
+    <pays>/<type>.json.gz                  dernière version, nom stable (cache court)
+
+- Contenu : jeux actifs, prochains programmes publiés, derniers résultats publics et
+  derniers pronostics publiés de chaque jeu (mêmes sérialiseurs que l'API client)
+- Empreinte calculée sur le contenu (hors date de génération) : un paquet inchangé
+  n'est pas réécrit et garde son URL
+- Écritures par renommage atomique ; les versions remplacées sont conservées
+  BUNDLE_KEEP_SECONDS secondes pour les téléchargements en cours
+- Régénération incrémentale : une modification marque le paquet (pays, type) périmé
+  après commit et planifie une passe regroupant les modifications du créneau
+  (BUNDLE_DEBOUNCE_SECONDS) ; une passe complète périodique (BUNDLE_REFRESH_INTERVAL)
+  fait sortir les programmes passés
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+import logging
+
+from games.feed import attach_game_counts, first_per_game
+from games.models import Country, Game, GameType
+from games.refcache import reference_data
+from .models import Bundle
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+class BundleLocked(Exception):
+    """Une autre génération de paquets est en cours."""
+
+
+def bundle_root():
+    return Path(settings.BUNDLE_ROOT)
+
+
+def bundle_key(country_slug, game_type_slug):
+    return f"{country_slug}/{game_type_slug}"
+
+
+# 1. Contenu d'un paquet
+
+def bundle_content(country, game_type):
+    """Données d'un paquet, en un nombre constant de requêtes (une par source)."""
+    # Imports locaux : ces applications dépendent elles-mêmes de games.models
+    from games.serializers import GameSerializer
+    from predictions.models import Prediction
+    from predictions.serializers import PredictionSerializer
+    from programmes.models import Program
+    from programmes.serializers import ProgramSerializer
+    from results.models import PUBLIC_STATUSES, Result
+    from results.serializers import ResultSerializer
+
+    games = list(
+        Game.objects.filter(country=country, game_type=game_type, is_active=True)
+        .select_related('country', 'game_type').order_by('name')
+    )
+    game_ids = [game.id for game in games]
+    attach_game_counts(games)
+
+    programs = first_per_game(
+        Program.objects.filter(game_id__in=game_ids, is_published=True, event_date__gte=timezone.now()),
+        F('event_date').asc(), settings.BUNDLE_ITEMS_PER_GAME,
+    ).order_by('event_date', 'id')
+    results = first_per_game(
+        Result.objects.filter(game_id__in=game_ids, status__in=PUBLIC_STATUSES).select_related('validated_by'),
+        F('result_date').desc(), settings.BUNDLE_ITEMS_PER_GAME,
+    ).order_by('-result_date', 'id')
+    predictions = first_per_game(
+        Prediction.objects.filter(game_id__in=game_ids, is_published=True).select_related('author'),
+        F('predicted_at').desc(), settings.BUNDLE_ITEMS_PER_GAME,
+    ).order_by('-predicted_at', 'id')
+
+    return {
+        'country': {'id': country.id, 'name': country.name, 'code': country.code, 'slug': country.slug},
+        'game_type': {'id': game_type.id, 'name': game_type.name, 'slug': game_type.slug},
+        'games': GameSerializer(games, many=True).data,
+        'programs': ProgramSerializer(programs, many=True).data,
+        'results': ResultSerializer(results, many=True).data,
+        'predictions': PredictionSerializer(predictions, many=True).data,
+    }
+
+
+def render_bundle(content):
+    """Retourne (empreinte, fichier compressé) ; l'empreinte ne dépend que du contenu."""
+    canonical = json.dumps(content, cls=DjangoJSONEncoder, sort_keys=True, separators=(',', ':'))
+    digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:20]
+    document = json.dumps(
+        {'version': digest, 'generated_at': timezone.now().isoformat(), **content},
+        cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':'),
+    )
+    # mtime=0 : octets identiques pour un même document
+    return digest, gzip.compress(document.encode('utf-8'), compresslevel=9, mtime=0)
+
+
+# 2. Écriture
+
+def _write_atomic(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+
+
+def bundle_files(country_slug, game_type_slug, digest):
+    """Chemins relatifs (version immuable, nom stable) d'un paquet."""
+    return (f"{country_slug}/{game_type_slug}.{digest}.json.gz", f"{country_slug}/{game_type_slug}.json.gz")
+
+
+def write_bundle(country_slug, game_type_slug, digest, compressed, root=None):
+    root = Path(root or bundle_root())
+    versioned, latest = bundle_files(country_slug, game_type_slug, digest)
+    if not (root / versioned).exists():
+        _write_atomic(root / versioned, compressed)
+    _write_atomic(root / latest, compressed)
+
+
+def write_manifest(root=None):
+    """Manifeste des paquets générés, écrit après leurs fichiers."""
+    root = Path(root or bundle_root())
+    bundles = {}
+    for bundle in Bundle.objects.exclude(digest='').select_related('country', 'game_type'):
+        versioned, latest = bundle_files(bundle.country.slug, bundle.game_type.slug, bundle.digest)
+        bundles[bundle_key(bundle.country.slug, bundle.game_type.slug)] = {
+            'digest': bundle.digest, 'file': versioned, 'latest': latest,
+            'size': bundle.size, 'built_at': bundle.built_at.isoformat(),
+        }
+    manifest = {'generated_at': timezone.now().isoformat(), 'bundles': bundles}
+    _write_atomic(root / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    return manifest
+
+
+def prune_files(manifest, root=None):
+    """Supprime les versions immuables absentes du manifeste depuis plus de BUNDLE_KEEP_SECONDS."""
+    root = Path(root or bundle_root())
+    current = {entry['file'] for entry in manifest['bundles'].values()}
+    limit = time.time() - settings.BUNDLE_KEEP_SECONDS
+    removed = 0
+    for path in root.glob('*/*.*.json.gz'):
+        if path.relative_to(root).as_posix() not in current and path.stat().st_mtime < limit:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+# 3. Génération
+
+def advisory_lock():
+    """Verrou consultatif PostgreSQL de session : une seule génération à la fois (manifeste)."""
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(hashtext('bundles'))")
+        return cursor.fetchone()[0]
+
+
+def advisory_unlock():
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(hashtext('bundles'))")
+
+
+def build_bundles(bundles, force=False):
+    """
+    Génère les paquets donnés puis réécrit le manifeste.
+    - `changes` est lu avant la génération : une modification concurrente laisse le paquet périmé
+    - Contenu inchangé (même empreinte) : fichiers conservés, seul l'état est mis à jour
+    Retourne le nombre de paquets dont le contenu a changé.
+    """
+    if not advisory_lock():
+        raise BundleLocked()
+    try:
+        written = 0
+        for bundle in bundles:
+            changes = Bundle.objects.filter(pk=bundle.pk).values_list('changes', flat=True).first()
+            if changes is None:
+                continue
+            digest, compressed = render_bundle(bundle_content(bundle.country, bundle.game_type))
+            versioned, _ = bundle_files(bundle.country.slug, bundle.game_type.slug, digest)
+            if force or digest != bundle.digest or not (bundle_root() / versioned).exists():
+                write_bundle(bundle.country.slug, bundle.game_type.slug, digest, compressed)
+                written += 1
+            Bundle.objects.filter(pk=bundle.pk).update(
+                built_changes=changes, digest=digest, size=len(compressed), built_at=timezone.now(),
+            )
+        prune_files(write_manifest())
+    finally:
+        advisory_unlock()
+    if written:
+        logger.info("%s paquets statiques régénérés", written)
+    return written
+
+
+def build_stale_bundles():
+    """Régénère les paquets modifiés depuis leur dernière génération."""
+    stale = Bundle.objects.filter(changes__gt=F('built_changes')).select_related('country', 'game_type')
+    return build_bundles(list(stale))
+
+
+def build_all_bundles(force=False):
+    """Crée l'état des couples (pays, type) ayant des jeux actifs, puis régénère tous les paquets."""
+    pairs = Game.objects.filter(is_active=True).values_list('country_id', 'game_type_id').distinct()
+    Bundle.objects.bulk_create(
+        [Bundle(country_id=country_id, game_type_id=game_type_id) for country_id, game_type_id in pairs],
+        ignore_conflicts=True,
+    )
+    return build_bundles(list(Bundle.objects.select_related('country', 'game_type')), force=force)
+
+
+# 4. Invalidation incrémentale
+
+def pairs_for_games(game_ids):
+    """Couples (pays, type) des jeux, lus dans le cache des données de référence."""
+    references = reference_data().games
+    pairs, missing = set(), []
+    for game_id in game_ids:
+        game = references.get(game_id)
+        if game is None:
+            missing.append(game_id)
+        else:
+            pairs.add((game.country_id, game.game_type_id))
+    if missing:
+        pairs.update(Game.objects.filter(id__in=missing).values_list('country_id', 'game_type_id'))
+    return pairs
+
+
+def mark_stale(pairs):
+    """Marque les paquets périmés et planifie leur régénération, après commit de la modification."""
+    pairs = set(pairs)
+    if pairs:
+        transaction.on_commit(lambda: _mark_stale(pairs))
+
+
+def _mark_stale(pairs):
+    from .tasks import schedule_stale_build
+    for country_id, game_type_id in pairs:
+        marked = Bundle.objects.filter(country_id=country_id, game_type_id=game_type_id).update(
+            changes=F('changes') + 1,
+        )
+        if not marked:
+            Bundle.objects.bulk_create(
+                [Bundle(country_id=country_id, game_type_id=game_type_id, changes=1)], ignore_conflicts=True,
+            )
+    schedule_stale_build()
+
+
+def invalidate_bundles(game_ids):
+    """Mises à jour en masse (actions d'administration) : paquets des jeux concernés."""
+    mark_stale(pairs_for_games(set(game_ids)))
+
+
+def mark_game_bundles(sender, instance, **kwargs):
+    """Récepteur : jeu créé, modifié ou supprimé (ancien couple compris si le jeu a changé de pays ou de type)."""
+    pairs = {(instance.country_id, instance.game_type_id)}
+    previous = reference_data().games.get(instance.pk)
+    if previous is not None:
+        pairs.add((previous.country_id, previous.game_type_id))
+    mark_stale(pairs)
+
+
+def mark_content_bundles(sender, instance, **kwargs):
+    """Récepteur : programme, résultat ou pronostic créé, modifié ou supprimé."""
+    mark_stale(pairs_for_games([instance.game_id]))
+
+
+def mark_reference_bundles(sender, instance, **kwargs):
+    """Récepteur : pays ou type de jeu renommé (en-tête de tous ses paquets)."""
+    field = 'country_id' if sender is Country else 'game_type_id'
+    mark_stale(Bundle.objects.filter(**{field: instance.pk}).values_list('country_id', 'game_type_id'))
+
+
+def mark_published_bundles(sender, published, unpublished, **kwargs):
+    """Récepteur de `publication_changed` (bascules en masse du planificateur)."""
+    game_ids = sender.objects.filter(id__in=[*published, *unpublished]).values_list('game_id', flat=True)
+    invalidate_bundles(game_ids)
+
+
+def connect_bundle_invalidation():
+    from predictions.models import Prediction
+    from programmes.models import Program
+    from results.models import Result
+    from wari.publication import publication_changed
+
+    receivers = [(mark_game_bundles, Game), (mark_reference_bundles, Country), (mark_reference_bundles, GameType)]
+    receivers += [(mark_content_bundles, model) for model in (Program, Result, Prediction)]
+    for receiver, model in receivers:
+        post_save.connect(receiver, sender=model, dispatch_uid=f'bundle-save-{model.__name__}')
+        post_delete.connect(receiver, sender=model, dispatch_uid=f'bundle-delete-{model.__name__}')
+    publication_changed.connect(mark_published_bundles, dispatch_uid='bundle-publication')
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bundles.build import BundleLocked, build_all_bundles, build_stale_bundles
+from bundles.tasks import schedule_refresh
+
+
+class Command(BaseCommand):
+    """
+    Génération des paquets statiques par pays et type de jeu (BUNDLE_ROOT).
+
+    Exemples :
+        python manage.py build_bundles              # tous les paquets (seuls les contenus modifiés sont réécrits)
+        python manage.py build_bundles --stale      # paquets marqués périmés uniquement
+        python manage.py build_bundles --force      # réécrit tous les fichiers
+        python manage.py build_bundles --schedule   # active la passe complète périodique (runjobs)
+    """
+    help = "Génère les paquets JSON compressés servis par le proxy frontal."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale', action='store_true', help="Ne régénère que les paquets périmés")
+        parser.add_argument('--force', action='store_true', help="Réécrit les fichiers même si le contenu est inchangé")
+        parser.add_argument('--schedule', action='store_true',
+                            help="Met en file la passe complète périodique au lieu d'exécuter une passe")
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            job = schedule_refresh()
+            self.stdout.write(f"Génération planifiée (tâche #{job.id}, {job.run_at.isoformat()}).")
+            return
+        try:
+            written = build_stale_bundles() if options['stale'] else build_all_bundles(force=options['force'])
+        except BundleLocked:
+            raise CommandError("Une autre génération de paquets est en cours.")
+        self.stdout.write(f"{written} paquets réécrits.")
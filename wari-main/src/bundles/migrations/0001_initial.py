@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('games', '0004_game_game_sync_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Bundle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('changes', models.PositiveBigIntegerField(default=0, verbose_name='Modifications')),
+                ('built_changes', models.PositiveBigIntegerField(default=0, verbose_name='Modifications prises en compte')),
+                ('digest', models.CharField(blank=True, max_length=40, verbose_name='Empreinte')),
+                ('size', models.PositiveIntegerField(default=0, verbose_name='Taille compressée (octets)')),
+                ('built_at', models.DateTimeField(blank=True, null=True, verbose_name='Dernière génération')),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bundles', to='games.country', verbose_name='Pays')),
+                ('game_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bundles', to='games.gametype', verbose_name='Type de jeu')),
+            ],
+            options={
+                'verbose_name': 'Paquet statique',
+                'verbose_name_plural': 'Paquets statiques',
+                'ordering': ['country', 'game_type'],
+                'constraints': [models.UniqueConstraint(fields=('country', 'game_type'), name='unique_bundle_per_country_type')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import models
+
+from games.models import Country, GameType
+
+
+class Bundle(models.Model):
+    """
+    État d'un paquet statique (pays, type de jeu) :
+    - `changes` est incrémenté à chaque modification des données du paquet ; le paquet est
+      périmé tant que `built_changes` (valeur lue avant la dernière génération) est inférieur
+    - `digest` : empreinte du contenu, reprise dans le nom du fichier immuable
+    """
+    country = models.ForeignKey(Country, on_delete=models.CASCADE, related_name='bundles', verbose_name='Pays')
+    game_type = models.ForeignKey(GameType, on_delete=models.CASCADE, related_name='bundles', verbose_name='Type de jeu')
+    changes = models.PositiveBigIntegerField(default=0, verbose_name='Modifications')
+    built_changes = models.PositiveBigIntegerField(default=0, verbose_name='Modifications prises en compte')
+    digest = models.CharField(max_length=40, blank=True, verbose_name='Empreinte')
+    size = models.PositiveIntegerField(default=0, verbose_name='Taille compressée (octets)')
+    built_at = models.DateTimeField(null=True, blank=True, verbose_name='Dernière génération')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['country', 'game_type'], name='unique_bundle_per_country_type')
+        ]
+        verbose_name = 'Paquet statique'
+        verbose_name_plural = 'Paquets statiques'
+        ordering = ['country', 'game_type']
+
+    def __str__(self):
+        return f"{self.country} / {self.game_type} ({self.digest or 'non généré'})"
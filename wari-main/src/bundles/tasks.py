@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.registry import enqueue, task
+from .build import BundleLocked, build_all_bundles, build_stale_bundles
+
+
+@task('bundles.build_stale', max_attempts=3)
+def build_stale():
+    """Régénère les paquets marqués périmés ; génération concurrente en cours : créneau suivant."""
+    try:
+        build_stale_bundles()
+    except BundleLocked:
+        schedule_stale_build()
+
+
+@task('bundles.refresh', max_attempts=3)
+def refresh():
+    """Passe complète (programmes devenus passés), puis se replanifie."""
+    schedule_refresh(delay=timedelta(seconds=settings.BUNDLE_REFRESH_INTERVAL))
+    build_all_bundles()
+
+
+def schedule_stale_build():
+    """
+    Planifie la régénération à la fin du créneau courant (une tâche par créneau) :
+    les modifications validées pendant le créneau sont toutes visibles de cette tâche.
+    """
+    debounce = settings.BUNDLE_DEBOUNCE_SECONDS
+    slot = int(timezone.now().timestamp() // debounce) + 1
+    run_at = datetime.fromtimestamp(slot * debounce, tz=dt_timezone.utc)
+    return enqueue('bundles.build_stale', run_at=run_at, dedup_key=f"stale:{slot}")
+
+
+def schedule_refresh(delay=None):
+    """Planifie une passe complète (une seule occurrence par créneau d'exécution)."""
+    run_at = timezone.now() + (delay or timedelta())
+    interval = settings.BUNDLE_REFRESH_INTERVAL
+    return enqueue('bundles.refresh', run_at=run_at, dedup_key=f"refresh:{int(run_at.timestamp() // interval)}")
@@ -0,0 +1,193 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from games import refcache
+from games.models import Country, GameType, Game
+from results.models import Result
+from . import build
+from .build import (
+    MANIFEST_NAME, _mark_stale, build_all_bundles, build_stale_bundles, bundle_files, prune_files, render_bundle,
+)
+from .models import Bundle
+from .views import _manifest
+
+
+class BundleTestCase(TestCase):
+    """Racine des paquets temporaire et cache des données de référence vidé."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.country = Country.objects.create(name='Togo', code='TGO')
+        cls.game_type = GameType.objects.create(name='Loto')
+        cls.game = Game.objects.create(name='Loto Togo', country=cls.country, game_type=cls.game_type)
+
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(BUNDLE_ROOT=str(self.root))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        refcache._state.data = None
+        _manifest.mtime = None
+        schedule = mock.patch('bundles.tasks.schedule_stale_build')
+        self.schedule_stale_build = schedule.start()
+        self.addCleanup(schedule.stop)
+
+    def bundle(self):
+        return Bundle.objects.get(country=self.country, game_type=self.game_type)
+
+    def paths(self, bundle):
+        return [self.root / name for name in bundle_files(self.country.slug, self.game_type.slug, bundle.digest)]
+
+
+class BundleBuildTests(BundleTestCase):
+    """Empreinte du contenu, écritures atomiques et purge des anciennes versions."""
+
+    def test_digest_ignores_generated_at(self):
+        content = {'games': [{'id': 1, 'name': 'Loto Togo'}]}
+        digest, compressed = render_bundle(content)
+        with mock.patch.object(build.timezone, 'now', return_value=timezone.now() + timedelta(hours=1)):
+            later_digest, later = render_bundle(content)
+        self.assertEqual(later_digest, digest)
+        self.assertNotEqual(later, compressed)
+        self.assertEqual(json.loads(gzip.decompress(compressed))['version'], digest)
+        self.assertNotEqual(render_bundle({'games': []})[0], digest)
+
+    def test_unchanged_bundle_not_rewritten(self):
+        self.assertEqual(build_all_bundles(), 1)
+        versioned, latest = self.paths(self.bundle())
+        mtimes = (versioned.stat().st_mtime_ns, latest.stat().st_mtime_ns)
+        with mock.patch.object(build.timezone, 'now', return_value=timezone.now() + timedelta(hours=1)):
+            self.assertEqual(build_all_bundles(), 0)
+        self.assertEqual((versioned.stat().st_mtime_ns, latest.stat().st_mtime_ns), mtimes)
+        self.assertEqual(build_all_bundles(force=True), 1)
+
+    def test_atomic_writes_manifest_last(self):
+        written = []
+        write_atomic = build._write_atomic
+
+        def record(path, content):
+            written.append(path.relative_to(self.root).as_posix())
+            write_atomic(path, content)
+
+        with mock.patch.object(build, '_write_atomic', side_effect=record):
+            build_all_bundles()
+        bundle = self.bundle()
+        versioned, latest = bundle_files(self.country.slug, self.game_type.slug, bundle.digest)
+        self.assertEqual(written, [versioned, latest, MANIFEST_NAME])
+        self.assertEqual(sorted(path.name for path in self.root.rglob('*') if path.name.endswith('.tmp')), [])
+        manifest = json.loads((self.root / MANIFEST_NAME).read_text())
+        self.assertEqual(manifest['bundles'][f"{self.country.slug}/{self.game_type.slug}"]['file'], versioned)
+        self.assertEqual((self.root / versioned).stat().st_size, bundle.size)
+
+    @override_settings(BUNDLE_KEEP_SECONDS=3600)
+    def test_prune_files_keeps_recent_versions(self):
+        directory = self.root / self.country.slug
+        directory.mkdir()
+        for name in ('loto.current.json.gz', 'loto.old.json.gz', 'loto.recent.json.gz', 'loto.json.gz'):
+            (directory / name).write_bytes(b'')
+        expired = time.time() - 7200
+        for name in ('loto.current.json.gz', 'loto.old.json.gz', 'loto.json.gz'):
+            os.utime(directory / name, (expired, expired))
+        manifest = {'bundles': {f"{self.country.slug}/loto": {'file': f"{self.country.slug}/loto.current.json.gz"}}}
+
+        self.assertEqual(prune_files(manifest, root=self.root), 1)
+        # Version courante, version remplacée récemment et nom stable conservés
+        self.assertEqual(sorted(path.name for path in directory.iterdir()),
+                         ['loto.current.json.gz', 'loto.json.gz', 'loto.recent.json.gz'])
+
+
+class BundleInvalidationTests(BundleTestCase):
+    """Marquage après commit (`changes`) et régénération des seuls paquets périmés."""
+
+    def test_mark_stale_increments_and_build_consumes(self):
+        build_all_bundles()
+        bundle = self.bundle()
+        self.assertEqual((bundle.changes, bundle.built_changes), (0, 0))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = Result.objects.create(game=self.game, result_date=timezone.now() - timedelta(hours=1),
+                                           outcome='1-2-3', status='disputed')
+        with self.captureOnCommitCallbacks(execute=True):
+            result.outcome = '4-5-6'
+            result.save()
+        self.assertEqual(self.bundle().changes, 2)
+        self.assertEqual(self.schedule_stale_build.call_count, 2)
+
+        self.assertEqual(build_stale_bundles(), 1)
+        bundle = self.bundle()
+        self.assertEqual((bundle.changes, bundle.built_changes), (2, 2))
+        self.assertEqual(json.loads(gzip.decompress(self.paths(bundle)[0].read_bytes()))['results'][0]['outcome'],
+                         '4-5-6')
+        self.assertEqual(build_stale_bundles(), 0)  # Plus rien de périmé
+
+    def test_mark_stale_creates_missing_bundle(self):
+        other = GameType.objects.create(name='PMU')
+        _mark_stale({(self.country.id, other.id)})
+        _mark_stale({(self.country.id, other.id)})
+        bundle = Bundle.objects.get(country=self.country, game_type=other)
+        self.assertEqual((bundle.changes, bundle.built_changes), (2, 0))
+
+    def test_no_mark_before_commit(self):
+        build_all_bundles()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Result.objects.create(game=self.game, result_date=timezone.now() - timedelta(hours=1),
+                                  outcome='1-2-3', status='disputed')
+        self.assertTrue(callbacks)
+        self.assertEqual(self.bundle().changes, 0)
+
+
+class BundleViewTests(BundleTestCase):
+    """API de secours : ETag = empreinte, gzip ou identité, sans requête SQL."""
+
+    def setUp(self):
+        super().setUp()
+        build_all_bundles()
+        self.entry = self.bundle()
+        self.url = reverse('client-bundle', args=[self.country.slug, self.game_type.slug])
+
+    def test_gzip_and_identity(self):
+        compressed = self.paths(self.entry)[0].read_bytes()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response.content, compressed)
+        self.assertEqual(response['ETag'], f'"{self.entry.digest}"')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, gzip.decompress(compressed))
+        self.assertEqual(json.loads(response.content)['version'], self.entry.digest)
+
+    def test_etag_not_modified(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'"{self.entry.digest}"')
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], f'"{self.entry.digest}"')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"autre"').status_code, 200)
+
+    def test_manifest_and_unknown_bundle(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('client-bundle-manifest'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['bundles'][f"{self.country.slug}/{self.game_type.slug}"]['digest'],
+                         self.entry.digest)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse('client-bundle', args=[self.country.slug, 'pmu'])).status_code,
+                             404)
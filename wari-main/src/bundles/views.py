@@ -0,0 +1,88 @@
+"""
+API de secours : paquets statiques servis par Django, sans accès à la base.
+
+Le proxy frontal sert normalement BUNDLE_ROOT directement. Ces vues permettent aux
+clients de se rabattre sur les paquets quand l'API est saturée (erreurs 5xx, délais)
+ou quand aucun proxy n'est configuré : ni authentification, ni requête SQL, seuls
+le manifeste et les fichiers sont lus (gardés en mémoire, rechargés à leur réécriture).
+"""
+import gzip
+import json
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from wari.log import ExceptionLoggingMixin
+from .build import MANIFEST_NAME, bundle_key, bundle_root
+
+
+class _Manifest:
+    """Manifeste et fichiers des paquets en mémoire, rechargés quand le manifeste est réécrit."""
+
+    def __init__(self):
+        self.mtime = None
+        self.data = None
+        self.files = {}
+
+    def load(self):
+        path = bundle_root() / MANIFEST_NAME
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self.mtime:
+            self.data = json.loads(path.read_text(encoding='utf-8'))
+            self.files, self.mtime = {}, mtime
+        return self.data
+
+    def read(self, entry):
+        """Fichier compressé d'un paquet (la version immuable ne change jamais de contenu)."""
+        content = self.files.get(entry['file'])
+        if content is None:
+            content = self.files[entry['file']] = (bundle_root() / entry['file']).read_bytes()
+        return content
+
+
+_manifest = _Manifest()
+
+
+class BundleView(ExceptionLoggingMixin, APIView):
+    """
+    Paquets statiques de secours :
+    - GET /api/client/bundles/ : manifeste (empreinte et fichiers de chaque paquet)
+    - GET /api/client/bundles/<pays>/<type>/ : paquet (gzip si accepté), ETag = empreinte
+    """
+    authentication_classes = []  # L'authentification JWT lirait l'utilisateur en base
+    permission_classes = [AllowAny]
+
+    def get(self, request, country=None, game_type=None):
+        manifest = _manifest.load()
+        if manifest is None:
+            raise NotFound("Aucun paquet généré (python manage.py build_bundles).")
+        if country is None:
+            response = Response(manifest)
+            patch_cache_control(response, public=True, max_age=settings.BUNDLE_MAX_AGE)
+            return response
+
+        entry = manifest['bundles'].get(bundle_key(country, game_type))
+        if entry is None:
+            raise NotFound("Paquet inconnu.")
+        etag = f'"{entry["digest"]}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content = _manifest.read(entry)
+            if 'gzip' in request.headers.get('Accept-Encoding', ''):
+                response = HttpResponse(content, content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(gzip.decompress(content), content_type='application/json')
+        response['ETag'] = etag
+        response['X-Bundle-Built-At'] = entry['built_at']
+        patch_vary_headers(response, ['Accept-Encoding'])
+        patch_cache_control(response, public=True, max_age=settings.BUNDLE_MAX_AGE)
+        return response
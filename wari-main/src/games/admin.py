@@ -1,7 +1,11 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from django.utils import timezone
 from django.db.models import Count
 from .models import Country, GameType, Game
+from .feed import invalidate_country_feeds
+from .refcache import invalidate_reference_data
+from bundles.build import invalidate_bundles
 
 class GameInline(admin.TabularInline):
     """Permet d'éditer les jeux directement dans l'interface d'un pays."""
@@ -101,12 +105,18 @@ class GameAdmin(admin.ModelAdmin):
 
     def activate(self, request, queryset):
         """Met à jour les jeux pour les rendre actifs."""
-        updated = queryset.update(is_active=True)
+        updated = queryset.update(is_active=True, updated_at=timezone.now())
+        invalidate_country_feeds()
+        invalidate_reference_data()
+        invalidate_bundles(queryset.values_list('id', flat=True))
         self.message_user(request, f"{updated} jeux sont maintenant actifs.")
     activate.short_description = _("Activer les jeux")
 
     def deactivate(self, request, queryset):
         """Met à jour les jeux pour les désactiver."""
-        updated = queryset.update(is_active=False)
+        updated = queryset.update(is_active=False, updated_at=timezone.now())
+        invalidate_country_feeds()
+        invalidate_reference_data()
+        invalidate_bundles(queryset.values_list('id', flat=True))
         self.message_user(request, f"{updated} jeux sont maintenant désactivés.")
     deactivate.short_description = _("Désactiver les jeux")
\ No newline at end of file
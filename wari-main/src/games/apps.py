@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class GamesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'games'
+
+    def ready(self):
+        from .signals import connect_feed_invalidation, connect_reference_invalidation
+        connect_feed_invalidation()
+        connect_reference_invalidation()
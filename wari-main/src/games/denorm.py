@@ -0,0 +1,134 @@
+"""
+Colonnes du jeu recopiées sur les programmes, résultats et pronostics (PostgreSQL).
+
+`country_id`, `game_type_id` et `game_active` (Game.is_active) sont dupliqués sur chaque
+ligne enfant : filtres par pays ou par type et exclusion des jeux désactivés sans
+jointure vers games_game, sur des index (pays, date) et (type, date) partiels.
+
+Cohérence assurée par des triggers, quel que soit le chemin d'écriture (save, update
+en masse, bulk_create, SQL direct) :
+- `games_denorm_copy` (BEFORE INSERT OR UPDATE sur la table enfant) : valeurs relues
+  dans games_game à chaque écriture de game_id ou des colonnes recopiées ; une instance
+  chargée avant un changement du jeu ne peut pas réécrire des valeurs périmées
+- `games_denorm_propagate` (AFTER UPDATE sur games_game, un trigger par table enfant) :
+  un jeu qui change de pays, de type ou d'activation met à jour ses lignes enfants et
+  leur `updated_at` (synchronisation incrémentale des clients) ; heure réelle de
+  l'écriture (clock_timestamp()), pas celle du début de la transaction (now()) : une
+  cascade longue n'antidate pas ses lignes, et la synchronisation ne lit qu'après la
+  fin des transactions d'écriture en cours (cf. sync.streams)
+"""
+from django.db import connections
+
+COPY_FUNCTION = """
+CREATE OR REPLACE FUNCTION games_denorm_copy() RETURNS trigger AS $$
+BEGIN
+    SELECT g.country_id, g.game_type_id, g.is_active
+      INTO NEW.country_id, NEW.game_type_id, NEW.game_active
+      FROM games_game g WHERE g.id = NEW.game_id;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+PROPAGATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION games_denorm_propagate() RETURNS trigger AS $$
+BEGIN
+    EXECUTE format(
+        'UPDATE %I SET country_id = $1, game_type_id = $2, game_active = $3, updated_at = clock_timestamp() WHERE game_id = $4',
+        TG_ARGV[0]
+    ) USING NEW.country_id, NEW.game_type_id, NEW.is_active, NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def copy_trigger(table):
+    return f"{table}_denorm_copy"
+
+
+def propagate_trigger(table):
+    return f"{table}_denorm_propagate"
+
+
+# 1. Fonctions (migration de games)
+
+def create_functions(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(COPY_FUNCTION, params=None)
+    # `%I` du format() plpgsql : pas de substitution de paramètres
+    schema_editor.execute(PROPAGATE_FUNCTION, params=None)
+
+
+def drop_functions(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP FUNCTION IF EXISTS games_denorm_copy()")
+    schema_editor.execute("DROP FUNCTION IF EXISTS games_denorm_propagate()")
+
+
+# 2. Triggers et remplissage (migrations des tables enfants)
+
+def install_triggers(table, using):
+    """Triggers de recopie et de propagation pour `table` (idempotent)."""
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {qn(copy_trigger(table))} ON {qn(table)}")
+        cursor.execute(
+            f"CREATE TRIGGER {qn(copy_trigger(table))} "
+            f"BEFORE INSERT OR UPDATE OF game_id, country_id, game_type_id, game_active ON {qn(table)} "
+            f"FOR EACH ROW EXECUTE FUNCTION games_denorm_copy()"
+        )
+        cursor.execute(f"DROP TRIGGER IF EXISTS {qn(propagate_trigger(table))} ON games_game")
+        cursor.execute(
+            f"CREATE TRIGGER {qn(propagate_trigger(table))} "
+            f"AFTER UPDATE OF country_id, game_type_id, is_active ON games_game FOR EACH ROW "
+            f"WHEN ((OLD.country_id, OLD.game_type_id, OLD.is_active) "
+            f"IS DISTINCT FROM (NEW.country_id, NEW.game_type_id, NEW.is_active)) "
+            f"EXECUTE FUNCTION games_denorm_propagate('{table}')"
+        )
+
+
+def drop_triggers(table, using):
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {qn(copy_trigger(table))} ON {qn(table)}")
+        cursor.execute(f"DROP TRIGGER IF EXISTS {qn(propagate_trigger(table))} ON games_game")
+
+
+def backfill(table, using, batch_size=5000):
+    """
+    Remplit les colonnes recopiées des lignes existantes, par lots d'identifiants
+    (une transaction courte par lot, hors transaction de migration).
+    - `updated_at` n'est pas modifié : aucune donnée visible des clients ne change
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT coalesce(min(id), 0), coalesce(max(id), 0) FROM {qn(table)}")
+        low, high = cursor.fetchone()
+        for start in range(low, high + 1, batch_size):
+            # Réécriture de game_id : le trigger de recopie renseigne les colonnes
+            cursor.execute(
+                f"UPDATE {qn(table)} SET game_id = game_id WHERE id >= %s AND id < %s AND country_id IS NULL",
+                [start, start + batch_size],
+            )
+
+
+def denormalize(table):
+    """Opérations RunPython (avant, arrière) d'une table enfant : triggers puis remplissage."""
+    def forwards(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        install_triggers(table, schema_editor.connection.alias)
+        backfill(table, schema_editor.connection.alias)
+
+    def backwards(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        drop_triggers(table, schema_editor.connection.alias)
+
+    return forwards, backwards
@@ -0,0 +1,149 @@
+"""
+Flux d'accueil par pays : pour chaque jeu actif, le prochain programme publié,
+le dernier résultat officiel et le dernier pronostic publié.
+
+Le flux est construit en un nombre constant de requêtes (fonctions de fenêtrage
+ROW_NUMBER() partitionnées par jeu) et mis en cache ; toute modification des
+modèles concernés invalide l'ensemble des flux via un compteur de version.
+
+- Le compteur est partagé par tous les processus (table games_sharedversion, cf. games.versions) :
+  le cache Django, local au processus, ne propagerait pas l'invalidation aux autres workers
+- Chaque processus relit la version au plus toutes les REFERENCE_CACHE_CHECK_INTERVAL secondes ;
+  le processus à l'origine d'une modification change de version immédiatement
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import Game
+from .versions import bump_version, get_version
+
+FEED_VERSION_NAME = 'country-feed'
+
+
+# 1. Cache et invalidation
+
+class _FeedVersion:
+    def __init__(self):
+        self.version = None
+        self.checked_at = 0.0
+
+
+_feed_version = _FeedVersion()
+
+
+def _set_local_version(version):
+    _feed_version.version = version
+    _feed_version.checked_at = time.monotonic()
+
+
+def get_feed_version():
+    """Version partagée des flux, relue au plus toutes les REFERENCE_CACHE_CHECK_INTERVAL secondes."""
+    interval = getattr(settings, 'REFERENCE_CACHE_CHECK_INTERVAL', 2)
+    if _feed_version.version is None or time.monotonic() - _feed_version.checked_at >= interval:
+        _set_local_version(get_version(FEED_VERSION_NAME))
+    return _feed_version.version
+
+
+def invalidate_country_feeds(*args, **kwargs):
+    """
+    Invalide les flux pays de tous les processus en incrémentant la version partagée
+    après validation de la transaction en cours.
+    - Utilisable directement comme récepteur de signal
+    """
+    bump_version(FEED_VERSION_NAME, _set_local_version)
+
+
+def get_country_feed(country, context):
+    """Retourne le flux du pays depuis le cache, ou le construit."""
+    key = f"country-feed:{get_feed_version()}:{country.slug}"
+    feed = cache.get(key)
+    if feed is None:
+        feed = build_country_feed(country, context)
+        cache.set(key, feed, getattr(settings, 'COUNTRY_FEED_CACHE_TIMEOUT', 300))
+    return feed
+
+
+# 2. Construction du flux
+
+def first_per_game(queryset, order_by, count=1):
+    """`count` premiers éléments par jeu selon `order_by`, via ROW_NUMBER() OVER (PARTITION BY game_id)."""
+    return queryset.annotate(
+        feed_rank=Window(RowNumber(), partition_by=[F('game_id')], order_by=order_by)
+    ).filter(feed_rank__lte=count)
+
+
+def attach_game_counts(games):
+    """Précalcule les compteurs de jeux des pays et types (deux requêtes agrégées)."""
+    country_counts = dict(
+        Game.objects.filter(country_id__in={g.country_id for g in games})
+        .values_list('country_id').annotate(total=Count('id')).order_by()
+    )
+    game_type_counts = dict(
+        Game.objects.filter(game_type_id__in={g.game_type_id for g in games})
+        .values_list('game_type_id').annotate(total=Count('id')).order_by()
+    )
+    for game in games:
+        game.country.game_count = country_counts.get(game.country_id, 0)
+        game.game_type.game_count = game_type_counts.get(game.game_type_id, 0)
+    return games
+
+
+def build_country_feed(country, context):
+    """
+    Construit le flux d'un pays en un nombre constant de requêtes :
+    - 1 requête pour les jeux actifs (+ 2 agrégats pour les compteurs imbriqués)
+    - 1 requête par source (programmes, résultats, pronostics), quel que soit le nombre de jeux
+    """
+    # Imports locaux : ces applications dépendent elles-mêmes de games.models
+    from programmes.models import Program
+    from programmes.recurrence import next_draws
+    from programmes.serializers import ProgramSerializer
+    from results.models import Result
+    from results.serializers import ResultSerializer
+    from predictions.models import Prediction
+    from predictions.serializers import PredictionSerializer
+    from .serializers import GameSerializer
+
+    games = list(Game.objects.filter(country=country, is_active=True).select_related('country', 'game_type'))
+    game_ids = [game.id for game in games]
+    attach_game_counts(games)
+
+    next_programs = first_per_game(
+        Program.objects.filter(game_id__in=game_ids, is_published=True, event_date__gte=timezone.now())
+        .select_related('game'),
+        F('event_date').asc(),
+    )
+    latest_results = first_per_game(
+        Result.objects.filter(game_id__in=game_ids, status='official').select_related('game', 'validated_by'),
+        F('result_date').desc(),
+    )
+    latest_predictions = first_per_game(
+        Prediction.objects.filter(game_id__in=game_ids, is_published=True).select_related('game', 'author'),
+        F('predicted_at').desc(),
+    )
+    # Occurrences des récurrences : retenues si elles précèdent le prochain programme ponctuel
+    programs_by_game = next_draws(game_ids, {obj.game_id: obj for obj in next_programs})
+    results_by_game = {obj.game_id: obj for obj in latest_results}
+    predictions_by_game = {obj.game_id: obj for obj in latest_predictions}
+
+    def serialize(serializer_class, instance):
+        return serializer_class(instance, context=context).data if instance is not None else None
+
+    return {
+        'country': {'id': country.id, 'name': country.name, 'code': country.code, 'slug': country.slug},
+        'generated_at': timezone.now().isoformat(),
+        'games': [
+            {
+                'game': serialize(GameSerializer, game),
+                'next_program': serialize(ProgramSerializer, programs_by_game.get(game.id)),
+                'latest_result': serialize(ResultSerializer, results_by_game.get(game.id)),
+                'latest_prediction': serialize(PredictionSerializer, predictions_by_game.get(game.id)),
+            }
+            for game in games
+        ],
+    }
@@ -0,0 +1,77 @@
+"""
+Filtres résolus par le cache des données de référence (`games.refcache`).
+
+`ReferenceFilterBackend` remplace DjangoFilterBackend : les filtres générés depuis
+`filterset_fields` de la forme `<relation>__slug` ou `<relation>__country__slug`
+(relation vers Country, GameType ou Game) sont réécrits en `<relation>_id IN (...)`,
+identifiants lus en mémoire : plus de jointure vers games_game ni games_country.
+Sur les tables portant les colonnes recopiées du jeu (`games.denorm`), les filtres
+`game__country__slug` et `game__game_type__slug` deviennent `country_id` / `game_type_id`
+(une valeur, index (pays, date) ou (type, date)) au lieu d'une liste de jeux.
+Les autres filtres sont inchangés.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django_filters import filters
+from django_filters.constants import EMPTY_VALUES
+from django_filters.rest_framework import DjangoFilterBackend, FilterSet
+
+from .models import Country, Game, GameType
+from .refcache import SUPPORTED_LOOKUPS, reference_data
+
+
+class ReferenceSlugFilter(filters.CharFilter):
+    """Filtre `<relation>__<lookup>` traduit en `<relation>__in` à partir du cache de référence."""
+
+    def __init__(self, *args, related_model=None, lookup='slug', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.related_model = related_model
+        self.lookup = lookup
+
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        ids = reference_data().resolve(self.related_model, self.lookup, value)
+        return qs.filter(**{f"{self.field_name}__in": ids})
+
+
+def denormalized_field(model, relation_field, lookup):
+    """Colonne recopiée du jeu (`country`, `game_type`) équivalente à `game__<lookup>`, sinon None."""
+    name, _, rest = lookup.partition('__')
+    if relation_field.related_model is not Game or rest != 'slug':
+        return None
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    return field if field.many_to_one and field.related_model in (Country, GameType) else None
+
+
+class ReferenceFilterSet(FilterSet):
+    """FilterSet dont les filtres exacts sur un slug de référence sont résolus en mémoire."""
+
+    @classmethod
+    def get_filters(cls):
+        generated = super().get_filters()
+        if cls._meta.model is None:
+            return generated
+        for name, current in list(generated.items()):
+            relation, _, lookup = current.field_name.partition('__')
+            if current.lookup_expr != 'exact' or not lookup.endswith('slug'):
+                continue
+            field = cls._meta.model._meta.get_field(relation)
+            if not field.many_to_one or lookup not in SUPPORTED_LOOKUPS.get(field.related_model, ()):
+                continue
+            denormalized = denormalized_field(cls._meta.model, field, lookup)
+            if denormalized is not None:
+                generated[name] = ReferenceSlugFilter(
+                    field_name=denormalized.name, related_model=denormalized.related_model, label=current.label,
+                )
+                continue
+            generated[name] = ReferenceSlugFilter(
+                field_name=relation, related_model=field.related_model, lookup=lookup, label=current.label,
+            )
+        return generated
+
+
+class ReferenceFilterBackend(DjangoFilterBackend):
+    filterset_base = ReferenceFilterSet
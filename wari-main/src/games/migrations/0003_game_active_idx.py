@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:37
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY s'exécutent hors transaction
+    atomic = False
+
+    dependencies = [
+        ('games', '0002_game_description_alter_country_code_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='game',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at'], include=('country', 'game_type'), name='game_active_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='game',
+            name='games_game_game_ty_0cdeea_idx',
+        ),
+        # (name, game_type) : redondant avec l'index de name et la contrainte unique (name, country)
+        RemoveIndexConcurrently(
+            model_name='game',
+            name='games_game_name_a0b2bf_idx',
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from games.denorm import create_functions, drop_functions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0004_game_game_sync_idx'),
+    ]
+
+    operations = [
+        # Fonctions des triggers de recopie (country_id, game_type_id, game_active) des tables enfants
+        migrations.RunPython(create_functions, drop_functions),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0005_denorm_functions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SharedVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Nom')),
+                ('version', models.BigIntegerField(default=0, verbose_name='Version')),
+            ],
+            options={
+                'verbose_name': 'Version de cache',
+                'verbose_name_plural': 'Versions de cache',
+            },
+        ),
+    ]
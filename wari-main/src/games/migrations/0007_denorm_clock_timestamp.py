@@ -0,0 +1,15 @@
+from django.db import migrations
+
+from games.denorm import create_functions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0006_sharedversion'),
+    ]
+
+    operations = [
+        # Propagation : updated_at = clock_timestamp() (CREATE OR REPLACE, triggers inchangés)
+        migrations.RunPython(create_functions, migrations.RunPython.noop),
+    ]
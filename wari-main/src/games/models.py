@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
 
@@ -58,8 +59,11 @@ class Game(models.Model):
             models.UniqueConstraint(fields=['name', 'country'], name='unique_game_per_country')
         ]
         indexes = [
-            models.Index(fields=['game_type', 'country']),
-            models.Index(fields=['name', 'game_type']),
+            # Requête client (jeux actifs, tri par date de création) : index partiel
+            models.Index(fields=['created_at'], include=['country', 'game_type'], condition=Q(is_active=True),
+                         name='game_active_idx'),
+            # Synchronisation incrémentale (/api/client/sync/) : parcours par (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='game_sync_idx'),
         ]
         ordering = ['-created_at']
         verbose_name = 'Jeu'
@@ -87,4 +91,19 @@ class Game(models.Model):
             country_code = self.country.code.lower() if self.country else "unknown"
             self.slug = slugify(f"{self.name}-{country_code}")
         self.full_clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class SharedVersion(models.Model):
+    """
+    Compteur de version partagé par tous les processus (invalidation des caches en mémoire).
+    - Une ligne par cache (`reference-data`, `country-feed`), incrémentée après validation
+    """
+    name = models.CharField(max_length=50, primary_key=True, verbose_name='Nom')
+    version = models.BigIntegerField(default=0, verbose_name='Version')
+
+    class Meta:
+        verbose_name = 'Version de cache'
+        verbose_name_plural = 'Versions de cache'
+
+    def __str__(self):
+        return f"{self.name} ({self.version})"
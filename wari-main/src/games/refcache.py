@@ -0,0 +1,180 @@
+"""
+Cache en mémoire (par processus) des données de référence : pays, types de jeux, jeux
+et jeux ayant une récurrence de programmes publiée.
+
+Ces tables sont petites et changent rarement, mais presque chaque requête résout
+un slug (`game__slug`, `country__slug`, champ `game` des pronostics). Chaque
+processus garde un instantané : dictionnaires slug -> id et id -> enregistrement
+compact.
+
+- Un compteur de version partagé (table games_sharedversion, cf. games.versions) est
+  incrémenté après validation de toute création, modification ou suppression
+  (signaux, mises à jour en masse) ; le cache Django, local au processus, ne convient pas
+- Chaque processus compare sa version à la version partagée au plus toutes les
+  REFERENCE_CACHE_CHECK_INTERVAL secondes et recharge l'instantané si besoin
+- Le processus à l'origine d'une modification recharge immédiatement
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from typing import NamedTuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import Country, Game, GameType
+from .versions import bump_version, get_version
+
+REFERENCE_VERSION_NAME = 'reference-data'
+
+# Recherches résolues en mémoire, par modèle
+SUPPORTED_LOOKUPS = {
+    Country: ('slug',),
+    GameType: ('slug',),
+    Game: ('slug', 'country__slug', 'game_type__slug'),
+}
+
+
+class CountryRef(NamedTuple):
+    id: int
+    name: str
+    code: str
+    slug: str
+
+
+class GameTypeRef(NamedTuple):
+    id: int
+    name: str
+    slug: str
+
+
+class GameRef(NamedTuple):
+    id: int
+    name: str
+    slug: str
+    country_id: int
+    game_type_id: int
+    is_active: bool
+
+    def instance(self):
+        """Instance de Game sans requête (champs absents de l'enregistrement chargés à la demande)."""
+        known = self._asdict()
+        # from_db attend les champs connus dans l'ordre des champs du modèle
+        names = [field.attname for field in Game._meta.concrete_fields if field.attname in known]
+        return Game.from_db(None, names, [known[name] for name in names])
+
+
+class ReferenceData:
+    """Instantané des données de référence à une version donnée."""
+
+    def __init__(self, version, countries, game_types, games, scheduled_games=()):
+        self.version = version
+        # Jeux ayant au moins une récurrence publiée (programmes.ProgramSchedule)
+        self.scheduled_games = frozenset(scheduled_games)
+        self.countries = {row.id: row for row in countries}
+        self.game_types = {row.id: row for row in game_types}
+        self.games = {row.id: row for row in games}
+        self.slugs = {
+            Country: {row.slug: row.id for row in countries},
+            GameType: {row.slug: row.id for row in game_types},
+            Game: {row.slug: row.id for row in games},
+        }
+        self.games_by = {'country': defaultdict(list), 'game_type': defaultdict(list)}
+        for game in games:
+            self.games_by['country'][game.country_id].append(game.id)
+            self.games_by['game_type'][game.game_type_id].append(game.id)
+
+    def id_for_slug(self, model, slug):
+        return self.slugs[model].get(slug)
+
+    def resolve(self, model, lookup, value):
+        """Identifiants de `model` vérifiant `<lookup> = value` (cf. SUPPORTED_LOOKUPS), sans requête."""
+        if lookup == 'slug':
+            found = self.slugs[model].get(value)
+            return [] if found is None else [found]
+        relation = lookup.split('__')[0]
+        related = self.slugs[Country if relation == 'country' else GameType].get(value)
+        return list(self.games_by[relation].get(related, []))
+
+
+# 1. Version partagée
+
+def get_reference_version():
+    return get_version(REFERENCE_VERSION_NAME)
+
+
+def _drop_local_snapshot(version):
+    _state.data = None
+
+
+def invalidate_reference_data(*args, **kwargs):
+    """
+    Invalide les instantanés de tous les processus après validation de la transaction en cours
+    (un rechargement avant le COMMIT relirait les anciennes lignes sous la nouvelle version).
+    - Utilisable directement comme récepteur de signal
+    """
+    bump_version(REFERENCE_VERSION_NAME, _drop_local_snapshot)
+
+
+# 2. Instantané du processus
+
+class _State:
+    def __init__(self):
+        self.data = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+
+_state = _State()
+
+
+def load_reference_data(version):
+    # Import local : programmes.models importe games.models
+    from programmes.models import ProgramSchedule
+
+    return ReferenceData(
+        version,
+        [CountryRef(*row) for row in Country.objects.order_by().values_list(*CountryRef._fields)],
+        [GameTypeRef(*row) for row in GameType.objects.order_by().values_list(*GameTypeRef._fields)],
+        [GameRef(*row) for row in Game.objects.order_by().values_list(*GameRef._fields)],
+        ProgramSchedule.objects.filter(is_published=True).order_by().values_list('game_id', flat=True).distinct(),
+    )
+
+
+def in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def reference_data():
+    """
+    Instantané courant, rechargé si la version partagée a changé.
+    - Dans une boucle asyncio, l'ORM synchrone est interdit : l'instantané existant est
+      conservé (les vues asynchrones appellent `areference_data()` en début de requête)
+    """
+    data = _state.data
+    now = time.monotonic()
+    interval = getattr(settings, 'REFERENCE_CACHE_CHECK_INTERVAL', 2)
+    if data is not None and now - _state.checked_at < interval:
+        return data
+    if data is not None and in_event_loop():
+        return data
+    with _state.lock:
+        version = get_reference_version()
+        if _state.data is None or _state.data.version != version:
+            _state.data = load_reference_data(version)
+        _state.checked_at = now
+        return _state.data
+
+
+async def areference_data():
+    """Équivalent asynchrone de `reference_data()` (rechargement dans un thread)."""
+    data = _state.data
+    interval = getattr(settings, 'REFERENCE_CACHE_CHECK_INTERVAL', 2)
+    if data is not None and time.monotonic() - _state.checked_at < interval:
+        return data
+    return await sync_to_async(reference_data)()
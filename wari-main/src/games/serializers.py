@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.core.exceptions import ValidationError
+from django.db.models import Count
 from .models import Country, GameType, Game
+from .refcache import reference_data
+from wari.readers import CompiledReader, constant
 
 class CountrySerializer(serializers.ModelSerializer):
     """Sérialiseur pour les pays, inclut le nombre de jeux associés."""
@@ -13,6 +16,9 @@ class CountrySerializer(serializers.ModelSerializer):
 
     def get_game_count(self, obj):
         """Calcule le nombre de jeux associés au pays."""
+        # Valeur précalculée par la vue si disponible (évite une requête par ligne)
+        if hasattr(obj, 'game_count'):
+            return obj.game_count
         # Note : Utiliser prefetch_related dans la vue pour optimiser
         return obj.games.count()
 
@@ -39,6 +45,9 @@ class GameTypeSerializer(serializers.ModelSerializer):
 
     def get_game_count(self, obj):
         """Calcule le nombre de jeux associés au type."""
+        # Valeur précalculée par la vue si disponible (évite une requête par ligne)
+        if hasattr(obj, 'game_count'):
+            return obj.game_count
         # Note : Utiliser prefetch_related dans la vue pour optimiser
         return obj.games.count()
 
@@ -101,4 +110,55 @@ class GameSerializer(serializers.ModelSerializer):
                 "Un jeu avec ce nom existe déjà pour ce pays."
             )
 
-        return data
\ No newline at end of file
+        return data
+
+class GameSlugField(serializers.SlugRelatedField):
+    """
+    Slug du jeu résolu par le cache des données de référence :
+    - Lecture : seul `game_id` est lu sur l'objet (ni jointure ni select_related)
+    - Écriture : slug -> instance de Game sans requête, repli sur le queryset
+      si le jeu n'est pas encore dans le cache (créé par un autre processus)
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('slug_field', 'slug')
+        super().__init__(**kwargs)
+
+    def use_pk_only_optimization(self):
+        return True
+
+    def to_representation(self, value):
+        game = reference_data().games.get(value.pk)
+        if game is None:
+            return Game.objects.filter(pk=value.pk).values_list('slug', flat=True).first()
+        return game.slug
+
+    def to_internal_value(self, data):
+        references = reference_data()
+        game_id = references.id_for_slug(Game, str(data))
+        if game_id is None:
+            return super().to_internal_value(data)
+        return references.games[game_id].instance()
+
+
+def attach_serialized_game_counts(items):
+    """Compteurs de jeux des pays et types d'une page sérialisée (deux requêtes agrégées)."""
+    country_counts = dict(
+        Game.objects.filter(country_id__in={item['country']['id'] for item in items})
+        .values_list('country_id').annotate(total=Count('id')).order_by()
+    )
+    game_type_counts = dict(
+        Game.objects.filter(game_type_id__in={item['game_type']['id'] for item in items})
+        .values_list('game_type_id').annotate(total=Count('id')).order_by()
+    )
+    for item in items:
+        item['country']['game_count'] = country_counts.get(item['country']['id'], 0)
+        item['game_type']['game_count'] = game_type_counts.get(item['game_type']['id'], 0)
+
+
+# Lecture compilée des listes client (wari.readers)
+game_reader = CompiledReader(
+    GameSerializer,
+    overrides={'country.game_count': constant(None), 'game_type.game_count': constant(None)},
+    finalize=attach_serialized_game_counts,
+)
@@ -0,0 +1,39 @@
+from django.db.models.signals import post_save, post_delete
+
+from .feed import invalidate_country_feeds
+from .refcache import invalidate_reference_data
+
+
+def connect_feed_invalidation():
+    """
+    Invalide les flux pays à chaque création, modification ou suppression
+    d'un pays, type de jeu (nom et slug sérialisés dans chaque jeu du flux), jeu,
+    programme, récurrence de programme, résultat ou pronostic.
+    - Les mises à jour en masse (queryset.update) invalident explicitement (cf. admin)
+    """
+    from programmes.models import Program, ProgramSchedule, ScheduleException
+    from results.models import Result
+    from predictions.models import Prediction
+    from .models import Country, Game, GameType
+
+    from wari.publication import publication_changed
+
+    for model in (Country, GameType, Game, Program, ProgramSchedule, ScheduleException, Result, Prediction):
+        post_save.connect(invalidate_country_feeds, sender=model, dispatch_uid=f'country-feed-save-{model.__name__}')
+        post_delete.connect(invalidate_country_feeds, sender=model, dispatch_uid=f'country-feed-delete-{model.__name__}')
+    # Bascules du planificateur de publication (UPDATE en masse, sans post_save)
+    publication_changed.connect(invalidate_country_feeds, dispatch_uid='country-feed-publication')
+
+
+def connect_reference_invalidation():
+    """
+    Invalide le cache des données de référence (slugs et identifiants) à chaque
+    création, modification ou suppression d'un pays, type de jeu, jeu ou récurrence de programmes.
+    - Les mises à jour en masse (queryset.update) invalident explicitement (cf. admin)
+    """
+    from programmes.models import ProgramSchedule
+    from .models import Country, Game, GameType
+
+    for model in (Country, GameType, Game, ProgramSchedule):
+        post_save.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference-save-{model.__name__}')
+        post_delete.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference-delete-{model.__name__}')
@@ -0,0 +1,14 @@
+from jobs.registry import task
+
+from .feed import get_country_feed
+from .models import Country
+
+
+@task('games.warm_country_feeds', max_attempts=3)
+def warm_country_feeds(slugs=None):
+    """Préconstruit les flux d'accueil des pays (tous, ou ceux listés dans `slugs`)."""
+    countries = Country.objects.all()
+    if slugs:
+        countries = countries.filter(slug__in=slugs)
+    for country in countries:
+        get_country_feed(country, {'request': None})
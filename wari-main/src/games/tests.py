@@ -1,3 +1,189 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from django.urls import reverse
+from rest_framework.test import APIClient, APIRequestFactory
+
+from programmes.models import Program
+from wari import batch
+from . import feed, refcache
+from .versions import increment_version
+from .models import Country, GameType, Game
+from .serializers import GameSerializer, game_reader
+from .views import ClientGameViewSet
+
+
+class GameReaderGoldenTests(TestCase):
+    """Liste compilée (wari.readers) : JSON identique octet pour octet au sérialiseur DRF."""
+
+    @classmethod
+    def setUpTestData(cls):
+        senegal = Country.objects.create(name='Sénégal', code='SEN')
+        ivory_coast = Country.objects.create(name="Côte d'Ivoire", code='CIV')
+        lotto = GameType.objects.create(name='Loto', description='Tirages « 5/90 »')
+        horses = GameType.objects.create(name='Courses Hippiques')
+        Game.objects.create(name='Loto Bonheur', country=senegal, game_type=lotto, description='Tirage du soir ✓')
+        Game.objects.create(name='Quinté', country=senegal, game_type=horses, description=None)
+        Game.objects.create(name='Loto Ivoire', country=ivory_coast, game_type=lotto, description='')
+        Game.objects.create(name='Ancien Jeu', country=ivory_coast, game_type=lotto, is_active=False)
+
+    def assertGolden(self, queryset):
+        expected = JSONRenderer().render(GameSerializer(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(game_reader.serialize(game_reader.rows(queryset))), expected)
+
+    def test_serialize_matches_serializer(self):
+        self.assertGolden(Game.objects.select_related('country', 'game_type'))
+
+    def test_serialize_empty_page(self):
+        self.assertEqual(game_reader.serialize(game_reader.rows(Game.objects.none())), [])
+
+    def test_client_list_matches_serializer(self):
+        view = ClientGameViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        for params in ({}, {'country__slug': 'senegal'}, {'search': 'loto'}, {'page_size': 1, 'page': 2}):
+            with self.subTest(params=params):
+                with override_settings(FAST_READ_SERIALIZERS=False):
+                    expected = view(factory.get('/api/client/games/', params)).render().content
+                with override_settings(FAST_READ_SERIALIZERS=True):
+                    compiled = view(factory.get('/api/client/games/', params)).render().content
+                self.assertEqual(compiled, expected)
+
+
+class ReferenceVersionTests(TestCase):
+    """Version des données de référence partagée en base : vue par tous les processus."""
+
+    def create_game(self, name):
+        country, _ = Country.objects.get_or_create(code='MLI', defaults={'name': 'Mali'})
+        game_type, _ = GameType.objects.get_or_create(name='Loto')
+        return Game.objects.create(name=name, country=country, game_type=game_type)
+
+    def test_bump_once_per_transaction_after_commit(self):
+        before = refcache.get_reference_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.create_game('Loto Mali')
+            self.create_game('Super Loto')
+            self.assertEqual(refcache.get_reference_version(), before)  # Rien avant le COMMIT
+        bumps = [func for func in callbacks if getattr(func, 'shared_version', None) == refcache.REFERENCE_VERSION_NAME]
+        self.assertEqual(len(bumps), 1)
+        self.assertEqual(refcache.get_reference_version(), before + 1)
+
+    def test_other_process_snapshot_reloaded(self):
+        # Instantané d'un autre processus, chargé avant la création du jeu
+        stale = refcache.load_reference_data(refcache.get_reference_version())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_game('Loto Bamako')
+        refcache._state.data, refcache._state.checked_at = stale, 0.0
+        self.addCleanup(setattr, refcache._state, 'data', None)
+        self.assertIsNone(stale.id_for_slug(Game, 'loto-bamako-mli'))
+        self.assertIsNotNone(refcache.reference_data().id_for_slug(Game, 'loto-bamako-mli'))
+
+
+class FeedVersionTests(TestCase):
+    """Version des flux pays partagée en base : l'invalidation atteint les autres processus."""
+
+    def setUp(self):
+        feed._feed_version.version = None  # Version locale d'un test précédent (annulé)
+
+    def test_invalidation_bumps_shared_version(self):
+        before = feed.get_feed_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            feed.invalidate_country_feeds()
+            feed.invalidate_country_feeds()
+        self.assertEqual(feed.get_version(feed.FEED_VERSION_NAME), before + 1)
+        self.assertEqual(feed.get_feed_version(), before + 1)  # Processus à l'origine : immédiat
+
+    def test_game_type_rename_invalidates(self):
+        game_type = GameType.objects.create(name='Loto')
+        with mock.patch.object(feed, 'bump_version') as bump:
+            game_type.name = 'Loto national'
+            game_type.save()
+            game_type.delete()
+        self.assertEqual(bump.call_count, 2)
+
+    def test_other_process_version_reread(self):
+        before = feed.get_feed_version()
+        increment_version(feed.FEED_VERSION_NAME)  # Invalidation par un autre processus
+        with override_settings(REFERENCE_CACHE_CHECK_INTERVAL=60):
+            self.assertEqual(feed.get_feed_version(), before)
+        feed._feed_version.checked_at = 0.0
+        self.assertEqual(feed.get_feed_version(), before + 1)
+
+
+class DenormPropagationTests(TestCase):
+    """Triggers de games.denorm : colonnes recopiées et `updated_at` des lignes enfants."""
+
+    def test_propagation_stamps_write_time(self):
+        country = Country.objects.create(name='Mali', code='MLI')
+        game = Game.objects.create(name='Loto Bamako', country=country, game_type=GameType.objects.create(name='Loto'))
+        program = Program.objects.create(game=game, event_date=timezone.now() + timedelta(days=1), details='Tirage',
+                                         is_published=True)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT now()")  # Début de la transaction du test
+            started = cursor.fetchone()[0]
+        Game.objects.filter(id=game.id).update(is_active=False)
+        program.refresh_from_db()
+        self.assertFalse(program.game_active)
+        self.assertGreater(program.updated_at, started)
+
+
+class BatchViewTests(TestCase):
+    """Requêtes groupées (wari.batch) : validation, ordre des réponses et statut par élément."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('client-batch')
+
+    def post(self, requests):
+        return self.client.post(self.url, {'requests': requests}, format='json')
+
+    def test_validation(self):
+        self.assertEqual(self.post([]).status_code, 400)
+        response = self.post(['/api/admin/games/', {'path': '/api/client/batch/'},
+                              {'path': '/api/client/games/', 'method': 'POST'}, '/api/client/games/'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['requests'], [
+            "#0 : le chemin doit commencer par /api/client/",
+            "#1 : les lots imbriqués ne sont pas autorisés",
+            "#2 : seules les requêtes GET sont autorisées",
+        ])
+        with override_settings(BATCH_MAX_REQUESTS=2):
+            self.assertEqual(self.post(['/api/client/games/'] * 3).json(),
+                             {'requests': ["Au plus 2 requêtes par lot."]})
+
+    def test_responses_in_request_order(self):
+        response = self.post([
+            {'id': 'games', 'path': '/api/client/games/?page_size=1'},
+            '/api/client/inconnu/',
+            {'id': 'detail', 'path': '/api/client/games/999999/'},
+        ])
+        self.assertEqual(response.status_code, 200)
+        responses = response.json()['responses']
+        self.assertEqual([(item['id'], item['path'], item['status']) for item in responses], [
+            ('games', '/api/client/games/?page_size=1', 200),
+            (1, '/api/client/inconnu/', 404),
+            ('detail', '/api/client/games/999999/', 404),
+        ])
+        self.assertIn('results', responses[0]['body'])
+
+    def test_unhandled_error_is_per_item_status(self):
+        run_subrequest = batch.run_subrequest
+
+        def fail_on_programs(request, item):
+            if item['path'].startswith('/api/client/programs/'):
+                raise RuntimeError("erreur attendue")
+            return run_subrequest(request, item)
+
+        with mock.patch.object(batch, 'run_subrequest', side_effect=fail_on_programs), \
+                self.assertLogs('wari.batch', 'ERROR'):
+            single = self.post(['/api/client/programs/'])
+            several = self.post(['/api/client/games/', '/api/client/programs/'])
+        self.assertEqual(single.status_code, 200)
+        self.assertEqual(single.json(), {'responses': [
+            {'id': 0, 'path': '/api/client/programs/', 'status': 500, 'body': {'detail': 'Erreur interne.'}},
+        ]})
+        self.assertEqual(several.status_code, 200)
+        self.assertEqual([item['status'] for item in several.json()['responses']], [200, 500])
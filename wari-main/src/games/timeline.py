@@ -0,0 +1,148 @@
+"""
+Fil chronologique d'un jeu (`/api/client/games/{slug}/timeline/`) : programmes,
+résultats et pronostics publiés, triés par date dans un seul flux.
+
+Fusion k-voies (heapq.merge) de trois curseurs lus dans l'ordre de leur index :
+- Programmes : contrainte unique (game, event_date)
+- Résultats : contrainte unique (game, result_date)
+- Pronostics : index partiel (game, predicted_at) des pronostics publiés
+
+Pagination par curseur opaque (keyset) : position (date, type, id) du dernier élément
+livré. Chaque page lit au plus `limit + 1` lignes par source, quelle que soit sa
+profondeur ; aucun OFFSET.
+"""
+import base64
+import heapq
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework import serializers
+
+
+# 1. Sources du fil
+
+@dataclass(frozen=True)
+class TimelineSource:
+    kind: str  # Type exposé aux clients
+    model: type
+    date_field: str  # Date de tri (deuxième colonne de l'index (game, date))
+    visible: Q  # Éléments visibles des clients (même règle que les vues client)
+    serializer_class: type
+    select_related: tuple = ()
+    unique_date: bool = False  # (game, date) unique : l'index suffit au tri, sans départage par id
+
+    def ordering(self, descending):
+        prefix = '-' if descending else ''
+        fields = [self.date_field] if self.unique_date else [self.date_field, 'id']
+        return [f'{prefix}{field}' for field in fields]
+
+    def queryset(self, game_id):
+        queryset = self.model.objects.filter(self.visible, game_id=game_id)
+        # select_related() sans argument suivrait toutes les clés étrangères
+        return queryset.select_related(*self.select_related) if self.select_related else queryset
+
+
+def timeline_sources():
+    # Imports locaux : ces applications dépendent elles-mêmes de games.models
+    from predictions.models import Prediction
+    from predictions.serializers import PredictionSerializer
+    from programmes.models import Program
+    from programmes.serializers import ProgramSerializer
+    from results.models import PUBLIC_STATUSES, Result
+    from results.serializers import ResultSerializer
+
+    return [
+        TimelineSource('program', Program, 'event_date', Q(is_published=True), ProgramSerializer,
+                       unique_date=True),
+        TimelineSource('result', Result, 'result_date', Q(status__in=PUBLIC_STATUSES), ResultSerializer,
+                       ('validated_by',), unique_date=True),
+        TimelineSource('prediction', Prediction, 'predicted_at', Q(is_published=True), PredictionSerializer,
+                       ('author',)),
+    ]
+
+
+# 2. Curseur
+
+class TimelineCursor(NamedTuple):
+    at: datetime
+    rank: int  # Rang de la source, départage les éléments de même date
+    id: int
+    descending: bool
+
+    def encode(self):
+        raw = [self.at.isoformat(), self.rank, self.id, int(self.descending)]
+        return base64.urlsafe_b64encode(json.dumps(raw, separators=(',', ':')).encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, token):
+        try:
+            at, rank, object_id, descending = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            cursor = cls(datetime.fromisoformat(at), int(rank), int(object_id), bool(descending))
+            if cursor.at.tzinfo is None:
+                raise ValueError(token)
+            return cursor
+        except (ValueError, TypeError):
+            raise serializers.ValidationError({'cursor': "Curseur de fil invalide."})
+
+    def after(self, field, rank):
+        """Éléments d'une source (rang `rank`) strictement après le curseur, dans le sens du fil."""
+        strict, loose = ('lt', 'lte') if self.descending else ('gt', 'gte')
+        ahead = rank < self.rank if self.descending else rank > self.rank
+        behind = rank > self.rank if self.descending else rank < self.rank
+        if ahead:
+            return Q(**{f'{field}__{loose}': self.at})
+        if behind:
+            return Q(**{f'{field}__{strict}': self.at})
+        # La borne large seule sert de condition d'index, le reste départage les ex aequo
+        return Q(**{f'{field}__{loose}': self.at}) & (
+            Q(**{f'{field}__{strict}': self.at}) | Q(**{f'id__{strict}': self.id})
+        )
+
+
+# 3. Lecture d'une page
+
+def read_source(rank, source, game_id, cursor, descending, limit):
+    """Au plus `limit` lignes d'une source après le curseur : [(clé de tri, rang, ligne)]."""
+    queryset = source.queryset(game_id).order_by(*source.ordering(descending))
+    if cursor is not None:
+        queryset = queryset.filter(cursor.after(source.date_field, rank))
+    return [((getattr(row, source.date_field), rank, row.id), rank, row) for row in queryset[:limit]]
+
+
+def timeline_page(game_id, cursor=None, limit=None, descending=True, context=None):
+    """
+    Page du fil d'un jeu après le curseur `cursor` (None : début du fil).
+    - `descending` : plus récents d'abord (par défaut) ; ignoré si un curseur est fourni
+    Retourne {'results', 'next', 'has_more'} ; `next` est à renvoyer tel quel au prochain appel.
+    """
+    limit = min(limit or settings.TIMELINE_PAGE_SIZE, settings.TIMELINE_MAX_PAGE_SIZE)
+    if cursor:
+        cursor = TimelineCursor.decode(cursor)
+        descending = cursor.descending
+    sources = timeline_sources()
+    streams = [read_source(rank, source, game_id, cursor, descending, limit + 1) for rank, source in enumerate(sources)]
+    # Chaque source est déjà triée : fusion sans tri global, arrêtée à `limit + 1` éléments
+    page = list(islice(heapq.merge(*streams, key=lambda entry: entry[0], reverse=descending), limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    # Sérialisation des seules lignes retenues, par source
+    data = {}
+    for rank, source in enumerate(sources):
+        rows = [row for _, row_rank, row in page if row_rank == rank]
+        serialized = source.serializer_class(rows, many=True, context=context or {}).data
+        data.update({(rank, row.id): item for row, item in zip(rows, serialized)})
+    results = [
+        {'type': sources[rank].kind, 'date': key[0], 'data': data[rank, row.id]}
+        for key, rank, row in page
+    ]
+    next_cursor = None
+    if has_more:
+        at, rank, last_id = page[-1][0]
+        next_cursor = TimelineCursor(at, rank, last_id, descending).encode()
+    return {'results': results, 'next': next_cursor, 'has_more': has_more}
@@ -0,0 +1,49 @@
+"""
+Versions partagées des caches en mémoire (table games_sharedversion).
+
+Le cache Django par défaut (LocMemCache) est propre à chaque processus : une version
+qui y serait incrémentée ne serait vue que par le processus à l'origine de la
+modification. La version est donc gardée en base, visible de tous les workers :
+- `bump_version` : incrément unique par transaction, exécuté après le COMMIT
+- `get_version` : lecture simple (0 tant que la version n'a jamais été incrémentée)
+"""
+from django.db import connection, transaction
+
+from .models import SharedVersion
+
+_BUMP_SQL = (
+    f"INSERT INTO {SharedVersion._meta.db_table} (name, version) VALUES (%s, 1) "
+    f"ON CONFLICT (name) DO UPDATE SET version = {SharedVersion._meta.db_table}.version + 1 "
+    "RETURNING version"
+)
+
+
+def get_version(name):
+    version = SharedVersion.objects.filter(name=name).values_list('version', flat=True).first()
+    return version or 0
+
+
+def increment_version(name):
+    """Incrémente la version immédiatement (UPSERT atomique) et la retourne."""
+    with connection.cursor() as cursor:
+        cursor.execute(_BUMP_SQL, [name])
+        return cursor.fetchone()[0]
+
+
+def bump_version(name, callback=None):
+    """
+    Incrémente la version `name` après validation de la transaction en cours :
+    - Une seule fois par transaction, quel que soit le nombre de modifications
+    - `callback(version)` appelé ensuite dans le processus courant (invalidation locale immédiate)
+    """
+    pending = [func for _, func, _ in connection.run_on_commit]
+    if any(getattr(func, 'shared_version', None) == name for func in pending):
+        return
+
+    def bump():
+        version = increment_version(name)
+        if callback is not None:
+            callback(version)
+
+    bump.shared_version = name
+    transaction.on_commit(bump)
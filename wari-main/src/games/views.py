@@ -1,15 +1,25 @@
 from django.shortcuts import render
 from django.db import transaction
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, serializers
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.exceptions import NotFound
+from django.shortcuts import get_object_or_404
 from rest_framework.pagination import PageNumberPagination
-from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import BasePermission
 from rest_framework.filters import SearchFilter
+from django.db.models import Count
 import logging
 
 from .models import Country, GameType, Game
-from .serializers import CountrySerializer, GameTypeSerializer, GameSerializer
+from .serializers import CountrySerializer, GameTypeSerializer, GameSerializer, game_reader
+from .feed import get_country_feed
+from .refcache import reference_data
+from .timeline import timeline_page
+from .filters import ReferenceFilterBackend
+from wari.async_views import AsyncClientReadOnlyView
+from wari.log import ExceptionLoggingMixin
+from wari.readers import CompiledListMixin
 
 # Configuration du logger pour le suivi des événements
 logger = logging.getLogger(__name__)
@@ -38,21 +48,16 @@ class IsAdminOrReadOnly(BasePermission):
 
 # 3. Base ViewSet pour factorisation
 
-class BaseViewSet(viewsets.ModelViewSet):
+class BaseViewSet(ExceptionLoggingMixin, viewsets.ModelViewSet):
     """
     ViewSet de base factorisant les configurations communes :
     - Permissions : admin pour écriture, lecture pour tous
     - Pagination : 20 éléments par page
-    - Filtres : DjangoFilterBackend et SearchFilter
+    - Filtres : ReferenceFilterBackend (slugs résolus en mémoire) et SearchFilter
     """
     permission_classes = [IsAdminOrReadOnly]
     pagination_class = StandardPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-
-    def handle_exception(self, exc):
-        """Surcharge pour logger les erreurs inattendues."""
-        logger.error(f"Erreur dans {self.__class__.__name__}: {str(exc)}", exc_info=True)
-        return super().handle_exception(exc)
+    filter_backends = [ReferenceFilterBackend, SearchFilter]
 
 
 # 4. ViewSet pour les Pays
@@ -77,13 +82,13 @@ class CountryViewSet(BaseViewSet):
         """
         instance = self.get_object()
         if instance.games.exists():
-            logger.warning(f"Tentative de suppression du pays '{instance.name}' avec jeux associés")
+            logger.warning("Tentative de suppression du pays '%s' avec jeux associés", instance.name)
             return Response(
                 {"detail": "Impossible de supprimer ce pays : des jeux y sont associés."},
                 status=status.HTTP_400_BAD_REQUEST
             )
         with transaction.atomic():
-            logger.info(f"Suppression réussie du pays '{instance.name}'")
+            logger.info("Suppression réussie du pays '%s'", instance.name)
             return super().destroy(request, *args, **kwargs)
 
 
@@ -108,13 +113,13 @@ class GameTypeViewSet(BaseViewSet):
         """
         instance = self.get_object()
         if instance.games.exists():
-            logger.warning(f"Tentative de suppression du type '{instance.name}' avec jeux associés")
+            logger.warning("Tentative de suppression du type '%s' avec jeux associés", instance.name)
             return Response(
                 {"detail": "Impossible de supprimer ce type : des jeux y sont associés."},
                 status=status.HTTP_400_BAD_REQUEST
             )
         with transaction.atomic():
-            logger.info(f"Suppression réussie du type '{instance.name}'")
+            logger.info("Suppression réussie du type '%s'", instance.name)
             return super().destroy(request, *args, **kwargs)
 
 
@@ -138,29 +143,107 @@ class GameViewSet(BaseViewSet):
         - Peut être étendu pour des validations spécifiques
         """
         instance = serializer.save()
-        logger.info(f"Jeu '{instance.name}' créé avec succès")
+        logger.info("Jeu '%s' créé avec succès", instance.name)
 
     def perform_update(self, serializer):
         """
         Mise à jour d'un jeu avec logging.
         """
         instance = serializer.save()
-        logger.info(f"Jeu '{instance.name}' mis à jour avec succès")
+        logger.info("Jeu '%s' mis à jour avec succès", instance.name)
 
 
  #7. ViewSet en lecture seule pour les Clients
-class ClientGameViewSet(viewsets.ReadOnlyModelViewSet):
+class ClientGameViewSet(ExceptionLoggingMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """
     Affichage des jeux actifs pour les clients (lecture seule).
     - Optimisation avec select_related et champs spécifiques via only()
     - Filtres et recherche sur nom, description, pays, type
+    - Liste sérialisée depuis des tuples (wari.readers), compteurs de jeux agrégés par page
     """
     queryset = Game.objects.filter(is_active=True).select_related('country', 'game_type').only(
         'id', 'name', 'description', 'country', 'game_type'
     )
     serializer_class = GameSerializer
+    reader = game_reader
     permission_classes = [IsAdminOrReadOnly]
     pagination_class = StandardPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [ReferenceFilterBackend, SearchFilter]
     filterset_fields = ['country__slug', 'game_type__slug']
-    search_fields = ['name', 'description']
\ No newline at end of file
+    search_fields = ['name', 'description']
+
+
+# 8. Flux d'accueil par pays pour les Clients
+class CountryFeedView(APIView):
+    """
+    Flux d'accueil d'un pays en un seul appel (remplace les appels jeux + programmes
+    + résultats + pronostics par jeu) :
+    - Pour chaque jeu actif : prochain programme publié, dernier résultat officiel,
+      dernier pronostic publié
+    - Nombre constant de requêtes, réponse mise en cache et invalidée à chaque modification
+    """
+    permission_classes = [IsAdminOrReadOnly]
+
+    def get(self, request, slug):
+        country = get_object_or_404(Country, slug=slug)
+        return Response(get_country_feed(country, {'request': request}))
+
+
+# 9. Fil chronologique d'un jeu pour les Clients
+class TimelineQuerySerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False, allow_blank=True)
+    limit = serializers.IntegerField(required=False, min_value=1)
+    order = serializers.ChoiceField(choices=['desc', 'asc'], default='desc')
+
+
+class GameTimelineView(ExceptionLoggingMixin, APIView):
+    """
+    Programmes, résultats et pronostics publiés d'un jeu en un seul fil trié par date
+    (remplace trois listes complètes triées côté client) :
+    - GET /api/client/games/{slug}/timeline/ : plus récents d'abord (`order=asc` : plus anciens d'abord)
+    - Tant que `has_more` est vrai, la page suivante s'obtient avec `cursor=<next>`
+    """
+    permission_classes = [IsAdminOrReadOnly]
+
+    def get(self, request, slug):
+        game_id = reference_data().id_for_slug(Game, slug)
+        game = reference_data().games.get(game_id)
+        if game is None or not game.is_active:
+            raise NotFound("Jeu introuvable.")
+        query = TimelineQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(timeline_page(
+            game.id,
+            cursor=query.validated_data.get('cursor') or None,
+            limit=query.validated_data.get('limit'),
+            descending=query.validated_data['order'] == 'desc',
+            context={'request': request},
+        ))
+
+
+# 10. Vue asynchrone pour les Clients (ASGI)
+class AsyncClientGameView(AsyncClientReadOnlyView):
+    """
+    Équivalent asynchrone de ClientGameViewSet (mêmes filtres, pagination et sortie).
+    - Les compteurs de jeux par pays et par type sont calculés en deux requêtes agrégées
+      au lieu d'une requête par ligne dans les sérialiseurs imbriqués
+    """
+    viewset_class = ClientGameViewSet
+
+    async def prepare(self, objects):
+        country_ids = {game.country_id for game in objects}
+        game_type_ids = {game.game_type_id for game in objects}
+        country_counts = {
+            row['country_id']: row['total']
+            async for row in Game.objects.filter(country_id__in=country_ids)
+            .values('country_id').annotate(total=Count('id')).order_by()
+        }
+        game_type_counts = {
+            row['game_type_id']: row['total']
+            async for row in Game.objects.filter(game_type_id__in=game_type_ids)
+            .values('game_type_id').annotate(total=Count('id')).order_by()
+        }
+        for game in objects:
+            game.country.game_count = country_counts.get(game.country_id, 0)
+            game.game_type.game_count = game_type_counts.get(game.game_type_id, 0)
+        return objects
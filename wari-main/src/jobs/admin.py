@@ -0,0 +1,29 @@
+from django.contrib import admin
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from .models import Job
+from .worker import job_metrics
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    """Interface pour suivre et relancer les tâches de fond."""
+    list_display = ['id', 'task', 'queue', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'finished_at']
+    list_filter = ['status', 'queue', 'task']
+    search_fields = ['task', 'dedup_key', 'locked_by']
+    date_hierarchy = 'created_at'
+    list_per_page = 25
+    readonly_fields = ['attempts', 'last_error', 'locked_by', 'locked_at', 'heartbeat_at', 'finished_at', 'created_at', 'updated_at']
+    actions = ['retry']
+
+    def changelist_view(self, request, extra_context=None):
+        # Métriques de la file affichées au-dessus de la liste
+        extra_context = {**(extra_context or {}), 'job_metrics': job_metrics()}
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def retry(self, request, queryset):
+        """Remet en file les tâches échouées sélectionnées."""
+        updated = queryset.filter(status=Job.STATUS_FAILED).update(
+            status=Job.STATUS_QUEUED, attempts=0, run_at=timezone.now(), finished_at=None, last_error=''
+        )
+        self.message_user(request, f"{updated} tâches ont été remises en file.")
+    retry.short_description = _("Relancer les tâches échouées")
@@ -0,0 +1,69 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from jobs.registry import registered_tasks
+from jobs.process import process_main
+from jobs.worker import run_threads
+
+
+class Command(BaseCommand):
+    """
+    Lance les workers de tâches de fond.
+
+    Exemples :
+        python manage.py runjobs --concurrency 4                    # 4 threads
+        python manage.py runjobs --mode processes --concurrency 4   # 4 processus
+        python manage.py runjobs --queue default --queue exports --burst --concurrency 4
+    """
+    help = "Exécute les tâches de fond de la file PostgreSQL (SELECT ... FOR UPDATE SKIP LOCKED)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', default=None, help="File à consommer (répétable, défaut : default)")
+        parser.add_argument('--concurrency', type=int, default=1, help="Nombre de workers parallèles")
+        parser.add_argument('--mode', choices=['threads', 'processes'], default='threads',
+                            help="Parallélisme par threads ou par processus")
+        parser.add_argument('--threads-per-process', type=int, default=1,
+                            help="Threads par processus en mode processes")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Attente quand la file est vide (secondes)")
+        parser.add_argument('--burst', action='store_true',
+                            help="S'arrête dès que la file est vide (--concurrency threads, quel que soit --mode)")
+
+    def handle(self, *args, **options):
+        queues = options['queue'] or ['default']
+        self.stdout.write(f"Tâches enregistrées : {', '.join(sorted(registered_tasks())) or 'aucune'}")
+
+        if options['burst'] or options['mode'] == 'threads':
+            stop_event = threading.Event()
+            signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+            signal.signal(signal.SIGINT, lambda *args: stop_event.set())
+            workers = run_threads(queues, options['poll_interval'], options['concurrency'], stop_event,
+                                  burst=options['burst'])
+            if options['burst']:
+                self.stdout.write(f"File vide : {sum(worker.processed for worker in workers)} tâches traitées.")
+            return
+
+        # Mode processus : chaque processus initialise Django et ses propres connexions
+        context = multiprocessing.get_context('spawn')
+        processes = [
+            context.Process(
+                target=process_main,
+                args=(queues, options['poll_interval'], options['threads_per_process']),
+                name=f"jobs-process-{i}",
+            )
+            for i in range(options['concurrency'])
+        ]
+        for process in processes:
+            process.start()
+
+        def stop(*args):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        for process in processes:
+            process.join()
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:06
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('queue', models.CharField(default='default', help_text='File de traitement de la tâche', max_length=50, verbose_name='File')),
+                ('task', models.CharField(help_text='Nom de la tâche enregistrée (ex. : games.warm_country_feeds)', max_length=200, verbose_name='Tâche')),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Arguments nommés passés à la tâche', verbose_name='Paramètres')),
+                ('status', models.CharField(choices=[('queued', 'En attente'), ('running', 'En cours'), ('succeeded', 'Terminée'), ('failed', 'Échouée')], default='queued', max_length=10, verbose_name='Statut')),
+                ('dedup_key', models.CharField(blank=True, help_text='Une seule tâche active (en attente ou en cours) par tâche et par clé', max_length=200, null=True, verbose_name='Clé de dédoublonnage')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Date à partir de laquelle la tâche peut être exécutée', verbose_name='Exécuter à partir de')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Tentatives')),
+                ('max_attempts', models.PositiveIntegerField(default=5, verbose_name='Tentatives maximales')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('locked_by', models.CharField(blank=True, max_length=100, verbose_name='Worker')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Prise en charge le')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Terminée le')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour')),
+            ],
+            options={
+                'verbose_name': 'Tâche de fond',
+                'verbose_name_plural': 'Tâches de fond',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['queue', 'run_at'], name='jobs_job_due_idx'), models.Index(fields=['status', 'finished_at'], name='jobs_job_status_finished_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('task', 'dedup_key'), name='unique_active_job_dedup_key')],
+            },
+        ),
+    ]
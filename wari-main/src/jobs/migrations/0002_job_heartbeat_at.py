@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Renouvelé par le worker pendant l’exécution ; au-delà de JOBS_LOCK_TIMEOUT, la tâche est reprise', null=True, verbose_name='Dernier signe de vie'),
+        ),
+        # Tâches déjà en cours : signe de vie initial à leur prise en charge
+        migrations.RunSQL(
+            "UPDATE jobs_job SET heartbeat_at = locked_at WHERE status = 'running'",
+            migrations.RunSQL.noop,
+        ),
+    ]
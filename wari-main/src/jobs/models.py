@@ -0,0 +1,87 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, 'En attente'),
+        (STATUS_RUNNING, 'En cours'),
+        (STATUS_SUCCEEDED, 'Terminée'),
+        (STATUS_FAILED, 'Échouée'),
+    )
+    ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+    queue = models.CharField(
+        max_length=50,
+        default='default',
+        verbose_name='File',
+        help_text='File de traitement de la tâche'
+    )
+    task = models.CharField(
+        max_length=200,
+        verbose_name='Tâche',
+        help_text='Nom de la tâche enregistrée (ex. : games.warm_country_feeds)'
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Paramètres',
+        help_text='Arguments nommés passés à la tâche'
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_QUEUED,
+        verbose_name='Statut'
+    )
+    dedup_key = models.CharField(
+        max_length=200,
+        null=True,
+        blank=True,
+        verbose_name='Clé de dédoublonnage',
+        help_text='Une seule tâche active (en attente ou en cours) par tâche et par clé'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Exécuter à partir de',
+        help_text='Date à partir de laquelle la tâche peut être exécutée'
+    )
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Tentatives')
+    max_attempts = models.PositiveIntegerField(default=5, verbose_name='Tentatives maximales')
+    last_error = models.TextField(blank=True, verbose_name='Dernière erreur')
+    locked_by = models.CharField(max_length=100, blank=True, verbose_name='Worker')
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name='Prise en charge le')
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Dernier signe de vie',
+        help_text='Renouvelé par le worker pendant l’exécution ; au-delà de JOBS_LOCK_TIMEOUT, la tâche est reprise'
+    )
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Terminée le')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date de création', editable=False)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour', editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['task', 'dedup_key'],
+                condition=Q(status__in=['queued', 'running']),
+                name='unique_active_job_dedup_key'
+            )
+        ]
+        indexes = [
+            # File des tâches exécutables : seules les lignes en attente sont indexées
+            models.Index(fields=['queue', 'run_at'], condition=Q(status='queued'), name='jobs_job_due_idx'),
+            models.Index(fields=['status', 'finished_at'], name='jobs_job_status_finished_idx'),
+        ]
+        verbose_name = 'Tâche de fond'
+        verbose_name_plural = 'Tâches de fond'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.get_status_display()})"
@@ -0,0 +1,19 @@
+"""
+Point d'entrée des processus workers (méthode de démarrage « spawn »).
+
+Ce module n'importe aucun modèle au chargement : le processus enfant doit
+d'abord initialiser Django.
+"""
+import signal
+import threading
+
+
+def process_main(queues, poll_interval, threads):
+    import django
+    django.setup()
+    from .worker import run_threads
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop_event.set())
+    signal.signal(signal.SIGINT, lambda *args: stop_event.set())
+    run_threads(queues, poll_interval, threads, stop_event)
@@ -0,0 +1,77 @@
+"""
+Enregistrement des tâches de fond et mise en file.
+
+Déclaration (dans le module `tasks.py` d'une application) :
+
+    from jobs.registry import task
+
+    @task('games.warm_country_feeds', max_attempts=3)
+    def warm_country_feeds():
+        ...
+
+Mise en file (dans la transaction de l'appelant) :
+
+    from jobs.registry import enqueue
+    enqueue('games.warm_country_feeds', delay=timedelta(minutes=5), dedup_key='all')
+"""
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Job
+
+
+@dataclass(frozen=True)
+class TaskDefinition:
+    name: str
+    func: object
+    queue: str = 'default'
+    max_attempts: int = 5
+
+
+_registry = {}
+
+
+def task(name, queue='default', max_attempts=5):
+    """Décorateur enregistrant une fonction comme tâche de fond sous le nom `name`."""
+    def decorator(func):
+        _registry[name] = TaskDefinition(name=name, func=func, queue=queue, max_attempts=max_attempts)
+        return func
+    return decorator
+
+
+def get_task(name):
+    """Retourne la définition d'une tâche, ou lève KeyError si elle est inconnue."""
+    return _registry[name]
+
+
+def registered_tasks():
+    return dict(_registry)
+
+
+def enqueue(name, payload=None, run_at=None, delay=None, dedup_key=None, queue=None, max_attempts=None):
+    """
+    Met une tâche en file :
+    - `run_at` ou `delay` : exécution différée
+    - `dedup_key` : si une tâche active existe déjà pour ce nom et cette clé,
+      aucune nouvelle ligne n'est créée et la tâche existante est retournée
+    - L'insertion a lieu dans la transaction courante (tâche visible seulement après commit)
+    """
+    definition = get_task(name)
+    if run_at is None:
+        run_at = timezone.now() + (delay or timedelta())
+    job = Job(
+        task=name,
+        payload=payload or {},
+        queue=queue or definition.queue,
+        max_attempts=max_attempts or definition.max_attempts,
+        run_at=run_at,
+        dedup_key=dedup_key,
+    )
+    if dedup_key is None:
+        job.save()
+        return job
+    # INSERT ... ON CONFLICT DO NOTHING sur la contrainte partielle de dédoublonnage
+    Job.objects.bulk_create([job], ignore_conflicts=True)
+    return Job.objects.filter(task=name, dedup_key=dedup_key, status__in=Job.ACTIVE_STATUSES).first()
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .registry import enqueue, task
+from .worker import Worker, beat, claim_jobs, execute_job, requeue_stale_jobs
+
+calls = []
+
+
+@task('jobs.tests.record')
+def record(value=None):
+    calls.append(value)
+
+
+@task('jobs.tests.fail', max_attempts=2)
+def fail():
+    raise ValueError("échec attendu")
+
+
+class ClaimTests(TestCase):
+    """Réclamation : tâches exécutables de la file, marquées en cours."""
+
+    def test_claim_due_jobs_in_order(self):
+        later = enqueue('jobs.tests.record', delay=timedelta(hours=1))
+        first = enqueue('jobs.tests.record', run_at=timezone.now() - timedelta(minutes=2))
+        second = enqueue('jobs.tests.record', run_at=timezone.now() - timedelta(minutes=1))
+        enqueue('jobs.tests.record', queue='exports')
+        jobs = claim_jobs('w1', ['default'], limit=5)
+        self.assertEqual([job.id for job in jobs], [first.id, second.id])
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.locked_by, first.attempts), (Job.STATUS_RUNNING, 'w1', 1))
+        self.assertIsNotNone(first.heartbeat_at)
+        self.assertEqual(Job.objects.get(id=later.id).status, Job.STATUS_QUEUED)
+        self.assertEqual(claim_jobs('w2', ['default']), [])
+
+
+class ClaimSkipLockedTests(TransactionTestCase):
+    """Une tâche verrouillée par un autre worker est ignorée, sans attente."""
+
+    def test_locked_job_skipped(self):
+        job = enqueue('jobs.tests.record')
+        other = connections.create_connection('default')
+        try:
+            other.set_autocommit(False)
+            with other.cursor() as cursor:
+                cursor.execute("SELECT id FROM jobs_job WHERE id = %s FOR UPDATE", [job.id])
+            self.assertEqual(claim_jobs('w1', ['default']), [])
+        finally:
+            other.rollback()
+            other.close()
+        self.assertEqual([claimed.id for claimed in claim_jobs('w1', ['default'])], [job.id])
+
+
+class ExecuteTests(TestCase):
+    """Issue d'une tâche : succès, nouvelle tentative puis échec définitif."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_success(self):
+        enqueue('jobs.tests.record', payload={'value': 7})
+        job, = claim_jobs('w1', ['default'])
+        self.assertTrue(execute_job(job))
+        self.assertEqual(calls, [7])
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.STATUS_SUCCEEDED)
+
+    def test_retry_then_fail(self):
+        job = enqueue('jobs.tests.fail')
+        claimed, = claim_jobs('w1', ['default'])
+        self.assertFalse(execute_job(claimed))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn("échec attendu", job.last_error)
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+        claimed, = claim_jobs('w1', ['default'])
+        self.assertFalse(execute_job(claimed))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+
+    def test_requeued_job_not_overwritten(self):
+        enqueue('jobs.tests.record')
+        job, = claim_jobs('w1', ['default'])
+        Job.objects.filter(id=job.id).update(status=Job.STATUS_RUNNING, locked_by='w2')  # Reprise ailleurs
+        execute_job(job)
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.STATUS_RUNNING)
+
+
+@override_settings(JOBS_LOCK_TIMEOUT=300)
+class RequeueTests(TestCase):
+    """Reprise des tâches sans signe de vie, dans la limite des tentatives."""
+
+    def running(self, heartbeat_age, attempts=1, max_attempts=5):
+        job = enqueue('jobs.tests.record', max_attempts=max_attempts)
+        Job.objects.filter(id=job.id).update(
+            status=Job.STATUS_RUNNING, locked_by='w1', locked_at=timezone.now() - timedelta(hours=2),
+            heartbeat_at=timezone.now() - heartbeat_age, attempts=attempts,
+        )
+        return job
+
+    def test_long_running_job_with_heartbeat_kept(self):
+        job = self.running(timedelta(seconds=10))
+        self.assertEqual(requeue_stale_jobs(), 0)
+        self.assertEqual(Job.objects.get(id=job.id).status, Job.STATUS_RUNNING)
+
+    def test_stale_job_requeued(self):
+        job = self.running(timedelta(minutes=10))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by, job.attempts), (Job.STATUS_QUEUED, '', 1))
+        self.assertGreater(job.run_at, timezone.now())
+
+    def test_stale_job_out_of_attempts_failed(self):
+        job = self.running(timedelta(minutes=10), attempts=3, max_attempts=3)
+        self.assertEqual(requeue_stale_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn("signe de vie", job.last_error)
+
+    def test_beat_renews_owned_job(self):
+        enqueue('jobs.tests.record')
+        job, = claim_jobs('w1', ['default'])
+        Job.objects.filter(id=job.id).update(heartbeat_at=timezone.now() - timedelta(minutes=10))
+        self.assertEqual(beat(job), 1)
+        self.assertEqual(requeue_stale_jobs(), 0)
+        job.locked_by = 'w2'
+        self.assertEqual(beat(job), 0)
+
+
+class BurstTests(TestCase):
+
+    def test_burst_worker_stops_when_empty(self):
+        calls.clear()
+        for value in range(3):
+            enqueue('jobs.tests.record', payload={'value': value})
+        worker = Worker(['default'], name='burst', burst=True)
+        # Connexion de la transaction du test : ni fermée ni recyclée
+        with mock.patch('jobs.worker.connections.close_all'), mock.patch('jobs.worker.close_old_connections'):
+            worker.run()
+        self.assertEqual((worker.processed, sorted(calls)), (3, [0, 1, 2]))
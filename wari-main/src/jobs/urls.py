@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import JobMetricsView
+
+urlpatterns = [
+    path('jobs/metrics/', JobMetricsView.as_view(), name='job-metrics'),  # /api/admin/jobs/metrics/
+]
@@ -0,0 +1,16 @@
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .worker import job_metrics
+
+
+class JobMetricsView(APIView):
+    """
+    Métriques de la file de tâches de fond (réservées aux administrateurs) :
+    - Compteurs par statut et par file, retard de la file, succès/échecs de la dernière heure
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(job_metrics())
@@ -0,0 +1,256 @@
+"""
+Worker de tâches de fond adossé à PostgreSQL.
+
+Les tâches sont réclamées avec SELECT ... FOR UPDATE SKIP LOCKED : plusieurs
+workers (threads ou processus, sur une ou plusieurs machines) consomment la même
+file sans se bloquer ni exécuter deux fois la même tâche.
+
+Pendant l'exécution, un thread renouvelle le signe de vie de la tâche (`heartbeat_at`,
+toutes les JOBS_HEARTBEAT_INTERVAL secondes) : seule une tâche sans signe de vie depuis
+JOBS_LOCK_TIMEOUT (worker arrêté brutalement) est reprise, quelle que soit sa durée.
+"""
+import os
+import random
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connections, transaction
+from django.db.models import Avg, Count, F, Min, Q
+from django.utils import timezone
+import logging
+
+from .models import Job
+from .registry import get_task
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+
+def backoff_delay(attempts):
+    """Délai avant nouvelle tentative : exponentiel, plafonné, avec gigue de ±20 %."""
+    base = getattr(settings, 'JOBS_RETRY_BASE_DELAY', 10)
+    cap = getattr(settings, 'JOBS_RETRY_MAX_DELAY', 3600)
+    delay = min(cap, base * 2 ** max(attempts - 1, 0))
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+# 1. Réclamation et exécution
+
+def claim_jobs(worker_id, queues, limit=1):
+    """Réclame au plus `limit` tâches exécutables et les marque en cours."""
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.STATUS_QUEUED, queue__in=queues, run_at__lte=now)
+            .order_by('run_at', 'id')[:limit]
+        )
+        if jobs:
+            Job.objects.filter(id__in=[job.id for job in jobs]).update(
+                status=Job.STATUS_RUNNING, locked_by=worker_id, locked_at=now, heartbeat_at=now,
+                attempts=F('attempts') + 1
+            )
+    for job in jobs:
+        job.status, job.locked_by, job.locked_at, job.attempts = Job.STATUS_RUNNING, worker_id, now, job.attempts + 1
+    return jobs
+
+
+class Heartbeat:
+    """Renouvelle `heartbeat_at` d'une tâche en cours depuis un thread dédié (sa propre connexion)."""
+
+    def __init__(self, job, interval=None):
+        self.job = job
+        self.interval = interval or getattr(settings, 'JOBS_HEARTBEAT_INTERVAL', 30)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"jobs-heartbeat-{job.id}", daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    beat(self.job)
+                except DatabaseError:
+                    logger.exception("Signe de vie de la tâche %s #%s non enregistré", self.job.task, self.job.id)
+        finally:
+            connections.close_all()
+
+
+def beat(job):
+    """Signe de vie d'une tâche, tant qu'elle est encore réclamée par ce worker."""
+    return owned(job).update(heartbeat_at=timezone.now())
+
+
+def owned(job):
+    # Une tâche reprise (worker jugé disparu) puis réclamée ailleurs n'est plus modifiée
+    return Job.objects.filter(id=job.id, status=Job.STATUS_RUNNING, locked_by=job.locked_by)
+
+
+def execute_job(job):
+    """Exécute une tâche réclamée et enregistre son issue (succès, nouvelle tentative ou échec)."""
+    try:
+        definition = get_task(job.task)
+        with Heartbeat(job):
+            definition.func(**job.payload)
+    except Exception as exc:
+        now = timezone.now()
+        error = ''.join(traceback.format_exception(exc))[-5000:]
+        if job.attempts >= job.max_attempts:
+            owned(job).update(status=Job.STATUS_FAILED, last_error=error, finished_at=now, updated_at=now)
+            logger.error("Tâche %s #%s échouée définitivement après %s tentatives", job.task, job.id, job.attempts)
+        else:
+            owned(job).update(
+                status=Job.STATUS_QUEUED, last_error=error, run_at=now + backoff_delay(job.attempts),
+                locked_by='', locked_at=None, heartbeat_at=None, updated_at=now
+            )
+            logger.warning("Tâche %s #%s en échec (tentative %s/%s), nouvel essai planifié",
+                           job.task, job.id, job.attempts, job.max_attempts)
+        return False
+    now = timezone.now()
+    owned(job).update(status=Job.STATUS_SUCCEEDED, finished_at=now, updated_at=now)
+    return True
+
+
+def requeue_stale_jobs():
+    """
+    Reprend les tâches dont le worker a disparu (pas de signe de vie depuis JOBS_LOCK_TIMEOUT) :
+    - Tentatives restantes : remise en file après le délai de nouvelle tentative
+    - Tentatives épuisées : échec définitif (une tâche qui arrête son worker ne boucle pas)
+    Retourne le nombre de tâches reprises.
+    """
+    now = timezone.now()
+    timeout = timedelta(seconds=getattr(settings, 'JOBS_LOCK_TIMEOUT', 300))
+    error = f"Worker sans signe de vie depuis plus de {int(timeout.total_seconds())} s"
+    with transaction.atomic():
+        stale = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.STATUS_RUNNING, heartbeat_at__lt=now - timeout)
+        )
+        for job in stale:
+            if job.attempts >= job.max_attempts:
+                job.status, job.finished_at = Job.STATUS_FAILED, now
+                logger.error("Tâche %s #%s abandonnée par %s, échouée après %s tentatives",
+                             job.task, job.id, job.locked_by, job.attempts)
+            else:
+                logger.warning("Tâche %s #%s abandonnée par %s, remise en file (tentative %s/%s)",
+                               job.task, job.id, job.locked_by, job.attempts, job.max_attempts)
+                job.status, job.run_at = Job.STATUS_QUEUED, now + backoff_delay(job.attempts)
+                job.locked_by, job.locked_at, job.heartbeat_at = '', None, None
+            job.last_error, job.updated_at = error, now
+        Job.objects.bulk_update(stale, ['status', 'run_at', 'locked_by', 'locked_at', 'heartbeat_at',
+                                        'finished_at', 'last_error', 'updated_at'])
+    return len(stale)
+
+
+# 2. Boucle de traitement
+
+class Worker:
+    """
+    Boucle de traitement d'un worker :
+    - Réclame une tâche à la fois, dort `poll_interval` secondes quand la file est vide
+    - `burst` : s'arrête dès que la file est vide
+    - S'arrête proprement (après la tâche en cours) quand `stop_event` est levé
+    """
+
+    def __init__(self, queues, poll_interval=1.0, stop_event=None, name=None, max_jobs=None, burst=False):
+        self.queues = queues
+        self.poll_interval = poll_interval
+        self.stop_event = stop_event or threading.Event()
+        self.worker_id = name
+        self.max_jobs = max_jobs
+        self.burst = burst
+        self.processed = 0
+        self.last_housekeeping = 0.0
+
+    def run(self):
+        # Identifiant calculé dans le thread d'exécution (hôte:pid:thread)
+        self.worker_id = self.worker_id or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        logger.info("Worker %s démarré (files : %s)", self.worker_id, ', '.join(self.queues))
+        try:
+            while not self.stop_event.is_set():
+                if self.max_jobs is not None and self.processed >= self.max_jobs:
+                    break
+                if not self.run_once():
+                    if self.burst:
+                        break
+                    self.stop_event.wait(self.poll_interval)
+        finally:
+            connections.close_all()
+            logger.info("Worker %s arrêté après %s tâches", self.worker_id, self.processed)
+
+    def run_once(self):
+        """Traite au plus une tâche ; retourne False si la file était vide."""
+        close_old_connections()
+        try:
+            jobs = claim_jobs(self.worker_id, self.queues)
+            for job in jobs:
+                execute_job(job)
+                self.processed += 1
+            if not jobs and time.monotonic() - self.last_housekeeping > 60:
+                # File vide : on en profite pour récupérer les tâches orphelines
+                self.last_housekeeping = time.monotonic()
+                requeue_stale_jobs()
+            return bool(jobs)
+        finally:
+            close_old_connections()
+
+
+def run_threads(queues, poll_interval, count, stop_event, burst=False):
+    """Lance `count` workers dans des threads, attend leur arrêt et les retourne."""
+    workers = [Worker(queues, poll_interval, stop_event, burst=burst) for _ in range(count)]
+    threads = [threading.Thread(target=worker.run, name=f"jobs-worker-{i}") for i, worker in enumerate(workers)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        for thread in threads:
+            thread.join(timeout=0.5)
+    return workers
+
+
+# 3. Métriques
+
+def job_metrics():
+    """
+    Métriques de la file :
+    - Nombre de tâches par statut et par file
+    - Tâches exécutables en retard et âge de la plus ancienne
+    - Succès/échecs et durée moyenne sur la dernière heure
+    """
+    now = timezone.now()
+    last_hour = now - timedelta(hours=1)
+    by_status = {status: 0 for status, _ in Job.STATUS_CHOICES}
+    by_queue = {}
+    for row in Job.objects.values('queue', 'status').annotate(total=Count('id')).order_by():
+        by_status[row['status']] += row['total']
+        by_queue.setdefault(row['queue'], {})[row['status']] = row['total']
+
+    due = Job.objects.filter(status=Job.STATUS_QUEUED, run_at__lte=now).aggregate(
+        total=Count('id'), oldest=Min('run_at')
+    )
+    recent = Job.objects.filter(finished_at__gte=last_hour).aggregate(
+        succeeded=Count('id', filter=Q(status=Job.STATUS_SUCCEEDED)),
+        failed=Count('id', filter=Q(status=Job.STATUS_FAILED)),
+        avg_duration=Avg(F('finished_at') - F('locked_at'), filter=Q(status=Job.STATUS_SUCCEEDED)),
+    )
+    return {
+        'by_status': by_status,
+        'by_queue': by_queue,
+        'due': due['total'],
+        'oldest_due_age_seconds': (now - due['oldest']).total_seconds() if due['oldest'] else 0.0,
+        'last_hour': {
+            'succeeded': recent['succeeded'],
+            'failed': recent['failed'],
+            'avg_duration_seconds': recent['avg_duration'].total_seconds() if recent['avg_duration'] else None,
+        },
+    }
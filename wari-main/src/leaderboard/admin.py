@@ -0,0 +1,51 @@
+from django.contrib import admin
+from .models import AuthorScore, LeaderboardRank, PredictionEvaluation
+
+
+@admin.register(PredictionEvaluation)
+class PredictionEvaluationAdmin(admin.ModelAdmin):
+    """Consultation des évaluations de pronostics (écrites par le moteur d'évaluation)."""
+    list_display = ['prediction_id', 'result_id', 'author', 'picks', 'hits', 'is_hit', 'returns', 'evaluated_at']
+    list_filter = ['is_hit', 'evaluated_at']
+    search_fields = ['author__username']
+    list_select_related = ['author']
+    list_per_page = 25
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(AuthorScore)
+class AuthorScoreAdmin(admin.ModelAdmin):
+    """Consultation des agrégats des pronostiqueurs par tableau."""
+    list_display = ['author', 'scope', 'scope_id', 'period', 'predictions', 'hits', 'picks',
+                    'current_streak', 'best_streak', 'returns', 'updated_at']
+    list_filter = ['scope', 'period']
+    search_fields = ['author__username']
+    list_select_related = ['author']
+    list_per_page = 25
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LeaderboardRank)
+class LeaderboardRankAdmin(admin.ModelAdmin):
+    """Consultation des classements précalculés."""
+    list_display = ['rank', 'author', 'scope', 'scope_id', 'period', 'predictions', 'hits', 'hit_rate', 'roi']
+    list_filter = ['scope', 'period']
+    search_fields = ['author__username']
+    list_select_related = ['author']
+    list_per_page = 25
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class LeaderboardConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'leaderboard'
+    verbose_name = 'Classement des pronostiqueurs'
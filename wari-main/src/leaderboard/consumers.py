@@ -0,0 +1,10 @@
+from outbox.domain import RESULT_CORRECTED, RESULT_OFFICIAL
+from outbox.registry import consumer
+
+from .scoring import schedule_scoring
+
+
+@consumer('leaderboard.scoring', events=[RESULT_OFFICIAL, RESULT_CORRECTED])
+def schedule_result_scoring(event):
+    """Planifie l'évaluation des pronostics d'un résultat devenu officiel ou corrigé."""
+    schedule_scoring([event.aggregate_id])
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from results.models import Result
+from leaderboard.models import AuthorScore, LeaderboardRank, PredictionEvaluation
+from leaderboard.scoring import lock_leaderboard, score_result
+
+
+class Command(BaseCommand):
+    """
+    Recalcule entièrement les évaluations et le classement (reprise d'historique).
+
+    Les résultats officiels sont rejoués dans l'ordre chronologique afin que les
+    séries des auteurs soient identiques à celles d'une évaluation au fil de l'eau.
+
+    Une seule transaction, sous verrou consultatif exclusif : les évaluations en cours
+    sont attendues, les nouvelles attendent la fin de la reconstruction, et les lecteurs
+    voient l'ancien classement jusqu'au COMMIT.
+    """
+    help = "Réévalue tous les résultats officiels et reconstruit le classement des pronostiqueurs."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            lock_leaderboard(exclusive=True)
+            LeaderboardRank.objects.all().delete()
+            AuthorScore.objects.all().delete()
+            PredictionEvaluation.objects.all().delete()
+
+            result_ids = list(
+                Result.objects.filter(status='official').order_by('result_date', 'id').values_list('id', flat=True)
+            )
+            evaluated = 0
+            for result_id in result_ids:
+                evaluated += score_result(result_id)
+        self.stdout.write(self.style.SUCCESS(f"{evaluated} pronostics évalués."))
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PredictionEvaluation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prediction_id', models.BigIntegerField(unique=True, verbose_name='Pronostic')),
+                ('result_id', models.BigIntegerField(db_index=True, verbose_name='Résultat')),
+                ('picks', models.PositiveSmallIntegerField(default=0, verbose_name='Choix évalués')),
+                ('hits', models.PositiveSmallIntegerField(default=0, verbose_name='Choix gagnants')),
+                ('is_hit', models.BooleanField(default=False, verbose_name='Pronostic gagnant')),
+                ('returns', models.DecimalField(decimal_places=2, default=0, help_text='Somme des (cote - 1) des choix gagnants moins une unité par choix perdant avec cote', max_digits=10, verbose_name='Gain net (unités)')),
+                ('evaluated_at', models.DateTimeField(auto_now_add=True, verbose_name='Évalué le')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prediction_evaluations', to=settings.AUTH_USER_MODEL, verbose_name='Auteur')),
+            ],
+            options={
+                'verbose_name': 'Évaluation de pronostic',
+                'verbose_name_plural': 'Évaluations de pronostics',
+                'ordering': ['-evaluated_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AuthorScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('game', 'Jeu'), ('country', 'Pays')], max_length=10, verbose_name='Périmètre')),
+                ('scope_id', models.BigIntegerField(default=0, verbose_name='Identifiant du périmètre')),
+                ('period', models.CharField(default='all', max_length=7, verbose_name='Période')),
+                ('predictions', models.PositiveIntegerField(default=0, verbose_name='Pronostics évalués')),
+                ('winning_predictions', models.PositiveIntegerField(default=0, verbose_name='Pronostics gagnants')),
+                ('picks', models.PositiveIntegerField(default=0, verbose_name='Choix évalués')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Choix gagnants')),
+                ('current_streak', models.PositiveIntegerField(default=0, verbose_name='Série en cours')),
+                ('best_streak', models.PositiveIntegerField(default=0, verbose_name='Meilleure série')),
+                ('returns', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Gain net (unités)')),
+                ('staked', models.PositiveIntegerField(default=0, verbose_name='Unités engagées')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_scores', to=settings.AUTH_USER_MODEL, verbose_name='Auteur')),
+            ],
+            options={
+                'verbose_name': 'Score de pronostiqueur',
+                'verbose_name_plural': 'Scores de pronostiqueurs',
+                'indexes': [models.Index(fields=['scope', 'scope_id', 'period'], name='leaderboard_scope_a1e6f9_idx')],
+                'constraints': [models.UniqueConstraint(fields=('author', 'scope', 'scope_id', 'period'), name='unique_author_score_board')],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'Global'), ('game', 'Jeu'), ('country', 'Pays')], max_length=10, verbose_name='Périmètre')),
+                ('scope_id', models.BigIntegerField(default=0, verbose_name='Identifiant du périmètre')),
+                ('period', models.CharField(default='all', max_length=7, verbose_name='Période')),
+                ('rank', models.PositiveIntegerField(verbose_name='Rang')),
+                ('predictions', models.PositiveIntegerField(default=0, verbose_name='Pronostics évalués')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Choix gagnants')),
+                ('hit_rate', models.FloatField(default=0, verbose_name='Taux de réussite')),
+                ('best_streak', models.PositiveIntegerField(default=0, verbose_name='Meilleure série')),
+                ('current_streak', models.PositiveIntegerField(default=0, verbose_name='Série en cours')),
+                ('roi', models.FloatField(default=0, verbose_name='ROI')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_ranks', to=settings.AUTH_USER_MODEL, verbose_name='Auteur')),
+            ],
+            options={
+                'verbose_name': 'Rang au classement',
+                'verbose_name_plural': 'Classements',
+                'ordering': ['scope', 'scope_id', 'period', 'rank'],
+                'indexes': [models.Index(fields=['scope', 'scope_id', 'period', 'rank'], name='leaderboard_scope_e5753e_idx')],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'scope_id', 'period', 'author'), name='unique_leaderboard_author')],
+            },
+        ),
+    ]
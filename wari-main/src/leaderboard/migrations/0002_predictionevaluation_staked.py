@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+def backfill_staked(apps, schema_editor):
+    """Unités engagées des évaluations existantes, recalculées depuis les choix et le résultat."""
+    from leaderboard.scoring import evaluate_picks
+
+    PredictionEvaluation = apps.get_model('leaderboard', 'PredictionEvaluation')
+    Prediction = apps.get_model('predictions', 'Prediction')
+    Result = apps.get_model('results', 'Result')
+    evaluations = list(PredictionEvaluation.objects.filter(picks__gt=0).only('id', 'prediction_id', 'result_id'))
+    picks = dict(Prediction.objects.filter(id__in={e.prediction_id for e in evaluations}).values_list('id', 'picks'))
+    outcomes = dict(Result.objects.filter(id__in={e.result_id for e in evaluations})
+                    .values_list('id', 'outcome_details'))
+    for evaluation in evaluations:
+        evaluation.staked = evaluate_picks(picks.get(evaluation.prediction_id),
+                                           outcomes.get(evaluation.result_id) or {})[3]
+    PredictionEvaluation.objects.bulk_update(evaluations, ['staked'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaderboard', '0001_initial'),
+        ('predictions', '0009_prediction_default_partition'),
+        ('results', '0007_result_default_partition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='predictionevaluation',
+            name='staked',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Choix évalués avec cote (retranchés des agrégats si le résultat est corrigé)', verbose_name='Unités engagées'),
+        ),
+        migrations.RunPython(backfill_staked, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,135 @@
+from django.db import models
+from users.models import CustomUser
+
+SCOPE_GLOBAL = 'global'
+SCOPE_GAME = 'game'
+SCOPE_COUNTRY = 'country'
+SCOPE_CHOICES = (
+    (SCOPE_GLOBAL, 'Global'),
+    (SCOPE_GAME, 'Jeu'),
+    (SCOPE_COUNTRY, 'Pays'),
+)
+PERIOD_ALL = 'all'
+
+
+class PredictionEvaluation(models.Model):
+    """
+    Évaluation d'un pronostic face au résultat officiel de son jeu.
+    - Références sans clé étrangère vers Prediction/Result (tables partitionnables)
+    - Sa présence marque le pronostic comme évalué (il n'est plus « ouvert »)
+    """
+    prediction_id = models.BigIntegerField(unique=True, verbose_name='Pronostic')
+    result_id = models.BigIntegerField(db_index=True, verbose_name='Résultat')
+    author = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='prediction_evaluations',
+        verbose_name='Auteur'
+    )
+    picks = models.PositiveSmallIntegerField(default=0, verbose_name='Choix évalués')
+    hits = models.PositiveSmallIntegerField(default=0, verbose_name='Choix gagnants')
+    is_hit = models.BooleanField(default=False, verbose_name='Pronostic gagnant')
+    returns = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name='Gain net (unités)',
+        help_text='Somme des (cote - 1) des choix gagnants moins une unité par choix perdant avec cote'
+    )
+    staked = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Unités engagées',
+        help_text="Choix évalués avec cote (retranchés des agrégats si le résultat est corrigé)"
+    )
+    evaluated_at = models.DateTimeField(auto_now_add=True, verbose_name='Évalué le')
+
+    class Meta:
+        verbose_name = 'Évaluation de pronostic'
+        verbose_name_plural = 'Évaluations de pronostics'
+        ordering = ['-evaluated_at']
+
+    def __str__(self):
+        return f"Pronostic #{self.prediction_id} : {self.hits}/{self.picks}"
+
+
+class AuthorScore(models.Model):
+    """
+    Agrégats d'un auteur pour un périmètre (global, jeu, pays) et une période
+    ('all' ou 'AAAA-MM'), mis à jour incrémentalement à chaque évaluation.
+    """
+    author = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_scores',
+        verbose_name='Auteur'
+    )
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES, verbose_name='Périmètre')
+    scope_id = models.BigIntegerField(default=0, verbose_name='Identifiant du périmètre')
+    period = models.CharField(max_length=7, default=PERIOD_ALL, verbose_name='Période')
+    predictions = models.PositiveIntegerField(default=0, verbose_name='Pronostics évalués')
+    winning_predictions = models.PositiveIntegerField(default=0, verbose_name='Pronostics gagnants')
+    picks = models.PositiveIntegerField(default=0, verbose_name='Choix évalués')
+    hits = models.PositiveIntegerField(default=0, verbose_name='Choix gagnants')
+    current_streak = models.PositiveIntegerField(default=0, verbose_name='Série en cours')
+    best_streak = models.PositiveIntegerField(default=0, verbose_name='Meilleure série')
+    returns = models.DecimalField(max_digits=12, decimal_places=2, default=0, verbose_name='Gain net (unités)')
+    staked = models.PositiveIntegerField(default=0, verbose_name='Unités engagées')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['author', 'scope', 'scope_id', 'period'], name='unique_author_score_board')
+        ]
+        indexes = [
+            models.Index(fields=['scope', 'scope_id', 'period']),
+        ]
+        verbose_name = 'Score de pronostiqueur'
+        verbose_name_plural = 'Scores de pronostiqueurs'
+
+    def __str__(self):
+        return f"{self.author} - {self.scope}:{self.scope_id} ({self.period})"
+
+    @property
+    def hit_rate(self):
+        return round(self.hits / self.picks, 4) if self.picks else 0.0
+
+    @property
+    def roi(self):
+        return round(float(self.returns) / self.staked, 4) if self.staked else 0.0
+
+
+class LeaderboardRank(models.Model):
+    """
+    Table de classement précalculée par tableau (périmètre + période), servie telle quelle.
+    - Recalculée uniquement pour les tableaux touchés par une évaluation
+    """
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES, verbose_name='Périmètre')
+    scope_id = models.BigIntegerField(default=0, verbose_name='Identifiant du périmètre')
+    period = models.CharField(max_length=7, default=PERIOD_ALL, verbose_name='Période')
+    rank = models.PositiveIntegerField(verbose_name='Rang')
+    author = models.ForeignKey(
+        CustomUser,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_ranks',
+        verbose_name='Auteur'
+    )
+    predictions = models.PositiveIntegerField(default=0, verbose_name='Pronostics évalués')
+    hits = models.PositiveIntegerField(default=0, verbose_name='Choix gagnants')
+    hit_rate = models.FloatField(default=0, verbose_name='Taux de réussite')
+    best_streak = models.PositiveIntegerField(default=0, verbose_name='Meilleure série')
+    current_streak = models.PositiveIntegerField(default=0, verbose_name='Série en cours')
+    roi = models.FloatField(default=0, verbose_name='ROI')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'scope_id', 'period', 'author'], name='unique_leaderboard_author')
+        ]
+        indexes = [
+            models.Index(fields=['scope', 'scope_id', 'period', 'rank']),
+        ]
+        verbose_name = 'Rang au classement'
+        verbose_name_plural = 'Classements'
+        ordering = ['scope', 'scope_id', 'period', 'rank']
+
+    def __str__(self):
+        return f"#{self.rank} {self.author} - {self.scope}:{self.scope_id} ({self.period})"
@@ -0,0 +1,333 @@
+"""
+Moteur d'évaluation des pronostics et de mise à jour incrémentale du classement.
+
+Quand un résultat devient officiel, chaque pronostic publié et encore ouvert du jeu
+(émis avant le résultat) est évalué choix par choix contre `outcome_details`.
+Quand un résultat officiel est corrigé, ses évaluations existantes sont recalculées :
+l'ancienne évaluation est retranchée des agrégats et la nouvelle ajoutée (les séries
+des auteurs concernés sont recomptées sur leur historique).
+Les agrégats des auteurs sont incrémentés sur six tableaux (global, jeu, pays ×
+toutes périodes, mois du résultat), puis seuls les tableaux effectivement modifiés
+sont reclassés, en ne réécrivant que les rangs qui changent.
+
+Verrous (évaluations concurrentes de résultats différents) :
+- Consultatif `leaderboard` : partagé par les évaluations, exclusif pendant une
+  reconstruction complète (rebuild_leaderboard)
+- Agrégats des auteurs verrouillés dans un ordre fixe (scope, scope_id, period, author_id) :
+  deux évaluations ne peuvent pas s'interbloquer sur les mêmes lignes
+- Consultatif exclusif par tableau pour le reclassement, pris dans un ordre fixe et gardé
+  jusqu'au COMMIT : chaque reclassement voit les agrégats validés du précédent
+"""
+from copy import copy
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef, Q, Window
+from django.db.models.functions import Rank
+from django.utils import timezone
+import logging
+
+from .models import (
+    AuthorScore, LeaderboardRank, PredictionEvaluation,
+    PERIOD_ALL, SCOPE_COUNTRY, SCOPE_GAME, SCOPE_GLOBAL,
+)
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+# Ordre du classement : choix gagnants, puis gain net, puis pronostics gagnants
+RANKING_ORDER = [F('hits').desc(), F('returns').desc(), F('winning_predictions').desc(), F('author_id').asc()]
+RANK_FIELDS = ['rank', 'predictions', 'hits', 'hit_rate', 'best_streak', 'current_streak', 'roi']
+SCORE_FIELDS = ['predictions', 'winning_predictions', 'picks', 'hits', 'current_streak', 'best_streak',
+                'returns', 'staked', 'updated_at']
+LEADERBOARD_LOCK = 'leaderboard'
+
+
+def lock_leaderboard(exclusive=False):
+    """Verrou consultatif de transaction : attend la fin d'une reconstruction (ou des évaluations en cours)."""
+    function = 'pg_advisory_xact_lock' if exclusive else 'pg_advisory_xact_lock_shared'
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {function}(hashtext(%s))", [LEADERBOARD_LOCK])
+
+
+def lock_boards(boards):
+    """Verrous consultatifs exclusifs des tableaux, dans un ordre fixe (reclassements sérialisés par tableau)."""
+    with connection.cursor() as cursor:
+        for scope, scope_id, period in sorted(boards):
+            cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))",
+                           [f"{LEADERBOARD_LOCK}:{scope}:{scope_id}:{period}"])
+
+
+# 1. Évaluation d'un choix
+
+def normalize(value):
+    """Normalise une valeur pour la comparaison (casse, espaces, ordre des listes)."""
+    if isinstance(value, (list, tuple)):
+        return sorted(normalize(item) for item in value)
+    if isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def evaluate_picks(picks, outcome_details):
+    """
+    Évalue une liste de choix contre le résultat structuré :
+    - Retourne (choix évalués, choix gagnants, gain net en unités, unités engagées)
+    - Les marchés absents du résultat ne sont pas évalués
+    """
+    evaluated = hits = staked = 0
+    returns = Decimal('0')
+    for pick in picks or []:
+        market = str(pick.get('market', '')).strip()
+        if market not in outcome_details:
+            continue
+        evaluated += 1
+        won = normalize(pick.get('value')) == normalize(outcome_details[market])
+        hits += won
+        odds = pick.get('odds')
+        if odds is not None:
+            staked += 1
+            returns += Decimal(str(odds)) - 1 if won else Decimal('-1')
+    return evaluated, hits, returns.quantize(Decimal('0.01')), staked
+
+
+# 2. Évaluation d'un résultat officiel
+
+def boards_for(result):
+    """Tableaux (périmètre, identifiant, période) touchés par un résultat."""
+    month = result.result_date.strftime('%Y-%m')
+    scopes = [(SCOPE_GLOBAL, 0), (SCOPE_GAME, result.game_id), (SCOPE_COUNTRY, result.game.country_id)]
+    return [(scope, scope_id, period) for scope, scope_id in scopes for period in (PERIOD_ALL, month)]
+
+
+def score_result(result_id):
+    """
+    Évalue les pronostics ouverts d'un résultat officiel puis reclasse les tableaux touchés.
+    - Idempotent : un pronostic déjà évalué ne l'est plus (contrainte unique)
+    - Résultat corrigé : les évaluations existantes sont recalculées et les agrégats ajustés
+    """
+    from predictions.models import Prediction
+    from results.models import Result
+
+    result = Result.objects.select_related('game').filter(id=result_id, status='official').first()
+    if result is None:
+        return 0
+    boards = boards_for(result)
+
+    with transaction.atomic():
+        lock_leaderboard()
+        # Verrou bloquant : un pronostic verrouillé (édition, publication) est attendu, jamais ignoré
+        open_predictions = list(
+            Prediction.objects.select_for_update()
+            .filter(game_id=result.game_id, is_published=True, author__isnull=False,
+                    predicted_at__lte=result.result_date)
+            .exclude(Exists(PredictionEvaluation.objects.filter(prediction_id=OuterRef('id'))))
+            .order_by('predicted_at', 'id')
+            .only('id', 'author_id', 'picks', 'predicted_at')
+        )
+        # Après l'attente d'un verrou, une évaluation concurrente a pu être validée : relecture
+        already_evaluated = set(
+            PredictionEvaluation.objects.filter(prediction_id__in=[p.id for p in open_predictions])
+            .values_list('prediction_id', flat=True)
+        )
+        evaluations = []
+        for prediction in open_predictions:
+            if prediction.id in already_evaluated:
+                continue
+            picks, hits, returns, staked = evaluate_picks(prediction.picks, result.outcome_details or {})
+            evaluation = PredictionEvaluation(
+                prediction_id=prediction.id, result_id=result.id, author_id=prediction.author_id,
+                picks=picks, hits=hits, is_hit=bool(picks) and hits == picks, returns=returns, staked=staked,
+            )
+            evaluations.append(evaluation)
+        revised = revise_evaluations(result)
+
+        scored = [evaluation for evaluation in evaluations if evaluation.picks]
+        authors = {evaluation.author_id for evaluation in scored} | {new.author_id for _, new in revised}
+        touched = set()
+        if authors:
+            # Un seul verrouillage, dans l'ordre fixe, pour les corrections et les nouvelles évaluations
+            scores = locked_scores(authors, boards)
+            for old, new in revised:
+                touched.update(revise_scores(old, new, scores, boards))
+        PredictionEvaluation.objects.bulk_create(evaluations)
+        if authors:
+            for evaluation in scored:
+                touched.update(apply_evaluation(evaluation, scores, boards))
+            save_scores(scores)
+        lock_boards(touched)
+        for board in boards:
+            if board in touched:
+                rebuild_ranks(*board)
+
+    if revised:
+        logger.info("Résultat #%s corrigé : %s évaluations recalculées", result.id, len(revised))
+    logger.info("Résultat #%s : %s pronostics évalués", result.id, len(evaluations))
+    return len(evaluations)
+
+
+def revise_evaluations(result):
+    """
+    Recalcule les évaluations existantes d'un résultat (corrigé depuis) contre `outcome_details`.
+    - Retourne les couples (ancienne, nouvelle) des évaluations modifiées, déjà enregistrées
+    """
+    from predictions.models import Prediction
+
+    evaluations = list(PredictionEvaluation.objects.select_for_update().filter(result_id=result.id).order_by('id'))
+    if not evaluations:
+        return []
+    picks_by_id = dict(
+        Prediction.objects.filter(id__in=[evaluation.prediction_id for evaluation in evaluations])
+        .values_list('id', 'picks')
+    )
+    revised = []
+    for evaluation in evaluations:
+        picks, hits, returns, staked = evaluate_picks(picks_by_id.get(evaluation.prediction_id),
+                                                      result.outcome_details or {})
+        if (picks, hits, returns, staked) == (evaluation.picks, evaluation.hits, evaluation.returns, evaluation.staked):
+            continue
+        old = copy(evaluation)
+        evaluation.picks, evaluation.hits, evaluation.returns, evaluation.staked = picks, hits, returns, staked
+        evaluation.is_hit = bool(picks) and hits == picks
+        revised.append((old, evaluation))
+    PredictionEvaluation.objects.bulk_update([new for _, new in revised],
+                                             ['picks', 'hits', 'is_hit', 'returns', 'staked'])
+    return revised
+
+
+def locked_scores(author_ids, boards):
+    """
+    Agrégats (auteur, tableau), créés si besoin puis verrouillés dans l'ordre
+    (scope, scope_id, period, author_id), identique pour toutes les évaluations.
+    """
+    keys = sorted((scope, scope_id, period, author_id) for scope, scope_id, period in boards for author_id in author_ids)
+    AuthorScore.objects.bulk_create(
+        [AuthorScore(scope=scope, scope_id=scope_id, period=period, author_id=author_id)
+         for scope, scope_id, period, author_id in keys],
+        ignore_conflicts=True,
+    )
+    on_boards = Q()
+    for scope, scope_id, period in boards:
+        on_boards |= Q(scope=scope, scope_id=scope_id, period=period)
+    rows = (
+        AuthorScore.objects.select_for_update().filter(on_boards, author_id__in=author_ids)
+        .order_by('scope', 'scope_id', 'period', 'author_id')
+    )
+    return {(row.author_id, row.scope, row.scope_id, row.period): row for row in rows}
+
+
+def apply_evaluation(evaluation, scores, boards):
+    """
+    Incrémente les agrégats verrouillés de l'auteur sur chaque tableau (sans rescanner l'historique).
+    - Retourne les tableaux modifiés
+    """
+    for board in boards:
+        score = scores[(evaluation.author_id, *board)]
+        score.predictions += 1
+        score.picks += evaluation.picks
+        score.hits += evaluation.hits
+        score.returns += evaluation.returns
+        score.staked += evaluation.staked
+        if evaluation.is_hit:
+            score.winning_predictions += 1
+            score.current_streak += 1
+            score.best_streak = max(score.best_streak, score.current_streak)
+        else:
+            score.current_streak = 0
+    return boards
+
+
+def revise_scores(old, new, scores, boards):
+    """
+    Retranche l'ancienne évaluation des agrégats verrouillés et ajoute la nouvelle.
+    - Séries recomptées sur l'historique de l'auteur si l'issue du pronostic a changé
+    - Retourne les tableaux modifiés
+    """
+    streak_changed = (bool(old.picks), old.is_hit) != (bool(new.picks), new.is_hit)
+    for board in boards:
+        score = scores[(new.author_id, *board)]
+        score.predictions += bool(new.picks) - bool(old.picks)
+        score.picks += new.picks - old.picks
+        score.hits += new.hits - old.hits
+        score.returns += new.returns - old.returns
+        score.staked += new.staked - old.staked
+        score.winning_predictions += new.is_hit - old.is_hit
+        if streak_changed:
+            score.current_streak, score.best_streak = board_streaks(new.author_id, *board)
+    return boards
+
+
+def board_streaks(author_id, scope, scope_id, period):
+    """Série en cours et meilleure série d'un auteur sur un tableau, dans l'ordre des évaluations."""
+    from results.models import Result
+
+    results = Result.objects.all()
+    if scope == SCOPE_GAME:
+        results = results.filter(game_id=scope_id)
+    elif scope == SCOPE_COUNTRY:
+        results = results.filter(country_id=scope_id)
+    if period != PERIOD_ALL:
+        year, month = map(int, period.split('-'))
+        results = results.filter(result_date__year=year, result_date__month=month)
+    outcomes = (
+        PredictionEvaluation.objects.filter(author_id=author_id, picks__gt=0, result_id__in=results.values('id'))
+        .order_by('id').values_list('is_hit', flat=True)
+    )
+    current = best = 0
+    for is_hit in outcomes:
+        current = current + 1 if is_hit else 0
+        best = max(best, current)
+    return current, best
+
+
+def save_scores(scores):
+    now = timezone.now()
+    for score in scores.values():
+        score.updated_at = now
+    AuthorScore.objects.bulk_update(list(scores.values()), SCORE_FIELDS, batch_size=500)
+
+
+def rebuild_ranks(scope, scope_id, period):
+    """
+    Recalcule le classement d'un seul tableau (RANK() sur les agrégats).
+    - Seules les lignes dont le rang ou les statistiques changent sont réécrites
+    - À appeler sous le verrou du tableau (`lock_boards`) : lecture des agrégats validés
+    """
+    scores = (
+        AuthorScore.objects.filter(scope=scope, scope_id=scope_id, period=period, predictions__gt=0)
+        .annotate(position=Window(Rank(), order_by=RANKING_ORDER))
+    )
+    current = {
+        row.author_id: row
+        for row in LeaderboardRank.objects.filter(scope=scope, scope_id=scope_id, period=period)
+    }
+    created, updated = [], []
+    for score in scores:
+        values = {
+            'rank': score.position, 'predictions': score.predictions, 'hits': score.hits,
+            'hit_rate': score.hit_rate, 'best_streak': score.best_streak,
+            'current_streak': score.current_streak, 'roi': score.roi,
+        }
+        row = current.pop(score.author_id, None)
+        if row is None:
+            created.append(LeaderboardRank(scope=scope, scope_id=scope_id, period=period,
+                                           author_id=score.author_id, **values))
+        elif any(getattr(row, name) != value for name, value in values.items()):
+            for name, value in values.items():
+                setattr(row, name, value)
+            updated.append(row)
+    if current:
+        # Auteurs sortis du tableau (agrégats remis à zéro)
+        LeaderboardRank.objects.filter(id__in=[row.id for row in current.values()]).delete()
+    LeaderboardRank.objects.bulk_update(updated, RANK_FIELDS, batch_size=500)
+    LeaderboardRank.objects.bulk_create(created, batch_size=500)
+    return len(created) + len(updated)
+
+
+# 3. Déclenchement
+
+def schedule_scoring(result_ids):
+    """Met en file l'évaluation des résultats (dédoublonnée par résultat)."""
+    from jobs.registry import enqueue
+    for result_id in result_ids:
+        enqueue('leaderboard.score_result', {'result_id': result_id}, dedup_key=f"result:{result_id}")
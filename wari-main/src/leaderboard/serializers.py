@@ -0,0 +1,12 @@
+from rest_framework import serializers
+from .models import LeaderboardRank
+
+
+class LeaderboardRankSerializer(serializers.ModelSerializer):
+    """Sérialiseur d'une ligne de classement (lecture seule)."""
+    author = serializers.CharField(source='author.username', read_only=True)
+
+    class Meta:
+        model = LeaderboardRank
+        fields = ['rank', 'author', 'predictions', 'hits', 'hit_rate', 'best_streak', 'current_streak', 'roi']
+        read_only_fields = fields
@@ -0,0 +1,9 @@
+from jobs.registry import task
+
+from .scoring import score_result
+
+
+@task('leaderboard.score_result', max_attempts=5)
+def score_official_result(result_id):
+    """Évalue les pronostics ouverts d'un résultat officiel et met à jour le classement."""
+    score_result(result_id)
@@ -0,0 +1,115 @@
+import threading
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from games.models import Country, GameType, Game
+from predictions.models import Prediction
+from results.models import Result
+from users.models import CustomUser
+from .models import AuthorScore, LeaderboardRank, PredictionEvaluation
+from .scoring import SCOPE_GLOBAL, PERIOD_ALL, rebuild_ranks, score_result
+
+
+class ScoreResultTests(TestCase):
+    """Évaluation d'un résultat officiel : idempotence et réécriture limitée des rangs."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Mali', code='MLI')
+        game_type = GameType.objects.create(name='Pmu')
+        game = Game.objects.create(name='Quarté Bamako', country=country, game_type=game_type)
+        cls.awa = CustomUser.objects.create_user(username='awa')
+        cls.moussa = CustomUser.objects.create_user(username='moussa')
+        Prediction.objects.create(game=game, author=cls.awa, is_published=True, description='Le 7 gagnant',
+                                  picks=[{'market': 'winner', 'value': '7', 'odds': 2.5}])
+        Prediction.objects.create(game=game, author=cls.moussa, is_published=True, description='Le 3 gagnant',
+                                  picks=[{'market': 'winner', 'value': '3', 'odds': 4.0}])
+        cls.result = Result.objects.create(game=game, result_date=timezone.now(), status='official',
+                                           outcome='7', outcome_details={'winner': '7'}, validated_by=cls.awa)
+
+    def test_score_once(self):
+        self.assertEqual(score_result(self.result.id), 2)
+        self.assertEqual(score_result(self.result.id), 0)
+        self.assertEqual(PredictionEvaluation.objects.count(), 2)
+        self.assertEqual(AuthorScore.objects.filter(author=self.awa).values_list('hits', flat=True).distinct().get(), 1)
+        ranks = dict(LeaderboardRank.objects.filter(scope=SCOPE_GLOBAL, scope_id=0, period=PERIOD_ALL)
+                     .values_list('author__username', 'rank'))
+        self.assertEqual(ranks, {'awa': 1, 'moussa': 2})
+
+    def test_corrected_result_rescored(self):
+        score_result(self.result.id)
+        Result.objects.filter(id=self.result.id).update(outcome='3', outcome_details={'winner': '3'})
+        self.assertEqual(score_result(self.result.id), 0)  # Aucun nouveau pronostic, évaluations recalculées
+
+        evaluations = dict(PredictionEvaluation.objects.values_list('author__username', 'is_hit'))
+        self.assertEqual(evaluations, {'awa': False, 'moussa': True})
+        # (pronostics, choix gagnants, pronostics gagnants, série en cours, meilleure série, gain net)
+        expected = {'awa': (1, 0, 0, 0, 0, Decimal('-1.00')), 'moussa': (1, 1, 1, 1, 1, Decimal('3.00'))}
+        for score in AuthorScore.objects.filter(scope=SCOPE_GLOBAL, period=PERIOD_ALL).select_related('author'):
+            self.assertEqual((score.predictions, score.hits, score.winning_predictions, score.current_streak,
+                              score.best_streak, score.returns), expected[score.author.username])
+        ranks = dict(LeaderboardRank.objects.filter(scope=SCOPE_GLOBAL, scope_id=0, period=PERIOD_ALL)
+                     .values_list('author__username', 'rank'))
+        self.assertEqual(ranks, {'moussa': 1, 'awa': 2})
+
+    def test_rebuild_ranks_writes_only_changes(self):
+        score_result(self.result.id)
+        self.assertEqual(rebuild_ranks(SCOPE_GLOBAL, 0, PERIOD_ALL), 0)
+        AuthorScore.objects.filter(author=self.moussa, scope=SCOPE_GLOBAL, period=PERIOD_ALL).update(hits=5)
+        self.assertEqual(rebuild_ranks(SCOPE_GLOBAL, 0, PERIOD_ALL), 2)
+        AuthorScore.objects.filter(author=self.awa, scope=SCOPE_GLOBAL, period=PERIOD_ALL).update(predictions=0)
+        rebuild_ranks(SCOPE_GLOBAL, 0, PERIOD_ALL)
+        self.assertFalse(LeaderboardRank.objects.filter(author=self.awa, scope=SCOPE_GLOBAL, period=PERIOD_ALL).exists())
+
+
+class ConcurrentScoringTests(TransactionTestCase):
+    """Évaluations simultanées de deux résultats pour les mêmes auteurs : ni interblocage ni rang faux."""
+
+    def test_parallel_results_share_boards(self):
+        country = Country.objects.create(name='Mali', code='MLI')
+        game_type = GameType.objects.create(name='Pmu')
+        authors = [CustomUser.objects.create_user(username=f"auteur{index}") for index in range(6)]
+        validator = CustomUser.objects.create_user(username='validateur')
+        now = timezone.now()
+        results = []
+        for number in range(2):
+            game = Game.objects.create(name=f"Quarté {number}", country=country, game_type=game_type)
+            for index, author in enumerate(authors):
+                prediction = Prediction.objects.create(game=game, author=author, is_published=True,
+                                                       description='Pronostic',
+                                                       picks=[{'market': 'winner', 'value': str(index % 3)}])
+                # Ordres de predicted_at (ordre de verrouillage des pronostics) inversés d'un jeu à l'autre
+                Prediction.objects.filter(id=prediction.id).update(
+                    predicted_at=now - timedelta(minutes=index if number else 10 - index))
+            results.append(Result.objects.create(game=game, result_date=now, status='official', outcome='0',
+                                                 outcome_details={'winner': '0'}, validated_by=validator))
+
+        errors = []
+        barrier = threading.Barrier(2)
+
+        def run(result_id):
+            try:
+                barrier.wait()
+                score_result(result_id)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(result.id,)) for result in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        ranks = dict(LeaderboardRank.objects.filter(scope=SCOPE_GLOBAL, scope_id=0, period=PERIOD_ALL)
+                     .values_list('author__username', 'predictions'))
+        self.assertEqual(ranks, {author.username: 2 for author in authors})
+        board = LeaderboardRank.objects.filter(scope=SCOPE_GLOBAL, scope_id=0, period=PERIOD_ALL).order_by('rank')
+        self.assertEqual(list(board.values_list('rank', flat=True)), [1, 2, 3, 4, 5, 6])
+        self.assertEqual([row.author.username for row in board[:2]], ['auteur0', 'auteur3'])  # 2 choix gagnants
@@ -0,0 +1,68 @@
+import re
+
+from rest_framework import generics
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import AllowAny
+import logging
+
+from games.models import Country, Game
+from wari.log import ExceptionLoggingMixin
+from .models import LeaderboardRank, PERIOD_ALL, SCOPE_COUNTRY, SCOPE_GAME, SCOPE_GLOBAL
+from .serializers import LeaderboardRankSerializer
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+PERIOD_PATTERN = re.compile(r'^(all|\d{4}-(0[1-9]|1[0-2]))$')
+
+
+# 1. Pagination standardisée
+class StandardPagination(PageNumberPagination):
+    """Pagination standard avec 20 éléments par page, configurable via paramètre URL."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+# 2. Vue client du classement
+class LeaderboardView(ExceptionLoggingMixin, generics.ListAPIView):
+    """
+    Classement des pronostiqueurs (lecture seule, précalculé) :
+    - `scope` : global (défaut), game (avec `game=<slug>`) ou country (avec `country=<slug>`)
+    - `period` : all (défaut) ou mois AAAA-MM
+    - Une seule lecture indexée de la table précalculée, triée par rang
+    """
+    serializer_class = LeaderboardRankSerializer
+    permission_classes = [AllowAny]
+    pagination_class = StandardPagination
+
+    def get_board(self):
+        """Résout le tableau demandé en (périmètre, identifiant, période)."""
+        params = self.request.query_params
+        scope = params.get('scope', SCOPE_GLOBAL)
+        period = params.get('period', PERIOD_ALL)
+        if not PERIOD_PATTERN.match(period):
+            raise ValidationError({'period': "Période invalide (attendu : 'all' ou AAAA-MM)."})
+        if scope == SCOPE_GLOBAL:
+            return scope, 0, period
+        if scope == SCOPE_GAME:
+            model, slug = Game, params.get('game')
+        elif scope == SCOPE_COUNTRY:
+            model, slug = Country, params.get('country')
+        else:
+            raise ValidationError({'scope': "Périmètre invalide (global, game ou country)."})
+        if not slug:
+            raise ValidationError({scope: "Le slug est requis pour ce périmètre."})
+        scope_id = model.objects.filter(slug=slug).values_list('id', flat=True).first()
+        if scope_id is None:
+            raise NotFound(f"{model._meta.verbose_name} '{slug}' introuvable.")
+        return scope, scope_id, period
+
+    def get_queryset(self):
+        scope, scope_id, period = self.get_board()
+        return (
+            LeaderboardRank.objects.filter(scope=scope, scope_id=scope_id, period=period)
+            .select_related('author')
+            .order_by('rank', 'author_id')
+        )
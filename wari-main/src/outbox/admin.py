@@ -0,0 +1,47 @@
+from django.contrib import admin
+from django.utils.translation import gettext_lazy as _
+from .models import OutboxCheckpoint, OutboxEvent
+from .dispatcher import consumer_lag, skip_failed_event
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    """Consultation des événements métier (lecture seule)."""
+    list_display = ['id', 'event_type', 'aggregate', 'aggregate_id', 'txid', 'created_at']
+    list_filter = ['event_type', 'aggregate']
+    search_fields = ['aggregate_id']
+    date_hierarchy = 'created_at'
+    list_per_page = 25
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OutboxCheckpoint)
+class OutboxCheckpointAdmin(admin.ModelAdmin):
+    """Suivi des consommateurs : point de reprise, retard et échecs."""
+    list_display = ['consumer', 'event_id', 'pending', 'delivered', 'attempts', 'retry_at', 'updated_at']
+    readonly_fields = ['consumer', 'txid', 'event_id', 'delivered', 'attempts', 'retry_at', 'last_error', 'updated_at']
+    list_per_page = 25
+    actions = ['skip_failed']
+
+    def changelist_view(self, request, extra_context=None):
+        # Retard calculé une fois pour toute la liste
+        self.lag = consumer_lag()
+        return super().changelist_view(request, extra_context=extra_context)
+
+    def pending(self, obj):
+        """Événements en attente de livraison."""
+        return getattr(self, 'lag', {}).get(obj.consumer, '-')
+    pending.short_description = _('En attente')
+
+    def skip_failed(self, request, queryset):
+        """Abandonne l'événement qui bloque les consommateurs en échec sélectionnés."""
+        skipped = [
+            checkpoint.consumer for checkpoint in queryset.filter(attempts__gt=0)
+            if skip_failed_event(checkpoint.consumer) is not None
+        ]
+        self.message_user(request, f"{len(skipped)} événements abandonnés ({', '.join(skipped) or 'aucun'}).")
+    skip_failed.short_description = _("Abandonner l'événement en échec")
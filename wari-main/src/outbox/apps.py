@@ -0,0 +1,15 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class OutboxConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'outbox'
+    verbose_name = "Événements métier (outbox)"
+
+    def ready(self):
+        from .domain import connect_domain_events
+        # Événements écrits dans la transaction des sauvegardes de résultats, programmes et pronostics
+        connect_domain_events()
+        # Enregistre les consommateurs déclarés dans les modules `consumers.py` des applications
+        autodiscover_modules('consumers')
@@ -0,0 +1,186 @@
+"""
+Dispatcher des événements métier vers leurs consommateurs (PostgreSQL).
+
+Livraison au moins une fois, dans l'ordre d'écriture :
+- Chaque consommateur a un point de reprise (txid, id) ; un passage verrouille ce point
+  (SELECT ... FOR UPDATE SKIP LOCKED), livre un lot d'événements puis l'avance, dans une
+  seule transaction : les écritures du consommateur sont validées avec l'avancement
+- Seuls les événements des transactions terminées sont lus (txid inférieur au xmin de
+  l'instantané courant) : une transaction plus ancienne encore en cours ne peut plus
+  insérer d'événement avant le point de reprise
+- Un échec arrête le lot : le point de reprise reste sur l'événement précédent et le
+  consommateur est relancé après un délai exponentiel ; l'ordre par agrégat est préservé
+  (au prix du blocage du consommateur jusqu'à correction ou abandon de l'événement)
+"""
+import select
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+import logging
+
+from jobs.worker import backoff_delay
+from .models import OutboxCheckpoint, OutboxEvent
+from .publish import NOTIFY_CHANNEL
+from .registry import registered_consumers
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+# Plus ancienne transaction encore en cours : les événements antérieurs sont définitifs
+HORIZON_SQL = "SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+
+
+# 1. Lecture
+
+def after(txid, event_id):
+    return Q(txid__gt=txid) | Q(txid=txid, id__gt=event_id)
+
+
+def pending_events(definition, checkpoint, limit):
+    """Événements du consommateur au-delà de son point de reprise, dans l'ordre de livraison."""
+    return list(
+        OutboxEvent.objects.filter(after(checkpoint.txid, checkpoint.event_id))
+        .filter(event_type__in=definition.events, txid__lt=RawSQL(HORIZON_SQL, []))
+        .order_by('txid', 'id')[:limit]
+    )
+
+
+def get_checkpoint(definition):
+    """Point de reprise du consommateur ; créé à la fin du journal, sauf `from_start`."""
+    checkpoint = OutboxCheckpoint.objects.filter(consumer=definition.name).first()
+    if checkpoint is not None:
+        return checkpoint
+    start = {'txid': 0, 'event_id': 0}
+    if not definition.from_start:
+        last = OutboxEvent.objects.order_by('-txid', '-id').values('txid', 'id').first()
+        if last:
+            start = {'txid': last['txid'], 'event_id': last['id']}
+    OutboxCheckpoint.objects.bulk_create([OutboxCheckpoint(consumer=definition.name, **start)], ignore_conflicts=True)
+    return OutboxCheckpoint.objects.get(consumer=definition.name)
+
+
+# 2. Livraison
+
+def dispatch(definition, batch_size=100):
+    """
+    Livre au plus `batch_size` événements à un consommateur.
+    Retourne le nombre d'événements livrés (0 si le consommateur est pris par un autre
+    dispatcher ou en attente de nouvel essai).
+    """
+    get_checkpoint(definition)
+    with transaction.atomic():
+        checkpoint = (
+            OutboxCheckpoint.objects.select_for_update(skip_locked=True)
+            .filter(consumer=definition.name).first()
+        )
+        now = timezone.now()
+        if checkpoint is None or (checkpoint.retry_at and checkpoint.retry_at > now):
+            return 0
+        events = pending_events(definition, checkpoint, batch_size)
+        delivered = 0
+        for event in events:
+            try:
+                with transaction.atomic():
+                    definition.func(event)
+            except Exception as exc:
+                checkpoint.attempts += 1
+                checkpoint.retry_at = now + backoff_delay(checkpoint.attempts)
+                checkpoint.last_error = f"Événement #{event.id} : {''.join(traceback.format_exception(exc))}"[-5000:]
+                log = logger.error if checkpoint.attempts >= settings.OUTBOX_ALERT_ATTEMPTS else logger.warning
+                log("Consommateur %s : échec sur l'événement %s #%s (%s échecs consécutifs)",
+                    definition.name, event.event_type, event.id, checkpoint.attempts)
+                break
+            checkpoint.txid, checkpoint.event_id = event.txid, event.id
+            checkpoint.attempts, checkpoint.retry_at, checkpoint.last_error = 0, None, ''
+            delivered += 1
+        if events:
+            checkpoint.delivered += delivered
+            checkpoint.save()
+    return delivered
+
+
+def dispatch_all(batch_size=100, names=None):
+    """Un passage pour chaque consommateur enregistré ; retourne le nombre d'événements livrés."""
+    total = 0
+    for name, definition in registered_consumers().items():
+        if names and name not in names:
+            continue
+        total += dispatch(definition, batch_size)
+    return total
+
+
+def skip_failed_event(name):
+    """Abandonne l'événement bloquant un consommateur (le point de reprise passe au-delà)."""
+    definition = registered_consumers()[name]
+    with transaction.atomic():
+        checkpoint = OutboxCheckpoint.objects.select_for_update().get(consumer=name)
+        events = pending_events(definition, checkpoint, 1)
+        if not events:
+            return None
+        checkpoint.txid, checkpoint.event_id = events[0].txid, events[0].id
+        checkpoint.attempts, checkpoint.retry_at = 0, None
+        checkpoint.last_error = f"Événement #{events[0].id} abandonné"
+        checkpoint.save()
+    logger.warning("Consommateur %s : événement %s #%s abandonné", name, events[0].event_type, events[0].id)
+    return events[0]
+
+
+# 3. Rétention
+
+def purge_delivered(retention=None):
+    """Supprime les événements plus anciens que la rétention et déjà livrés à tous les consommateurs."""
+    retention = retention or timedelta(days=settings.OUTBOX_RETENTION_DAYS)
+    checkpoints = OutboxCheckpoint.objects.filter(consumer__in=list(registered_consumers()))
+    if checkpoints.count() < len(registered_consumers()):
+        return 0  # Un consommateur n'a pas encore de point de reprise
+    slowest = checkpoints.order_by('txid', 'event_id').values('txid', 'event_id').first()
+    queryset = OutboxEvent.objects.filter(created_at__lt=timezone.now() - retention)
+    if slowest is not None:
+        queryset = queryset.exclude(after(slowest['txid'], slowest['event_id']))
+    deleted, _ = queryset.delete()
+    return deleted
+
+
+def consumer_lag():
+    """Événements en attente par consommateur (suivi)."""
+    lag = {}
+    for name, definition in registered_consumers().items():
+        checkpoint = OutboxCheckpoint.objects.filter(consumer=name).first()
+        pending = OutboxEvent.objects.filter(event_type__in=definition.events)
+        if checkpoint is not None:
+            pending = pending.filter(after(checkpoint.txid, checkpoint.event_id))
+        lag[name] = pending.count()
+    return lag
+
+
+# 4. Boucle du dispatcher
+
+def run_dispatcher(stop_event, batch_size=100, poll_interval=5.0, names=None):
+    """
+    Boucle du dispatcher :
+    - Enchaîne les lots tant que des événements sont livrés
+    - Sinon attend un NOTIFY (écriture d'événements) ou `poll_interval` secondes
+      (nouveaux essais, transactions longues qui retenaient l'horizon)
+    """
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+    raw = connection.connection
+    last_purge = 0.0
+
+    while not stop_event.is_set():
+        if dispatch_all(batch_size, names):
+            continue
+        if time.monotonic() - last_purge > 3600:
+            last_purge = time.monotonic()
+            purge_delivered()
+        ready, _, _ = select.select([raw], [], [], poll_interval)
+        if ready:
+            raw.poll()
+            raw.notifies.clear()
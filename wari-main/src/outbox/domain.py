@@ -0,0 +1,108 @@
+"""
+Événements métier des résultats, programmes et pronostics.
+
+- Sauvegarde d'un objet (vues, formulaires d'administration, toutes deux atomiques) :
+  pre_save relit les champs suivis, post_save compare et écrit l'événement
+- Mises à jour en masse (actions d'administration, planificateur de publication) :
+  `publish_transition` pour les identifiants basculés, dans la même transaction
+"""
+from dataclasses import dataclass
+
+from django.apps import apps
+from django.db.models.signals import post_save, pre_save
+
+from .publish import publish, publish_many
+
+RESULT_OFFICIAL = 'result.official'
+RESULT_CORRECTED = 'result.corrected'
+PROGRAM_PUBLISHED = 'program.published'
+PREDICTION_PUBLISHED = 'prediction.published'
+
+
+@dataclass(frozen=True)
+class DomainEvents:
+    model: str  # Label du modèle
+    watched: tuple  # Champs relus avant une mise à jour
+    payload: tuple  # Attributs copiés dans l'événement
+    detect: object  # (instance, valeurs précédentes ou None) -> type d'événement ou None
+
+    def payload_of(self, instance):
+        return {name: getattr(instance, name) for name in self.payload}
+
+
+def result_event(instance, previous):
+    """Résultat devenu officiel, ou résultat officiel dont le contenu a été corrigé."""
+    if instance.status != 'official':
+        return None
+    if previous is None or previous['status'] != 'official':
+        return RESULT_OFFICIAL
+    if (previous['outcome'], previous['outcome_details']) != (instance.outcome, instance.outcome_details):
+        return RESULT_CORRECTED
+    return None
+
+
+def published_event(event_type):
+    def detect(instance, previous):
+        if instance.is_published and (previous is None or not previous['is_published']):
+            return event_type
+        return None
+    return detect
+
+
+DOMAIN_EVENTS = [
+    DomainEvents('results.Result', ('status', 'outcome', 'outcome_details'),
+                 ('game_id', 'result_date', 'validated_by_id'), result_event),
+    # publish_at / unpublish_at : relus aussi pour le réveil du planificateur (wari.publication)
+    DomainEvents('programmes.Program', ('is_published', 'publish_at', 'unpublish_at'), ('game_id', 'event_date'),
+                 published_event(PROGRAM_PUBLISHED)),
+    DomainEvents('predictions.Prediction', ('is_published', 'publish_at', 'unpublish_at'), ('game_id', 'author_id'),
+                 published_event(PREDICTION_PUBLISHED)),
+]
+
+# Événement de publication par modèle planifié (wari.publication)
+PUBLISHED_EVENTS = {
+    'programmes.Program': PROGRAM_PUBLISHED,
+    'predictions.Prediction': PREDICTION_PUBLISHED,
+}
+
+_by_model = {}
+
+
+# 1. Sauvegardes
+
+def remember_previous(sender, instance, raw=False, **kwargs):
+    """pre_save : valeurs des champs suivis avant la mise à jour (une requête, jamais à la création)."""
+    spec = _by_model[sender]
+    if raw or instance._state.adding or instance.pk is None:
+        instance._outbox_previous = None
+        return
+    instance._outbox_previous = sender._base_manager.filter(pk=instance.pk).values(*spec.watched).first()
+
+
+def emit_domain_event(sender, instance, created, raw=False, **kwargs):
+    """post_save : écrit l'événement détecté, dans la transaction de la sauvegarde."""
+    if raw:
+        return
+    spec = _by_model[sender]
+    event_type = spec.detect(instance, None if created else getattr(instance, '_outbox_previous', None))
+    if event_type:
+        publish(event_type, sender, instance.pk, spec.payload_of(instance))
+
+
+def connect_domain_events():
+    for spec in DOMAIN_EVENTS:
+        model = apps.get_model(spec.model)
+        _by_model[model] = spec
+        pre_save.connect(remember_previous, sender=model, dispatch_uid=f'outbox-previous-{spec.model}')
+        post_save.connect(emit_domain_event, sender=model, dispatch_uid=f'outbox-event-{spec.model}')
+
+
+# 2. Mises à jour en masse
+
+def publish_transition(model, event_type, ids):
+    """Écrit `event_type` pour chaque objet basculé par un UPDATE en masse (queryset.update, RETURNING)."""
+    if not ids:
+        return []
+    spec = _by_model[model]
+    rows = model._base_manager.filter(pk__in=ids).values('pk', *spec.payload)
+    return publish_many(event_type, model, [(row.pop('pk'), row) for row in rows])
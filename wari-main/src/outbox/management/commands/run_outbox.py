@@ -0,0 +1,53 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from outbox.dispatcher import dispatch_all, purge_delivered, run_dispatcher
+from outbox.registry import registered_consumers
+
+
+class Command(BaseCommand):
+    """
+    Dispatcher des événements métier (table outbox) vers les consommateurs enregistrés.
+
+    Exemples :
+        python manage.py run_outbox                                  # boucle continue
+        python manage.py run_outbox --burst                          # vide le journal puis s'arrête
+        python manage.py run_outbox --consumer leaderboard.scoring
+    """
+    help = "Livre les événements métier (au moins une fois, dans l'ordre) aux consommateurs enregistrés."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--consumer', action='append', default=None,
+                            help="Consommateur à servir (répétable, défaut : tous)")
+        parser.add_argument('--batch-size', type=int, default=None, help="Événements par lot et par consommateur")
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help="Attente maximale sans notification (secondes)")
+        parser.add_argument('--burst', action='store_true', help="S'arrête dès qu'aucun événement n'est livré")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size'] or settings.OUTBOX_BATCH_SIZE
+        names = options['consumer']
+        self.stdout.write(f"Consommateurs enregistrés : {', '.join(sorted(registered_consumers())) or 'aucun'}")
+
+        if options['burst']:
+            total = 0
+            while delivered := dispatch_all(batch_size, names):
+                total += delivered
+            purged = purge_delivered()
+            self.stdout.write(f"{total} événements livrés, {purged} purgés.")
+            return
+
+        stop_event = threading.Event()
+
+        def stop(*args):
+            stop_event.set()
+            raise KeyboardInterrupt
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            run_dispatcher(stop_event, batch_size, options['poll_interval'] or settings.OUTBOX_POLL_INTERVAL, names)
+        except KeyboardInterrupt:
+            self.stdout.write("Dispatcher arrêté.")
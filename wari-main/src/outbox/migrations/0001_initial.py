@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:08
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=200, unique=True, verbose_name='Consommateur')),
+                ('txid', models.BigIntegerField(default=0, verbose_name='Transaction du dernier événement livré')),
+                ('event_id', models.BigIntegerField(default=0, verbose_name='Dernier événement livré')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Échecs consécutifs')),
+                ('last_error', models.TextField(blank=True, verbose_name='Dernière erreur')),
+                ('retry_at', models.DateTimeField(blank=True, null=True, verbose_name='Nouvel essai à partir de')),
+                ('delivered', models.PositiveBigIntegerField(default=0, verbose_name='Événements livrés')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour')),
+            ],
+            options={
+                'verbose_name': 'Point de reprise',
+                'verbose_name_plural': 'Points de reprise',
+                'ordering': ['consumer'],
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('aggregate', models.CharField(help_text='Modèle concerné (ex. : results.Result)', max_length=100, verbose_name='Agrégat')),
+                ('aggregate_id', models.BigIntegerField(verbose_name="Identifiant de l'agrégat")),
+                ('event_type', models.CharField(db_index=True, help_text='Ex. : result.official', max_length=100, verbose_name="Type d'événement")),
+                ('payload', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text="Attributs de l'agrégat au moment de l'événement", verbose_name='Données')),
+                ('txid', models.BigIntegerField(db_default=models.Func(output_field=models.BigIntegerField(), template='pg_current_xact_id()::text::bigint'), editable=False, verbose_name='Transaction')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Date de création')),
+            ],
+            options={
+                'verbose_name': 'Événement',
+                'verbose_name_plural': 'Événements',
+                'ordering': ['txid', 'id'],
+                'indexes': [models.Index(fields=['txid', 'id'], name='outbox_event_order_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class OutboxEvent(models.Model):
+    """
+    Événement métier écrit dans la même transaction que la modification qui le produit.
+    - `txid` : transaction d'écriture ; l'ordre de livraison est (txid, id) et seuls les
+      événements des transactions terminées sont lus (cf. outbox.dispatcher)
+    """
+    aggregate = models.CharField(
+        max_length=100,
+        verbose_name='Agrégat',
+        help_text='Modèle concerné (ex. : results.Result)'
+    )
+    aggregate_id = models.BigIntegerField(verbose_name="Identifiant de l'agrégat")
+    event_type = models.CharField(
+        max_length=100,
+        db_index=True,
+        verbose_name="Type d'événement",
+        help_text='Ex. : result.official'
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        verbose_name='Données',
+        help_text="Attributs de l'agrégat au moment de l'événement"
+    )
+    txid = models.BigIntegerField(
+        db_default=models.Func(template='pg_current_xact_id()::text::bigint', output_field=models.BigIntegerField()),
+        editable=False,
+        verbose_name='Transaction'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Date de création', editable=False)
+
+    class Meta:
+        indexes = [
+            # Lecture des consommateurs : événements au-delà du point de reprise, dans l'ordre de livraison
+            models.Index(fields=['txid', 'id'], name='outbox_event_order_idx'),
+        ]
+        verbose_name = 'Événement'
+        verbose_name_plural = 'Événements'
+        ordering = ['txid', 'id']
+
+    def __str__(self):
+        return f"{self.event_type} {self.aggregate}#{self.aggregate_id}"
+
+
+class OutboxCheckpoint(models.Model):
+    """Point de reprise d'un consommateur : dernier événement livré (txid, id) et état des essais."""
+    consumer = models.CharField(max_length=200, unique=True, verbose_name='Consommateur')
+    txid = models.BigIntegerField(default=0, verbose_name='Transaction du dernier événement livré')
+    event_id = models.BigIntegerField(default=0, verbose_name='Dernier événement livré')
+    attempts = models.PositiveIntegerField(default=0, verbose_name='Échecs consécutifs')
+    last_error = models.TextField(blank=True, verbose_name='Dernière erreur')
+    retry_at = models.DateTimeField(null=True, blank=True, verbose_name='Nouvel essai à partir de')
+    delivered = models.PositiveBigIntegerField(default=0, verbose_name='Événements livrés')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour', editable=False)
+
+    class Meta:
+        verbose_name = 'Point de reprise'
+        verbose_name_plural = 'Points de reprise'
+        ordering = ['consumer']
+
+    def __str__(self):
+        return f"{self.consumer} @ #{self.event_id}"
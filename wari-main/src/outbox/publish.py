@@ -0,0 +1,28 @@
+"""
+Écriture des événements dans la table outbox.
+
+À appeler dans la transaction de la modification : l'événement est validé (ou annulé)
+avec elle. Un NOTIFY, délivré au commit, réveille le dispatcher.
+"""
+from django.db import connection
+
+from .models import OutboxEvent
+
+NOTIFY_CHANNEL = 'wari_outbox'
+
+
+def publish(event_type, model, aggregate_id, payload=None):
+    """Écrit un événement pour l'objet `aggregate_id` du modèle `model`."""
+    return publish_many(event_type, model, [(aggregate_id, payload or {})])
+
+
+def publish_many(event_type, model, items):
+    """Écrit un événement par couple (identifiant, données) en une seule requête INSERT."""
+    events = OutboxEvent.objects.bulk_create([
+        OutboxEvent(aggregate=model._meta.label, aggregate_id=aggregate_id, event_type=event_type, payload=payload)
+        for aggregate_id, payload in items
+    ])
+    if events:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, '')", [NOTIFY_CHANNEL])
+    return events
@@ -0,0 +1,49 @@
+"""
+Enregistrement des consommateurs d'événements métier.
+
+Déclaration (dans le module `consumers.py` d'une application) :
+
+    from outbox.domain import RESULT_OFFICIAL
+    from outbox.registry import consumer
+
+    @consumer('notifications.push', events=[RESULT_OFFICIAL])
+    def push_result(event):
+        ...
+
+Le consommateur reçoit chaque événement (OutboxEvent) au moins une fois, dans l'ordre
+d'écriture ; il doit donc être idempotent. Ses écritures en base sont validées avec
+l'avancement de son point de reprise.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ConsumerDefinition:
+    name: str
+    func: object
+    events: tuple
+    from_start: bool = False
+
+
+_registry = {}
+
+
+def consumer(name, events, from_start=False):
+    """
+    Décorateur enregistrant une fonction comme consommateur des événements `events`.
+    - `from_start` : un nouveau consommateur relit les événements encore conservés ;
+      par défaut il ne reçoit que les événements postérieurs à son premier passage
+    """
+    def decorator(func):
+        _registry[name] = ConsumerDefinition(name=name, func=func, events=tuple(events), from_start=from_start)
+        return func
+    return decorator
+
+
+def get_consumer(name):
+    """Retourne la définition d'un consommateur, ou lève KeyError s'il est inconnu."""
+    return _registry[name]
+
+
+def registered_consumers():
+    return dict(_registry)
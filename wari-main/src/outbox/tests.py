@@ -0,0 +1,102 @@
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+
+from .dispatcher import dispatch, pending_events
+from .models import OutboxCheckpoint, OutboxEvent
+from .registry import ConsumerDefinition
+
+delivered = []
+
+
+def record(event):
+    delivered.append(event.id)
+
+
+def fail_on_second(event):
+    if event.payload.get('fail'):
+        raise ValueError("échec attendu")
+    delivered.append(event.id)
+
+
+def consumer(func=record, name='outbox.tests'):
+    return ConsumerDefinition(name=name, func=func, events=('test.event',), from_start=True)
+
+
+def event(txid=None, **payload):
+    """Événement d'une transaction `txid` (par défaut : la transaction courante)."""
+    fields = {'txid': txid} if txid is not None else {}
+    return OutboxEvent.objects.create(aggregate='tests.Test', aggregate_id=1, event_type='test.event',
+                                      payload=payload, **fields)
+
+
+class DispatchOrderTests(TestCase):
+    """Livraison dans l'ordre (txid, id), limitée aux transactions terminées."""
+
+    def setUp(self):
+        delivered.clear()
+
+    def test_delivered_in_txid_then_id_order(self):
+        late = event(txid=20)
+        first = event(txid=10)
+        second = event(txid=10)
+        self.assertEqual(dispatch(consumer()), 3)
+        self.assertEqual(delivered, [first.id, second.id, late.id])
+        checkpoint = OutboxCheckpoint.objects.get(consumer='outbox.tests')
+        self.assertEqual((checkpoint.txid, checkpoint.event_id, checkpoint.delivered), (20, late.id, 3))
+
+    def test_resumes_after_checkpoint(self):
+        event(txid=10)
+        dispatch(consumer())
+        delivered.clear()
+        self.assertEqual(dispatch(consumer()), 0)
+        newer = event(txid=11)
+        self.assertEqual(dispatch(consumer()), 1)
+        self.assertEqual(delivered, [newer.id])
+
+    def test_open_transaction_events_not_read(self):
+        # Transaction du test encore ouverte : son txid n'est pas inférieur au xmin de l'instantané
+        committed = event(txid=10)
+        event()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_current_xact_id()::text::bigint, "
+                           "pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+            current, xmin = cursor.fetchone()
+        self.assertLessEqual(xmin, current)
+        self.assertEqual(dispatch(consumer()), 1)
+        self.assertEqual(delivered, [committed.id])
+
+    def test_failure_stops_batch_and_keeps_checkpoint(self):
+        first = event(txid=10)
+        event(txid=11, fail=True)
+        event(txid=12)
+        self.assertEqual(dispatch(consumer(fail_on_second)), 1)
+        self.assertEqual(delivered, [first.id])
+        checkpoint = OutboxCheckpoint.objects.get(consumer='outbox.tests')
+        self.assertEqual((checkpoint.event_id, checkpoint.attempts), (first.id, 1))
+        self.assertIsNotNone(checkpoint.retry_at)
+        self.assertEqual(dispatch(consumer(fail_on_second)), 0)  # En attente du nouvel essai
+        self.assertEqual(len(pending_events(consumer(), checkpoint, 10)), 2)
+
+
+class CheckpointClaimTests(TransactionTestCase):
+    """Point de reprise verrouillé par un autre dispatcher (FOR UPDATE SKIP LOCKED) : consommateur ignoré."""
+
+    def setUp(self):
+        delivered.clear()
+
+    def test_locked_checkpoint_skipped(self):
+        OutboxCheckpoint.objects.create(consumer='outbox.tests')
+        pending = event()
+        other = connections.create_connection('default')
+        try:
+            other.set_autocommit(False)
+            with other.cursor() as cursor:
+                cursor.execute("SELECT id FROM outbox_outboxcheckpoint WHERE consumer = %s FOR UPDATE",
+                               ['outbox.tests'])
+            self.assertEqual(dispatch(consumer()), 0)
+            self.assertEqual(delivered, [])
+        finally:
+            other.rollback()
+            other.close()
+        self.assertEqual(dispatch(consumer()), 1)
+        self.assertEqual(delivered, [pending.id])
@@ -13,7 +13,7 @@ from users.models import CustomUser
 from games.models import Game, Country, GameType
 from predictions.models import Prediction
 from results.models import Result
-from programmes.models import Program
+from programmes.models import Program, ProgramSchedule, ScheduleException
 
 def populate_database():
     """
@@ -282,7 +282,42 @@ def populate_database():
             print(f"Programme créé pour {program.game.name} : {program.details}")
 
         # -------------------------------------
-        # Étape 9 : Résumé des Données Créées
+        # Étape 9 : Création des Récurrences (tirages réguliers, sans une ligne par tirage)
+        # -------------------------------------
+        print("Création des récurrences...")
+        schedules_data = [
+            {
+                "game": games[0],
+                "frequency": "daily",
+                "weekdays": [],
+                "draw_time": "13:00",
+                "details": "Tirage quotidien de 13h",
+            },
+            {
+                "game": games[1],
+                "frequency": "weekly",
+                "weekdays": [2, 5],  # Mercredi et samedi
+                "draw_time": "20:00",
+                "details": "Tirage du mercredi et du samedi",
+            },
+        ]
+
+        for schedule_data in schedules_data:
+            schedule = ProgramSchedule.objects.create(
+                timezone="Africa/Abidjan",
+                starts_on=timezone.now().date(),
+                **schedule_data
+            )
+            print(f"Récurrence créée : {schedule}")
+        # Jour férié : pas de tirage quotidien
+        ScheduleException.objects.create(
+            schedule=ProgramSchedule.objects.get(game=games[0]),
+            date=timezone.now().date() + timedelta(days=7),
+            reason="Jour férié"
+        )
+
+        # -------------------------------------
+        # Étape 10 : Résumé des Données Créées
         # -------------------------------------
         print("\nRésumé des données créées :")
         print(f"- Utilisateurs : {CustomUser.objects.count()}")
@@ -292,6 +327,7 @@ def populate_database():
         print(f"- Prédictions : {Prediction.objects.count()}")
         print(f"- Résultats : {Result.objects.count()}")
         print(f"- Programmes : {Program.objects.count()}")
+        print(f"- Récurrences : {ProgramSchedule.objects.count()}")
         print("\nBase de données peuplée avec succès !")
 
     except Exception as e:
@@ -1,11 +1,16 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from django.db import transaction
+from django.utils import timezone
 from .models import Prediction
+from bundles.build import invalidate_bundles
+from games.feed import invalidate_country_feeds
+from outbox.domain import PREDICTION_PUBLISHED, publish_transition
 
 @admin.register(Prediction)
 class PredictionAdmin(admin.ModelAdmin):
     """Interface pour gérer les pronostics."""
-    list_display = ['game', 'predicted_at', 'is_published', 'author', 'updated_at', 'short_description']
+    list_display = ['game', 'predicted_at', 'is_published', 'publish_at', 'unpublish_at', 'author', 'updated_at', 'short_description']
     list_filter = ['is_published', 'predicted_at', 'author', 'game__country']
     search_fields = ['game__name', 'description']
     date_hierarchy = 'predicted_at'
@@ -20,12 +25,20 @@ class PredictionAdmin(admin.ModelAdmin):
 
     def publish(self, request, queryset):
         """Met à jour les pronostics pour les publier."""
-        updated = queryset.update(is_published=True)
+        with transaction.atomic():
+            # update() n'émet pas post_save : événements écrits ici pour les seuls pronostics basculés
+            ids = list(queryset.filter(is_published=False).values_list('id', flat=True))
+            updated = queryset.update(is_published=True, updated_at=timezone.now())
+            publish_transition(Prediction, PREDICTION_PUBLISHED, ids)
+        invalidate_country_feeds()
+        invalidate_bundles(queryset.values_list('game_id', flat=True))
         self.message_user(request, f"{updated} pronostics sont maintenant publiés.")
     publish.short_description = _("Publier les pronostics")
 
     def unpublish(self, request, queryset):
         """Met à jour les pronostics pour les dépublier."""
-        updated = queryset.update(is_published=False)
+        updated = queryset.update(is_published=False, updated_at=timezone.now())
+        invalidate_country_feeds()
+        invalidate_bundles(queryset.values_list('game_id', flat=True))
         self.message_user(request, f"{updated} pronostics sont maintenant dépubliés.")
     unpublish.short_description = _("Dépublier les pronostics")
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class PredictionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'predictions'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+        from wari.publication import notify_schedule_change
+        from .models import Prediction
+        # Réveille le planificateur de publication quand une échéance est enregistrée
+        post_save.connect(notify_schedule_change, sender=Prediction, dispatch_uid='predictions-publication-notify')
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0002_game_description_alter_country_code_and_more'),
+        ('predictions', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prediction',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, help_text='Date à laquelle le pronostic sera publié automatiquement', null=True, verbose_name='Publication programmée'),
+        ),
+        migrations.AddField(
+            model_name='prediction',
+            name='unpublish_at',
+            field=models.DateTimeField(blank=True, help_text='Date à laquelle le pronostic sera dépublié automatiquement', null=True, verbose_name='Dépublication programmée'),
+        ),
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(condition=models.Q(('is_published', False), ('publish_at__isnull', False)), fields=['publish_at'], name='prediction_publish_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(condition=models.Q(('is_published', True), ('unpublish_at__isnull', False)), fields=['unpublish_at'], name='prediction_unpublish_due_idx'),
+        ),
+    ]
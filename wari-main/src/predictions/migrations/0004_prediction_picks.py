@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0003_prediction_publish_at_prediction_unpublish_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prediction',
+            name='picks',
+            field=models.JSONField(blank=True, default=list, help_text='Liste de choix évaluables (ex. : [{"market": "winner", "value": "Équipe A", "odds": 2.1}])', verbose_name='Choix structurés'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def partition_predictions(apps, schema_editor):
+    """Conversion en ligne de predictions_prediction en table partitionnée par mois (PostgreSQL uniquement)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from wari.partitioning import convert_to_partitioned
+    convert_to_partitioned('predictions_prediction', 'predicted_at', using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY et VALIDATE CONSTRAINT s'exécutent hors transaction
+    atomic = False
+
+    dependencies = [
+        ('predictions', '0004_prediction_picks'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_predictions, migrations.RunPython.noop),
+    ]
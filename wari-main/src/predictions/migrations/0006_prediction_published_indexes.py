@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+from wari.partitioning import AddIndexConcurrentlyPartitioned, RemoveIndexConcurrentlyPartitioned
+
+
+class Migration(migrations.Migration):
+    # Index construits partition par partition avec CREATE INDEX CONCURRENTLY, hors transaction
+    atomic = False
+
+    dependencies = [
+        ('predictions', '0005_partition_prediction'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyPartitioned(
+            model_name='prediction',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['predicted_at'], include=('game', 'author'), name='prediction_published_idx'),
+        ),
+        AddIndexConcurrentlyPartitioned(
+            model_name='prediction',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['game', 'predicted_at'], name='prediction_published_game_idx'),
+        ),
+        RemoveIndexConcurrentlyPartitioned(
+            model_name='prediction',
+            name='predictions_is_publ_4c9506_idx',
+        ),
+        RemoveIndexConcurrentlyPartitioned(
+            model_name='prediction',
+            name='predictions_game_id_0ff87d_idx',
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from games.denorm import denormalize
+from wari.partitioning import AddIndexConcurrentlyPartitioned
+
+
+class Migration(migrations.Migration):
+    # Remplissage par lots et CREATE INDEX CONCURRENTLY : hors transaction
+    atomic = False
+
+    dependencies = [
+        ('games', '0005_denorm_functions'),
+        ('predictions', '0007_prediction_prediction_sync_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prediction',
+            name='country',
+            field=models.ForeignKey(db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='games.country', verbose_name='Pays du jeu'),
+        ),
+        migrations.AddField(
+            model_name='prediction',
+            name='game_active',
+            field=models.BooleanField(default=True, editable=False, verbose_name='Jeu actif'),
+        ),
+        migrations.AddField(
+            model_name='prediction',
+            name='game_type',
+            field=models.ForeignKey(db_constraint=False, db_index=False, editable=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='games.gametype', verbose_name='Type du jeu'),
+        ),
+        # Triggers de recopie et de propagation, puis remplissage des lignes existantes
+        migrations.RunPython(*denormalize('predictions_prediction')),
+        AddIndexConcurrentlyPartitioned(
+            model_name='prediction',
+            index=models.Index(condition=models.Q(('game_active', True), ('is_published', True)), fields=['country', 'predicted_at'], name='prediction_country_idx'),
+        ),
+        AddIndexConcurrentlyPartitioned(
+            model_name='prediction',
+            index=models.Index(condition=models.Q(('game_active', True), ('is_published', True)), fields=['game_type', 'predicted_at'], name='prediction_game_type_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def create_default_partition(apps, schema_editor):
+    """Partition DEFAULT de predictions_prediction : les écritures hors partitions mensuelles n'échouent plus (PostgreSQL uniquement)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from wari.partitioning import ensure_default_partition, is_partitioned
+    if is_partitioned('predictions_prediction', using=schema_editor.connection.alias):
+        ensure_default_partition('predictions_prediction', using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0008_prediction_country_prediction_game_active_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_default_partition, migrations.RunPython.noop),
+    ]
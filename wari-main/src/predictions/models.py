@@ -1,8 +1,9 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from users.models import CustomUser
-from games.models import Game
+from games.models import Country, Game, GameType
 
 
 class Prediction(models.Model):
@@ -13,10 +14,38 @@ class Prediction(models.Model):
         verbose_name='Jeu',
         help_text='Le jeu auquel ce pronostic est associé'
     )
+    # Colonnes du jeu recopiées par trigger (games.denorm) : filtres sans jointure vers games_game
+    country = models.ForeignKey(
+        Country,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Pays du jeu'
+    )
+    game_type = models.ForeignKey(
+        GameType,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Type du jeu'
+    )
+    game_active = models.BooleanField(default=True, editable=False, verbose_name='Jeu actif')
     description = models.TextField(
         verbose_name='Description',
         help_text='Détails du pronostic'
     )
+    picks = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Choix structurés',
+        help_text='Liste de choix évaluables (ex. : [{"market": "winner", "value": "Équipe A", "odds": 2.1}])'
+    )
     predicted_at = models.DateTimeField(
         auto_now_add=True,
         db_index=True,
@@ -29,6 +58,18 @@ class Prediction(models.Model):
         verbose_name='Publié',
         help_text='Indique si le pronostic est visible publiquement'
     )
+    publish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Publication programmée',
+        help_text='Date à laquelle le pronostic sera publié automatiquement'
+    )
+    unpublish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Dépublication programmée',
+        help_text='Date à laquelle le pronostic sera dépublié automatiquement'
+    )
     author = models.ForeignKey(
         CustomUser,
         on_delete=models.SET_NULL,
@@ -46,8 +87,23 @@ class Prediction(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=['is_published', 'predicted_at']),
-            models.Index(fields=['game', 'is_published']),
+            # Requêtes client et flux par pays (pronostics publiés, tri par date) : index partiels
+            models.Index(fields=['predicted_at'], include=['game', 'author'], condition=Q(is_published=True),
+                         name='prediction_published_idx'),
+            models.Index(fields=['game', 'predicted_at'], condition=Q(is_published=True),
+                         name='prediction_published_game_idx'),
+            # Filtres client par pays ou type de jeu (colonnes recopiées, jeux actifs uniquement)
+            models.Index(fields=['country', 'predicted_at'], condition=Q(is_published=True, game_active=True),
+                         name='prediction_country_idx'),
+            models.Index(fields=['game_type', 'predicted_at'], condition=Q(is_published=True, game_active=True),
+                         name='prediction_game_type_idx'),
+            # Files d'échéances du planificateur de publication (seules les lignes en attente sont indexées)
+            models.Index(fields=['publish_at'], condition=Q(is_published=False, publish_at__isnull=False),
+                         name='prediction_publish_due_idx'),
+            models.Index(fields=['unpublish_at'], condition=Q(is_published=True, unpublish_at__isnull=False),
+                         name='prediction_unpublish_due_idx'),
+            # Synchronisation incrémentale (/api/client/sync/) : parcours par (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='prediction_sync_idx'),
         ]
         verbose_name = 'Prédiction'
         verbose_name_plural = 'Prédictions'
@@ -62,6 +118,10 @@ class Prediction(models.Model):
             raise ValidationError("La description ne peut pas être vide.")
         if self.is_published and not self.author:
             raise ValidationError("Un pronostic publié doit avoir un auteur.")
+        if self.publish_at and not self.author:
+            raise ValidationError("Un pronostic à publier doit avoir un auteur.")
+        if self.publish_at and self.unpublish_at and self.unpublish_at <= self.publish_at:
+            raise ValidationError("La dépublication programmée doit suivre la publication programmée.")
 
     def save(self, *args, **kwargs):
         self.description = self.description.strip()
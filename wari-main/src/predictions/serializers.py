@@ -2,6 +2,9 @@ from rest_framework import serializers
 from django.utils import timezone
 from .models import Prediction
 from games.models import Game  # Importation absolue
+from games.refcache import reference_data
+from games.serializers import GameSlugField
+from wari.readers import SKIP, CompiledReader, game_name
 
 class PredictionSerializer(serializers.ModelSerializer):
     """
@@ -10,8 +13,7 @@ class PredictionSerializer(serializers.ModelSerializer):
     - Valide les champs modifiables (description)
     - Champs en lecture seule protégés
     """
-    game = serializers.SlugRelatedField(
-        slug_field='slug',
+    game = GameSlugField(
         queryset=Game.objects.all(),  # Permet l'écriture par slug
         help_text="Slug du jeu associé au pronostic."
     )
@@ -23,7 +25,7 @@ class PredictionSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Prediction
-        fields = ['id', 'game', 'description', 'predicted_at', 'is_published', 'author', 'updated_at']
+        fields = ['id', 'game', 'description', 'picks', 'predicted_at', 'is_published', 'publish_at', 'unpublish_at', 'author', 'updated_at']
         read_only_fields = ['predicted_at', 'updated_at', 'author']
         extra_kwargs = {
             'description': {'required': True, 'help_text': "Description du pronostic (non vide)."},
@@ -43,6 +45,27 @@ class PredictionSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La description doit contenir au moins 15 caractères.")
         return cleaned_value
 
+    def validate_picks(self, value):
+        """
+        Valide les choix structurés :
+        - Liste d'objets {"market", "value", "odds" (optionnelle)}
+        - Marché non vide et unique, cote décimale strictement supérieure à 1
+        """
+        if not isinstance(value, list):
+            raise serializers.ValidationError("Les choix doivent être une liste.")
+        markets = set()
+        for pick in value:
+            if not isinstance(pick, dict) or not str(pick.get('market', '')).strip() or 'value' not in pick:
+                raise serializers.ValidationError("Chaque choix doit contenir 'market' et 'value'.")
+            market = str(pick['market']).strip()
+            if market in markets:
+                raise serializers.ValidationError(f"Le marché '{market}' est présent plusieurs fois.")
+            markets.add(market)
+            odds = pick.get('odds')
+            if odds is not None and (not isinstance(odds, (int, float)) or odds <= 1):
+                raise serializers.ValidationError("La cote doit être un nombre strictement supérieur à 1.")
+        return value
+
     def validate(self, attrs):
         """
         Validation globale :
@@ -58,8 +81,26 @@ class PredictionSerializer(serializers.ModelSerializer):
         - Ajoute le nom du jeu et des détails supplémentaires pour les clients
         """
         representation = super().to_representation(instance)
-        if instance.game:
-            representation['game_name'] = instance.game.name  # Nom du jeu en plus du slug
+        if instance.game_id:
+            # Nom du jeu en plus du slug (cache de référence, sans jointure)
+            game = reference_data().games.get(instance.game_id)
+            representation['game_name'] = game.name if game else instance.game.name
         if instance.author:
             representation['author_display'] = instance.author.get_full_name() or instance.author.username
-        return representation
\ No newline at end of file
+        return representation
+
+def author_display(author_id, first_name, last_name, username):
+    """`author_display` : même valeur que AbstractUser.get_full_name() ou, à défaut, le nom d'utilisateur."""
+    if author_id is None:
+        return SKIP
+    return f"{first_name} {last_name}".strip() or username
+
+
+# Lecture compilée des listes client (wari.readers)
+prediction_reader = CompiledReader(
+    PredictionSerializer,
+    extras={
+        'game_name': (['game_id'], game_name),
+        'author_display': (['author_id', 'author__first_name', 'author__last_name', 'author__username'], author_display),
+    },
+)
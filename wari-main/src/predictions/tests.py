@@ -1,3 +1,130 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from games.models import Country, GameType, Game
+from outbox.domain import PREDICTION_PUBLISHED
+from outbox.models import OutboxEvent
+from users.models import CustomUser
+from wari.publication import flip_due
+from .admin import PredictionAdmin
+from .models import Prediction
+from .serializers import PredictionSerializer, prediction_reader
+from .views import ClientPredictionViewSet
+
+
+class PredictionReaderGoldenTests(TestCase):
+    """Liste compilée (wari.readers) : JSON identique octet pour octet au sérialiseur DRF."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Mali', code='MLI')
+        game_type = GameType.objects.create(name='Pmu')
+        game = Game.objects.create(name='Quarté Bamako', country=country, game_type=game_type)
+        named = CustomUser.objects.create_user(username='awa', first_name='Awa', last_name='Traoré')
+        anonymous = CustomUser.objects.create_user(username='pronostiqueur')
+        removed = CustomUser.objects.create_user(username='ancien', first_name='Ancien')
+        Prediction.objects.create(game=game, author=named, is_published=True,
+                                  description='Favori : le numéro 7 à la corde',
+                                  picks=[{'market': 'winner', 'value': '7', 'odds': 2.15}])
+        Prediction.objects.create(game=game, author=anonymous, is_published=True,
+                                  description='Outsider « surprise » en fin de course', picks=[])
+        Prediction.objects.create(game=game, author=removed, is_published=True,
+                                  description='Pronostic dont l’auteur a été supprimé',
+                                  picks=[{'market': 'place', 'value': ['3', '11']}])
+        removed.delete()  # Auteur remis à NULL (SET_NULL) : pas de `author_display`
+
+    def assertGolden(self, queryset):
+        expected = JSONRenderer().render(PredictionSerializer(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(prediction_reader.serialize(prediction_reader.rows(queryset))), expected)
+
+    def test_serialize_matches_serializer(self):
+        self.assertGolden(Prediction.objects.select_related('author'))
+
+    def test_client_list_matches_serializer(self):
+        view = ClientPredictionViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        for params in ({}, {'game__slug': 'quarte-bamako-mli'}, {'page_size': 1, 'page': 3}):
+            with self.subTest(params=params):
+                with override_settings(FAST_READ_SERIALIZERS=False):
+                    expected = view(factory.get('/api/client/predictions/', params)).render().content
+                with override_settings(FAST_READ_SERIALIZERS=True):
+                    compiled = view(factory.get('/api/client/predictions/', params)).render().content
+                self.assertEqual(compiled, expected)
+
+
+class ScheduledPublicationTests(TestCase):
+    """Planificateur de publication (wari.publication) appliqué aux pronostics."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Mali', code='MLI')
+        game_type = GameType.objects.create(name='Pmu')
+        cls.game = Game.objects.create(name='Quarté Bamako', country=country, game_type=game_type)
+        cls.author = CustomUser.objects.create_user(username='awa')
+
+    def schedule(self, author, publish_in, description='Favori : le numéro 7'):
+        return Prediction.objects.create(game=self.game, author=author, description=description,
+                                         publish_at=timezone.now() + publish_in)
+
+    def test_due_prediction_published(self):
+        prediction = self.schedule(self.author, timedelta(minutes=-1))
+        published, _ = flip_due(Prediction)
+        self.assertEqual(published, [prediction.pk])
+        prediction.refresh_from_db()
+        self.assertTrue(prediction.is_published)
+        self.assertIsNone(prediction.publish_at)
+
+    def test_prediction_without_author_not_published(self):
+        prediction = self.schedule(CustomUser.objects.create_user(username='ancien'), timedelta(minutes=-1))
+        CustomUser.objects.filter(username='ancien').delete()  # Auteur remis à NULL (SET_NULL)
+        before = Prediction.objects.get(pk=prediction.pk).updated_at
+        now = timezone.now()
+        self.assertEqual(flip_due(Prediction, now), ([], []))
+        prediction.refresh_from_db()
+        self.assertFalse(prediction.is_published)
+        self.assertIsNone(prediction.publish_at)  # Échéance abandonnée : pas de réveil en boucle
+        self.assertEqual(prediction.updated_at, now)
+        self.assertGreater(prediction.updated_at, before)
+
+    def test_notify_only_on_window_change(self):
+        prediction = self.schedule(self.author, timedelta(hours=1))
+
+        def notified():
+            return any('pg_notify' in query['sql'] for query in queries.captured_queries)
+
+        with CaptureQueriesContext(connection) as queries:
+            prediction.description = 'Favori : le numéro 9'
+            prediction.save()
+        self.assertFalse(notified())
+        with CaptureQueriesContext(connection) as queries:
+            prediction.publish_at += timedelta(minutes=30)
+            prediction.save()
+        self.assertTrue(notified())
+
+
+class AdminPublishTests(TestCase):
+    """Action d'administration « Publier » : un événement outbox par pronostic basculé."""
+
+    def test_bulk_publish_writes_events(self):
+        country = Country.objects.create(name='Mali', code='MLI')
+        game = Game.objects.create(name='Quarté Bamako', country=country, game_type=GameType.objects.create(name='Pmu'))
+        author = CustomUser.objects.create_user(username='awa')
+        draft = Prediction.objects.create(game=game, author=author, description='Favori : le numéro 7')
+        Prediction.objects.create(game=game, author=author, description='Déjà publié', is_published=True)
+        OutboxEvent.objects.all().delete()
+
+        admin = PredictionAdmin(Prediction, site)
+        with mock.patch.object(admin, 'message_user'):
+            admin.publish(APIRequestFactory().post('/admin/'), Prediction.objects.all())
+
+        events = OutboxEvent.objects.filter(event_type=PREDICTION_PUBLISHED)
+        self.assertEqual(list(events.values_list('aggregate_id', flat=True)), [draft.pk])
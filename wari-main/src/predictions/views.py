@@ -3,14 +3,17 @@ from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly, BasePermission
 from rest_framework.filters import SearchFilter
 from rest_framework import serializers
 import logging
 
+from games.filters import ReferenceFilterBackend
 from .models import Prediction
-from .serializers import PredictionSerializer
+from .serializers import PredictionSerializer, prediction_reader
+from wari.async_views import AsyncClientReadOnlyView
+from wari.log import ExceptionLoggingMixin
+from wari.readers import CompiledListMixin
 
 # Configuration du logger pour le suivi des événements
 logger = logging.getLogger(__name__)
@@ -25,26 +28,22 @@ class StandardPagination(PageNumberPagination):
 
 
 # 2. Base ViewSet pour factorisation
-class BasePredictionViewSet(viewsets.ModelViewSet):
+class BasePredictionViewSet(ExceptionLoggingMixin, viewsets.ModelViewSet):
     """
     ViewSet de base pour les pronostics :
     - Factorise pagination, filtres et gestion des erreurs
-    - Optimisé avec select_related pour 'game' et 'author', et only() pour limiter les champs
+    - Optimisé avec select_related pour 'author', et only() pour limiter les champs ; le jeu
+      (slug, nom) et les filtres par slug sont résolus par le cache de référence
     - Permission par défaut : lecture seule pour tous, écriture authentifiée
     """
-    queryset = Prediction.objects.all().select_related('game', 'author').only(
-        'id', 'game', 'author', 'is_published', 'predicted_at'
+    queryset = Prediction.objects.all().select_related('author').only(
+        'id', 'game', 'author', 'is_published', 'predicted_at', 'picks'
     )
     serializer_class = PredictionSerializer
     pagination_class = StandardPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [ReferenceFilterBackend, SearchFilter]
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-    def handle_exception(self, exc):
-        """Surcharge pour logger les erreurs inattendues avec contexte."""
-        logger.error(f"Erreur dans {self.__class__.__name__}: {str(exc)}", exc_info=True)
-        return super().handle_exception(exc)
-
 
 # 3. Permission personnalisée pour admins et éditeurs
 class IsAdminOrEditor(BasePermission):
@@ -71,7 +70,7 @@ class PredictionViewSet(BasePredictionViewSet):
             raise serializers.ValidationError("Authentification requise pour créer un pronostic.")
         with transaction.atomic():
             instance = serializer.save(author=self.request.user)
-            logger.info(f"Pronostic créé pour '{instance.game.name}' par {self.request.user.username}")
+            logger.info("Pronostic créé pour '%s' par %s", instance.game.name, self.request.user.username)
             return instance
 
     def perform_update(self, serializer):
@@ -81,7 +80,7 @@ class PredictionViewSet(BasePredictionViewSet):
             raise serializers.ValidationError("Seul l'auteur ou un admin peut modifier ce pronostic.")
         with transaction.atomic():
             updated_instance = serializer.save()
-            logger.info(f"Pronostic mis à jour pour '{updated_instance.game.name}' par {self.request.user.username}")
+            logger.info("Pronostic mis à jour pour '%s' par %s", updated_instance.game.name, self.request.user.username)
             return updated_instance
 
     def destroy(self, request, *args, **kwargs):
@@ -93,30 +92,37 @@ class PredictionViewSet(BasePredictionViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
         with transaction.atomic():
-            logger.info(f"Pronostic supprimé pour '{instance.game.name}' par {request.user.username}")
+            logger.info("Pronostic supprimé pour '%s' par %s", instance.game.name, request.user.username)
             return super().destroy(request, *args, **kwargs)
 
 
 # 5. Vue pour les clients (lecture seule)
-class ClientPredictionViewSet(viewsets.ReadOnlyModelViewSet):
+class ClientPredictionViewSet(ExceptionLoggingMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """
     Affichage des pronostics publiés (lecture seule) :
-    - Restreint aux pronostics publiés (is_published=True)
+    - Restreint aux pronostics publiés (is_published=True) des jeux actifs (colonne recopiée, sans jointure)
     - Pagination et recherche activées
-    - Filtres : slug du jeu, date de prédiction
+    - Filtres : slug du jeu, pays, type de jeu, date de prédiction
     - Recherche : nom du jeu
+    - Liste sérialisée depuis des tuples (wari.readers)
     """
-    queryset = Prediction.objects.filter(is_published=True).select_related('game', 'author').only(
-        'id', 'game', 'author', 'predicted_at'
+    queryset = Prediction.objects.filter(is_published=True, game_active=True).select_related('author').only(
+        'id', 'game', 'author', 'predicted_at', 'picks'
     )
     serializer_class = PredictionSerializer
+    reader = prediction_reader
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-    filterset_fields = ['game__slug', 'predicted_at']
+    filter_backends = [ReferenceFilterBackend, SearchFilter]
+    filterset_fields = ['game__slug', 'game__country__slug', 'game__game_type__slug', 'predicted_at']
     search_fields = ['game__name']
 
-    def handle_exception(self, exc):
-        """Surcharge pour logger les erreurs inattendues dans la vue client."""
-        logger.error(f"Erreur dans ClientPredictionViewSet: {str(exc)}", exc_info=True)
-        return super().handle_exception(exc)
+
+# 6. Vue asynchrone pour les clients (ASGI)
+class AsyncClientPredictionView(AsyncClientReadOnlyView):
+    """
+    Équivalent asynchrone de ClientPredictionViewSet (pronostics publiés) :
+    - Mêmes filtres, recherche, pagination et sortie JSON que la vue synchrone
+    - Accès base de données via l'ORM asynchrone
+    """
+    viewset_class = ClientPredictionViewSet
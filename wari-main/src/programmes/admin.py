@@ -1,12 +1,17 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from django.db import transaction
 from django.utils import timezone
-from .models import Program
+from .models import Program, ProgramSchedule, ScheduleException
+from .recurrence import compile_schedules
+from bundles.build import invalidate_bundles
+from games.feed import invalidate_country_feeds
+from outbox.domain import PROGRAM_PUBLISHED, publish_transition
 
 @admin.register(Program)
 class ProgramAdmin(admin.ModelAdmin):
     """Interface pour gérer les programmes."""
-    list_display = ['game', 'event_date', 'is_published', 'created_at', 'days_until_event']
+    list_display = ['game', 'event_date', 'is_published', 'publish_at', 'unpublish_at', 'created_at', 'days_until_event']
     list_filter = ['is_published', 'event_date', 'game__country']
     search_fields = ['game__name', 'details']
     date_hierarchy = 'event_date'
@@ -22,12 +27,47 @@ class ProgramAdmin(admin.ModelAdmin):
 
     def publish(self, request, queryset):
         """Met à jour les programmes pour les publier."""
-        updated = queryset.update(is_published=True)
+        with transaction.atomic():
+            # update() n'émet pas post_save : événements écrits ici pour les seuls programmes basculés
+            ids = list(queryset.filter(is_published=False).values_list('id', flat=True))
+            updated = queryset.update(is_published=True, updated_at=timezone.now())
+            publish_transition(Program, PROGRAM_PUBLISHED, ids)
+        invalidate_country_feeds()
+        invalidate_bundles(queryset.values_list('game_id', flat=True))
         self.message_user(request, f"{updated} programmes sont maintenant publiés.")
     publish.short_description = _("Publier les programmes")
 
     def unpublish(self, request, queryset):
         """Met à jour les programmes pour les dépublier."""
-        updated = queryset.update(is_published=False)
+        updated = queryset.update(is_published=False, updated_at=timezone.now())
+        invalidate_country_feeds()
+        invalidate_bundles(queryset.values_list('game_id', flat=True))
         self.message_user(request, f"{updated} programmes sont maintenant dépubliés.")
     unpublish.short_description = _("Dépublier les programmes")
+
+
+class ScheduleExceptionInline(admin.TabularInline):
+    model = ScheduleException
+    extra = 1
+
+
+@admin.register(ProgramSchedule)
+class ProgramScheduleAdmin(admin.ModelAdmin):
+    """Interface pour gérer les récurrences de programmes (occurrences calculées, non enregistrées)."""
+    list_display = ['game', 'frequency', 'weekday_labels', 'draw_time', 'timezone', 'starts_on', 'ends_on', 'is_published', 'next_occurrence']
+    list_filter = ['is_published', 'frequency', 'game__country']
+    search_fields = ['game__name', 'details']
+    list_select_related = ['game', 'game__country']
+    list_per_page = 25
+    inlines = [ScheduleExceptionInline]
+
+    def weekday_labels(self, obj):
+        return ', '.join(obj.get_weekday_labels()) if obj.frequency == 'weekly' else '-'
+    weekday_labels.short_description = _('Jours')
+
+    def next_occurrence(self, obj):
+        """Prochaine occurrence (exceptions et programmes ponctuels déduits)."""
+        recurrence = compile_schedules([obj], timezone.now())[0]
+        occurrence = recurrence.next_occurrence(timezone.now())
+        return timezone.localtime(occurrence).strftime('%d/%m/%Y %H:%M') if occurrence else '-'
+    next_occurrence.short_description = _('Prochaine occurrence')
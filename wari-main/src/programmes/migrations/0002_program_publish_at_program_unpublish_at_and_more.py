@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:08
+
+from django.db import migrations, models
+
+
+def expire_at_event_date(apps, schema_editor):
+    # Les programmes existants expirent à la date de leur événement
+    Program = apps.get_model('programmes', 'Program')
+    Program.objects.filter(unpublish_at__isnull=True).update(unpublish_at=models.F('event_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0002_game_description_alter_country_code_and_more'),
+        ('programmes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='program',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, help_text='Date à laquelle le programme sera publié automatiquement', null=True, verbose_name='Publication programmée'),
+        ),
+        migrations.AddField(
+            model_name='program',
+            name='unpublish_at',
+            field=models.DateTimeField(blank=True, help_text='Date à laquelle le programme sera dépublié automatiquement (par défaut : date de l’événement)', null=True, verbose_name='Dépublication programmée'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(condition=models.Q(('is_published', False), ('publish_at__isnull', False)), fields=['publish_at'], name='program_publish_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='program',
+            index=models.Index(condition=models.Q(('is_published', True), ('unpublish_at__isnull', False)), fields=['unpublish_at'], name='program_unpublish_due_idx'),
+        ),
+        migrations.RunPython(expire_at_event_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:37
+
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY s'exécutent hors transaction
+    atomic = False
+
+    dependencies = [
+        ('programmes', '0002_program_publish_at_program_unpublish_at_and_more'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='program',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['event_date'], name='program_published_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='program',
+            name='programmes__event_d_27116a_idx',
+        ),
+        # (game, event_date) : doublon de la contrainte unique_program_per_game_date
+        RemoveIndexConcurrently(
+            model_name='program',
+            name='programmes__game_id_50c2b1_idx',
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:19
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY s'exécute hors transaction
+    atomic = False
+
+    dependencies = [
+        ('programmes', '0003_program_published_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='program',
+            index=models.Index(fields=['updated_at', 'id'], name='program_sync_idx'),
+        ),
+    ]
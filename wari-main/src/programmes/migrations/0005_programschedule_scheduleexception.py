@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:27
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0004_game_game_sync_idx'),
+        ('programmes', '0004_program_program_sync_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgramSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(choices=[('daily', 'Quotidienne'), ('weekly', 'Hebdomadaire')], default='daily', max_length=10, verbose_name='Fréquence')),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Tous les N jours (quotidienne) ou toutes les N semaines (hebdomadaire)', verbose_name='Intervalle')),
+                ('weekdays', django.contrib.postgres.fields.ArrayField(base_field=models.PositiveSmallIntegerField(choices=[(0, 'Lundi'), (1, 'Mardi'), (2, 'Mercredi'), (3, 'Jeudi'), (4, 'Vendredi'), (5, 'Samedi'), (6, 'Dimanche')]), blank=True, default=list, help_text='0 = lundi … 6 = dimanche (fréquence hebdomadaire)', size=None, verbose_name='Jours de la semaine')),
+                ('draw_time', models.TimeField(verbose_name='Heure du tirage')),
+                ('timezone', models.CharField(default='UTC', help_text='Fuseau de l’heure du tirage (ex. : Africa/Abidjan)', max_length=64, verbose_name='Fuseau horaire')),
+                ('starts_on', models.DateField(verbose_name='Premier jour')),
+                ('ends_on', models.DateField(blank=True, null=True, verbose_name='Dernier jour')),
+                ('details', models.TextField(blank=True, help_text='Détails repris par chaque occurrence', verbose_name='Détails')),
+                ('is_published', models.BooleanField(db_index=True, default=True, help_text='Les occurrences ne sont visibles que si la règle est publiée', verbose_name='Publiée')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour')),
+                ('game', models.ForeignKey(help_text='Le jeu dont les tirages suivent cette règle', on_delete=django.db.models.deletion.CASCADE, related_name='schedules', to='games.game', verbose_name='Jeu')),
+            ],
+            options={
+                'verbose_name': 'Récurrence de programme',
+                'verbose_name_plural': 'Récurrences de programme',
+                'ordering': ['game', 'draw_time'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduleException',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Date locale (fuseau de la récurrence)', verbose_name='Jour exclu')),
+                ('reason', models.CharField(blank=True, max_length=200, verbose_name='Motif')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exceptions', to='programmes.programschedule', verbose_name='Récurrence')),
+            ],
+            options={
+                'verbose_name': 'Exception de récurrence',
+                'verbose_name_plural': 'Exceptions de récurrence',
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('schedule', 'date'), name='unique_exception_per_schedule_date')],
+            },
+        ),
+    ]
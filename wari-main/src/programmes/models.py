@@ -1,7 +1,11 @@
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from games.models import Game
+from games.models import Country, Game, GameType
 
 class Program(models.Model):
     game = models.ForeignKey(
@@ -11,6 +15,28 @@ class Program(models.Model):
         verbose_name='Jeu',
         help_text='Le jeu auquel ce programme est associé'
     )
+    # Colonnes du jeu recopiées par trigger (games.denorm) : filtres sans jointure vers games_game
+    country = models.ForeignKey(
+        Country,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Pays du jeu'
+    )
+    game_type = models.ForeignKey(
+        GameType,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Type du jeu'
+    )
+    game_active = models.BooleanField(default=True, editable=False, verbose_name='Jeu actif')
     event_date = models.DateTimeField(
         db_index=True,
         verbose_name='Date de l’événement',
@@ -27,6 +53,18 @@ class Program(models.Model):
         verbose_name='Publié',
         help_text='Indique si le programme est visible publiquement'
     )
+    publish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Publication programmée',
+        help_text='Date à laquelle le programme sera publié automatiquement'
+    )
+    unpublish_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Dépublication programmée',
+        help_text='Date à laquelle le programme sera dépublié automatiquement (par défaut : date de l’événement)'
+    )
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Date de création',
@@ -46,8 +84,22 @@ class Program(models.Model):
             )
         ]
         indexes = [
-            models.Index(fields=['event_date', 'is_published']),
-            models.Index(fields=['game', 'event_date']),
+            # Requêtes client (programmes publiés, tri par date) : index partiel, sans colonnes INCLUDE
+            # qui empêcheraient la déduplication des dates d'événement répétées d'un jeu à l'autre ;
+            # le filtre par jeu s'appuie sur la contrainte unique (game, event_date)
+            models.Index(fields=['event_date'], condition=Q(is_published=True), name='program_published_idx'),
+            # Filtres client par pays ou type de jeu (colonnes recopiées, jeux actifs uniquement)
+            models.Index(fields=['country', 'event_date'], condition=Q(is_published=True, game_active=True),
+                         name='program_country_idx'),
+            models.Index(fields=['game_type', 'event_date'], condition=Q(is_published=True, game_active=True),
+                         name='program_game_type_idx'),
+            # Files d'échéances du planificateur de publication (seules les lignes en attente sont indexées)
+            models.Index(fields=['publish_at'], condition=Q(is_published=False, publish_at__isnull=False),
+                         name='program_publish_due_idx'),
+            models.Index(fields=['unpublish_at'], condition=Q(is_published=True, unpublish_at__isnull=False),
+                         name='program_unpublish_due_idx'),
+            # Synchronisation incrémentale (/api/client/sync/) : parcours par (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='program_sync_idx'),
         ]
         verbose_name = 'Programme'
         verbose_name_plural = 'Programmes'
@@ -60,9 +112,133 @@ class Program(models.Model):
     def clean(self):
         if self.event_date < timezone.now() and self.is_published:
             raise ValidationError("Un programme passé ne peut pas être publié.")
+        if self.publish_at and self.publish_at > self.event_date:
+            raise ValidationError("La publication programmée doit précéder la date de l’événement.")
+        if self.publish_at and self.unpublish_at and self.unpublish_at <= self.publish_at:
+            raise ValidationError("La dépublication programmée doit suivre la publication programmée.")
 
     def save(self, *args, **kwargs):
         if self.details:
             self.details = self.details.strip()
+        if self.unpublish_at is None and self.event_date:
+            # Un programme expire à la date de son événement, sauf échéance explicite
+            self.unpublish_at = self.event_date
         self.full_clean()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class ProgramSchedule(models.Model):
+    """
+    Règle de récurrence des tirages d'un jeu (ex. : tous les jours à 13:00, mercredi et samedi à 20:00).
+    Les occurrences ne sont pas enregistrées : elles sont calculées à la demande
+    (`programmes.recurrence`) et fusionnées avec les programmes ponctuels. Un programme
+    ponctuel à la date d'une occurrence la remplace (publié) ou l'annule (non publié).
+    """
+    FREQUENCY_CHOICES = (
+        ('daily', 'Quotidienne'),
+        ('weekly', 'Hebdomadaire'),
+    )
+    WEEKDAY_CHOICES = (
+        (0, 'Lundi'), (1, 'Mardi'), (2, 'Mercredi'), (3, 'Jeudi'), (4, 'Vendredi'), (5, 'Samedi'), (6, 'Dimanche'),
+    )
+
+    game = models.ForeignKey(
+        Game,
+        on_delete=models.CASCADE,
+        related_name='schedules',
+        verbose_name='Jeu',
+        help_text='Le jeu dont les tirages suivent cette règle'
+    )
+    frequency = models.CharField(
+        max_length=10,
+        choices=FREQUENCY_CHOICES,
+        default='daily',
+        verbose_name='Fréquence'
+    )
+    interval = models.PositiveSmallIntegerField(
+        default=1,
+        verbose_name='Intervalle',
+        help_text='Tous les N jours (quotidienne) ou toutes les N semaines (hebdomadaire)'
+    )
+    weekdays = ArrayField(
+        models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES),
+        default=list,
+        blank=True,
+        verbose_name='Jours de la semaine',
+        help_text='0 = lundi … 6 = dimanche (fréquence hebdomadaire)'
+    )
+    draw_time = models.TimeField(verbose_name='Heure du tirage')
+    timezone = models.CharField(
+        max_length=64,
+        default='UTC',
+        verbose_name='Fuseau horaire',
+        help_text='Fuseau de l’heure du tirage (ex. : Africa/Abidjan)'
+    )
+    starts_on = models.DateField(verbose_name='Premier jour')
+    ends_on = models.DateField(null=True, blank=True, verbose_name='Dernier jour')
+    details = models.TextField(
+        blank=True,
+        verbose_name='Détails',
+        help_text='Détails repris par chaque occurrence'
+    )
+    is_published = models.BooleanField(
+        default=True,
+        db_index=True,
+        verbose_name='Publiée',
+        help_text='Les occurrences ne sont visibles que si la règle est publiée'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Date de création', editable=False)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Dernière mise à jour', editable=False)
+
+    class Meta:
+        verbose_name = 'Récurrence de programme'
+        verbose_name_plural = 'Récurrences de programme'
+        ordering = ['game', 'draw_time']
+
+    def __str__(self):
+        days = ', '.join(self.get_weekday_labels()) if self.frequency == 'weekly' else 'tous les jours'
+        return f"{self.game} : {days} à {self.draw_time:%H:%M} ({self.timezone})"
+
+    def get_weekday_labels(self):
+        labels = dict(self.WEEKDAY_CHOICES)
+        return [labels[day] for day in sorted(self.weekdays)]
+
+    def clean(self):
+        if self.frequency == 'weekly' and not self.weekdays:
+            raise ValidationError("Une récurrence hebdomadaire doit préciser au moins un jour de la semaine.")
+        if self.interval < 1:
+            raise ValidationError("L'intervalle doit être au moins égal à 1.")
+        if self.ends_on and self.ends_on < self.starts_on:
+            raise ValidationError("Le dernier jour doit suivre le premier jour.")
+        try:
+            ZoneInfo(self.timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValidationError({'timezone': f"Fuseau horaire inconnu : {self.timezone}."})
+
+    def save(self, *args, **kwargs):
+        self.weekdays = sorted(set(self.weekdays))
+        self.full_clean()
+        super().save(*args, **kwargs)
+
+
+class ScheduleException(models.Model):
+    """Jour sans tirage pour une récurrence (jour férié, report) ; un report se saisit comme programme ponctuel."""
+    schedule = models.ForeignKey(
+        ProgramSchedule,
+        on_delete=models.CASCADE,
+        related_name='exceptions',
+        verbose_name='Récurrence'
+    )
+    date = models.DateField(verbose_name='Jour exclu', help_text='Date locale (fuseau de la récurrence)')
+    reason = models.CharField(max_length=200, blank=True, verbose_name='Motif')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'date'], name='unique_exception_per_schedule_date')
+        ]
+        verbose_name = 'Exception de récurrence'
+        verbose_name_plural = 'Exceptions de récurrence'
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.schedule} : pas de tirage le {self.date:%d/%m/%Y}"
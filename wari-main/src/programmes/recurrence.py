@@ -0,0 +1,260 @@
+"""
+Expansion paresseuse des récurrences de programmes (`ProgramSchedule`).
+
+Une règle quotidienne ou hebdomadaire est arithmétique : le rang d'une date dans la
+série, le nombre d'occurrences d'une fenêtre et l'occurrence suivante se calculent
+sans parcourir la série (au plus 7 jours examinés par jour de la semaine).
+Les exceptions (jours exclus) et les remplacements (programmes ponctuels à la date
+d'une occurrence) sont des listes triées consultées par recherche dichotomique :
+- Occurrence suivante : O(log n)
+- Comptage d'une fenêtre : O(log n), sans générer les occurrences
+- Parcours d'une fenêtre : générateur, une occurrence à la fois
+
+`ProgramTimeline` fusionne les programmes ponctuels (queryset trié) et les occurrences
+de plusieurs règles en une séquence paginable (Paginator de Django) sans matérialiser
+la série : seule la page demandée est produite.
+"""
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from zoneinfo import ZoneInfo
+
+from django.db.models import F
+
+from .models import Program
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def ceil_div(a, b):
+    return -(-a // b)
+
+
+class Recurrence:
+    """
+    Règle compilée d'une récurrence :
+    - `exdates` : jours exclus (dates locales)
+    - `overrides` : dates (UTC) remplacées ou annulées par un programme ponctuel
+    """
+
+    def __init__(self, schedule, exdates=(), overrides=()):
+        self.schedule = schedule
+        self.tz = ZoneInfo(schedule.timezone)
+        self.start = schedule.starts_on
+        self.end = schedule.ends_on
+        self.interval = schedule.interval
+        self.weekly = schedule.frequency == 'weekly'
+        self.weekdays = sorted(schedule.weekdays) if self.weekly else []
+        self.exdates = sorted(set(exdates))
+        self.overrides = sorted(set(overrides))
+
+    # Jours de la série
+
+    def local_date(self, moment):
+        return moment.astimezone(self.tz).date()
+
+    def at(self, day):
+        """Date du tirage (UTC) d'un jour local."""
+        return datetime.combine(day, self.schedule.draw_time, tzinfo=self.tz).astimezone(dt_timezone.utc)
+
+    def days_before(self, day):
+        """Nombre de jours de la série strictement antérieurs à `day` (hors exceptions)."""
+        if self.end is not None:
+            day = min(day, self.end + timedelta(days=1))
+        if day <= self.start:
+            return 0
+        if not self.weekly:
+            return ceil_div((day - self.start).days, self.interval)
+        first_week = week_start(self.start)
+        span = (day - first_week).days
+        total = 0
+        for weekday in self.weekdays:
+            weeks = max(ceil_div(span - weekday, 7), 0)  # Semaines k telles que first_week + 7k + weekday < day
+            total += ceil_div(weeks, self.interval)
+            if weekday < self.start.weekday() and weeks:
+                total -= 1  # Jour de la première semaine antérieur au premier jour
+        return total
+
+    def next_day(self, day):
+        """Premier jour de la série à partir de `day` (exceptions comprises), ou None."""
+        day = max(day, self.start)
+        if not self.weekly:
+            day += timedelta(days=(-(day - self.start).days) % self.interval)
+        else:
+            first_week = week_start(self.start)
+            for _ in range(7 * self.interval + 1):
+                if day.weekday() in self.weekdays and ((day - first_week).days // 7) % self.interval == 0:
+                    break
+                day += timedelta(days=1)
+        if self.end is not None and day > self.end:
+            return None
+        return day
+
+    # Occurrences (exceptions et remplacements déduits)
+
+    def rank(self, moment):
+        """Nombre de tirages de la série (hors exceptions) strictement antérieurs à `moment`."""
+        day = self.local_date(moment)
+        count = self.days_before(day)
+        if self.next_day(day) == day and self.at(day) < moment:
+            count += 1
+        return count
+
+    def count(self, start, end):
+        """Occurrences visibles dans [start, end), sans les générer."""
+        if end <= start:
+            return 0
+        raw = self.rank(end) - self.rank(start)
+        excluded = {
+            day for day in self.exdates[bisect_left(self.exdates, self.local_date(start)):
+                                        bisect_right(self.exdates, self.local_date(end))]
+            if self.next_day(day) == day and start <= self.at(day) < end
+        }
+        overridden = {
+            moment for moment in self.overrides[bisect_left(self.overrides, start):bisect_left(self.overrides, end)]
+            if self.is_raw_occurrence(moment) and self.local_date(moment) not in excluded
+        }
+        return raw - len(excluded) - len(overridden)
+
+    def is_raw_occurrence(self, moment):
+        day = self.local_date(moment)
+        return self.next_day(day) == day and self.at(day) == moment
+
+    def is_hidden(self, day, moment):
+        position = bisect_left(self.exdates, day)
+        if position < len(self.exdates) and self.exdates[position] == day:
+            return True
+        position = bisect_left(self.overrides, moment)
+        return position < len(self.overrides) and self.overrides[position] == moment
+
+    def occurrences(self, start, end=None):
+        """Générateur des occurrences visibles à partir de `start` (avant `end` si donné)."""
+        day = self.local_date(start)
+        while True:
+            day = self.next_day(day)
+            if day is None:
+                return
+            moment = self.at(day)
+            if end is not None and moment >= end:
+                return
+            if moment >= start and not self.is_hidden(day, moment):
+                yield moment
+            day += timedelta(days=1)
+
+    def next_occurrence(self, moment):
+        """Prochaine occurrence visible à partir de `moment`, ou None."""
+        return next(self.occurrences(moment), None)
+
+
+def compile_schedules(schedules, start=None, end=None):
+    """
+    Compile les règles avec leurs exceptions et les dates des programmes ponctuels du jeu
+    dans [start, end) (deux requêtes, quel que soit le nombre de règles).
+    """
+    from .models import ScheduleException
+
+    schedules = list(schedules)
+    exdates = {}
+    for schedule_id, day in ScheduleException.objects.filter(schedule__in=schedules).values_list('schedule_id', 'date'):
+        exdates.setdefault(schedule_id, []).append(day)
+    overrides = {}
+    programs = Program.objects.filter(game_id__in={schedule.game_id for schedule in schedules})
+    if start is not None:
+        programs = programs.filter(event_date__gte=start)
+    if end is not None:
+        programs = programs.filter(event_date__lt=end)
+    for game_id, event_date in programs.values_list('game_id', 'event_date'):
+        overrides.setdefault(game_id, []).append(event_date)
+    return [
+        Recurrence(schedule, exdates.get(schedule.id, ()), overrides.get(schedule.game_id, ()))
+        for schedule in schedules
+    ]
+
+
+def occurrence_program(recurrence, moment):
+    """Programme non enregistré représentant une occurrence (même sérialiseur que les programmes)."""
+    schedule = recurrence.schedule
+    program = Program(game_id=schedule.game_id, event_date=moment, details=schedule.details, is_published=True)
+    program.schedule_id = schedule.id
+    return program
+
+
+# Fusion paginable
+
+class ProgramTimeline:
+    """
+    Programmes ponctuels et occurrences des règles, triés par date :
+    - `count()` : comptage SQL des programmes + comptage arithmétique des occurrences
+    - Découpage (page) : fusion paresseuse des sources jusqu'à la fin de la page
+    Les occurrences sont bornées à [start, end) (la série peut être illimitée).
+    """
+
+    def __init__(self, queryset, recurrences, start, end):
+        self.queryset = queryset.order_by('event_date', 'id')
+        self.recurrences = recurrences
+        self.start = start
+        self.end = end
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.queryset.count() + sum(
+                recurrence.count(self.start, self.end) for recurrence in self.recurrences
+            )
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def stream(self, limit):
+        # Au plus `limit` programmes lus : une page n'en contient jamais davantage
+        sources = [iter(self.queryset[:limit])]
+        sources += [
+            (occurrence_program(recurrence, moment) for moment in recurrence.occurrences(self.start, self.end))
+            for recurrence in self.recurrences
+        ]
+        return heapq.merge(*sources, key=lambda program: program.event_date)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            stop = index.stop if index.stop is not None else self.count()
+            return list(islice(self.stream(stop), index.start or 0, stop))
+        return self[index:index + 1][0]
+
+
+def next_draws(game_ids, one_offs=None, moment=None):
+    """
+    Prochain tirage publié par jeu (programme ponctuel ou occurrence) : {game_id: Program}.
+    - `one_offs` : prochains programmes ponctuels déjà lus ({game_id: Program}), sinon lus ici
+    - Règles : occurrence suivante calculée, vérifiée contre exceptions et remplacements
+      (deux requêtes pour l'ensemble des jeux)
+    """
+    from django.utils import timezone
+    from games.feed import first_per_game
+    from .models import ProgramSchedule
+
+    moment = moment or timezone.now()
+    if one_offs is None:
+        one_offs = {
+            program.game_id: program
+            for program in first_per_game(
+                Program.objects.filter(game_id__in=game_ids, is_published=True, event_date__gte=moment),
+                F('event_date').asc(),
+            )
+        }
+    draws = dict(one_offs)
+    schedules = ProgramSchedule.objects.filter(game_id__in=game_ids, is_published=True)
+    for recurrence in compile_schedules(schedules, moment):
+        occurrence = recurrence.next_occurrence(moment)
+        current = draws.get(recurrence.schedule.game_id)
+        if occurrence is not None and (current is None or occurrence < current.event_date):
+            draws[recurrence.schedule.game_id] = occurrence_program(recurrence, occurrence)
+    return draws
+
+
+def next_draw(game, moment=None):
+    """Prochain tirage publié d'un jeu, ou None."""
+    return next_draws([game.id], moment=moment).get(game.id)
@@ -1,5 +1,8 @@
 from rest_framework import serializers
 from django.utils import timezone
+from games.refcache import reference_data
+from games.serializers import GameSlugField
+from wari.readers import CompiledReader, constant, game_name
 from .models import Program
 
 class ProgramSerializer(serializers.ModelSerializer):
@@ -9,15 +12,17 @@ class ProgramSerializer(serializers.ModelSerializer):
     - Valide les champs clés (event_date, details)
     - Champs en lecture seule protégés
     """
-    game = serializers.SlugRelatedField(
-        slug_field='slug',
+    game = GameSlugField(
         read_only=True,
         help_text="Slug du jeu associé au programme."
     )
+    schedule = serializers.SerializerMethodField(
+        help_text="Récurrence d'origine (occurrence calculée, sans `id`) ; null pour un programme ponctuel."
+    )
 
     class Meta:
         model = Program
-        fields = ['id', 'game', 'event_date', 'details', 'is_published', 'created_at']
+        fields = ['id', 'game', 'event_date', 'details', 'is_published', 'publish_at', 'unpublish_at', 'created_at', 'schedule']
         read_only_fields = ['created_at']
         extra_kwargs = {
             'event_date': {'required': True, 'help_text': "Date de l'événement (non passée)."},
@@ -25,6 +30,9 @@ class ProgramSerializer(serializers.ModelSerializer):
             'is_published': {'default': False, 'help_text': "Statut de publication du programme."},
         }
 
+    def get_schedule(self, obj):
+        return getattr(obj, 'schedule_id', None)
+
     def validate_event_date(self, value):
         """
         Valide la date de l'événement :
@@ -64,6 +72,15 @@ class ProgramSerializer(serializers.ModelSerializer):
         - Ajoute le nom du jeu en plus du slug pour les clients (optionnel)
         """
         representation = super().to_representation(instance)
-        if instance.game:
-            representation['game_name'] = instance.game.name  # Ajoute le nom du jeu
-        return representation
\ No newline at end of file
+        if instance.game_id:
+            # Ajoute le nom du jeu (cache de référence, sans jointure)
+            game = reference_data().games.get(instance.game_id)
+            representation['game_name'] = game.name if game else instance.game.name
+        return representation
+
+# Lecture compilée des listes client (wari.readers) : programmes ponctuels, sans `schedule`
+program_reader = CompiledReader(
+    ProgramSerializer,
+    overrides={'schedule': constant(None)},
+    extras={'game_name': (['game_id'], game_name)},
+)
@@ -1,3 +1,122 @@
-from django.test import TestCase
+import json
+from datetime import date, time, timedelta
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.test import RequestFactory
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from games import refcache
+from games.models import Country, GameType, Game
+from .models import Program, ProgramSchedule
+from .serializers import ProgramSerializer, program_reader
+from wari.publication import flip_due
+from .views import AsyncClientProgramView, ClientProgramViewSet
+
+
+class ProgramReaderGoldenTests(TestCase):
+    """Liste compilée (wari.readers) : JSON identique octet pour octet au sérialiseur DRF."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Bénin', code='BEN')
+        game_type = GameType.objects.create(name='Loto')
+        lotto = Game.objects.create(name='Loto Kadoo', country=country, game_type=game_type)
+        fortune = Game.objects.create(name='Fortune Été', country=country, game_type=game_type)
+        now = timezone.now().replace(microsecond=123456)
+        Program.objects.create(game=lotto, event_date=now + timedelta(days=1), details='Tirage de 13h — « spécial »',
+                               is_published=True)
+        Program.objects.create(game=lotto, event_date=now + timedelta(days=2), details='Tirage reporté au lendemain',
+                               is_published=True, unpublish_at=now + timedelta(days=3))
+        Program.objects.create(game=fortune, event_date=now + timedelta(hours=5), details='Tirage non publié',
+                               publish_at=now + timedelta(hours=1))
+
+    def assertGolden(self, queryset):
+        expected = JSONRenderer().render(ProgramSerializer(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(program_reader.serialize(program_reader.rows(queryset))), expected)
+
+    def test_serialize_matches_serializer(self):
+        self.assertGolden(Program.objects.all())
+
+    def test_client_list_matches_serializer(self):
+        view = ClientProgramViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        for params in ({}, {'game__slug': 'loto-kadoo-ben'}, {'page_size': 1, 'page': 2}):
+            with self.subTest(params=params):
+                with override_settings(FAST_READ_SERIALIZERS=False):
+                    expected = view(factory.get('/api/client/programs/', params)).render().content
+                with override_settings(FAST_READ_SERIALIZERS=True):
+                    compiled = view(factory.get('/api/client/programs/', params)).render().content
+                self.assertEqual(compiled, expected)
+
+
+class ClientProgramRecurrenceTests(TestCase):
+    """Occurrences des récurrences dans la liste client."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Mali', code='MLI')
+        game_type = GameType.objects.create(name='Pmu')
+        cls.game = Game.objects.create(name='Quarté Bamako', country=country, game_type=game_type)
+        Game.objects.create(name='Tiercé Bamako', country=country, game_type=game_type)
+        ProgramSchedule.objects.create(game=cls.game, draw_time=time(13, 0), starts_on=date(2020, 1, 1),
+                                       details='Tirage quotidien')
+
+    def setUp(self):
+        refcache._state.data = None  # Invalidation après COMMIT : jamais exécutée dans un TestCase
+
+    def list(self, params):
+        view = ClientProgramViewSet.as_view({'get': 'list'})
+        return view(APIRequestFactory().get('/api/client/programs/', params))
+
+    def test_event_date_formats(self):
+        # Date de l'événement nettoyée par le filtre, quel que soit le format accepté
+        for value in ('2026-10-20T13:00:00Z', '2026-10-20 13:00', '2026-10-20T14:00:00+01:00', '2026-10-20'):
+            with self.subTest(event_date=value):
+                self.assertEqual(self.list({'event_date': value}).status_code, 200)
+        self.assertEqual(self.list({'event_date': '2026-10-20T14:00:00+01:00'}).data['count'], 1)
+        self.assertEqual(self.list({'event_date': '20/10/2026 13:00'}).status_code, 400)
+
+    def test_async_list_matches_sync(self):
+        Program.objects.create(game=self.game, event_date=timezone.now() + timedelta(days=1, hours=1),
+                               details='Tirage spécial', is_published=True)
+        view = AsyncClientProgramView.as_view()
+        for params in ({}, {'game__slug': 'quarte-bamako-mli'}, {'page_size': 2, 'page': 2},
+                       {'game__slug': 'tierce-bamako-mli'}):
+            with self.subTest(params=params):
+                expected = json.loads(self.list(params).render().content)
+                # Même chemin que la vue synchrone : liens de pagination comparables
+                response = async_to_sync(view)(RequestFactory().get('/api/client/programs/', params))
+                self.assertEqual(json.loads(response.content), expected)
+                if params.get('game__slug') != 'tierce-bamako-mli':
+                    self.assertTrue(any(row.get('id') is None for row in expected['results']))  # Occurrences
+
+    def test_no_schedule_query_without_recurrence(self):
+        self.list({})  # Chargement de l'instantané de référence
+        with self.assertNumQueries(1):  # Comptage seul (aucun programme ponctuel)
+            self.list({'game__slug': 'tierce-bamako-mli'})
+
+
+class ScheduledPublicationTests(TestCase):
+    """Planificateur de publication (wari.publication) : un programme passé n'est pas publié."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Bénin', code='BEN')
+        game_type = GameType.objects.create(name='Loto')
+        cls.game = Game.objects.create(name='Loto Cotonou', country=country, game_type=game_type)
+
+    def test_past_program_not_published(self):
+        now = timezone.now()
+        past = Program.objects.create(game=self.game, event_date=now + timedelta(hours=1), details='Passé',
+                                      publish_at=now + timedelta(minutes=30), unpublish_at=now + timedelta(hours=3))
+        upcoming = Program.objects.create(game=self.game, event_date=now + timedelta(hours=5), details='À venir',
+                                          publish_at=now + timedelta(hours=1))
+
+        self.assertEqual(flip_due(Program, now + timedelta(hours=2)), ([upcoming.pk], []))
+        past.refresh_from_db()
+        self.assertFalse(past.is_published)
+        self.assertEqual((past.publish_at, past.unpublish_at), (None, None))  # Échéance abandonnée
+        self.assertTrue(Program.objects.get(pk=upcoming.pk).is_published)
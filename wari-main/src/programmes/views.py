@@ -1,15 +1,26 @@
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.shortcuts import render
 from django.db import transaction
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
 from rest_framework.filters import SearchFilter
 import logging
 
-from .models import Program
-from .serializers import ProgramSerializer
+from games.filters import ReferenceFilterBackend
+from games.models import Game
+from games.refcache import reference_data
+from .models import Program, ProgramSchedule
+from .recurrence import ProgramTimeline, compile_schedules
+from .serializers import ProgramSerializer, program_reader
+from wari.async_views import AsyncClientReadOnlyView
+from wari.log import ExceptionLoggingMixin
+from wari.readers import CompiledListMixin
 
 # Configuration du logger pour le suivi des événements
 logger = logging.getLogger(__name__)
@@ -26,21 +37,16 @@ class StandardPagination(PageNumberPagination):
 
 # 2. Base ViewSet pour factorisation
 
-class BaseProgramViewSet(viewsets.ModelViewSet):
+class BaseProgramViewSet(ExceptionLoggingMixin, viewsets.ModelViewSet):
     """
     ViewSet de base pour les programmes :
     - Factorise pagination, filtres et gestion des erreurs
-    - Optimisé avec select_related pour les relations
+    - Jeu (slug, nom) et filtres par slug résolus par le cache de référence, sans jointure
     """
-    queryset = Program.objects.all().select_related('game', 'game__country')
+    queryset = Program.objects.all()
     serializer_class = ProgramSerializer
     pagination_class = StandardPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-
-    def handle_exception(self, exc):
-        """Surcharge pour logger les erreurs inattendues."""
-        logger.error(f"Erreur dans {self.__class__.__name__}: {str(exc)}", exc_info=True)
-        return super().handle_exception(exc)
+    filter_backends = [ReferenceFilterBackend, SearchFilter]
 
 # 3. Vue pour les administrateurs
 
@@ -63,7 +69,7 @@ class ProgramViewSet(BaseProgramViewSet):
         """
         with transaction.atomic():
             instance = serializer.save(creator=self.request.user if self.request.user.is_authenticated else None)
-            logger.info(f"Programme '{instance.name}' créé par {self.request.user if self.request.user.is_authenticated else 'anonyme'}")
+            logger.info("Programme '%s' créé par %s", instance.name, self.request.user.username if self.request.user.is_authenticated else 'anonyme')
             return instance
 
     def perform_update(self, serializer):
@@ -73,7 +79,7 @@ class ProgramViewSet(BaseProgramViewSet):
         """
         with transaction.atomic():
             instance = serializer.save()
-            logger.info(f"Programme '{instance.name}' mis à jour par {self.request.user}")
+            logger.info("Programme '%s' mis à jour par %s", instance.name, self.request.user.username)
             return instance
 
     def destroy(self, request, *args, **kwargs):
@@ -84,29 +90,95 @@ class ProgramViewSet(BaseProgramViewSet):
         """
         instance = self.get_object()
         with transaction.atomic():
-            logger.info(f"Programme '{instance.name}' supprimé par {request.user}")
+            logger.info("Programme '%s' supprimé par %s", instance.name, request.user.username)
             return super().destroy(request, *args, **kwargs)
 
 
 # 4. Vue pour les clients
-class ClientProgramViewSet(viewsets.ReadOnlyModelViewSet):
+class ClientProgramViewSet(ExceptionLoggingMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """
     Affichage des programmes publiés (lecture seule pour les clients).
-    - N'affiche que les programmes publiés (is_published=True)
+    - N'affiche que les programmes publiés (is_published=True) des jeux actifs (colonne recopiée, sans jointure)
+    - Liste : occurrences des récurrences publiées fusionnées par date (sans `id`)
     - Pagination et recherche activées
-    - Filtres sur jeu, pays et date d'événement
+    - Filtres sur jeu, pays, type de jeu et date d'événement
     """
-    queryset = Program.objects.filter(is_published=True).select_related('game', 'game__country')
+    queryset = Program.objects.filter(is_published=True, game_active=True)
     serializer_class = ProgramSerializer
+    reader = program_reader
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-    filterset_fields = ['game__slug', 'game__country__slug', 'event_date']
+    filter_backends = [ReferenceFilterBackend, SearchFilter]
+    filterset_fields = ['game__slug', 'game__country__slug', 'game__game_type__slug', 'event_date']
     search_fields = ['name']  # Recherche sur le nom du programme
 
-    def handle_exception(self, exc):
-        """Surcharge pour logger les erreurs inattendues dans la vue client."""
-        logger.error(f"Erreur dans ClientProgramViewSet: {str(exc)}", exc_info=True)
-        return super().handle_exception(exc)
-
-
+    def list(self, request, *args, **kwargs):
+        """
+        Liste paginée des programmes publiés et des occurrences des récurrences :
+        - Occurrences de maintenant à PROGRAM_SCHEDULE_HORIZON_DAYS, calculées à la demande
+        - Comptage arithmétique et page produite par fusion : la série n'est jamais matérialisée
+        - Sans récurrence dans la fenêtre : liste sérialisée depuis des tuples (wari.readers)
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        recurrences, start, end = self.get_recurrences(queryset)
+        if not recurrences and settings.FAST_READ_SERIALIZERS:
+            return self.compiled_list(queryset)
+        page = self.paginate_queryset(ProgramTimeline(queryset, recurrences, start, end) if recurrences else queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def get_recurrences(self, queryset):
+        """
+        Récurrences publiées répondant aux filtres de la requête, et fenêtre des occurrences.
+        - Aucune requête si aucun jeu filtré n'a de récurrence publiée (cache de référence)
+        """
+        params = self.request.query_params
+        if params.get('search'):
+            return [], None, None  # Recherche textuelle : programmes ponctuels seulement
+        start = timezone.now()
+        end = start + timedelta(days=settings.PROGRAM_SCHEDULE_HORIZON_DAYS)
+        filterset = ReferenceFilterBackend().get_filterset(self.request, queryset, self)
+        event_date = filterset.form.cleaned_data.get('event_date') if filterset.is_valid() else None
+        if event_date:
+            # Date exacte, telle que nettoyée par le filtre (tous formats acceptés) : seule l'occurrence à cette date
+            start = timezone.make_aware(event_date) if timezone.is_naive(event_date) else event_date
+            end = start + timedelta(microseconds=1)
+        # Jeux actifs avec récurrence, lus dans le cache de référence : pas de jointure vers games_game
+        data = reference_data()
+        game_ids = {game.id for game in data.games.values() if game.is_active} & data.scheduled_games
+        for param in ('game__slug', 'game__country__slug', 'game__game_type__slug'):
+            if params.get(param):
+                lookup = param.partition('__')[2]
+                game_ids &= set(data.resolve(Game, lookup, params[param]))
+        if not game_ids:
+            return [], start, end
+        # Tri explicite : l'ordre par défaut (game) suivrait celui de Game, avec jointure
+        schedules = ProgramSchedule.objects.filter(is_published=True, game_id__in=game_ids).order_by('id')
+        return compile_schedules(schedules, start, end), start, end
+
+
+# 5. Vue asynchrone pour les clients (ASGI)
+class AsyncClientProgramView(AsyncClientReadOnlyView):
+    """
+    Équivalent asynchrone de ClientProgramViewSet (programmes publiés) :
+    - Mêmes filtres, recherche, pagination et sortie JSON que la vue synchrone
+    - Accès base de données via l'ORM asynchrone
+    - Occurrences des récurrences : même fusion que la vue synchrone (ProgramTimeline,
+      synchrone, exécutée dans un thread) ; sans récurrence, liste entièrement asynchrone
+    """
+    viewset_class = ClientProgramViewSet
+
+    async def list(self, request):
+        viewset = self.get_viewset(request, 'list')
+        queryset = viewset.filter_queryset(self.get_queryset(viewset))
+        recurrences, start, end = await sync_to_async(viewset.get_recurrences)(queryset)
+        if not recurrences:
+            return await super().list(request)
+        return await sync_to_async(self.timeline_list)(viewset, ProgramTimeline(queryset, recurrences, start, end))
+
+    def timeline_list(self, viewset, timeline):
+        """Page fusionnée programmes + occurrences, comme `ClientProgramViewSet.list`."""
+        page = viewset.paginate_queryset(timeline)
+        if page is None:
+            return self.serialize(viewset, list(timeline))
+        return viewset.get_paginated_response(self.serialize(viewset, page)).data
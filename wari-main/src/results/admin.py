@@ -1,6 +1,11 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
+from django.db import transaction
+from django.utils import timezone
 from .models import Result
+from games.feed import invalidate_country_feeds
+from bundles.build import invalidate_bundles
+from outbox.domain import RESULT_OFFICIAL, publish_transition
 
 @admin.register(Result)
 class ResultAdmin(admin.ModelAdmin):
@@ -21,12 +26,20 @@ class ResultAdmin(admin.ModelAdmin):
     def mark_official(self, request, queryset):
         """Met à jour les résultats comme officiels avec l'utilisateur actuel."""
         user = request.user if request.user.is_authenticated else None
-        updated = queryset.update(status='official', validated_by=user)
+        with transaction.atomic():
+            # update() n'émet pas post_save : événements écrits ici pour les seuls résultats basculés
+            ids = list(queryset.exclude(status='official').values_list('id', flat=True))
+            updated = queryset.update(status='official', validated_by=user, updated_at=timezone.now())
+            publish_transition(Result, RESULT_OFFICIAL, ids)
+        invalidate_country_feeds()
+        invalidate_bundles(queryset.values_list('game_id', flat=True))
         self.message_user(request, f"{updated} résultats sont maintenant officiels.")
     mark_official.short_description = _("Marquer comme officiel")
 
     def mark_pending(self, request, queryset):
         """Met à jour les résultats comme en attente et supprime le validateur."""
-        updated = queryset.update(status='pending', validated_by=None)
+        updated = queryset.update(status='pending', validated_by=None, updated_at=timezone.now())
+        invalidate_country_feeds()
+        invalidate_bundles(queryset.values_list('game_id', flat=True))
         self.message_user(request, f"{updated} résultats sont maintenant en attente.")
     mark_pending.short_description = _("Marquer comme en attente")
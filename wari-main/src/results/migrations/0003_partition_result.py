@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def partition_results(apps, schema_editor):
+    """Conversion en ligne de results_result en table partitionnée par mois (PostgreSQL uniquement)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from wari.partitioning import convert_to_partitioned
+    convert_to_partitioned('results_result', 'result_date', using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY et VALIDATE CONSTRAINT s'exécutent hors transaction
+    atomic = False
+
+    dependencies = [
+        ('results', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_results, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:37
+
+from django.db import migrations, models
+
+from wari.partitioning import AddIndexConcurrentlyPartitioned, RemoveIndexConcurrentlyPartitioned
+
+
+class Migration(migrations.Migration):
+    # Index construits partition par partition avec CREATE INDEX CONCURRENTLY, hors transaction
+    atomic = False
+
+    dependencies = [
+        ('results', '0003_partition_result'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyPartitioned(
+            model_name='result',
+            index=models.Index(condition=models.Q(('status__in', ['official', 'disputed'])), fields=['result_date'], include=('game', 'validated_by'), name='result_public_idx'),
+        ),
+        RemoveIndexConcurrentlyPartitioned(
+            model_name='result',
+            name='resultats_r_result__204821_idx',
+        ),
+        # (game, result_date) : doublon de la contrainte unique_result_per_game_date
+        RemoveIndexConcurrentlyPartitioned(
+            model_name='result',
+            name='resultats_r_game_id_f9f67a_idx',
+        ),
+        # (status, validated_by) : jamais utilisé, le statut a son propre index
+        RemoveIndexConcurrentlyPartitioned(
+            model_name='result',
+            name='resultats_r_status_be6901_idx',
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:19
+
+from django.db import migrations, models
+
+from wari.partitioning import AddIndexConcurrentlyPartitioned
+
+
+class Migration(migrations.Migration):
+    # Index construits partition par partition avec CREATE INDEX CONCURRENTLY, hors transaction
+    atomic = False
+
+    dependencies = [
+        ('results', '0004_result_public_idx'),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyPartitioned(
+            model_name='result',
+            index=models.Index(fields=['updated_at', 'id'], name='result_sync_idx'),
+        ),
+    ]
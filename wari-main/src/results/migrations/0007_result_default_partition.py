@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+def create_default_partition(apps, schema_editor):
+    """Partition DEFAULT de results_result : les écritures hors partitions mensuelles n'échouent plus (PostgreSQL uniquement)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from wari.partitioning import ensure_default_partition, is_partitioned
+    if is_partitioned('results_result', using=schema_editor.connection.alias):
+        ensure_default_partition('results_result', using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('results', '0006_result_country_result_game_active_result_game_type_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_default_partition, migrations.RunPython.noop),
+    ]
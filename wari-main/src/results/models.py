@@ -1,8 +1,12 @@
 from django.db import models
+from django.db.models import Q
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from users.models import CustomUser
-from games.models import Game
+from games.models import Country, Game, GameType
+
+# Statuts visibles des clients (les résultats en attente restent internes)
+PUBLIC_STATUSES = ['official', 'disputed']
 
 class Result(models.Model):
     STATUS_CHOICES = (
@@ -18,6 +22,28 @@ class Result(models.Model):
         verbose_name='Jeu',
         help_text='Le jeu auquel ce résultat est associé'
     )
+    # Colonnes du jeu recopiées par trigger (games.denorm) : filtres sans jointure vers games_game
+    country = models.ForeignKey(
+        Country,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Pays du jeu'
+    )
+    game_type = models.ForeignKey(
+        GameType,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        db_index=False,
+        null=True,
+        editable=False,
+        related_name='+',
+        verbose_name='Type du jeu'
+    )
+    game_active = models.BooleanField(default=True, editable=False, verbose_name='Jeu actif')
     result_date = models.DateTimeField(
         db_index=True,
         verbose_name='Date du résultat',
@@ -70,9 +96,17 @@ class Result(models.Model):
             )
         ]
         indexes = [
-            models.Index(fields=['result_date', 'status']),
-            models.Index(fields=['game', 'result_date']),
-            models.Index(fields=['status', 'validated_by']),
+            # Requêtes client (statuts publics, tri par date) : index partiel, lignes en attente exclues ;
+            # le filtre par jeu s'appuie sur la contrainte unique (game, result_date)
+            models.Index(fields=['result_date'], include=['game', 'validated_by'],
+                         condition=Q(status__in=PUBLIC_STATUSES), name='result_public_idx'),
+            # Filtres client par pays ou type de jeu (colonnes recopiées, jeux actifs uniquement)
+            models.Index(fields=['country', 'result_date'], condition=Q(status__in=PUBLIC_STATUSES, game_active=True),
+                         name='result_country_idx'),
+            models.Index(fields=['game_type', 'result_date'], condition=Q(status__in=PUBLIC_STATUSES, game_active=True),
+                         name='result_game_type_idx'),
+            # Synchronisation incrémentale (/api/client/sync/) : parcours par (updated_at, id)
+            models.Index(fields=['updated_at', 'id'], name='result_sync_idx'),
         ]
         verbose_name = 'Résultat'
         verbose_name_plural = 'Résultats'
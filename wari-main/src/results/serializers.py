@@ -1,9 +1,11 @@
 from rest_framework import serializers
+from games.serializers import GameSlugField
+from wari.readers import CompiledReader
 from .models import Result
 
 class ResultSerializer(serializers.ModelSerializer):
     """Sérialiseur pour les résultats, inclut les relations avec jeu et validateur."""
-    game = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    game = GameSlugField(read_only=True)
     validated_by = serializers.SlugRelatedField(slug_field='username', read_only=True)
 
     class Meta:
@@ -21,4 +23,7 @@ class ResultSerializer(serializers.ModelSerializer):
         """Vérifie que le champ outcome n'est pas vide."""
         if not value.strip():
             raise serializers.ValidationError("Le résultat ne peut pas être vide.")
-        return value
\ No newline at end of file
+        return value
+
+# Lecture compilée des listes client (wari.readers)
+result_reader = CompiledReader(ResultSerializer)
@@ -1,3 +1,92 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from games.models import Country, GameType, Game
+from users.models import CustomUser
+from wari.partitioning import (
+    add_months, archive_partitions, default_partition, ensure_partitions, list_partitions, month_start,
+)
+from .models import Result
+from .serializers import ResultSerializer, result_reader
+from .views import ClientResultViewSet
+
+
+class ResultReaderGoldenTests(TestCase):
+    """Liste compilée (wari.readers) : JSON identique octet pour octet au sérialiseur DRF."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Togo', code='TGO')
+        game_type = GameType.objects.create(name='Loto')
+        game = Game.objects.create(name='Lotto Togo', country=country, game_type=game_type)
+        admin = CustomUser.objects.create_user(username='validateur', password='secret')
+        now = timezone.now().replace(microsecond=654321)
+        Result.objects.create(game=game, result_date=now - timedelta(days=1), outcome='12-45-67-08-90',
+                              outcome_details={'numbers': [12, 45, 67, 8, 90], 'bonus': None}, status='official',
+                              validated_by=admin)
+        Result.objects.create(game=game, result_date=now - timedelta(days=2), outcome='Contesté — à vérifier',
+                              status='disputed')
+        Result.objects.create(game=game, result_date=now - timedelta(days=3), outcome='',
+                              outcome_details={'gagnant': 'Equipe A', 'score': '2-1'})
+
+    def assertGolden(self, queryset):
+        expected = JSONRenderer().render(ResultSerializer(queryset, many=True).data)
+        self.assertEqual(JSONRenderer().render(result_reader.serialize(result_reader.rows(queryset))), expected)
+
+    def test_serialize_matches_serializer(self):
+        self.assertGolden(Result.objects.select_related('validated_by'))
+
+    def test_client_list_matches_serializer(self):
+        view = ClientResultViewSet.as_view({'get': 'list'})
+        factory = APIRequestFactory()
+        for params in ({}, {'status': 'disputed'}, {'game__country__slug': 'togo'}, {'page_size': 1, 'page': 2}):
+            with self.subTest(params=params):
+                with override_settings(FAST_READ_SERIALIZERS=False):
+                    expected = view(factory.get('/api/client/results/', params)).render().content
+                with override_settings(FAST_READ_SERIALIZERS=True):
+                    compiled = view(factory.get('/api/client/results/', params)).render().content
+                self.assertEqual(compiled, expected)
+
+
+class PartitionArchiveTests(TestCase):
+    """Archivage des partitions de results_result, partition DEFAULT présente."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Togo', code='TGO')
+        game_type = GameType.objects.create(name='Loto')
+        cls.game = Game.objects.create(name='Lotto Togo', country=country, game_type=game_type)
+
+    def test_archive_month_with_default_partition(self):
+        self.assertIsNotNone(default_partition('results_result'))
+        month = add_months(month_start(timezone.now()), 1)
+        ensure_partitions('results_result', months_ahead=1)
+        # bulk_create : sans full_clean (date future refusée par save)
+        Result.objects.bulk_create([Result(game=self.game, result_date=month + timedelta(days=3), outcome='01-02-03')])
+        later = add_months(month, 3)  # Rétention d'un mois : le mois créé est hors rétention
+
+        archived = archive_partitions('results_result', 1, now=later)
+
+        name = f"results_result_p{month:%Y_%m}"
+        self.assertIn(name, archived)
+        self.assertNotIn(name, [partition for partition, *_ in list_partitions('results_result')])
+        self.assertEqual(Result.objects.filter(result_date__gte=month).count(), 0)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM archive.{name}")
+            self.assertEqual(cursor.fetchone()[0], 1)
+        self.assertIsNotNone(default_partition('results_result'))
+
+    def test_archive_legacy_rows_by_month(self):
+        old = add_months(month_start(timezone.now()), -30)
+        Result.objects.create(game=self.game, result_date=old + timedelta(days=2), outcome='04-05-06')
+        Result.objects.create(game=self.game, result_date=add_months(old, 2), outcome='07-08-09')
+
+        archived = archive_partitions('results_result', 24)
+
+        self.assertEqual(archived, [f"results_result_p{old:%Y_%m}", f"results_result_p{add_months(old, 2):%Y_%m}"])
+        self.assertFalse(Result.objects.filter(result_date__lt=add_months(old, 3)).exists())
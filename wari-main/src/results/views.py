@@ -3,13 +3,16 @@ from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAdminUser, IsAuthenticatedOrReadOnly
 from rest_framework.filters import SearchFilter
 import logging
 
-from .models import Result
-from .serializers import ResultSerializer
+from games.filters import ReferenceFilterBackend
+from .models import PUBLIC_STATUSES, Result
+from .serializers import ResultSerializer, result_reader
+from wari.async_views import AsyncClientReadOnlyView
+from wari.log import ExceptionLoggingMixin
+from wari.readers import CompiledListMixin
 
 # Configuration du logger pour le suivi des événements
 logger = logging.getLogger(__name__)
@@ -25,23 +28,19 @@ class StandardPagination(PageNumberPagination):
 
 # 2. Base ViewSet pour factorisation
 
-class BaseResultViewSet(viewsets.ModelViewSet):
+class BaseResultViewSet(ExceptionLoggingMixin, viewsets.ModelViewSet):
     """
     ViewSet de base pour les résultats :
     - Factorise pagination, filtres et gestion des erreurs
-    - Optimisé avec select_related pour 'game' et 'validated_by', et prefetch_related pour 'game__country'
+    - Optimisé avec select_related pour 'validated_by' ; le jeu (slug, nom) et les filtres par slug
+      sont résolus par le cache de référence, sans jointure vers games_game
     """
-    queryset = Result.objects.all().select_related('game', 'validated_by').prefetch_related('game__country')
+    queryset = Result.objects.all().select_related('validated_by')
     serializer_class = ResultSerializer
     pagination_class = StandardPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [ReferenceFilterBackend, SearchFilter]
     permission_classes = [IsAuthenticatedOrReadOnly]  # Par défaut, lecture seule
 
-    def handle_exception(self, exc):
-        """Surcharge pour logger les erreurs inattendues."""
-        logger.error(f"Erreur dans {self.__class__.__name__}: {str(exc)}", exc_info=True)
-        return super().handle_exception(exc)
-
 # 3. Vue pour les administrateurs
 class ResultViewSet(BaseResultViewSet):
     """
@@ -64,7 +63,7 @@ class ResultViewSet(BaseResultViewSet):
             status_value = serializer.validated_data.get('status')
             validated_by = self.request.user if status_value == 'official' and self.request.user.is_authenticated else None
             instance = serializer.save(validated_by=validated_by)
-            logger.info(f"Résultat créé pour '{instance.game.name}' (status: {status_value}) par {self.request.user.username}")
+            logger.info("Résultat créé pour '%s' (status: %s) par %s", instance.game.name, status_value, self.request.user.username)
             return instance
 
     def perform_update(self, serializer):
@@ -77,10 +76,10 @@ class ResultViewSet(BaseResultViewSet):
             status_value = serializer.validated_data.get('status')
             if status_value == 'official' and self.request.user.is_authenticated:
                 instance = serializer.save(validated_by=self.request.user)
-                logger.info(f"Résultat officialisé pour '{instance.game.name}' par {self.request.user.username}")
+                logger.info("Résultat officialisé pour '%s' par %s", instance.game.name, self.request.user.username)
             else:
                 instance = serializer.save()
-                logger.info(f"Résultat mis à jour pour '{instance.game.name}' par {self.request.user.username}")
+                logger.info("Résultat mis à jour pour '%s' par %s", instance.game.name, self.request.user.username)
             return instance
 
     def destroy(self, request, *args, **kwargs):
@@ -91,30 +90,36 @@ class ResultViewSet(BaseResultViewSet):
         """
         instance = self.get_object()
         with transaction.atomic():
-            logger.info(f"Résultat supprimé pour '{instance.game.name}' par {request.user.username}")
+            logger.info("Résultat supprimé pour '%s' par %s", instance.game.name, request.user.username)
             return super().destroy(request, *args, **kwargs)
 
 
 # 4. Vue pour les clients (lecture seule)
 
-class ClientResultViewSet(viewsets.ReadOnlyModelViewSet):
+class ClientResultViewSet(ExceptionLoggingMixin, CompiledListMixin, viewsets.ReadOnlyModelViewSet):
     """
     Affichage des résultats officiels ou contestés (lecture seule) :
-    - Restreint à status='official' ou 'disputed'
+    - Restreint à status='official' ou 'disputed', jeux actifs (colonne recopiée, sans jointure)
     - Pagination et recherche activées
-    - Filtres : slug du jeu, statut, date de résultat
+    - Filtres : slug du jeu, pays, type de jeu, statut, date de résultat
     - Recherche : nom du jeu
+    - Liste sérialisée depuis des tuples (wari.readers)
     """
-    queryset = Result.objects.filter(status__in=['official', 'disputed']).select_related('game', 'validated_by').prefetch_related('game__country')
+    queryset = Result.objects.filter(status__in=PUBLIC_STATUSES, game_active=True).select_related('validated_by')
     serializer_class = ResultSerializer
+    reader = result_reader
     permission_classes = [IsAuthenticatedOrReadOnly]
     pagination_class = StandardPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
-    filterset_fields = ['game__slug', 'status', 'result_date']
+    filter_backends = [ReferenceFilterBackend, SearchFilter]
+    filterset_fields = ['game__slug', 'game__country__slug', 'game__game_type__slug', 'status', 'result_date']
     search_fields = ['game__name']  # Recherche sur le nom du jeu
 
-    def handle_exception(self, exc):
-        """Surcharge pour logger les erreurs inattendues dans la vue client."""
-        logger.error(f"Erreur dans ClientResultViewSet: {str(exc)}", exc_info=True)
-        return super().handle_exception(exc)
 
+# 5. Vue asynchrone pour les clients (ASGI)
+class AsyncClientResultView(AsyncClientReadOnlyView):
+    """
+    Équivalent asynchrone de ClientResultViewSet (résultats officiels ou contestés) :
+    - Mêmes filtres, recherche, pagination et sortie JSON que la vue synchrone
+    - Accès base de données via l'ORM asynchrone
+    """
+    viewset_class = ClientResultViewSet
@@ -0,0 +1,123 @@
+import json
+
+from django.contrib import admin
+from django.utils.html import format_html, format_html_join
+
+from .models import SlowQuery, SlowQuerySample
+
+
+class SlowQuerySampleInline(admin.TabularInline):
+    model = SlowQuerySample
+    fields = ['captured_at', 'duration_ms', 'origin', 'request_id', 'findings_display']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = True
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Constats')
+    def findings_display(self, obj):
+        return findings_list(obj.findings)
+
+
+def findings_list(findings):
+    if not findings:
+        return '-'
+    return format_html('<ul>{}</ul>', format_html_join('', '<li>{}</li>', ((f['hint'],) for f in findings)))
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    """Requêtes lentes par empreinte : occurrences, percentiles, origines et index manquants probables."""
+    list_display = ['fingerprint_short', 'kind', 'calls', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms_display',
+                    'top_origin', 'has_findings', 'last_seen']
+    list_filter = ['kind', 'database']
+    search_fields = ['statement', 'fingerprint']
+    date_hierarchy = 'last_seen'
+    list_per_page = 50
+    fields = ['fingerprint', 'kind', 'database', 'statement', 'calls', 'mean_ms_display', 'p50_ms', 'p95_ms',
+              'p99_ms', 'max_ms_display', 'origins_display', 'findings_display', 'first_seen', 'last_seen']
+    readonly_fields = fields
+    inlines = [SlowQuerySampleInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Empreinte', ordering='fingerprint')
+    def fingerprint_short(self, obj):
+        return obj.fingerprint[:12]
+
+    @admin.display(description='Moyenne (ms)')
+    def mean_ms_display(self, obj):
+        return round(obj.mean_ms, 1) if obj.mean_ms is not None else None
+
+    @admin.display(description='p50 (ms)')
+    def p50_ms(self, obj):
+        return round(obj.percentile(0.50), 1) if obj.durations else None
+
+    @admin.display(description='p95 (ms)')
+    def p95_ms(self, obj):
+        return round(obj.percentile(0.95), 1) if obj.durations else None
+
+    @admin.display(description='p99 (ms)')
+    def p99_ms(self, obj):
+        return round(obj.percentile(0.99), 1) if obj.durations else None
+
+    @admin.display(description='Max (ms)', ordering='max_ms')
+    def max_ms_display(self, obj):
+        return round(obj.max_ms, 1)
+
+    @admin.display(description='Origine principale')
+    def top_origin(self, obj):
+        return max(obj.origins, key=obj.origins.get) if obj.origins else '-'
+
+    @admin.display(description='Constats', boolean=True)
+    def has_findings(self, obj):
+        return bool(obj.findings)
+
+    @admin.display(description='Origines')
+    def origins_display(self, obj):
+        origins = sorted(obj.origins.items(), key=lambda item: -item[1])
+        return format_html('<ul>{}</ul>', format_html_join('', '<li>{} : {}</li>', origins)) if origins else '-'
+
+    @admin.display(description='Constats du dernier plan')
+    def findings_display(self, obj):
+        return findings_list(obj.findings)
+
+
+@admin.register(SlowQuerySample)
+class SlowQuerySampleAdmin(admin.ModelAdmin):
+    """Occurrences relevées, avec le plan EXPLAIN (ANALYZE, BUFFERS) des occurrences échantillonnées."""
+    list_display = ['captured_at', 'query', 'duration_ms', 'origin', 'has_plan']
+    list_filter = ['query__kind']
+    search_fields = ['origin', 'request_id', 'sql']
+    date_hierarchy = 'captured_at'
+    list_select_related = ['query']
+    fields = ['query', 'captured_at', 'duration_ms', 'origin', 'request_id', 'sql', 'params', 'findings_display',
+              'plan_display', 'plan_error']
+    readonly_fields = fields
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Plan', boolean=True)
+    def has_plan(self, obj):
+        return obj.plan is not None
+
+    @admin.display(description='Constats')
+    def findings_display(self, obj):
+        return findings_list(obj.findings)
+
+    @admin.display(description='Plan (EXPLAIN ANALYZE)')
+    def plan_display(self, obj):
+        if obj.plan is None:
+            return '-'
+        return format_html('<pre>{}</pre>', json.dumps(obj.plan, indent=2, ensure_ascii=False))
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class SlowQueriesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'slowqueries'
+    verbose_name = 'Requêtes SQL lentes'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .capture import install_wrapper
+        # Chronométrage de chaque requête SQL, sur toute connexion ouverte par le processus
+        connection_created.connect(install_wrapper, dispatch_uid='slowqueries-install-wrapper')
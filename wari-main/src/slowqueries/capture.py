@@ -0,0 +1,387 @@
+"""
+Relevé des requêtes SQL lentes en production.
+
+- `slow_query_wrapper` : execute_wrapper installé sur chaque connexion (signal
+  connection_created) ; chronomètre chaque requête et ne fait, au-delà du seuil
+  SLOW_QUERY_THRESHOLD_MS, qu'un ajout dans une file bornée (file pleine : perdu et compté)
+- `SlowQueryOriginMiddleware` : origine des requêtes SQL d'une requête HTTP, soit
+  vue, action et filtres utilisés (ex. `results.views.ResultViewSet.list?game__slug&status`)
+- `SlowQueryCollector` : thread dédié qui normalise le SQL (empreinte), réexécute un
+  échantillon des SELECT avec `EXPLAIN (ANALYZE, BUFFERS)` sur SLOW_QUERY_EXPLAIN_DATABASE
+  ou dans une transaction annulée, et agrège par empreinte (SlowQuery, SlowQuerySample) ;
+  jamais les SELECT verrouillants (FOR UPDATE / SHARE), qui reprendraient les verrous de ligne
+
+Constats tirés des plans : parcours séquentiels sélectifs (index manquant probable
+pour le filtre), index suivis d'un filtre éliminant la plupart des lignes (index ne
+couvrant pas la combinaison de filtres), tris sur disque.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from typing import NamedTuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from wari.log import request_id_var
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+origin_var = ContextVar('slow_query_origin', default='')
+# Requêtes du collecteur lui-même : jamais relevées
+_suspended = ContextVar('slow_query_suspended', default=False)
+
+
+# 1. Empreinte du SQL
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+_LOCKING = re.compile(r"\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b", re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    """SQL sans valeurs : littéraux et paramètres -> ?, listes IN et VALUES de taille variable réduites."""
+    sql = _STRING.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _VALUES_LIST.sub('VALUES (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(statement):
+    return hashlib.sha1(statement.encode()).hexdigest()
+
+
+def statement_kind(statement):
+    return statement.split(' ', 1)[0].upper()[:10]
+
+
+def is_locking(statement):
+    """SELECT ... FOR UPDATE / NO KEY UPDATE / SHARE / KEY SHARE (littéraux déjà retirés par normalize_sql)."""
+    return bool(_LOCKING.search(statement))
+
+
+# 2. Origine des requêtes SQL
+
+def view_origin(request, view_func):
+    """Vue, action et filtres de la requête HTTP (seuls les noms des paramètres, pas leurs valeurs)."""
+    view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    if view_class is None:
+        return f"{view_func.__module__}.{getattr(view_func, '__name__', type(view_func).__name__)}"
+    actions = getattr(view_func, 'actions', None) or {}
+    method = request.method.lower()
+    origin = f"{view_class.__module__}.{view_class.__name__}.{actions.get(method, method)}"
+    known = set(getattr(view_class, 'filterset_fields', None) or ())
+    if getattr(view_class, 'search_fields', None):
+        known.add(settings.REST_FRAMEWORK.get('SEARCH_PARAM', 'search'))
+    used = sorted(key for key in request.GET if key in known)
+    return f"{origin}?{'&'.join(used)}" if used else origin
+
+
+class SlowQueryOriginMiddleware:
+    """Associe aux requêtes SQL d'une requête HTTP la vue qui les exécute (compatible WSGI et ASGI)."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = origin_var.set(f"{request.method} {request.path}")
+        try:
+            return self.get_response(request)
+        finally:
+            origin_var.reset(token)
+
+    async def __acall__(self, request):
+        token = origin_var.set(f"{request.method} {request.path}")
+        try:
+            return await self.get_response(request)
+        finally:
+            origin_var.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        origin_var.set(view_origin(request, view_func))
+
+
+# 3. Chronométrage
+
+class SlowQueryEvent(NamedTuple):
+    alias: str
+    sql: str
+    params: tuple  # None : requête exécutée sans paramètres (pas de substitution de %)
+    many: bool
+    duration_ms: float
+    origin: str
+    request_id: str
+    at: object
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS and not _suspended.get():
+            collector.record(SlowQueryEvent(
+                context['connection'].alias, sql, None if many or params is None else tuple(params), many,
+                duration_ms, origin_var.get(), request_id_var.get() or '', timezone.now(),
+            ))
+
+
+def install_wrapper(sender, connection, **kwargs):
+    """Récepteur de connection_created : chronométrage des requêtes de la connexion."""
+    if settings.SLOW_QUERY_ENABLED and slow_query_wrapper not in connection.execute_wrappers:
+        # En tête (comme wari.traffic) : le pop() d'un execute_wrapper() temporaire ne le retire pas
+        connection.execute_wrappers.insert(0, slow_query_wrapper)
+
+
+# 4. Plans d'exécution
+
+def explain_alias(event):
+    return settings.SLOW_QUERY_EXPLAIN_DATABASE or event.alias
+
+
+def explain_analyze(event):
+    """
+    Plan `EXPLAIN (ANALYZE, BUFFERS)` d'une requête relevée : (plan, erreur).
+    - Sur SLOW_QUERY_EXPLAIN_DATABASE (réplica) si défini, sinon sur la base d'origine
+    - Toujours dans une transaction annulée, avec un délai maximal d'exécution
+    """
+    alias = explain_alias(event)
+    connection = connections[alias]
+    if connection.vendor != 'postgresql':
+        return None, "EXPLAIN ANALYZE n'est relevé que sur PostgreSQL."
+    try:
+        with transaction.atomic(using=alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}")
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {event.sql}", event.params)
+                value = cursor.fetchone()[0]
+            transaction.set_rollback(True, using=alias)
+    except DatabaseError as exc:
+        return None, str(exc).strip()
+    return (json.loads(value) if isinstance(value, str) else value)[0], ''
+
+
+def partition_parents(plan, alias):
+    """Parents des partitions et index de partition du plan (constats rapportés à la table partitionnée)."""
+    from wari.benchmark.plans import plan_nodes
+
+    names = sorted({
+        node[key] for node in plan_nodes(plan['Plan']) for key in ('Relation Name', 'Index Name') if key in node
+    })
+    if not names:
+        return {}
+    with connections[alias].cursor() as cursor:
+        cursor.execute("""
+            SELECT c.relname, p.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE c.relname = ANY(%s)
+        """, [names])
+        return dict(cursor.fetchall())
+
+
+def plan_findings(plan, parents=None):
+    """Constats d'un plan exécuté : index manquants probables et tris sur disque."""
+    from wari.benchmark.plans import SELECTIVE_SCAN, plan_nodes
+
+    parents = parents or {}
+    findings = []
+    for node in plan_nodes(plan['Plan']):
+        table = parents.get(node.get('Relation Name'), node.get('Relation Name'))
+        kept = node.get('Actual Rows', 0) * node.get('Actual Loops', 1)
+        removed = node.get('Rows Removed by Filter', 0) * node.get('Actual Loops', 1)
+        selective = removed and kept < (kept + removed) * SELECTIVE_SCAN
+        if node['Node Type'] == 'Seq Scan' and selective and kept + removed >= settings.SLOW_QUERY_SEQ_SCAN_ROWS:
+            findings.append({
+                'type': 'seq_scan', 'table': table, 'filter': node.get('Filter'), 'rows': kept, 'removed': removed,
+                'hint': f"Index manquant probable sur {table} pour le filtre {node.get('Filter')}",
+            })
+        elif 'Index Name' in node and selective and removed >= settings.SLOW_QUERY_SEQ_SCAN_ROWS:
+            index = parents.get(node['Index Name'], node['Index Name'])
+            findings.append({
+                'type': 'index_filter', 'table': table, 'index': index, 'filter': node.get('Filter'),
+                'rows': kept, 'removed': removed,
+                'hint': f"{index} ne couvre pas le filtre {node.get('Filter')} (index composite ou partiel à envisager)",
+            })
+        elif node['Node Type'] == 'Sort' and node.get('Sort Space Type') == 'Disk':
+            findings.append({
+                'type': 'sort_on_disk', 'sort_key': node.get('Sort Key'), 'space_kb': node.get('Sort Space Used'),
+                'hint': "Tri sur disque : index sur la clé de tri ou work_mem insuffisant",
+            })
+    return findings
+
+
+# 5. Collecte et agrégation
+
+def json_params(params):
+    """Paramètres sérialisables en JSON (valeurs non natives converties en texte)."""
+    def convert(value):
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [convert(item) for item in value]
+        return str(value)
+    return [convert(value) for value in params or ()]
+
+
+class SlowQueryCollector:
+    """
+    File des requêtes lentes vidée par un thread dédié (démarré au premier relevé),
+    toutes les SLOW_QUERY_FLUSH_INTERVAL secondes et à l'arrêt du processus.
+    """
+
+    def __init__(self):
+        self.queue = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.dropped = 0
+        self.last_explained = {}  # Empreinte -> dernier EXPLAIN (time.monotonic())
+
+    def record(self, event):
+        if self.thread is None:
+            self.start()
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self):
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.queue = queue.Queue(maxsize=settings.SLOW_QUERY_QUEUE_SIZE)
+            self.thread = threading.Thread(target=self.run, name='slow-query-collector', daemon=True)
+            self.thread.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        self.stopping.set()
+        if self.thread is not None and self.thread.is_alive():
+            self.thread.join(timeout=5)
+
+    def run(self):
+        while not self.stopping.is_set():
+            self.stopping.wait(settings.SLOW_QUERY_FLUSH_INTERVAL)
+            self.drain()
+
+    def drain(self):
+        token = _suspended.set(True)
+        try:
+            self.drain_queue()
+        finally:
+            _suspended.reset(token)
+
+    def drain_queue(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if not batch:
+            return
+        try:
+            self.flush(batch)
+        except Exception:
+            logger.exception("Échec de l'enregistrement de %s requêtes lentes", len(batch))
+        finally:
+            if threading.current_thread() is self.thread:
+                # Pas de connexion persistante hors requête (ni de base de test retenue)
+                for connection in connections.all(initialized_only=True):
+                    connection.close()
+        if self.dropped:
+            logger.warning("%s requêtes lentes perdues (file pleine)", self.dropped)
+            self.dropped = 0
+
+    def should_explain(self, key, statement, event):
+        if event.many or random.random() >= settings.SLOW_QUERY_EXPLAIN_RATE:
+            return False
+        if statement_kind(statement) not in ('SELECT', 'WITH') and not settings.SLOW_QUERY_EXPLAIN_WRITES:
+            return False
+        if is_locking(statement):
+            return False  # Verrous de ligne repris jusqu'au délai d'EXPLAIN, et refusés sur un réplica
+        now = time.monotonic()
+        if now - self.last_explained.get(key, float('-inf')) < settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+            return False
+        self.last_explained[key] = now
+        return True
+
+    def flush(self, batch):
+        grouped = {}
+        for event in batch:
+            statement = normalize_sql(event.sql)
+            grouped.setdefault(fingerprint(statement), (statement, []))[1].append(event)
+
+        # Plans relevés hors de la transaction d'écriture des agrégats
+        plans = {}
+        for key, (statement, events) in grouped.items():
+            for event in events:
+                if self.should_explain(key, statement, event):
+                    plan, error = explain_analyze(event)
+                    findings = plan_findings(plan, partition_parents(plan, explain_alias(event))) if plan else []
+                    plans[id(event)] = (plan, error, findings)
+
+        for key, (statement, events) in grouped.items():
+            try:
+                self.store(key, statement, events, plans)
+            except DatabaseError:
+                logger.exception("Échec de l'enregistrement de la requête lente %s", key[:12])
+
+    def store(self, key, statement, events, plans):
+        """Agrégat d'une empreinte et occurrences conservées (une transaction par empreinte)."""
+        from .models import SlowQuery, SlowQuerySample
+
+        with transaction.atomic():
+            query, _ = SlowQuery.objects.select_for_update().get_or_create(
+                fingerprint=key,
+                defaults={'statement': statement, 'kind': statement_kind(statement),
+                          'database': events[0].alias, 'last_seen': events[-1].at},
+            )
+            durations = [event.duration_ms for event in events]
+            query.calls += len(events)
+            query.total_ms += sum(durations)
+            query.max_ms = max(query.max_ms, *durations)
+            query.durations = (query.durations + durations)[-settings.SLOW_QUERY_DURATIONS_KEPT:]
+            for event in events:
+                query.origins[event.origin] = query.origins.get(event.origin, 0) + 1
+            query.last_seen = max(query.last_seen, *(event.at for event in events))
+            # Occurrences conservées : la plus lente du lot et celles dont le plan a été relevé
+            slowest = max(events, key=lambda event: event.duration_ms)
+            for event in [event for event in events if id(event) in plans or event is slowest]:
+                plan, error, findings = plans.get(id(event), (None, '', []))
+                if plan:
+                    query.findings = findings
+                SlowQuerySample.objects.create(
+                    query=query, sql=event.sql, params=json_params(event.params),
+                    duration_ms=event.duration_ms, origin=event.origin[:255], request_id=event.request_id,
+                    plan=plan, plan_error=error, findings=findings, captured_at=event.at,
+                )
+            query.save()
+            stale = query.samples.order_by('-captured_at').values_list('id', flat=True)[
+                settings.SLOW_QUERY_SAMPLES_KEPT:]
+            SlowQuerySample.objects.filter(id__in=list(stale)).delete()
+
+collector = SlowQueryCollector()
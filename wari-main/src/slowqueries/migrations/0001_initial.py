@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:45
+
+import django.contrib.postgres.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=40, unique=True, verbose_name='Empreinte')),
+                ('statement', models.TextField(verbose_name='SQL normalisé')),
+                ('kind', models.CharField(db_index=True, max_length=10, verbose_name='Type')),
+                ('database', models.CharField(default='default', max_length=50, verbose_name='Base')),
+                ('calls', models.BigIntegerField(default=0, verbose_name='Occurrences')),
+                ('total_ms', models.FloatField(default=0, verbose_name='Durée cumulée (ms)')),
+                ('max_ms', models.FloatField(default=0, verbose_name='Durée maximale (ms)')),
+                ('durations', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(), blank=True, default=list, size=None, verbose_name='Dernières durées (ms)')),
+                ('origins', models.JSONField(blank=True, default=dict, verbose_name='Origines')),
+                ('findings', models.JSONField(blank=True, default=list, verbose_name='Constats du dernier plan')),
+                ('first_seen', models.DateTimeField(auto_now_add=True, verbose_name='Première occurrence')),
+                ('last_seen', models.DateTimeField(db_index=True, verbose_name='Dernière occurrence')),
+            ],
+            options={
+                'verbose_name': 'Requête lente',
+                'verbose_name_plural': 'Requêtes lentes',
+                'ordering': ['-last_seen'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SlowQuerySample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sql', models.TextField(verbose_name='SQL')),
+                ('params', models.JSONField(blank=True, default=list, verbose_name='Paramètres')),
+                ('duration_ms', models.FloatField(verbose_name='Durée (ms)')),
+                ('origin', models.CharField(blank=True, max_length=255, verbose_name='Origine')),
+                ('request_id', models.CharField(blank=True, max_length=64, verbose_name='Identifiant de requête')),
+                ('plan', models.JSONField(blank=True, null=True, verbose_name='Plan (EXPLAIN ANALYZE)')),
+                ('plan_error', models.TextField(blank=True, verbose_name="Erreur d'EXPLAIN")),
+                ('findings', models.JSONField(blank=True, default=list, verbose_name='Constats')),
+                ('captured_at', models.DateTimeField(db_index=True, verbose_name='Relevée le')),
+                ('query', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='samples', to='slowqueries.slowquery', verbose_name='Requête')),
+            ],
+            options={
+                'verbose_name': 'Occurrence de requête lente',
+                'verbose_name_plural': 'Occurrences de requêtes lentes',
+                'ordering': ['-captured_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+
+from wari.httpbench import percentile
+
+
+class SlowQuery(models.Model):
+    """
+    Requêtes lentes agrégées par empreinte (SQL normalisé : littéraux et listes IN remplacés).
+    - `durations` : dernières durées relevées (millisecondes), base des percentiles
+    - `origins` : nombre d'occurrences par origine (vue, action et filtres de la requête HTTP)
+    """
+    fingerprint = models.CharField(max_length=40, unique=True, verbose_name='Empreinte')
+    statement = models.TextField(verbose_name='SQL normalisé')
+    kind = models.CharField(max_length=10, db_index=True, verbose_name='Type')
+    database = models.CharField(max_length=50, default='default', verbose_name='Base')
+    calls = models.BigIntegerField(default=0, verbose_name='Occurrences')
+    total_ms = models.FloatField(default=0, verbose_name='Durée cumulée (ms)')
+    max_ms = models.FloatField(default=0, verbose_name='Durée maximale (ms)')
+    durations = ArrayField(models.FloatField(), default=list, blank=True, verbose_name='Dernières durées (ms)')
+    origins = models.JSONField(default=dict, blank=True, verbose_name='Origines')
+    findings = models.JSONField(default=list, blank=True, verbose_name='Constats du dernier plan')
+    first_seen = models.DateTimeField(auto_now_add=True, verbose_name='Première occurrence')
+    last_seen = models.DateTimeField(db_index=True, verbose_name='Dernière occurrence')
+
+    class Meta:
+        verbose_name = 'Requête lente'
+        verbose_name_plural = 'Requêtes lentes'
+        ordering = ['-last_seen']
+
+    def __str__(self):
+        return f"{self.kind} {self.fingerprint[:12]} ({self.calls} occurrences)"
+
+    def percentile(self, fraction):
+        return percentile(sorted(self.durations), fraction)
+
+    @property
+    def mean_ms(self):
+        return self.total_ms / self.calls if self.calls else None
+
+
+class SlowQuerySample(models.Model):
+    """
+    Occurrence d'une requête lente, avec son plan `EXPLAIN (ANALYZE, BUFFERS)` pour
+    les occurrences échantillonnées (réexécutées sur un réplica ou dans une transaction annulée).
+    """
+    query = models.ForeignKey(SlowQuery, on_delete=models.CASCADE, related_name='samples', verbose_name='Requête')
+    sql = models.TextField(verbose_name='SQL')
+    params = models.JSONField(default=list, blank=True, verbose_name='Paramètres')
+    duration_ms = models.FloatField(verbose_name='Durée (ms)')
+    origin = models.CharField(max_length=255, blank=True, verbose_name='Origine')
+    request_id = models.CharField(max_length=64, blank=True, verbose_name='Identifiant de requête')
+    plan = models.JSONField(null=True, blank=True, verbose_name='Plan (EXPLAIN ANALYZE)')
+    plan_error = models.TextField(blank=True, verbose_name="Erreur d'EXPLAIN")
+    findings = models.JSONField(default=list, blank=True, verbose_name='Constats')
+    captured_at = models.DateTimeField(db_index=True, verbose_name='Relevée le')
+
+    class Meta:
+        verbose_name = 'Occurrence de requête lente'
+        verbose_name_plural = 'Occurrences de requêtes lentes'
+        ordering = ['-captured_at']
+
+    def __str__(self):
+        return f"{self.duration_ms:.1f} ms – {self.origin or 'hors requête'}"
@@ -0,0 +1,109 @@
+from datetime import datetime
+from unittest import mock
+
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from programmes.views import ClientProgramViewSet
+from .capture import (
+    SlowQueryCollector, SlowQueryEvent, fingerprint, install_wrapper, is_locking, normalize_sql, plan_findings,
+    slow_query_wrapper, view_origin,
+)
+
+
+class NormalizeSqlTests(SimpleTestCase):
+    """Empreinte : même requête quelles que soient les valeurs."""
+
+    def test_literals_and_params(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE name = 'l''été' AND id = 42 AND score > -1.5 AND slug = %s"),
+            "SELECT * FROM t WHERE name = ? AND id = ? AND score > ? AND slug = ?",
+        )
+
+    def test_identifiers_kept(self):
+        self.assertEqual(normalize_sql('SELECT "t"."col2" FROM t2 LIMIT 21'), 'SELECT "t"."col2" FROM t2 LIMIT ?')
+
+    def test_in_lists(self):
+        short = normalize_sql("SELECT id FROM t WHERE id IN (%s, %s)")
+        long = normalize_sql("SELECT id FROM t WHERE id IN (1, 2, 3,\n 4)")
+        self.assertEqual(short, "SELECT id FROM t WHERE id IN (...)")
+        self.assertEqual(fingerprint(short), fingerprint(long))
+
+    def test_values_lists(self):
+        self.assertEqual(
+            normalize_sql("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s) RETURNING id"),
+            normalize_sql("INSERT INTO t (a, b) VALUES ('x', 1) RETURNING id"),
+        )
+
+    def test_locking(self):
+        self.assertTrue(is_locking(normalize_sql("SELECT * FROM t WHERE id = 1 FOR UPDATE SKIP LOCKED")))
+        self.assertTrue(is_locking(normalize_sql("SELECT * FROM t FOR NO KEY UPDATE OF t")))
+        self.assertTrue(is_locking(normalize_sql("SELECT * FROM t FOR SHARE")))
+        self.assertFalse(is_locking(normalize_sql("SELECT * FROM t WHERE note = 'for update'")))
+
+
+@override_settings(SLOW_QUERY_EXPLAIN_RATE=1, SLOW_QUERY_EXPLAIN_INTERVAL=0, SLOW_QUERY_EXPLAIN_WRITES=False)
+class ShouldExplainTests(SimpleTestCase):
+
+    def event(self, sql):
+        return SlowQueryEvent('default', sql, (), False, 500.0, '', '', datetime(2026, 1, 1))
+
+    def test_reads_only(self):
+        collector = SlowQueryCollector()
+        for sql, expected in (
+            ("SELECT * FROM t WHERE id = ?", True),
+            ("WITH x AS (SELECT 1) SELECT * FROM x", True),
+            ("UPDATE t SET a = ?", False),
+            ("SELECT * FROM t WHERE id = ? FOR UPDATE", False),
+            ("SELECT * FROM t ORDER BY id FOR UPDATE SKIP LOCKED", False),
+        ):
+            with self.subTest(sql=sql):
+                self.assertEqual(collector.should_explain(fingerprint(sql), sql, self.event(sql)), expected)
+
+
+class PlanFindingsTests(SimpleTestCase):
+
+    @override_settings(SLOW_QUERY_SEQ_SCAN_ROWS=1000)
+    def test_findings(self):
+        plan = {'Plan': {
+            'Node Type': 'Sort', 'Sort Key': ['created_at'], 'Sort Space Type': 'Disk', 'Sort Space Used': 2048,
+            'Plans': [
+                {'Node Type': 'Seq Scan', 'Relation Name': 'results_result_p2026_10', 'Filter': '(status = 1)',
+                 'Actual Rows': 10, 'Actual Loops': 1, 'Rows Removed by Filter': 50000},
+                {'Node Type': 'Index Scan', 'Relation Name': 'games_game', 'Index Name': 'games_game_pkey',
+                 'Filter': '(is_active)', 'Actual Rows': 5, 'Actual Loops': 2, 'Rows Removed by Filter': 900},
+                {'Node Type': 'Seq Scan', 'Relation Name': 'games_country', 'Filter': '(code = ?)',
+                 'Actual Rows': 1, 'Actual Loops': 1, 'Rows Removed by Filter': 4},
+            ],
+        }}
+        findings = plan_findings(plan, {'results_result_p2026_10': 'results_result'})
+        self.assertEqual([finding['type'] for finding in findings], ['sort_on_disk', 'seq_scan', 'index_filter'])
+        self.assertEqual(findings[1]['table'], 'results_result')
+        self.assertEqual((findings[2]['rows'], findings[2]['removed']), (10, 1800))
+
+    def test_no_findings(self):
+        plan = {'Plan': {'Node Type': 'Index Only Scan', 'Relation Name': 't', 'Index Name': 't_pkey',
+                         'Actual Rows': 20, 'Actual Loops': 1}}
+        self.assertEqual(plan_findings(plan), [])
+
+
+class ViewOriginTests(SimpleTestCase):
+
+    def test_viewset_action_and_filters(self):
+        view = ClientProgramViewSet.as_view({'get': 'list'})
+        request = RequestFactory().get('/api/client/programs/', {'search': 'x', 'game__slug': 'y', 'page': 2})
+        self.assertEqual(view_origin(request, view), 'programmes.views.ClientProgramViewSet.list?game__slug&search')
+
+    def test_function_view(self):
+        def health(request):
+            pass
+        self.assertEqual(view_origin(RequestFactory().get('/'), health), f"{__name__}.health")
+
+
+class InstallWrapperTests(SimpleTestCase):
+    @override_settings(SLOW_QUERY_ENABLED=True)
+    def test_kept_after_temporary_wrapper(self):
+        with mock.patch.object(connection, 'execute_wrappers', []):
+            with connection.execute_wrapper(lambda execute, *args: execute(*args)):
+                install_wrapper(sender=None, connection=connection)
+            self.assertEqual(connection.execute_wrappers, [slow_query_wrapper])
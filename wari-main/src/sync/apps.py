@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sync'
+    verbose_name = 'Synchronisation des clients'
+
+    def ready(self):
+        from .streams import connect_tombstones
+        # Journal des suppressions : les clients hors ligne retirent les objets supprimés
+        connect_tombstones()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from sync.streams import purge_tombstones
+from sync.tasks import schedule_tombstone_purge
+
+
+class Command(BaseCommand):
+    """
+    Purge du journal des suppressions lu par la synchronisation des clients.
+
+    Exemples :
+        python manage.py purge_tombstones              # une passe immédiate
+        python manage.py purge_tombstones --schedule   # active la tâche quotidienne (runjobs)
+    """
+    help = "Supprime les traces de suppression plus anciennes que SYNC_TOMBSTONE_RETENTION_DAYS."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schedule', action='store_true',
+                            help="Met en file la tâche quotidienne au lieu d'exécuter une passe")
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            job = schedule_tombstone_purge()
+            self.stdout.write(f"Purge planifiée (tâche #{job.id}, {job.run_at.isoformat()}).")
+            return
+        self.stdout.write(f"{purge_tombstones()} traces de suppression purgées.")
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:19
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(help_text='Ex. : result', max_length=20, verbose_name="Type d'objet")),
+                ('object_id', models.BigIntegerField(verbose_name="Identifiant de l'objet")),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Date de suppression')),
+            ],
+            options={
+                'verbose_name': 'Suppression',
+                'verbose_name_plural': 'Suppressions',
+                'ordering': ['deleted_at', 'id'],
+                'indexes': [models.Index(fields=['deleted_at', 'id'], name='sync_tombstone_order_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Tombstone(models.Model):
+    """
+    Trace d'un objet supprimé, lue par la synchronisation incrémentale (`/api/client/sync/`).
+    Conservée SYNC_TOMBSTONE_RETENTION_DAYS jours : un curseur plus ancien impose une
+    resynchronisation complète.
+    """
+    kind = models.CharField(max_length=20, verbose_name="Type d'objet", help_text='Ex. : result')
+    object_id = models.BigIntegerField(verbose_name="Identifiant de l'objet")
+    deleted_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name='Date de suppression')
+
+    class Meta:
+        indexes = [
+            # Lecture de la synchronisation : parcours par (deleted_at, id) au-delà du curseur
+            models.Index(fields=['deleted_at', 'id'], name='sync_tombstone_order_idx'),
+        ]
+        verbose_name = 'Suppression'
+        verbose_name_plural = 'Suppressions'
+        ordering = ['deleted_at', 'id']
+
+    def __str__(self):
+        return f"{self.kind}#{self.object_id} supprimé le {self.deleted_at:%d/%m/%Y %H:%M}"
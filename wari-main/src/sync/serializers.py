@@ -0,0 +1,33 @@
+from rest_framework import serializers
+from games.models import Country, GameType
+from games.refcache import reference_data
+
+
+def reference_slug(model, references, object_id):
+    """Slug lu dans le cache des données de référence, requête seulement si l'objet n'y est pas encore."""
+    row = references.get(object_id)
+    if row is None:
+        return model.objects.filter(pk=object_id).values_list('slug', flat=True).first()
+    return row.slug
+
+
+class SyncGameSerializer(serializers.Serializer):
+    """
+    Jeu dans le flux de synchronisation : champs plats, pays et type de jeu par slug
+    (lus dans le cache des données de référence, sans jointure ni compteur).
+    """
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    slug = serializers.CharField()
+    description = serializers.CharField(allow_null=True)
+    country = serializers.SerializerMethodField()
+    game_type = serializers.SerializerMethodField()
+    is_active = serializers.BooleanField()
+    created_at = serializers.DateTimeField()
+    updated_at = serializers.DateTimeField()
+
+    def get_country(self, obj):
+        return reference_slug(Country, reference_data().countries, obj.country_id)
+
+    def get_game_type(self, obj):
+        return reference_slug(GameType, reference_data().game_types, obj.game_type_id)
@@ -0,0 +1,220 @@
+"""
+Synchronisation incrémentale des clients hors ligne (`/api/client/sync/`).
+
+Un seul flux de changements, trié par (date, type, id), couvre les jeux, programmes,
+résultats et pronostics :
+- `upsert` : objet créé ou modifié et visible des clients (données du sérialiseur client)
+- `delete` : objet supprimé (journal `Tombstone`), dépublié, désactivé ou remis en attente
+
+Curseur opaque (keyset) : position (date, type, id) du dernier changement livré. Chaque
+page lit au plus `limit + 1` lignes par modèle sur l'index (updated_at, id), puis fusionne.
+
+- Première synchronisation (sans curseur) : instantané ; les objets masqués et les
+  suppressions antérieures à son début sont omis, le client n'en a jamais eu copie
+- Horizon de lecture : `updated_at` est fixé avant le commit ; comme le dispatcher de
+  l'outbox (xmin de l'instantané), la lecture s'arrête avant le début de la plus ancienne
+  transaction d'écriture encore ouverte (xid attribué, pg_stat_activity), quelle que soit
+  sa durée : elle ne peut pas valider une ligne derrière le curseur d'un client (wari.horizon)
+- Fenêtre de stabilisation (SYNC_SETTLE_SECONDS) retranchée à l'horizon : écart d'horloge
+  entre serveurs d'application et base, et écritures préparées avant l'attribution du xid
+- Curseur antérieur à la rétention des suppressions : resynchronisation complète (410)
+"""
+import base64
+import heapq
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import APIException
+import logging
+
+from games.models import Game
+from predictions.models import Prediction
+from predictions.serializers import PredictionSerializer
+from programmes.models import Program
+from programmes.serializers import ProgramSerializer
+from results.models import PUBLIC_STATUSES, Result
+from results.serializers import ResultSerializer
+from wari.horizon import read_horizon
+from .models import Tombstone
+from .serializers import SyncGameSerializer
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+class SyncCursorExpired(APIException):
+    status_code = 410
+    default_detail = "Curseur de synchronisation expiré : resynchronisation complète nécessaire (sans `since`)."
+    default_code = 'sync_cursor_expired'
+
+
+# 1. Flux synchronisés
+
+@dataclass(frozen=True)
+class SyncStream:
+    kind: str  # Type exposé aux clients
+    model: type
+    visible: Q  # Objets visibles des clients (même règle que les vues client)
+    serializer_class: type  # Sérialiseur client
+    select_related: tuple = ()
+
+    def queryset(self):
+        queryset = self.model.objects.all()
+        # select_related() sans argument suivrait toutes les clés étrangères
+        return queryset.select_related(*self.select_related) if self.select_related else queryset
+
+
+STREAMS = [
+    SyncStream('game', Game, Q(is_active=True), SyncGameSerializer),
+    # Jeu désactivé : ses programmes, résultats et pronostics sont supprimés chez les clients
+    # (les triggers de games.denorm mettent à jour game_active et updated_at)
+    SyncStream('program', Program, Q(is_published=True, game_active=True), ProgramSerializer),
+    SyncStream('result', Result, Q(status__in=PUBLIC_STATUSES, game_active=True), ResultSerializer, ('validated_by',)),
+    SyncStream('prediction', Prediction, Q(is_published=True, game_active=True), PredictionSerializer, ('author',)),
+]
+# Rang des suppressions dans le tri (date, type, id) : après les flux de modèles
+TOMBSTONE_RANK = len(STREAMS)
+
+
+# 2. Curseur
+
+class Cursor(NamedTuple):
+    at: datetime
+    rank: int
+    id: int
+    snapshot: datetime | None  # Début de la synchronisation initiale (None une fois dépassé)
+
+    @classmethod
+    def initial(cls, horizon):
+        return cls(EPOCH, -1, 0, horizon)
+
+    def encode(self):
+        raw = [self.at.isoformat(), self.rank, self.id, self.snapshot.isoformat() if self.snapshot else None]
+        return base64.urlsafe_b64encode(json.dumps(raw, separators=(',', ':')).encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, token):
+        try:
+            at, rank, object_id, snapshot = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+            cursor = cls(datetime.fromisoformat(at), int(rank), int(object_id),
+                         datetime.fromisoformat(snapshot) if snapshot else None)
+            if cursor.at.tzinfo is None or (cursor.snapshot and cursor.snapshot.tzinfo is None):
+                raise ValueError(token)
+            return cursor
+        except (ValueError, TypeError):
+            raise serializers.ValidationError({'since': "Curseur de synchronisation invalide."})
+
+    def after(self, field, rank):
+        """Lignes d'un flux (rang `rank`) strictement après le curseur dans l'ordre (date, rang, id)."""
+        # La borne `>=` seule est utilisée comme condition d'index, le reste filtre les ex aequo
+        bound = Q(**{f'{field}__gte': self.at})
+        if rank > self.rank:
+            return bound
+        if rank < self.rank:
+            return Q(**{f'{field}__gt': self.at})
+        return bound & (Q(**{f'{field}__gt': self.at}) | Q(id__gt=self.id))
+
+
+# 3. Lecture d'une page
+
+def sync_horizon(now):
+    """Date au-delà de laquelle aucun changement n'est encore livré (transactions en cours)."""
+    return read_horizon(now, settings.SYNC_SETTLE_SECONDS)
+
+
+def read_stream(rank, stream, cursor, horizon, limit, context):
+    """Au plus `limit` changements d'un modèle après le curseur : [(clé de tri, entrée)]."""
+    queryset = (
+        stream.queryset()
+        .filter(cursor.after('updated_at', rank), updated_at__lte=horizon)
+        .annotate(sync_visible=ExpressionWrapper(stream.visible, output_field=BooleanField()))
+        .order_by('updated_at', 'id')
+    )
+    if cursor.snapshot:
+        queryset = queryset.filter(stream.visible | Q(updated_at__gt=cursor.snapshot))
+    rows = list(queryset[:limit])
+    data = iter(stream.serializer_class([row for row in rows if row.sync_visible], many=True, context=context).data)
+    changes = []
+    for row in rows:
+        entry = {'type': stream.kind, 'id': row.id, 'op': 'upsert' if row.sync_visible else 'delete',
+                 'updated_at': row.updated_at}
+        if row.sync_visible:
+            entry['data'] = next(data)
+        changes.append(((row.updated_at, rank, row.id), entry))
+    return changes
+
+
+def read_tombstones(cursor, horizon, limit):
+    queryset = Tombstone.objects.filter(cursor.after('deleted_at', TOMBSTONE_RANK), deleted_at__lte=horizon)
+    if cursor.snapshot:
+        queryset = queryset.filter(deleted_at__gt=cursor.snapshot)
+    return [
+        ((row.deleted_at, TOMBSTONE_RANK, row.id),
+         {'type': row.kind, 'id': row.object_id, 'op': 'delete', 'updated_at': row.deleted_at})
+        for row in queryset.order_by('deleted_at', 'id')[:limit]
+    ]
+
+
+def sync_page(since=None, limit=None, context=None):
+    """
+    Page de changements après le curseur `since` (None : synchronisation initiale).
+    Retourne {'changes', 'next', 'has_more'} ; `next` est à renvoyer tel quel au prochain appel.
+    """
+    limit = min(limit or settings.SYNC_PAGE_SIZE, settings.SYNC_MAX_PAGE_SIZE)
+    now = timezone.now()
+    horizon = sync_horizon(now)
+    cursor = Cursor.decode(since) if since else Cursor.initial(horizon)
+
+    # Suppressions à connaître depuis la position du client (ou depuis le début de l'instantané)
+    needed_from = max(cursor.at, cursor.snapshot) if cursor.snapshot else cursor.at
+    if needed_from < now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+        raise SyncCursorExpired()
+
+    streams = [read_stream(rank, stream, cursor, horizon, limit + 1, context or {})
+               for rank, stream in enumerate(STREAMS)]
+    streams.append(read_tombstones(cursor, horizon, limit + 1))
+    merged = list(heapq.merge(*streams, key=lambda change: change[0]))
+
+    page = merged[:limit]
+    if page:
+        at, rank, last_id = page[-1][0]
+        snapshot = cursor.snapshot if cursor.snapshot and cursor.snapshot >= at else None
+        cursor = Cursor(at, rank, last_id, snapshot)
+    return {
+        'changes': [entry for _, entry in page],
+        'next': cursor.encode(),
+        'has_more': len(merged) > limit,
+    }
+
+
+# 4. Journal des suppressions
+
+def record_tombstone(sender, instance, **kwargs):
+    """post_delete : trace la suppression (dans la transaction de la suppression, cascades comprises)."""
+    Tombstone.objects.create(kind=_kinds[sender], object_id=instance.pk)
+
+
+_kinds = {}
+
+
+def connect_tombstones():
+    for stream in STREAMS:
+        _kinds[stream.model] = stream.kind
+        post_delete.connect(record_tombstone, sender=stream.model, dispatch_uid=f'sync-tombstone-{stream.kind}')
+
+
+def purge_tombstones(retention=None):
+    """Supprime les traces plus anciennes que la rétention (les curseurs correspondants ont expiré)."""
+    retention = retention or timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=timezone.now() - retention).delete()
+    if deleted:
+        logger.info("%s traces de suppression purgées", deleted)
+    return deleted
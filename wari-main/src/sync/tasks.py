@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobs.registry import enqueue, task
+from .streams import purge_tombstones
+
+
+@task('sync.purge_tombstones', max_attempts=3)
+def purge_tombstones_daily():
+    """Se replanifie pour le lendemain (même en cas d'échec), puis purge le journal des suppressions."""
+    schedule_tombstone_purge(delay=timedelta(days=1))
+    purge_tombstones()
+
+
+def schedule_tombstone_purge(delay=None):
+    """Planifie la purge du journal des suppressions (une seule occurrence par jour d'exécution)."""
+    run_at = timezone.now() + (delay or timedelta())
+    return enqueue('sync.purge_tombstones', run_at=run_at, dedup_key=f"tombstones:{run_at:%Y-%m-%d}")
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+
+from games.models import Country, GameType, Game
+from predictions.models import Prediction
+from programmes.models import Program
+from users.models import CustomUser
+from .models import Tombstone
+from .streams import Cursor, SyncCursorExpired, sync_horizon, sync_page
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncPageTests(TestCase):
+    """Curseur (date, type, id), suppressions et instantané initial."""
+
+    @classmethod
+    def setUpTestData(cls):
+        country = Country.objects.create(name='Mali', code='MLI')
+        game_type = GameType.objects.create(name='Pmu')
+        cls.game = Game.objects.create(name='Quarté Bamako', country=country, game_type=game_type)
+        now = timezone.now()
+        cls.programs = [
+            Program.objects.create(game=cls.game, event_date=now + timedelta(days=day), details=f'Tirage {day}',
+                                   is_published=True)
+            for day in range(1, 4)
+        ]
+        cls.hidden = Program.objects.create(game=cls.game, event_date=now + timedelta(days=9), details='Brouillon')
+        author = CustomUser.objects.create_user(username='awa')
+        cls.prediction = Prediction.objects.create(game=cls.game, author=author, is_published=True,
+                                                   description='Le 7 gagnant')
+
+    def sync_all(self, since=None, limit=2):
+        changes = []
+        while True:
+            page = sync_page(since=since, limit=limit)
+            changes += page['changes']
+            since = page['next']
+            if not page['has_more']:
+                return changes, since
+
+    def keys(self, changes):
+        return [(change['type'], change['id'], change['op']) for change in changes]
+
+    def test_initial_sync_pages(self):
+        changes, _ = self.sync_all()
+        expected = {('game', self.game.id, 'upsert'), ('prediction', self.prediction.id, 'upsert')}
+        expected |= {('program', program.id, 'upsert') for program in self.programs}
+        self.assertEqual(len(changes), len(expected))  # Ni doublon ni perte entre les pages
+        self.assertEqual(set(self.keys(changes)), expected)
+        self.assertEqual(sorted(changes, key=lambda change: change['updated_at']), changes)
+
+    def test_changes_and_tombstones_after_cursor(self):
+        _, since = self.sync_all()
+        self.assertEqual(sync_page(since=since)['changes'], [])
+        self.programs[0].is_published = False
+        self.programs[0].save()
+        prediction_id = self.prediction.id
+        self.prediction.delete()
+        changes, since = self.sync_all(since)
+        self.assertEqual(self.keys(changes), [('program', self.programs[0].id, 'delete'),
+                                              ('prediction', prediction_id, 'delete')])
+        self.assertTrue(Tombstone.objects.filter(kind='prediction', object_id=prediction_id).exists())
+        self.assertEqual(sync_page(since=since)['changes'], [])
+
+    def test_initial_sync_omits_older_deletions(self):
+        Tombstone.objects.create(kind='program', object_id=999, deleted_at=timezone.now() - timedelta(hours=1))
+        changes, _ = self.sync_all()
+        self.assertNotIn(('program', 999, 'delete'), self.keys(changes))
+
+    def test_cursor_round_trip(self):
+        cursor = Cursor(timezone.now(), 2, 17, None)
+        self.assertEqual(Cursor.decode(cursor.encode()), cursor)
+        with self.assertRaises(serializers.ValidationError):
+            Cursor.decode('pas-un-curseur')
+
+    @override_settings(SYNC_TOMBSTONE_RETENTION_DAYS=30)
+    def test_expired_cursor(self):
+        since = Cursor(timezone.now() - timedelta(days=31), 0, 1, None).encode()
+        with self.assertRaises(SyncCursorExpired):
+            sync_page(since=since)
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncHorizonTests(TestCase):
+    """Horizon de lecture borné par la plus ancienne transaction d'écriture ouverte."""
+
+    def test_open_writer_holds_horizon(self):
+        now = timezone.now()
+        self.assertEqual(sync_horizon(now), now)  # Transaction du test : session courante, ignorée
+        writer = connections.create_connection('default')
+        try:
+            writer.set_autocommit(False)
+            with writer.cursor() as cursor:
+                cursor.execute("SELECT now(), pg_current_xact_id()")  # xid attribué : transaction d'écriture
+                started = cursor.fetchone()[0]
+            with connections['default'].cursor() as cursor:
+                # pg_stat_activity est figé pour la transaction (celle du test ; requêtes en autocommit sinon)
+                cursor.execute("SELECT pg_stat_clear_snapshot()")
+            self.assertEqual(sync_horizon(timezone.now() + timedelta(minutes=5)), started)
+        finally:
+            writer.rollback()
+            writer.close()
@@ -0,0 +1,32 @@
+from rest_framework import serializers
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from wari.log import ExceptionLoggingMixin
+from .streams import sync_page
+
+
+class SyncQuerySerializer(serializers.Serializer):
+    since = serializers.CharField(required=False, allow_blank=True)
+    limit = serializers.IntegerField(required=False, min_value=1)
+
+
+class SyncView(ExceptionLoggingMixin, APIView):
+    """
+    Synchronisation incrémentale des clients hors ligne :
+    - GET /api/client/sync/ : synchronisation initiale (objets visibles), page par page
+    - GET /api/client/sync/?since=<next> : changements et suppressions depuis le dernier appel
+    - Tant que `has_more` est vrai, rappeler immédiatement avec `next`
+    - 410 : curseur trop ancien, reprendre une synchronisation initiale
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request):
+        query = SyncQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        return Response(sync_page(
+            since=query.validated_data.get('since') or None,
+            limit=query.validated_data.get('limit'),
+            context={'request': request},
+        ))
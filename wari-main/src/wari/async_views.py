@@ -0,0 +1,106 @@
+from django.core.paginator import InvalidPage
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+import logging
+
+from games.refcache import areference_data
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+
+# 1. Vue asynchrone de base pour les clients
+
+class AsyncClientReadOnlyView(View):
+    """
+    Vue client en lecture seule servie nativement en asynchrone (ASGI) :
+    - Reprend la configuration du ViewSet client synchrone associé (queryset,
+      filtres, recherche, pagination, sérialiseur) pour garantir une sortie identique
+    - Les accès base de données passent par l'ORM asynchrone (acount, aiterator, afirst)
+    - Les sous-classes peuvent surcharger `prepare()` pour précharger des données
+      annexes sans requête synchrone pendant la sérialisation
+    """
+    viewset_class = None
+    http_method_names = ['get', 'head', 'options']
+    renderer = JSONRenderer()
+
+    def get_viewset(self, request, action):
+        """Instancie le ViewSet synchrone pour réutiliser sa configuration."""
+        viewset = self.viewset_class(action=action, format_kwarg=None, args=(), kwargs={})
+        # Lecture seule et anonyme : aucune authentification ni parsing du corps
+        viewset.request = Request(request, parsers=[], authenticators=[])
+        return viewset
+
+    def get_queryset(self, viewset):
+        """
+        Queryset de base du ViewSet :
+        - Supprime les champs différés (only/defer) qui provoqueraient une requête par ligne
+        """
+        return viewset.get_queryset().defer(None)
+
+    async def prepare(self, objects):
+        """Point d'extension : précharge les données annexes des objets de la page."""
+        return objects
+
+    async def get(self, request, pk=None):
+        # Filtres par slug et sérialiseurs lisent le cache de référence : rechargé ici, hors boucle
+        await areference_data()
+        try:
+            if pk is None:
+                payload = await self.list(request)
+            else:
+                payload = await self.retrieve(request, pk)
+        except APIException as exc:
+            return self.render(exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail},
+                               status=exc.status_code)
+        return self.render(payload)
+
+    async def list(self, request):
+        """Liste filtrée et paginée, équivalente à `ReadOnlyModelViewSet.list`."""
+        viewset = self.get_viewset(request, 'list')
+        queryset = viewset.filter_queryset(self.get_queryset(viewset))
+        paginator = viewset.paginator
+        page_size = paginator.get_page_size(viewset.request)
+
+        if not page_size:
+            objects = await self.fetch(queryset)
+            return self.serialize(viewset, objects)
+
+        # Le comptage est fait en asynchrone, puis injecté dans le paginateur Django
+        django_paginator = paginator.django_paginator_class(queryset, page_size)
+        django_paginator.count = await queryset.acount()
+        page_number = paginator.get_page_number(viewset.request, django_paginator)
+        try:
+            page = django_paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(paginator.invalid_page_message.format(page_number=page_number, message=str(exc)))
+
+        page.object_list = await self.fetch(page.object_list, chunk_size=page_size)
+        paginator.request = viewset.request
+        paginator.page = page
+        return paginator.get_paginated_response(self.serialize(viewset, page.object_list)).data
+
+    async def retrieve(self, request, pk):
+        """Détail d'un objet, équivalent à `ReadOnlyModelViewSet.retrieve`."""
+        viewset = self.get_viewset(request, 'retrieve')
+        queryset = viewset.filter_queryset(self.get_queryset(viewset))
+        instance = await queryset.filter(pk=pk).afirst()
+        if instance is None:
+            raise NotFound(f"No {queryset.model._meta.object_name} matches the given query.")
+        objects = await self.prepare([instance])
+        return self.serialize(viewset, objects[0], many=False)
+
+    async def fetch(self, queryset, chunk_size=100):
+        """Évalue le queryset via `aiterator` puis applique `prepare()`."""
+        objects = [obj async for obj in queryset.aiterator(chunk_size=chunk_size)]
+        return await self.prepare(objects)
+
+    def serialize(self, viewset, data, many=True):
+        context = {'request': viewset.request, 'format': None, 'view': viewset}
+        return viewset.serializer_class(data, many=many, context=context).data
+
+    def render(self, data, status=200):
+        return HttpResponse(self.renderer.render(data), status=status, content_type='application/json')
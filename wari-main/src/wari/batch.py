@@ -0,0 +1,158 @@
+"""
+Endpoint de requêtes groupées pour l'API client.
+
+Le frontend envoie en une seule requête POST la liste des GET à effectuer ;
+l'authentification, les middlewares et le CORS ne sont traités qu'une fois, puis
+chaque sous-requête est exécutée en mémoire par le ViewSet existant.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+import logging
+
+from .log import bind_request_id
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+BATCH_PATH_PREFIX = '/api/client/'
+
+_executor = None
+
+
+def get_executor():
+    """Pool de threads partagé par le processus (créé à la première utilisation)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'BATCH_MAX_WORKERS', 8),
+            thread_name_prefix='batch',
+        )
+    return _executor
+
+
+# 1. Exécution d'une sous-requête
+
+def build_subrequest(request, path, query):
+    """
+    Construit une requête GET interne à partir de la requête englobante :
+    - Reprend les en-têtes (hôte, schéma) pour des liens de pagination corrects
+    - Réutilise l'utilisateur déjà authentifié (pas de nouveau décodage JWT)
+    """
+    subrequest = HttpRequest()
+    subrequest.method = 'GET'
+    subrequest.path = subrequest.path_info = path
+    subrequest.META = {
+        key: value for key, value in request.META.items()
+        if key not in ('CONTENT_LENGTH', 'CONTENT_TYPE', 'wsgi.input')
+    }
+    subrequest.META.update({'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query})
+    subrequest.GET = QueryDict(query)
+    subrequest.user = request.user
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    return subrequest
+
+
+def run_subrequest(request, item):
+    """Exécute une sous-requête et retourne son statut et son corps décodé."""
+    url = urlsplit(item['path'])
+    try:
+        match = resolve(url.path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {'detail': 'Not found.'}
+
+    subrequest = build_subrequest(request, url.path, url.query)
+    subrequest.resolver_match = match
+    view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func
+    response = view(subrequest, *match.args, **match.kwargs)
+
+    if getattr(response, 'data', None) is not None:
+        return response.status_code, response.data
+    if hasattr(response, 'render'):
+        response.render()
+    try:
+        return response.status_code, json.loads(response.content or b'null')
+    except ValueError:
+        return response.status_code, None
+
+
+def run_guarded(request, item):
+    """Exécute une sous-requête ; une exception non gérée devient un statut 500 de l'élément."""
+    try:
+        return run_subrequest(request, item)
+    except Exception:
+        logger.exception("Erreur dans la sous-requête groupée %s", item['path'])
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, {'detail': 'Erreur interne.'}
+
+
+def run_in_worker(request, item):
+    """Exécution dans un thread du pool, avec le même cycle de connexions qu'une requête."""
+    close_old_connections()
+    try:
+        with bind_request_id(getattr(request, 'request_id', None)):
+            return run_guarded(request, item)
+    finally:
+        close_old_connections()
+
+
+# 2. Vue
+
+class BatchView(APIView):
+    """
+    Requêtes GET groupées sur l'API client : POST /api/client/batch/
+    - Corps : {"requests": [{"id": "games", "path": "/api/client/games/?page=2"}, ...]}
+      (chaque élément peut aussi être directement un chemin)
+    - Les sous-requêtes indépendantes sont exécutées en parallèle
+    - Réponse : {"responses": [{"id", "path", "status", "body"}, ...]} dans l'ordre de la demande
+    """
+    permission_classes = [AllowAny]  # Chaque sous-requête applique ses propres permissions
+
+    def post(self, request):
+        items = request.data.get('requests') if isinstance(request.data, dict) else request.data
+        errors = self.validate_items(items)
+        if errors:
+            return Response({'requests': errors}, status=status.HTTP_400_BAD_REQUEST)
+        items = [item if isinstance(item, dict) else {'path': item} for item in items]
+
+        if len(items) == 1:
+            # Élément unique : thread appelant (connexion et identifiant de requête déjà en place)
+            outcomes = [run_guarded(request, items[0])]
+        else:
+            outcomes = list(get_executor().map(lambda item: run_in_worker(request, item), items))
+
+        return Response({
+            'responses': [
+                {'id': item.get('id', index), 'path': item['path'], 'status': code, 'body': body}
+                for index, (item, (code, body)) in enumerate(zip(items, outcomes))
+            ]
+        })
+
+    def validate_items(self, items):
+        """Valide la liste : taille maximale, méthode GET uniquement, chemins de l'API client."""
+        max_requests = getattr(settings, 'BATCH_MAX_REQUESTS', 30)
+        if not isinstance(items, list) or not items:
+            return ["Une liste non vide de requêtes est attendue."]
+        if len(items) > max_requests:
+            return [f"Au plus {max_requests} requêtes par lot."]
+        errors = []
+        for index, item in enumerate(items):
+            path = item.get('path') if isinstance(item, dict) else item
+            method = item.get('method', 'GET') if isinstance(item, dict) else 'GET'
+            if not isinstance(path, str) or not path.startswith(BATCH_PATH_PREFIX):
+                errors.append(f"#{index} : le chemin doit commencer par {BATCH_PATH_PREFIX}")
+            elif urlsplit(path).path.startswith(BATCH_PATH_PREFIX + 'batch/'):
+                errors.append(f"#{index} : les lots imbriqués ne sont pas autorisés")
+            elif str(method).upper() != 'GET':
+                errors.append(f"#{index} : seules les requêtes GET sont autorisées")
+        return errors
@@ -0,0 +1,267 @@
+"""
+Contrôle des plans d'exécution des requêtes générées par les endpoints (PostgreSQL).
+
+Pour chaque scénario de la suite de benchmark (liste, filtres, recherche, détail) :
+- Les SELECT exécutés pendant la requête HTTP sont capturés avec leurs paramètres
+- Chacun est passé à `EXPLAIN (FORMAT JSON)` sur la base de test amorcée et analysée
+- Les index utilisés et les parcours séquentiels sont relevés ; partitions et index
+  de partition sont ramenés à leur table et à leur index parents
+
+Vérifications (`plans.json`, clé = nom du scénario) :
+- Aucun parcours séquentiel sélectif d'une table de plus de `seq_scan_rows` lignes,
+  sauf tables explicitement tolérées (`allow_seq_scans`)
+- Les index enregistrés pour un scénario sont toujours utilisés (régression de plan)
+
+Rapports :
+- Index déclarés dans `Meta.indexes` qu'aucun endpoint n'utilise
+- Index jamais parcourus d'après `pg_stat_user_indexes` (base de test ou base réelle)
+"""
+import json
+from pathlib import Path
+
+from django.apps import apps
+from django.db import connection
+
+from .suite import prepared_scenarios
+
+PLANS_PATH = Path(__file__).with_name('plans.json')
+DEFAULT_SEQ_SCAN_ROWS = 1000
+# Part des lignes retenues en deçà de laquelle un index aurait dû servir
+SELECTIVE_SCAN = 0.2
+
+
+class QueryRecorder:
+    """execute_wrapper relevant les SELECT exécutés (SQL et paramètres)."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip()[:6].upper() == 'SELECT':
+            self.queries.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+# 1. Catalogue
+
+class Catalog:
+    """
+    Parents des partitions et de leurs index, lignes estimées par table (ou partition)
+    et colonnes des index non uniques, pour retrouver un index déclaré quel que soit son nom en base.
+    """
+
+    def __init__(self):
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT c.relname, parent.relname, GREATEST(c.reltuples, 0)::bigint
+                FROM pg_class c
+                LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+                LEFT JOIN pg_class parent ON parent.oid = i.inhparent
+                WHERE c.relnamespace = 'public'::regnamespace AND c.relkind IN ('r', 'p', 'i', 'I')
+            """)
+            rows = cursor.fetchall()
+            cursor.execute("""
+                SELECT t.relname, c.relname, x.indisunique, array_agg(a.attname ORDER BY k.ord)
+                FROM pg_index x
+                JOIN pg_class c ON c.oid = x.indexrelid
+                JOIN pg_class t ON t.oid = x.indrelid
+                CROSS JOIN LATERAL unnest((x.indkey::int2[])[0:x.indnkeyatts - 1]) WITH ORDINALITY AS k(attnum, ord)
+                JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = k.attnum
+                WHERE t.relnamespace = 'public'::regnamespace
+                GROUP BY t.relname, c.relname, x.indisunique
+            """)
+            index_rows = cursor.fetchall()
+        self.parents = {name: parent for name, parent, _ in rows if parent}
+        self.rows = {name: tuples for name, _, tuples in rows}
+        self.indexes = {index for _, index, _, _ in index_rows}
+        self.columns = {}
+        for table, index, unique, columns in index_rows:
+            if table not in self.parents and not unique:
+                self.columns.setdefault((table, tuple(columns)), []).append(index)
+
+    def root(self, name):
+        """Table ou index parent (une partition est ramenée à sa table partitionnée)."""
+        while name in self.parents:
+            name = self.parents[name]
+        return name
+
+    def resolve(self, model, index):
+        """Nom en base d'un index déclaré (`models.Index`), retrouvé par nom puis par colonnes clés."""
+        if index.name in self.indexes:
+            return index.name
+        table = model._meta.db_table
+        columns = tuple(model._meta.get_field(name.lstrip('-')).column for name in index.fields)
+        candidates = self.columns.get((table, columns), [])
+        return candidates[0] if len(candidates) == 1 else None
+
+
+
+def declared_indexes(catalog):
+    """
+    Index déclarés dans `Meta.indexes` des modèles : {nom déclaré: (table, modèle, nom en base)}.
+    Le nom en base vaut None si aucun index ne correspond (migration manquante).
+    """
+    declared = {}
+    for model in apps.get_models():
+        table = model._meta.db_table
+        for index in model._meta.indexes:
+            declared[index.name] = (table, model._meta.label, catalog.resolve(model, index))
+    return declared
+
+
+# 2. Plans
+
+def explain(sql, params):
+    """Plan estimé (sans exécution) d'une requête, sous forme de dictionnaire."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        value = cursor.fetchone()[0]
+    return (json.loads(value) if isinstance(value, str) else value)[0]['Plan']
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def analyse_scenario(client, scenario, headers, catalog):
+    """Exécute un scénario et relève les index et parcours séquentiels de ses requêtes."""
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        response = client.get(scenario.full_url, **headers)
+    indexes, seq_scans = set(), {}
+    for sql, params in {(sql, repr(params)): (sql, params) for sql, params in recorder.queries}.values():
+        scanned = {}
+        for node in plan_nodes(explain(sql, params)):
+            if node['Node Type'] == 'Seq Scan':
+                # Seules les partitions parcourues comptent (les partitions vides à venir sont ignorées)
+                entry = scanned.setdefault(catalog.root(node['Relation Name']), {'rows': 0, 'kept': 0})
+                entry['rows'] += catalog.rows.get(node['Relation Name'], 0)
+                entry['kept'] += node['Plan Rows']
+            if 'Index Name' in node:
+                indexes.add(catalog.root(node['Index Name']))
+        for table, entry in scanned.items():
+            if entry['rows'] >= seq_scans.get(table, {}).get('rows', 0):
+                seq_scans[table] = {'rows': entry['rows'], 'kept': min(entry['kept'], entry['rows'])}
+    return {
+        'name': scenario.name,
+        'url': scenario.full_url,
+        'status': response.status_code,
+        'queries': len(recorder.queries),
+        'indexes': sorted(indexes),
+        'seq_scans': dict(sorted(seq_scans.items())),
+    }
+
+
+def check_plan(result, expected, threshold):
+    """
+    Violations d'un scénario :
+    - Parcours séquentiel sélectif (moins de SELECTIVE_SCAN des lignes retenues) d'une table de
+      plus de `threshold` lignes, hors tables tolérées ; un comptage ou un filtre peu sélectif
+      lit de toute façon la table entière
+    - Index attendus absents du plan
+    """
+    violations = []
+    allowed = set(expected.get('allow_seq_scans', []))
+    for table, scan in result['seq_scans'].items():
+        if scan['rows'] > threshold and scan['kept'] < scan['rows'] * SELECTIVE_SCAN and table not in allowed:
+            violations.append(f"parcours séquentiel de {table} ({scan['kept']}/{scan['rows']} lignes)")
+    for name in expected.get('indexes', []):
+        if name not in result['indexes']:
+            violations.append(f"index {name} n'est plus utilisé")
+    result['violations'] = violations
+    return violations
+
+
+# 3. Statistiques d'utilisation des index
+
+def index_usage(catalog):
+    """
+    Parcours cumulés par index d'après `pg_stat_user_indexes` (partitions regroupées) :
+    {index: {'table', 'scans', 'bytes', 'unique'}}, et date de remise à zéro des statistiques.
+    """
+    with connection.cursor() as cursor:
+        # Les compteurs de la session courante ne sont publiés qu'en fin de transaction
+        cursor.execute("SELECT pg_stat_force_next_flush()")
+        cursor.execute("SELECT pg_stat_clear_snapshot()")
+        cursor.execute("""
+            SELECT s.relname, s.indexrelname, s.idx_scan, pg_relation_size(s.indexrelid), i.indisunique
+            FROM pg_stat_user_indexes s
+            JOIN pg_index i ON i.indexrelid = s.indexrelid
+            WHERE s.schemaname = 'public'
+        """)
+        rows = cursor.fetchall()
+        cursor.execute("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+        stats_reset = cursor.fetchone()[0]
+    usage = {}
+    for table, index, scans, size, unique in rows:
+        entry = usage.setdefault(catalog.root(index), {
+            'table': catalog.root(table), 'scans': 0, 'bytes': 0, 'unique': unique,
+        })
+        entry['scans'] += scans
+        entry['bytes'] += size
+    return usage, stats_reset
+
+
+def unused_indexes(usage):
+    """Index non uniques jamais parcourus (les index uniques garantissent une contrainte)."""
+    return {name: entry for name, entry in sorted(usage.items()) if not entry['scans'] and not entry['unique']}
+
+
+# 4. Exécution
+
+def load_plans(path=PLANS_PATH):
+    if not Path(path).exists():
+        return {'seq_scan_rows': DEFAULT_SEQ_SCAN_ROWS, 'scenarios': {}}
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def plans_from_results(results, plans):
+    """Attentes réécrites depuis les plans observés ; les tolérances existantes sont conservées."""
+    previous = plans.get('scenarios', {})
+    scenarios = {}
+    for result in sorted(results, key=lambda result: result['name']):
+        entry = {'indexes': result['indexes']}
+        if previous.get(result['name'], {}).get('allow_seq_scans'):
+            entry['allow_seq_scans'] = previous[result['name']]['allow_seq_scans']
+        scenarios[result['name']] = entry
+    return {'seq_scan_rows': plans.get('seq_scan_rows', DEFAULT_SEQ_SCAN_ROWS), 'scenarios': scenarios}
+
+
+def run_plans(client, match=None, plans=None, threshold=None, progress=None):
+    """
+    Analyse les plans de tous les scénarios et retourne le rapport :
+    scénarios, index déclarés inutilisés par les endpoints, index jamais parcourus.
+    """
+    plans = plans if plans is not None else load_plans()
+    threshold = threshold or plans.get('seq_scan_rows', DEFAULT_SEQ_SCAN_ROWS)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    catalog = Catalog()
+    results = []
+    for scenario, headers in prepared_scenarios(client, match):
+        result = analyse_scenario(client, scenario, headers, catalog)
+        check_plan(result, plans.get('scenarios', {}).get(scenario.name, {}), threshold)
+        results.append(result)
+        if progress:
+            progress(result)
+
+    used = {name for result in results for name in result['indexes']}
+    usage, stats_reset = index_usage(catalog)
+    # Tables lues par les endpoints : leurs index déclarés absents de tous les plans sont signalés
+    touched = {table for result in results for table in result['seq_scans']}
+    touched |= {usage[name]['table'] for name in used if name in usage}
+    declared = declared_indexes(catalog)
+    return {
+        'seq_scan_rows': threshold,
+        'scenarios': results,
+        'violations': sum(len(result['violations']) for result in results),
+        'unused_declared': {
+            name: {'model': label, 'index': actual} for name, (table, label, actual) in sorted(declared.items())
+            if table in touched and actual not in used
+        },
+        'unused_indexes': unused_indexes(usage),
+        'index_bytes': {name: entry['bytes'] for name, entry in sorted(usage.items())},
+        'stats_reset': stats_reset.isoformat() if stats_reset else None,
+    }
@@ -0,0 +1,133 @@
+"""
+Jeu de données reproductible pour les benchmarks d'endpoints.
+
+Même graine et même échelle -> mêmes lignes, mêmes identifiants (après un flush)
+et donc mêmes URLs de détail, filtres et pages. Les dates sont calées sur minuit
+UTC du jour : les comptes restent identiques d'une exécution à l'autre dans la
+journée. Insertions en masse (bulk_create), sans les validations de save().
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+from django.utils.text import slugify
+
+from games.models import Country, Game, GameType
+from games.refcache import invalidate_reference_data
+from predictions.models import Prediction
+from programmes.models import Program
+from results.models import Result
+from users.models import CustomUser
+
+COUNTRIES = [('Benin', 'BEN'), ('Cote D Ivoire', 'CIV'), ('France', 'FRA'), ('Senegal', 'SEN'), ('Togo', 'TGO')]
+GAME_TYPES = ['Loto', 'Pmu', 'Sport']
+MARKETS = ['winner', 'first_number', 'total']
+BENCH_PASSWORD = 'benchmark'
+
+
+def seed_dataset(seed=42, scale=1.0):
+    """
+    Crée le jeu de données de benchmark et retourne le nombre de lignes par modèle :
+    - 5 pays, 3 types, 6 jeux par pays (dont un inactif)
+    - Par jeu : 90 jours de résultats, 30 programmes à venir, 120 pronostics (× `scale`)
+    """
+    rng = random.Random(seed)
+    midnight = datetime.combine(timezone.now().date(), time.min, tzinfo=dt_timezone.utc)
+    days = max(1, int(90 * scale))
+    programmes = max(1, int(30 * scale))
+    predictions = max(1, int(120 * scale))
+
+    with transaction.atomic():
+        admin = CustomUser.objects.create_superuser('bench-admin', 'bench-admin@example.com', BENCH_PASSWORD)
+        editors = [
+            CustomUser.objects.create_user(f"bench-editor-{i}", f"bench-editor-{i}@example.com", BENCH_PASSWORD,
+                                           role='editor')
+            for i in range(5)
+        ]
+        CustomUser.objects.create_user('bench-viewer', 'bench-viewer@example.com', BENCH_PASSWORD, role='viewer')
+
+        countries = [Country.objects.create(name=name, code=code) for name, code in COUNTRIES]
+        game_types = [GameType.objects.create(name=name, description=f"Jeux de type {name}") for name in GAME_TYPES]
+        games = []
+        for country in countries:
+            for index in range(6):
+                name = f"{rng.choice(['Grand', 'Super', 'Mega', 'Quick'])} {GAME_TYPES[index % 3]} {index}"
+                games.append(Game(
+                    name=name, slug=slugify(f"{name}-{country.code.lower()}"), country=country,
+                    game_type=game_types[index % 3], is_active=index != 5,
+                    description=f"Tirage {name} organisé en {country.name}",
+                ))
+        games = Game.objects.bulk_create(games)
+
+        Result.objects.bulk_create([
+            Result(
+                game=game, result_date=midnight - timedelta(days=day, hours=rng.randint(1, 12)),
+                outcome='-'.join(str(number) for number in sorted(rng.sample(range(1, 50), 5))),
+                outcome_details=outcome_details(rng),
+                status=rng.choices(['official', 'pending', 'disputed'], weights=[8, 1, 1])[0],
+                validated_by=admin,
+            )
+            for game in games for day in range(1, days + 1)
+        ], batch_size=2000)
+
+        Program.objects.bulk_create([
+            Program(
+                game=game, event_date=midnight + timedelta(days=day, hours=20),
+                details=f"Tirage du soir n°{day} - {game.name}", is_published=rng.random() < 0.8,
+            )
+            for game in games for day in range(1, programmes + 1)
+        ], batch_size=2000)
+
+        rows = Prediction.objects.bulk_create([
+            Prediction(
+                game=game, author=rng.choice(editors), is_published=rng.random() < 0.85,
+                description=f"Pronostic {index} pour {game.name} : {rng.choice(['prudent', 'risqué', 'équilibré'])}",
+                picks=[{'market': market, 'value': str(rng.randint(1, 49)), 'odds': round(rng.uniform(1.2, 6.0), 2)}
+                       for market in rng.sample(MARKETS, rng.randint(1, 3))],
+            )
+            for game in games for index in range(predictions)
+        ], batch_size=2000)
+        # predicted_at est auto_now_add : dates réparties sur la période en une seule requête
+        dates = [midnight - timedelta(minutes=rng.randint(60, days * 24 * 60)) for _ in rows]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {Prediction._meta.db_table} AS p SET predicted_at = v.at "
+                f"FROM unnest(%s::bigint[], %s::timestamptz[]) AS v(id, at) WHERE p.id = v.id",
+                [[row.id for row in rows], dates],
+            )
+
+    # bulk_create n'émet pas post_save : instantanés de référence périmés
+    invalidate_reference_data()
+    return {
+        'users': CustomUser.objects.count(),
+        'countries': len(countries),
+        'games': len(games),
+        'results': Result.objects.count(),
+        'programmes': Program.objects.count(),
+        'predictions': Prediction.objects.count(),
+    }
+
+
+def outcome_details(rng):
+    numbers = sorted(rng.sample(range(1, 50), 5))
+    return {'numbers': numbers, 'winner': str(numbers[0]), 'first_number': numbers[0], 'total': sum(numbers)}
+
+
+@contextmanager
+def seeded_test_database(seed=42, scale=1.0, keepdb=False):
+    """
+    Base de test jetable (migrations comprises) remplie par `seed_dataset`.
+    Produit le nombre de lignes par modèle ; la base est détruite en sortie (sauf `keepdb`).
+    """
+    setup_test_environment()
+    databases = setup_databases(verbosity=0, interactive=False, keepdb=keepdb)
+    try:
+        call_command('flush', interactive=False, verbosity=0)
+        yield seed_dataset(seed=seed, scale=scale)
+    finally:
+        teardown_databases(databases, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
@@ -0,0 +1,92 @@
+"""
+Débit de sérialisation des listes client : sérialiseur DRF contre lecture compilée (wari.readers).
+
+Pour chaque ressource (jeux, programmes, résultats, pronostics) :
+- Une page de `page_size` lignes du queryset de la vue client, lue puis rendue en JSON
+- DRF : instances de modèle + `serializer_class(..., many=True).data`
+- Compilé : tuples de `values_list()` + `reader.serialize()`
+- Lignes par seconde, latence par page, requêtes SQL par page et égalité des octets rendus
+"""
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from wari.httpbench import LatencyStats
+
+
+def resources():
+    # Imports locaux : vues chargées après la configuration des applications
+    from games.views import ClientGameViewSet
+    from predictions.views import ClientPredictionViewSet
+    from programmes.views import ClientProgramViewSet
+    from results.views import ClientResultViewSet
+
+    return {
+        'games': ClientGameViewSet,
+        'programs': ClientProgramViewSet,
+        'results': ClientResultViewSet,
+        'predictions': ClientPredictionViewSet,
+    }
+
+
+def drf_page(viewset, page_size):
+    rows = list(viewset.queryset.all()[:page_size])
+    return rows, viewset.serializer_class(rows, many=True).data
+
+
+def compiled_page(viewset, page_size):
+    rows = list(viewset.reader.rows(viewset.queryset.all())[:page_size])
+    return rows, viewset.reader.serialize(rows)
+
+
+def measure(page, viewset, page_size, repeat, warmup):
+    """Mesures d'une méthode de sérialisation (`page`) sur `repeat` pages, octets rendus compris."""
+    renderer = JSONRenderer()
+    for _ in range(warmup):
+        renderer.render(page(viewset, page_size)[1])
+    stats = LatencyStats()
+    queries, rendered, rows = [], b'', 0
+    for _ in range(repeat):
+        connection.queries_log.clear()  # Journal plein (9000 requêtes) : décompte faussé par CaptureQueriesContext
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            objects, data = page(viewset, page_size)
+            rendered = renderer.render(data)
+            latency = time.perf_counter() - started
+        stats.record(latency, 200, len(rendered))
+        queries.append(len(captured.captured_queries))
+        rows = len(objects)
+    stats.stop()
+    total = sum(stats.latencies)
+    return {
+        'rows_per_page': rows,
+        'rows_per_second': round(rows * repeat / total, 1) if total else None,
+        'latency_ms': stats.summary()['latency_ms'],
+        'queries': max(queries),
+    }, rendered
+
+
+def run_serializer_bench(page_size=100, repeat=50, warmup=3, match=None, progress=None):
+    """
+    Compare les deux méthodes pour chaque ressource retenue par `match`.
+    Retourne [{'name', 'drf', 'compiled', 'speedup', 'identical'}].
+    """
+    results = []
+    for name, viewset in resources().items():
+        if match and match not in name:
+            continue
+        drf, drf_bytes = measure(drf_page, viewset, page_size, repeat, warmup)
+        compiled, compiled_bytes = measure(compiled_page, viewset, page_size, repeat, warmup)
+        speedup = None
+        if drf['rows_per_second'] and compiled['rows_per_second']:
+            speedup = round(compiled['rows_per_second'] / drf['rows_per_second'], 2)
+        result = {
+            'name': name, 'drf': drf, 'compiled': compiled, 'speedup': speedup,
+            'identical': drf_bytes == compiled_bytes,
+        }
+        results.append(result)
+        if progress:
+            progress(result)
+    return results
@@ -0,0 +1,315 @@
+"""
+Suite de benchmark des endpoints des routeurs DRF sous /api/admin/ et /api/client/.
+
+Pour chaque route de ViewSet découverte dans l'URLconf :
+- liste, détail, chaque champ de `filterset_fields`, recherche et dernière page
+- N requêtes en processus (django.test.Client, middlewares compris) après préchauffage
+- Latences p50/p90/p95/p99, requêtes SQL par requête HTTP, octets de réponse
+
+Les mesures sont comparées aux budgets de `budgets.json` (clé = nom du scénario,
+indépendant des données). `--update-budgets` réécrit ce fichier à partir des mesures.
+"""
+import json
+import math
+import platform
+import re
+import subprocess
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework.exceptions import NotAuthenticated, PermissionDenied
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.models import CustomUser
+from wari.httpbench import LatencyStats
+
+BUDGETS_PATH = Path(__file__).with_name('budgets.json')
+PREFIXES = ('api/admin/', 'api/client/')
+GROUP_PATTERN = re.compile(r'\(\?P<(?P<name>\w+)>[^)]*\)')
+
+
+@dataclass
+class Endpoint:
+    template: str
+    viewset: type
+    action: str
+
+
+@dataclass
+class Scenario:
+    name: str
+    url: str
+    staff: bool
+    query: dict = field(default_factory=dict)
+
+    @property
+    def full_url(self):
+        return f"{self.url}?{urlencode(self.query)}" if self.query else self.url
+
+
+# 1. Découverte des endpoints
+
+def pattern_text(pattern):
+    """Fragment d'URL d'un motif (route ou expression régulière sans ancres)."""
+    return str(pattern.pattern).lstrip('^').rstrip('$')
+
+
+def walk(patterns, prefix=''):
+    for entry in patterns:
+        if isinstance(entry, URLResolver):
+            yield from walk(entry.url_patterns, prefix + pattern_text(entry))
+        elif isinstance(entry, URLPattern):
+            yield prefix + pattern_text(entry), entry.callback
+
+
+def discover_endpoints():
+    """Routes GET des ViewSets montées sous les préfixes benchmarkés (hors suffixes de format)."""
+    endpoints, seen = [], set()
+    for template, callback in walk(get_resolver().url_patterns):
+        actions = getattr(callback, 'actions', None)
+        if not actions or 'get' not in actions or '(?P<format>' in template:
+            continue
+        if not template.startswith(PREFIXES) or template in seen:
+            continue
+        seen.add(template)
+        endpoints.append(Endpoint('/' + template, callback.cls, actions['get']))
+    return endpoints
+
+
+# 2. Construction des scénarios
+
+def make_view(viewset, user):
+    """Instance de ViewSet (action list) liée à une requête GET de `user` (anonyme si None)."""
+    request = APIRequestFactory().get('/')
+    force_authenticate(request, user=user or AnonymousUser())
+    view = viewset(action_map={'get': 'list'}, args=(), kwargs={}, format_kwarg=None)
+    view.request = view.initialize_request(request)
+    return view
+
+
+def requires_authentication(viewset):
+    """Vrai si un client anonyme est refusé en lecture : le scénario s'exécute alors en administrateur."""
+    view = make_view(viewset, None)
+    try:
+        view.check_permissions(view.request)
+    except (NotAuthenticated, PermissionDenied):
+        return True
+    return False
+
+
+def sample_object(viewset, user):
+    """Objet représentatif (milieu du queryset) vu par la vue, pour les URLs de détail et les filtres."""
+    queryset = make_view(viewset, user).get_queryset()
+    count = queryset.count()
+    return queryset[count // 2] if count else None
+
+
+def resolve_value(obj, path):
+    """Valeur d'un chemin ORM (« game__slug ») sur une instance, formatée pour une query string."""
+    for part in path.split('__'):
+        obj = getattr(obj, part, None)
+        if obj is None:
+            return None
+    if isinstance(obj, bool):
+        return 'true' if obj else 'false'
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    return str(obj)
+
+
+def filter_fields(viewset):
+    fields = getattr(viewset, 'filterset_fields', None)
+    filterset_class = getattr(viewset, 'filterset_class', None)
+    if not fields and filterset_class is not None:
+        fields = list(filterset_class.base_filters)
+    return list(fields or [])
+
+
+def build_scenarios(endpoint, staff_user):
+    """Scénarios d'un endpoint : liste (+ filtres, recherche, dernière page), détail ou action."""
+    viewset = endpoint.viewset
+    staff = requires_authentication(viewset)
+    base = GROUP_PATTERN.sub(lambda match: '{' + match['name'] + '}', endpoint.template)
+    groups = GROUP_PATTERN.findall(endpoint.template)
+    obj = sample_object(viewset, staff_user) if groups or endpoint.action == 'list' else None
+
+    if groups:
+        if obj is None:
+            return []
+        url = GROUP_PATTERN.sub(lambda match: resolve_value(obj, match['name']) or '', endpoint.template)
+        kind = 'detail' if endpoint.action == 'retrieve' else endpoint.action
+        return [Scenario(f"{base} {kind}", url, staff)]
+
+    if endpoint.action != 'list':
+        return [Scenario(f"{base} {endpoint.action}", endpoint.template, staff)]
+
+    scenarios = [Scenario(f"{base} list", endpoint.template, staff)]
+    if obj is not None:
+        for name in filter_fields(viewset):
+            value = resolve_value(obj, name)
+            if value is not None:
+                scenarios.append(Scenario(f"{base} filter:{name}", endpoint.template, staff, {name: value}))
+        search_fields = getattr(viewset, 'search_fields', None)
+        if search_fields:
+            term = resolve_value(obj, search_fields[0].lstrip('^=@$'))
+            if term:
+                scenarios.append(Scenario(f"{base} search", endpoint.template, staff, {'search': term.split()[0]}))
+    if getattr(viewset, 'pagination_class', None):
+        scenarios.append(Scenario(f"{base} page:last", endpoint.template, staff, {'page': 'last'}))
+    return scenarios
+
+
+# 3. Mesure
+
+def auth_headers(user):
+    return {'HTTP_AUTHORIZATION': f"Bearer {AccessToken.for_user(user)}"} if user else {}
+
+
+def measure(client, scenario, headers, repeat, warmup):
+    """Exécute un scénario et retourne ses mesures (latences, requêtes SQL, octets, statuts)."""
+    url = scenario.full_url
+    for _ in range(warmup):
+        client.get(url, **headers)
+    stats = LatencyStats()
+    queries, sizes = [], []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(url, **headers)
+            latency = time.perf_counter() - started
+        stats.record(latency, response.status_code, len(response.content))
+        queries.append(len(captured.captured_queries))
+        sizes.append(len(response.content))
+    stats.stop()
+    summary = stats.summary()
+    return {
+        'name': scenario.name,
+        'url': url,
+        'statuses': summary['statuses'],
+        'requests': summary['requests'],
+        'latency_ms': summary['latency_ms'],
+        'queries': {'min': min(queries), 'max': max(queries)},
+        'bytes': max(sizes),
+    }
+
+
+def resolve_last_page(client, scenario, headers):
+    """Remplace page=last par le numéro de la dernière page (d'après le `count` de la première)."""
+    response = client.get(scenario.url, **headers)
+    try:
+        data = json.loads(response.content)
+        page_size = len(data['results'])
+        count = data['count']
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not page_size or count <= page_size:
+        return None
+    scenario.query = {'page': math.ceil(count / page_size)}
+    return scenario
+
+
+def prepared_scenarios(client, match=None):
+    """Scénarios retenus par `match`, prêts à exécuter : [(scénario, en-têtes d'authentification)]."""
+    staff_user = CustomUser.objects.filter(is_staff=True).order_by('id').first()
+    prepared = []
+    for endpoint in discover_endpoints():
+        for scenario in build_scenarios(endpoint, staff_user):
+            if match and match not in scenario.name:
+                continue
+            headers = auth_headers(staff_user if scenario.staff else None)
+            if scenario.query.get('page') == 'last' and resolve_last_page(client, scenario, headers) is None:
+                continue
+            prepared.append((scenario, headers))
+    return prepared
+
+
+# 4. Budgets et rapport
+
+def load_budgets(path=BUDGETS_PATH):
+    if not Path(path).exists():
+        return {'defaults': {}, 'scenarios': {}}
+    return json.loads(Path(path).read_text(encoding='utf-8'))
+
+
+def check_budget(result, budgets):
+    """Dépassements d'un scénario : statut non 2xx, p95, requêtes SQL et taille de réponse."""
+    budget = {**budgets.get('defaults', {}), **budgets.get('scenarios', {}).get(result['name'], {})}
+    violations = []
+    bad = [status for status in result['statuses'] if not status.startswith('2')]
+    if bad:
+        violations.append(f"statut {', '.join(bad)}")
+    if 'p95_ms' in budget and result['latency_ms']['p95'] > budget['p95_ms']:
+        violations.append(f"p95 {result['latency_ms']['p95']}ms > {budget['p95_ms']}ms")
+    if 'queries' in budget and result['queries']['max'] > budget['queries']:
+        violations.append(f"{result['queries']['max']} requêtes SQL > {budget['queries']}")
+    if 'bytes' in budget and result['bytes'] > budget['bytes']:
+        violations.append(f"{result['bytes']} octets > {budget['bytes']}")
+    result['budget'] = budget
+    result['violations'] = violations
+    return violations
+
+
+def budgets_from_results(results, defaults):
+    """Budgets réécrits depuis les mesures : requêtes exactes, marge sur la taille et la latence."""
+    return {
+        'defaults': defaults,
+        'scenarios': {
+            result['name']: {
+                'p95_ms': max(100, math.ceil(result['latency_ms']['p95'] * 3)),
+                'queries': result['queries']['max'],
+                'bytes': math.ceil(result['bytes'] * 1.2 / 1024) * 1024,
+            }
+            for result in sorted(results, key=lambda result: result['name'])
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, timeout=5,
+                              cwd=settings.BASE_DIR).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(repeat=20, warmup=2, match=None, budgets=None, progress=None):
+    """
+    Exécute tous les scénarios et retourne le rapport (dictionnaire sérialisable en JSON).
+    - `match` : sous-chaîne filtrant les noms de scénarios
+    """
+    budgets = budgets if budgets is not None else load_budgets()
+    client = Client()
+    results = []
+    # Vérification périodique de la version des données de référence (une requête toutes les
+    # REFERENCE_CACHE_CHECK_INTERVAL secondes par processus, pas par requête HTTP) : hors mesure,
+    # sinon le maximum de requêtes SQL d'un scénario dépendrait de sa durée
+    with override_settings(REFERENCE_CACHE_CHECK_INTERVAL=math.inf):
+        for scenario, headers in prepared_scenarios(client, match):
+            result = measure(client, scenario, headers, repeat, warmup)
+            check_budget(result, budgets)
+            results.append(result)
+            if progress:
+                progress(result)
+    return {
+        'generated_at': timezone.now().isoformat(),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'repeat': repeat,
+        'warmup': warmup,
+        'scenarios': results,
+        'violations': sum(len(result['violations']) for result in results),
+    }
@@ -0,0 +1,35 @@
+"""
+Horizon de lecture des lecteurs incrémentaux (synchronisation client, export analytique).
+
+`updated_at` est fixé avant le commit : une transaction d'écriture encore ouverte peut
+valider une ligne datée d'avant le point de reprise d'un lecteur. Comme le dispatcher de
+l'outbox (xmin de l'instantané), la lecture s'arrête avant le début de la plus ancienne
+transaction d'écriture ouverte (xid attribué, pg_stat_activity), quelle que soit sa durée,
+moins une fenêtre de stabilisation (écart d'horloge entre serveurs d'application et base,
+écritures préparées avant l'attribution du xid).
+"""
+from datetime import timedelta
+
+from django.db import connection
+
+# Début de la plus ancienne transaction d'écriture encore ouverte dans la base (hors session courante) :
+# c'est elle qui retient le xmin des instantanés ; ses lignes ont un `updated_at` postérieur
+OLDEST_WRITER_SQL = """
+    SELECT min(xact_start) FROM pg_stat_activity
+    WHERE backend_xid IS NOT NULL AND datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+
+def oldest_writer_start():
+    """Début de la plus ancienne transaction d'écriture ouverte (None si aucune ou hors PostgreSQL)."""
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(OLDEST_WRITER_SQL)
+        return cursor.fetchone()[0]
+
+
+def read_horizon(now, settle_seconds):
+    """Date au-delà de laquelle les lignes modifiées attendent le passage suivant."""
+    oldest = oldest_writer_start()
+    return min(now, oldest or now) - timedelta(seconds=settle_seconds)
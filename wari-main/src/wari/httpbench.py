@@ -0,0 +1,199 @@
+"""
+Outils HTTP asynchrones pour les mesures de charge (bibliothèque standard uniquement).
+
+- AsyncHTTPConnection : client HTTP/1.1 minimal avec keep-alive
+- reconnect_delay : pause exponentielle entre deux échecs consécutifs d'un client
+- LatencyStats : agrégation des latences, codes de statut et volumes
+"""
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+class HTTPError(Exception):
+    """Réponse HTTP illisible ou connexion interrompue."""
+
+
+# 1. Connexion HTTP/1.1 persistante
+
+class AsyncHTTPConnection:
+    """
+    Connexion HTTP/1.1 persistante vers une URL de base :
+    - Réouverture automatique si le serveur ferme la connexion ou ne répond pas à temps
+      (une réponse en retard ne doit pas être lue comme celle de la requête suivante)
+    - Gère Content-Length et Transfer-Encoding: chunked
+    """
+
+    def __init__(self, base_url, timeout=30.0):
+        parts = urlsplit(base_url)
+        if parts.scheme != 'http':
+            raise ValueError(f"Seul le schéma http est supporté : {base_url}")
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers=None, body=None):
+        """Envoie une requête et retourne (statut, en-têtes, corps)."""
+        if self.writer is None:
+            await self.connect()
+        lines = [
+            f"{method} {self.prefix}{path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            "Accept: application/json",
+        ]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + (body or b'')
+        try:
+            self.writer.write(payload)
+            await self.writer.drain()
+            return await asyncio.wait_for(self._read_response(), self.timeout)
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, HTTPError):
+            await self.close()
+            raise
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise HTTPError("Connexion fermée par le serveur")
+        try:
+            status = int(status_line.split(b' ', 2)[1])
+        except (IndexError, ValueError):
+            raise HTTPError(f"Ligne de statut invalide : {status_line!r}")
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b''.join(chunks)
+        else:
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, headers, body
+
+
+def reconnect_delay(failures, base=0.05, cap=2.0, rng=random):
+    """Pause (secondes) après `failures` échecs consécutifs : exponentielle, plafonnée, avec gigue de ±20 %."""
+    if failures <= 0:
+        return 0.0
+    return min(cap, base * 2 ** (failures - 1)) * rng.uniform(0.8, 1.2)
+
+
+# 2. Agrégation des mesures
+
+def percentile(sorted_values, fraction):
+    """Percentile par rang le plus proche sur une liste déjà triée."""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class LatencyStats:
+    """Latences (en secondes), statuts et octets reçus pour une série de requêtes."""
+
+    def __init__(self):
+        self.latencies = []
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.bytes_received = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, latency, status, nbytes):
+        self.latencies.append(latency)
+        self.statuses[status] += 1
+        self.bytes_received += nbytes
+
+    def record_error(self, exc):
+        self.errors[type(exc).__name__] += 1
+
+    def stop(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def histogram(self, bounds_ms=(5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)):
+        """Histogramme cumulatif des latences par seuil en millisecondes."""
+        buckets = Counter()
+        for latency in self.latencies:
+            ms = latency * 1000
+            bucket = next((f"<={bound}ms" for bound in bounds_ms if ms <= bound), f">{bounds_ms[-1]}ms")
+            buckets[bucket] += 1
+        return {label: buckets[label] for label in [f"<={b}ms" for b in bounds_ms] + [f">{bounds_ms[-1]}ms"]}
+
+    def summary(self):
+        values = sorted(self.latencies)
+        total = len(values) + sum(self.errors.values())
+        failed = sum(self.errors.values()) + sum(n for s, n in self.statuses.items() if s >= 500)
+
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            'requests': len(values),
+            'errors': dict(self.errors),
+            'statuses': {str(k): v for k, v in sorted(self.statuses.items())},
+            'error_rate': round(failed / total, 4) if total else 0.0,
+            'throughput_rps': round(len(values) / self.elapsed, 2) if self.elapsed else 0.0,
+            'bytes_received': self.bytes_received,
+            'latency_ms': {
+                'p50': ms(percentile(values, 0.50)),
+                'p90': ms(percentile(values, 0.90)),
+                'p95': ms(percentile(values, 0.95)),
+                'p99': ms(percentile(values, 0.99)),
+                'max': ms(values[-1] if values else None),
+            },
+        }
+
+
+def raise_open_files_limit(wanted):
+    """Relève la limite de descripteurs ouverts (nécessaire pour des milliers de connexions)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
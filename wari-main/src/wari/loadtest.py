@@ -0,0 +1,341 @@
+"""
+Générateur de charge « soir de tirage » (asyncio, bibliothèque standard et wari.httpbench).
+
+Modèle ouvert : les arrivées suivent un processus de Poisson dont le débit cible est
+interpolé linéairement d'une étape à l'autre du profil (montées, paliers, reflux) ;
+un serveur saturé ne ralentit donc pas la charge. Chaque arrivée tire un scénario
+selon les poids du profil :
+- `poll_results` : rafraîchissement anonyme des résultats d'un jeu (?game__slug=)
+- `browse_programs` : programmes d'un pays (pages successives) ou fil d'un jeu
+- `search` : recherche de jeux ou de pronostics
+- `login` : obtention d'un jeton JWT (/api/token/)
+- `editor_write` : création d'un pronostic (non publié) par un éditeur authentifié
+
+Les latences sont mesurées depuis l'instant d'arrivée prévu : l'attente d'une
+connexion libre (au plus `concurrency`) est comptée. Au-delà de `max_pending`
+arrivées en attente, les suivantes sont abandonnées et comptées (ClientOverload).
+
+Profil : wari/benchmark/drawday.json (étapes, poids, chemins, comptes du jeu de
+données de benchmark). Commande : python manage.py loadtest.
+"""
+import asyncio
+import json
+import math
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlencode
+
+from .httpbench import AsyncHTTPConnection, LatencyStats, percentile
+
+DEFAULT_PROFILE = Path(__file__).parent / 'benchmark' / 'drawday.json'
+RATE_TICK = 1.0  # Pas maximal (s) entre deux réévaluations du débit cible
+SEARCH_TERMS = ['loto', 'pmu', 'sport', 'grand', 'super', 'mega', 'quick', 'tirage']
+
+
+class ClientOverload(Exception):
+    """Trop d'arrivées en attente d'une connexion : requête abandonnée par le générateur."""
+
+
+# 1. Profil de charge
+
+class LoadProfile:
+    """Étapes de débit, poids des scénarios, chemins et comptes (fichier JSON)."""
+
+    def __init__(self, data, rate_scale=1.0, time_scale=1.0):
+        self.name = data.get('name', 'profil')
+        self.start_rate = data.get('start_rate', 0) * rate_scale
+        self.stages = [
+            {'label': stage.get('label', f"étape {index + 1}"), 'duration': stage['duration'] * time_scale,
+             'rate': stage['rate'] * rate_scale}
+            for index, stage in enumerate(data['stages'])
+        ]
+        self.scenarios = {name: weight for name, weight in data['scenarios'].items() if weight > 0}
+        unknown = set(self.scenarios) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Scénarios inconnus : {', '.join(sorted(unknown))}")
+        self.paths = data['paths']
+        self.accounts = data.get('accounts', {})
+        self.window = data.get('window', 10)
+
+    @classmethod
+    def load(cls, path=DEFAULT_PROFILE, **kwargs):
+        return cls(json.loads(Path(path).read_text(encoding='utf-8')), **kwargs)
+
+    @property
+    def duration(self):
+        return sum(stage['duration'] for stage in self.stages)
+
+    def stage_at(self, elapsed):
+        """(étape, débit cible) à `elapsed` secondes du début ; (None, 0) après la dernière étape."""
+        start, rate = 0.0, self.start_rate
+        for stage in self.stages:
+            if elapsed < start + stage['duration']:
+                progress = (elapsed - start) / stage['duration']
+                return stage, rate + (stage['rate'] - rate) * progress
+            start, rate = start + stage['duration'], stage['rate']
+        return None, 0.0
+
+
+# 2. Données cibles et comptes
+
+class TrafficData:
+    """Jeux, pays et comptes découverts sur le serveur cible avant la mesure."""
+
+    def __init__(self, games, countries, accounts):
+        self.games = games  # Slugs des jeux exposés par l'API cible
+        self.countries = countries
+        self.viewers = accounts.get('viewers', [])
+        self.editors = accounts.get('editors', [])
+        self.password = accounts.get('password', '')
+        self.tokens = {}  # Jetons d'accès des éditeurs, réutilisés jusqu'au premier 401
+
+    @classmethod
+    async def discover(cls, connection, profile, max_pages=20):
+        games, countries = [], set()
+        query = {'page_size': 100}
+        for page in range(1, max_pages + 1):
+            status, _, body = await connection.request('GET', f"{profile.paths['games']}?{urlencode({**query, 'page': page})}")
+            if status != 200:
+                break
+            data = json.loads(body)
+            for game in data.get('results', []):
+                games.append(game['slug'])
+                if game.get('country'):
+                    countries.add(game['country']['slug'])
+            if not data.get('next'):
+                break
+        if not games:
+            raise ValueError(f"Aucun jeu trouvé sur {profile.paths['games']} : base cible vide ?")
+        return cls(games, sorted(countries), profile.accounts)
+
+
+# 3. Scénarios
+
+class LoadSession:
+    """Contexte d'une arrivée : connexion, générateur aléatoire et enregistrement des mesures."""
+
+    def __init__(self, runner, connection, rng, scheduled):
+        self.runner = runner
+        self.connection = connection
+        self.rng = rng
+        self.due = scheduled  # Première requête : mesurée depuis l'arrivée prévue
+        self.paths = runner.profile.paths
+        self.data = runner.data
+
+    async def request(self, scenario, method, path, query=None, payload=None, token=None):
+        headers = {}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        target = f"{path}?{urlencode(query)}" if query else path
+        started, self.due = self.due or time.perf_counter(), None
+        try:
+            status, _, response = await self.connection.request(method, target, headers, body)
+        except Exception as exc:
+            self.runner.record_error(scenario, exc)
+            raise
+        self.runner.record(scenario, time.perf_counter() - started, status, len(response))
+        return status, response
+
+
+async def poll_results(session):
+    await session.request('poll_results', 'GET', session.paths['results'],
+                          {'game__slug': session.rng.choice(session.data.games)})
+
+
+async def browse_programs(session):
+    rng = session.rng
+    if rng.random() < 0.3:
+        await session.request('browse_programs', 'GET',
+                              session.paths['timeline'].format(slug=rng.choice(session.data.games)))
+        return
+    query = {'game__country__slug': rng.choice(session.data.countries)} if session.data.countries else {}
+    for page in range(1, rng.randint(1, 3) + 1):
+        status, body = await session.request('browse_programs', 'GET', session.paths['programs'], {**query, 'page': page})
+        if status != 200 or not json.loads(body).get('next'):
+            break  # Dernière page atteinte : pas de 404 artificiel
+
+
+async def search(session):
+    path = session.paths['games'] if session.rng.random() < 0.6 else session.paths['predictions']
+    await session.request('search', 'GET', path, {'search': session.rng.choice(SEARCH_TERMS)})
+
+
+async def obtain_token(session, username):
+    status, body = await session.request('login', 'POST', session.paths['token'],
+                                         payload={'username': username, 'password': session.data.password})
+    return json.loads(body).get('access') if status == 200 else None
+
+
+async def login(session):
+    accounts = session.data.viewers + session.data.editors
+    if accounts:
+        await obtain_token(session, session.rng.choice(accounts))
+
+
+async def editor_write(session):
+    data, rng = session.data, session.rng
+    if not data.editors:
+        return
+    editor = rng.choice(data.editors)
+    payload = {
+        'game': rng.choice(data.games),
+        'description': f"Pronostic de charge #{rng.randint(1, 10 ** 6)} : {rng.choice(['prudent', 'offensif'])}",
+        'picks': [{'market': 'winner', 'value': str(rng.randint(1, 49)), 'odds': round(rng.uniform(1.2, 6.0), 2)}],
+        'is_published': False,  # Données client inchangées d'une exécution à l'autre
+    }
+    for _ in range(2):
+        token = data.tokens.get(editor) or await obtain_token(session, editor)
+        if token is None:
+            return
+        data.tokens[editor] = token
+        status, _ = await session.request('editor_write', 'POST', session.paths['editor_predictions'],
+                                          payload=payload, token=token)
+        if status != 401:
+            return
+        data.tokens.pop(editor, None)  # Jeton expiré : nouvelle connexion puis nouvel essai
+
+
+SCENARIOS = {
+    'poll_results': poll_results,
+    'browse_programs': browse_programs,
+    'search': search,
+    'login': login,
+    'editor_write': editor_write,
+}
+
+
+# 4. Exécution
+
+class LoadRunner:
+    """
+    Exécute un profil contre `base_url` :
+    - `concurrency` : connexions HTTP persistantes au plus
+    - `max_pending` : arrivées en attente d'une connexion au-delà desquelles la charge est abandonnée
+    """
+
+    def __init__(self, base_url, profile, concurrency=200, max_pending=None, timeout=30.0, seed=42, progress=None):
+        self.base_url = base_url
+        self.profile = profile
+        self.concurrency = concurrency
+        self.max_pending = max_pending or concurrency * 10
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.progress = progress
+        self.data = None
+        self.total = LatencyStats()
+        self.by_scenario = {name: LatencyStats() for name in SCENARIOS}
+        self.windows = {}
+        self.started = None
+
+    def window(self):
+        index = int((time.perf_counter() - self.started) // self.profile.window)
+        return self.windows.setdefault(index, {'latencies': [], 'statuses': Counter(), 'errors': 0})
+
+    def record(self, scenario, latency, status, nbytes):
+        self.total.record(latency, status, nbytes)
+        self.by_scenario[scenario].record(latency, status, nbytes)
+        window = self.window()
+        window['latencies'].append(latency)
+        window['statuses'][status] += 1
+        window['errors'] += status >= 500
+
+    def record_error(self, scenario, exc):
+        self.total.record_error(exc)
+        self.by_scenario[scenario].record_error(exc)
+        self.window()['errors'] += 1
+
+    async def run(self):
+        discovery = AsyncHTTPConnection(self.base_url, timeout=self.timeout)
+        try:
+            self.data = await TrafficData.discover(discovery, self.profile)
+        finally:
+            await discovery.close()
+
+        pool = asyncio.Queue()
+        connections = [AsyncHTTPConnection(self.base_url, timeout=self.timeout) for _ in range(self.concurrency)]
+        for connection in connections:
+            pool.put_nowait(connection)
+        names, weights = list(self.profile.scenarios), list(self.profile.scenarios.values())
+        tasks = set()
+        self.started = time.perf_counter()
+        for stats in [self.total, *self.by_scenario.values()]:
+            stats.started = self.started
+        elapsed, last_stage = 0.0, None
+
+        while True:
+            stage, rate = self.profile.stage_at(elapsed)
+            if stage is None:
+                break
+            if stage is not last_stage and self.progress:
+                self.progress(stage)
+            last_stage = stage
+            # Poisson non homogène : un intervalle tiré au-delà de RATE_TICK est abandonné (loi
+            # exponentielle sans mémoire) et le débit réévalué, y compris aux changements d'étape
+            gap = self.rng.expovariate(rate) if rate > 0 else math.inf
+            elapsed += min(gap, RATE_TICK)
+            delay = self.started + elapsed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if gap > RATE_TICK or self.profile.stage_at(elapsed)[0] is None:
+                continue
+            if len(tasks) >= self.concurrency + self.max_pending:
+                name = self.rng.choices(names, weights)[0]
+                self.record_error(name, ClientOverload())
+                continue
+            name = self.rng.choices(names, weights)[0]
+            task = asyncio.create_task(self.arrival(pool, name, self.started + elapsed, random.Random(self.rng.random())))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for stats in [self.total, *self.by_scenario.values()]:
+            stats.stop()
+        for connection in connections:
+            await connection.close()
+        return self.report()
+
+    async def arrival(self, pool, name, scheduled, rng):
+        connection = await pool.get()
+        try:
+            await SCENARIOS[name](LoadSession(self, connection, rng, scheduled))
+        except Exception:
+            pass  # Déjà compté par LoadSession.request
+        finally:
+            pool.put_nowait(connection)
+
+    def report(self):
+        scenarios = {}
+        for name, stats in self.by_scenario.items():
+            if stats.latencies or stats.errors:
+                scenarios[name] = {**stats.summary(), 'histogram': stats.histogram()}
+        timeline = []
+        for index in sorted(self.windows):
+            window = self.windows[index]
+            values = sorted(window['latencies'])
+            total = len(values) + window['errors'] - sum(n for s, n in window['statuses'].items() if s >= 500)
+            timeline.append({
+                'start_s': index * self.profile.window,
+                'target_rps': round(self.profile.stage_at(index * self.profile.window)[1], 1),
+                'throughput_rps': round(len(values) / self.profile.window, 1),
+                'error_rate': round(window['errors'] / total, 4) if total else 0.0,
+                'p50_ms': round(percentile(values, 0.50) * 1000, 2) if values else None,
+                'p95_ms': round(percentile(values, 0.95) * 1000, 2) if values else None,
+                'statuses': {str(status): count for status, count in sorted(window['statuses'].items())},
+            })
+        return {
+            'profile': self.profile.name,
+            'base_url': self.base_url,
+            'concurrency': self.concurrency,
+            'duration_s': round(self.profile.duration, 1),
+            'dataset': {'games': len(self.data.games), 'countries': len(self.data.countries)},
+            'total': {**self.total.summary(), 'histogram': self.total.histogram()},
+            'scenarios': scenarios,
+            'timeline': timeline,
+        }
@@ -0,0 +1,248 @@
+"""
+Journalisation non bloquante du chemin de requête.
+
+Les vues journalisent dans le thread du worker ; l'écriture (formatage, traces,
+sortie standard) est reportée sur un thread dédié :
+- `BackgroundQueueHandler` : file bornée vidée par un QueueListener ; file pleine ->
+  enregistrement perdu et compté, perte signalée dès que la file se libère
+- Formatage différé : message (`%s` + arguments) et trace ne sont produits que par
+  le thread d'écriture ; les arguments doivent donc être des valeurs figées
+- `JsonFormatter` : une ligne JSON par enregistrement, avec l'identifiant de requête
+- `DuplicateFilter` : avertissements et erreurs répétés (même appel, même exception)
+  supprimés pendant une fenêtre, leur nombre est reporté sur l'occurrence suivante
+- `RequestIdMiddleware` : identifiant de requête (en-tête X-Request-ID repris ou généré)
+- `ExceptionLoggingMixin` : remplace les surcharges `handle_exception` des ViewSets
+
+Configuration : LOGGING dans settings.py.
+"""
+import atexit
+import json
+import logging
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone as dt_timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from rest_framework.exceptions import APIException
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+request_id_var = ContextVar('request_id', default=None)
+
+
+# 1. Identifiant de requête
+
+class RequestIdMiddleware:
+    """
+    Associe un identifiant à chaque requête (contexte de journalisation et en-tête de réponse) :
+    - Repris de l'en-tête X-Request-ID s'il est valide (proxy, client), sinon généré
+    - Compatible WSGI et ASGI
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = request_id_var.set(self.request_id(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        token = request_id_var.set(self.request_id(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_id_var.reset(token)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+    def request_id(self, request):
+        value = request.headers.get(REQUEST_ID_HEADER, '')
+        request.request_id = value if _VALID_REQUEST_ID.match(value) else uuid.uuid4().hex
+        return request.request_id
+
+
+@contextmanager
+def bind_request_id(value):
+    """Reprend l'identifiant d'une requête dans un autre thread (pool de sous-requêtes)."""
+    token = request_id_var.set(value)
+    try:
+        yield
+    finally:
+        request_id_var.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """Fige l'identifiant de requête sur l'enregistrement, dans le thread appelant."""
+
+    def filter(self, record):
+        # django.request journalise après la sortie du middleware : identifiant lu sur la requête
+        record.request_id = request_id_var.get() or getattr(getattr(record, 'request', None), 'request_id', None)
+        return True
+
+
+# 2. Suppression des doublons
+
+class DuplicateFilter(logging.Filter):
+    """
+    Supprime les avertissements et erreurs répétés pendant `window` secondes.
+    - Doublon : même logger, niveau, ligne d'appel, gabarit de message et type d'exception
+      (les arguments sont ignorés : un identifiant qui change reste un doublon)
+    - L'occurrence suivante, après la fenêtre, porte le nombre d'occurrences supprimées
+    """
+
+    def __init__(self, window=60, max_keys=1024):
+        super().__init__()
+        self.window = window
+        self.max_keys = max_keys
+        self.seen = OrderedDict()
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+        exc_type = record.exc_info[0].__name__ if record.exc_info and record.exc_info[0] else None
+        key = (record.name, record.levelno, record.pathname, record.lineno, str(record.msg), exc_type)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.seen.get(key)
+            if entry is not None and now - entry[0] < self.window:
+                entry[1] += 1
+                return False
+            record.suppressed = entry[1] if entry is not None else 0
+            self.seen[key] = [now, 0]
+            self.seen.move_to_end(key)
+            while len(self.seen) > self.max_keys:
+                self.seen.popitem(last=False)
+        return True
+
+
+# 3. Écriture en arrière-plan
+
+class BackgroundQueueHandler(QueueHandler):
+    """
+    Handler de la requête : dépose l'enregistrement dans une file bornée, sans I/O.
+    - Le thread d'écriture formate avec le formatter de ce handler et écrit dans `stream`
+    - `maxsize` : capacité de la file ; au-delà, enregistrements perdus (`dropped`)
+    - Thread d'écriture démarré au premier enregistrement (après un éventuel fork du
+      serveur d'application) et vidé à l'arrêt du processus
+    """
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.writer = logging.StreamHandler(stream)
+        self.listener = None
+        self.dropped = 0
+        self.reported = 0
+        self.start_lock = threading.Lock()
+
+    def start(self):
+        with self.start_lock:
+            if self.listener is not None:
+                return
+            self.writer.setFormatter(self.formatter)
+            self.listener = QueueListener(self.queue, self.writer)
+            self.listener.start()
+            atexit.register(self.stop)
+
+    def stop(self):
+        listener, self.listener = self.listener, None
+        while listener is not None:
+            try:
+                listener.stop()  # Vide la file puis arrête le thread
+                break
+            except queue.Full:
+                time.sleep(0.01)  # File pleine : attendre une place pour le marqueur de fin
+
+    def prepare(self, record):
+        # Rien n'est formaté ici : le thread d'écriture s'en charge (cf. QueueHandler.prepare)
+        return record
+
+    def enqueue(self, record):
+        if self.listener is None:
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped > self.reported:
+            lost, self.reported = self.dropped - self.reported, self.dropped
+            warning = logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': "%s enregistrements de journal perdus (file pleine, %s au total)",
+                'args': (lost, self.dropped), 'request_id': None,
+            })
+            try:
+                self.queue.put_nowait(warning)
+            except queue.Full:
+                self.reported -= lost
+
+
+# 4. Format JSON
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement ; les attributs passés via `extra=` sont inclus."""
+
+    RESERVED = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id', 'suppressed'}
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, tz=dt_timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        for key, value in record.__dict__.items():
+            if key not in self.RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# 5. Erreurs des ViewSets
+
+class ExceptionLoggingMixin:
+    """
+    Journalisation des erreurs d'un ViewSet (logger du module de la vue) :
+    - Erreurs client (APIException, Http404, PermissionDenied) : une ligne, sans trace
+    - Erreurs inattendues : niveau ERROR avec trace (formatée par le thread d'écriture)
+    """
+
+    def handle_exception(self, exc):
+        view_logger = logging.getLogger(self.__class__.__module__)
+        if isinstance(exc, (APIException, Http404, PermissionDenied)):
+            view_logger.info("%s : %s", self.__class__.__name__, exc.__class__.__name__)
+        else:
+            view_logger.error("Erreur dans %s : %s", self.__class__.__name__, exc, exc_info=exc)
+        return super().handle_exception(exc)
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wari.httpbench import AsyncHTTPConnection, LatencyStats, raise_open_files_limit, reconnect_delay
+
+
+class Command(BaseCommand):
+    """
+    Compare la capacité en connexions simultanées de plusieurs déploiements.
+
+    Exemple (WSGI vs ASGI sur la même base) :
+        gunicorn wari.wsgi -w 4 -b 127.0.0.1:8000
+        uvicorn wari.asgi:application --workers 4 --port 8001
+        python manage.py bench_concurrency \\
+            --target wsgi=http://127.0.0.1:8000/api/client/ \\
+            --target asgi=http://127.0.0.1:8001/api/client/async/ \\
+            --path programs/ --path games/ --clients 2000 --duration 30
+    """
+    help = "Mesure la capacité en clients simultanés (WSGI vs ASGI) sur les endpoints client."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', action='append', required=True,
+                            help="nom=url_de_base, répétable (ex. asgi=http://127.0.0.1:8001/api/client/async/)")
+        parser.add_argument('--path', action='append', default=None,
+                            help="Chemin relatif à la cible, répétable (défaut : games/, programs/)")
+        parser.add_argument('--clients', type=int, default=2000, help="Nombre de connexions simultanées")
+        parser.add_argument('--duration', type=float, default=30.0, help="Durée de la mesure (secondes)")
+        parser.add_argument('--ramp', type=float, default=10.0, help="Durée d'ouverture progressive des connexions")
+        parser.add_argument('--timeout', type=float, default=30.0, help="Délai maximal par requête")
+        parser.add_argument('--json', dest='json_output', help="Écrit le rapport JSON dans ce fichier")
+
+    def handle(self, *args, **options):
+        targets = []
+        for spec in options['target']:
+            name, sep, url = spec.partition('=')
+            if not sep or not url:
+                raise CommandError(f"Cible invalide '{spec}' : format attendu nom=url")
+            targets.append((name, url))
+        paths = options['path'] or ['games/', 'programs/']
+
+        limit = raise_open_files_limit(options['clients'] + 256)
+        if limit is not None and limit < options['clients'] + 16:
+            self.stderr.write(f"Limite de descripteurs ({limit}) inférieure au nombre de clients demandé.")
+
+        report = {}
+        for name, url in targets:
+            self.stdout.write(f"[{name}] {options['clients']} clients pendant {options['duration']}s sur {url}")
+            stats = asyncio.run(self.run_target(url, paths, options))
+            report[name] = stats.summary()
+            report[name]['connections'] = stats.connections
+
+        self.print_table(report)
+        if options['json_output']:
+            with open(options['json_output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+
+    async def run_target(self, base_url, paths, options):
+        """
+        Clients en boucle fermée ; seules les requêtes terminées dans la fenêtre de mesure
+        (après l'ouverture progressive, pendant `duration`) entrent dans les statistiques.
+        """
+        stats = LatencyStats()
+        stats.connections = {'opened': 0, 'failed': 0}
+        stats.started = time.perf_counter() + options['ramp']  # Débit calculé hors montée en charge
+        deadline = stats.started + options['duration']
+
+        async def client(index):
+            # Ouverture progressive pour ne pas saturer la file d'attente d'accept()
+            await asyncio.sleep(options['ramp'] * index / max(options['clients'], 1))
+            conn = AsyncHTTPConnection(base_url, timeout=options['timeout'])
+            try:
+                await conn.connect()
+            except (OSError, asyncio.TimeoutError) as exc:
+                stats.connections['failed'] += 1
+                stats.record_error(exc)
+                return
+            stats.connections['opened'] += 1
+            rng = random.Random(index)
+            failures = 0
+            try:
+                while time.perf_counter() < deadline:
+                    path = rng.choice(paths)
+                    started = time.perf_counter()
+                    try:
+                        status, _, body = await conn.request('GET', '/' + path.lstrip('/'))
+                    except Exception as exc:
+                        if started >= stats.started:
+                            stats.record_error(exc)
+                        # Pause avant la reconnexion : pas de boucle serrée contre un serveur saturé
+                        failures += 1
+                        await asyncio.sleep(min(reconnect_delay(failures, rng=rng),
+                                                max(deadline - time.perf_counter(), 0)))
+                        continue
+                    failures = 0
+                    finished = time.perf_counter()
+                    if stats.started <= finished <= deadline:
+                        stats.record(finished - started, status, len(body))
+            finally:
+                await conn.close()
+
+        await asyncio.gather(*(client(i) for i in range(options['clients'])))
+        stats.finished = max(stats.started, min(deadline, time.perf_counter()))
+        return stats
+
+    def print_table(self, report):
+        names = list(report)
+        rows = [
+            ('connexions ouvertes', lambda r: r['connections']['opened']),
+            ('connexions refusées', lambda r: r['connections']['failed']),
+            ('requêtes', lambda r: r['requests']),
+            ('débit (req/s)', lambda r: r['throughput_rps']),
+            ('taux d\'erreur', lambda r: r['error_rate']),
+            ('p50 (ms)', lambda r: r['latency_ms']['p50']),
+            ('p95 (ms)', lambda r: r['latency_ms']['p95']),
+            ('p99 (ms)', lambda r: r['latency_ms']['p99']),
+        ]
+        self.stdout.write(f"{'':<22}" + ''.join(f"{name:>16}" for name in names))
+        for label, getter in rows:
+            self.stdout.write(f"{label:<22}" + ''.join(f"{str(getter(report[n])):>16}" for n in names))
@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wari.benchmark.seed import seeded_test_database
+from wari.benchmark.suite import BUDGETS_PATH, budgets_from_results, load_budgets, run_suite
+
+
+class Command(BaseCommand):
+    """
+    Benchmark des endpoints des routeurs sur une base de test jetable.
+
+    Exemples :
+        python manage.py bench_endpoints                            # tous les scénarios, comparaison aux budgets
+        python manage.py bench_endpoints --match predictions --repeat 50
+        python manage.py bench_endpoints --json report.json         # rapport machine pour le suivi des tendances
+        python manage.py bench_endpoints --update-budgets           # réécrit wari/benchmark/budgets.json
+    """
+    help = "Mesure latences, requêtes SQL et tailles de réponse des endpoints /api/admin/ et /api/client/."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help="Requêtes mesurées par scénario")
+        parser.add_argument('--warmup', type=int, default=2, help="Requêtes de préchauffage par scénario")
+        parser.add_argument('--seed', type=int, default=42, help="Graine du jeu de données")
+        parser.add_argument('--scale', type=float, default=1.0, help="Facteur de volume du jeu de données")
+        parser.add_argument('--match', default=None, help="Ne garde que les scénarios contenant ce texte")
+        parser.add_argument('--json', default=None, help="Chemin du rapport JSON")
+        parser.add_argument('--keepdb', action='store_true', help="Conserve la base de test entre deux exécutions")
+        parser.add_argument('--update-budgets', action='store_true',
+                            help="Réécrit les budgets à partir des mesures au lieu de les vérifier")
+        parser.add_argument('--no-fail', action='store_true', help="Ne termine pas en erreur en cas de dépassement")
+
+    def handle(self, *args, **options):
+        with seeded_test_database(options['seed'], options['scale'], options['keepdb']) as dataset:
+            self.stdout.write("Jeu de données : " + ', '.join(f"{name}={count}" for name, count in dataset.items()))
+            budgets = load_budgets()
+            report = run_suite(
+                repeat=options['repeat'], warmup=options['warmup'], match=options['match'],
+                budgets={} if options['update_budgets'] else budgets, progress=self.print_result,
+            )
+
+        report.update(seed=options['seed'], scale=options['scale'], dataset=dataset)
+        if options['json']:
+            Path(options['json']).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+            self.stdout.write(f"Rapport écrit dans {options['json']}")
+
+        if options['update_budgets']:
+            updated = budgets_from_results(report['scenarios'], budgets.get('defaults', {}))
+            if options['match']:
+                updated['scenarios'] = {**budgets.get('scenarios', {}), **updated['scenarios']}
+            BUDGETS_PATH.write_text(json.dumps(updated, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"{len(report['scenarios'])} budgets écrits dans {BUDGETS_PATH}"))
+            return
+
+        if report['violations']:
+            message = f"{report['violations']} dépassements de budget."
+            if options['no_fail']:
+                self.stdout.write(self.style.WARNING(message))
+            else:
+                raise CommandError(message)
+        else:
+            self.stdout.write(self.style.SUCCESS("Tous les budgets sont respectés."))
+
+    def print_result(self, result):
+        latency = result['latency_ms']
+        line = (f"{result['name']:<70} p50={latency['p50']:>7}ms p95={latency['p95']:>7}ms "
+                f"sql={result['queries']['max']:>3} {result['bytes']:>7}o")
+        if result['violations']:
+            self.stdout.write(self.style.ERROR(f"{line}  ✗ {'; '.join(result['violations'])}"))
+        else:
+            self.stdout.write(line)
@@ -0,0 +1,72 @@
+import json
+import platform
+from pathlib import Path
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from wari.benchmark.seed import seeded_test_database
+from wari.benchmark.serializers import run_serializer_bench
+from wari.benchmark.suite import git_commit
+
+
+class Command(BaseCommand):
+    """
+    Débit de sérialisation des listes client, sérialiseurs DRF contre lecture compilée,
+    sur une base de test jetable.
+
+    Exemples :
+        python manage.py bench_serializers                          # toutes les ressources, pages de 100 lignes
+        python manage.py bench_serializers --match predictions --page-size 20 --repeat 200
+        python manage.py bench_serializers --json serializers.json  # rapport machine pour le suivi des tendances
+    """
+    help = "Mesure le débit (lignes/s) des sérialiseurs DRF et des lectures compilées des listes client."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100, help="Lignes par page sérialisée")
+        parser.add_argument('--repeat', type=int, default=50, help="Pages mesurées par méthode")
+        parser.add_argument('--warmup', type=int, default=3, help="Pages de préchauffage par méthode")
+        parser.add_argument('--seed', type=int, default=42, help="Graine du jeu de données")
+        parser.add_argument('--scale', type=float, default=1.0, help="Facteur de volume du jeu de données")
+        parser.add_argument('--match', default=None, help="Ne garde que les ressources contenant ce texte")
+        parser.add_argument('--json', default=None, help="Chemin du rapport JSON")
+        parser.add_argument('--keepdb', action='store_true', help="Conserve la base de test entre deux exécutions")
+
+    def handle(self, *args, **options):
+        with seeded_test_database(options['seed'], options['scale'], options['keepdb']) as dataset:
+            self.stdout.write("Jeu de données : " + ', '.join(f"{name}={count}" for name, count in dataset.items()))
+            results = run_serializer_bench(
+                page_size=options['page_size'], repeat=options['repeat'], warmup=options['warmup'],
+                match=options['match'], progress=self.print_result,
+            )
+
+        if options['json']:
+            report = {
+                'generated_at': timezone.now().isoformat(),
+                'git_commit': git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'page_size': options['page_size'],
+                'repeat': options['repeat'],
+                'seed': options['seed'],
+                'scale': options['scale'],
+                'dataset': dataset,
+                'resources': results,
+            }
+            Path(options['json']).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+            self.stdout.write(f"Rapport écrit dans {options['json']}")
+
+        different = [result['name'] for result in results if not result['identical']]
+        if different:
+            raise CommandError(f"Sortie compilée différente du sérialiseur DRF : {', '.join(different)}")
+
+    def print_result(self, result):
+        drf, compiled = result['drf'], result['compiled']
+        line = (f"{result['name']:<12} drf={drf['rows_per_second']:>10} lignes/s (sql={drf['queries']:>3}) "
+                f"compilé={compiled['rows_per_second']:>10} lignes/s (sql={compiled['queries']:>3}) "
+                f"x{result['speedup']}")
+        if result['identical']:
+            self.stdout.write(line)
+        else:
+            self.stdout.write(self.style.ERROR(f"{line}  ✗ sortie différente"))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wari.schema import generate_schema, read_manifest, schema_digest, schema_root, write_schema
+
+
+class Command(BaseCommand):
+    """
+    Génère le schéma OpenAPI servi par /api/schema/ (à exécuter à chaque déploiement).
+
+    Exemples :
+        python manage.py build_schema            # écrit schema.yaml, schema.json et manifest.json
+        python manage.py build_schema --check    # erreur si le schéma écrit n'est plus à jour
+    """
+    help = "Écrit le schéma OpenAPI précalculé (YAML et JSON) dans OPENAPI_SCHEMA_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', default=None, help="Répertoire de sortie (défaut : OPENAPI_SCHEMA_ROOT)")
+        parser.add_argument('--check', action='store_true',
+                            help="N'écrit rien ; termine en erreur si le schéma existant diffère du code")
+
+    def handle(self, *args, **options):
+        root = options['root'] or schema_root()
+        rendered = generate_schema()
+        digest = schema_digest(rendered)
+
+        if options['check']:
+            manifest = read_manifest(root)
+            if manifest is None:
+                raise CommandError(f"Aucun schéma généré dans {root}.")
+            if manifest['digest'] != digest:
+                raise CommandError(f"Schéma obsolète dans {root} ({manifest['digest']} au lieu de {digest}).")
+            self.stdout.write(self.style.SUCCESS(f"Schéma à jour ({digest})."))
+            return
+
+        manifest = write_schema(rendered, root)
+        sizes = ', '.join(f"{fmt}={len(content) // 1024} Kio" for fmt, content in rendered.items())
+        self.stdout.write(self.style.SUCCESS(f"Schéma {manifest['digest']} écrit dans {root} ({sizes})."))
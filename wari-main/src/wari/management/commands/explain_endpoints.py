@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from wari.benchmark.plans import Catalog, PLANS_PATH, index_usage, load_plans, plans_from_results, run_plans, unused_indexes
+from wari.benchmark.seed import seeded_test_database
+
+
+class Command(BaseCommand):
+    """
+    Vérifie les plans d'exécution (EXPLAIN) des requêtes des endpoints sur une base de test amorcée.
+
+    Exemples :
+        python manage.py explain_endpoints                      # comparaison à wari/benchmark/plans.json
+        python manage.py explain_endpoints --match results --scale 5
+        python manage.py explain_endpoints --update-plans       # enregistre les index utilisés par scénario
+        python manage.py explain_endpoints --live               # index jamais parcourus sur la base configurée
+    """
+    help = "Contrôle l'utilisation des index par les requêtes des endpoints et signale les index inutilisés."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help="Graine du jeu de données")
+        parser.add_argument('--scale', type=float, default=1.0, help="Facteur de volume du jeu de données")
+        parser.add_argument('--match', default=None, help="Ne garde que les scénarios contenant ce texte")
+        parser.add_argument('--seq-scan-rows', type=int, default=None,
+                            help="Taille de table au-delà de laquelle un parcours séquentiel est refusé")
+        parser.add_argument('--json', default=None, help="Chemin du rapport JSON")
+        parser.add_argument('--keepdb', action='store_true', help="Conserve la base de test entre deux exécutions")
+        parser.add_argument('--update-plans', action='store_true',
+                            help="Réécrit les index attendus à partir des plans observés")
+        parser.add_argument('--no-fail', action='store_true', help="Ne termine pas en erreur en cas de violation")
+        parser.add_argument('--live', action='store_true',
+                            help="Rapport pg_stat_user_indexes de la base configurée, sans base de test")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Les plans d'exécution ne sont analysés que sur PostgreSQL.")
+        if options['live']:
+            usage, stats_reset = index_usage(Catalog())
+            self.print_unused(unused_indexes(usage), stats_reset)
+            return
+
+        plans = load_plans()
+        with seeded_test_database(options['seed'], options['scale'], options['keepdb']) as dataset:
+            self.stdout.write("Jeu de données : " + ', '.join(f"{name}={count}" for name, count in dataset.items()))
+            report = run_plans(
+                Client(), match=options['match'], plans={} if options['update_plans'] else plans,
+                threshold=options['seq_scan_rows'] or plans.get('seq_scan_rows'), progress=self.print_result,
+            )
+
+        report.update(seed=options['seed'], scale=options['scale'], dataset=dataset)
+        if options['json']:
+            Path(options['json']).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+            self.stdout.write(f"Rapport écrit dans {options['json']}")
+
+        if report['unused_declared']:
+            self.stdout.write(self.style.WARNING("Index déclarés utilisés par aucun endpoint :"))
+            for name, entry in report['unused_declared'].items():
+                actual = entry['index'] or 'absent de la base'
+                suffix = '' if actual == name else f" ({actual})"
+                self.stdout.write(f"  {entry['model']:<28} {name}{suffix}")
+        self.print_unused(report['unused_indexes'], None)
+
+        if options['update_plans']:
+            updated = plans_from_results(report['scenarios'], plans)
+            if options['match']:
+                updated['scenarios'] = {**plans.get('scenarios', {}), **updated['scenarios']}
+            PLANS_PATH.write_text(json.dumps(updated, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"{len(report['scenarios'])} plans écrits dans {PLANS_PATH}"))
+            return
+
+        if report['violations']:
+            message = f"{report['violations']} violations de plan."
+            if options['no_fail']:
+                self.stdout.write(self.style.WARNING(message))
+            else:
+                raise CommandError(message)
+        else:
+            self.stdout.write(self.style.SUCCESS("Tous les plans sont conformes."))
+
+    def print_result(self, result):
+        scans = ', '.join(f"{table}({scan['kept']}/{scan['rows']})"
+                          for table, scan in result['seq_scans'].items()) or '-'
+        line = f"{result['name']:<70} index={','.join(result['indexes']) or '-'} seq={scans}"
+        if result['violations']:
+            self.stdout.write(self.style.ERROR(f"{line}  ✗ {'; '.join(result['violations'])}"))
+        else:
+            self.stdout.write(line)
+
+    def print_unused(self, unused, stats_reset):
+        since = f" depuis {stats_reset:%Y-%m-%d %H:%M}" if stats_reset else ''
+        if not unused:
+            self.stdout.write(self.style.SUCCESS(f"Aucun index non unique inutilisé{since}."))
+            return
+        self.stdout.write(self.style.WARNING(f"Index jamais parcourus (pg_stat_user_indexes){since} :"))
+        for name, entry in unused.items():
+            self.stdout.write(f"  {entry['table']:<32} {name:<40} {entry['bytes'] // 1024:>8} Kio")
@@ -0,0 +1,117 @@
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from wari.httpbench import raise_open_files_limit
+from wari.loadtest import DEFAULT_PROFILE, LoadProfile, LoadRunner
+
+LOCAL_HOSTS = {'127.0.0.1', 'localhost', '::1'}
+
+
+class Command(BaseCommand):
+    """
+    Rejoue le trafic d'un soir de tirage contre un serveur de développement.
+
+    Exemple (base de développement remplie par le jeu de données de benchmark) :
+        python manage.py loadtest --prepare --scale 20
+        gunicorn wari.wsgi -w 4 -b 127.0.0.1:8000
+        python manage.py loadtest --base-url http://127.0.0.1:8000 --rate-scale 0.5 --json drawday.json
+    """
+    help = "Génère une charge réaliste (soir de tirage) et rapporte débit, histogrammes de latence et erreurs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help="Racine du serveur cible")
+        parser.add_argument('--profile', default=str(DEFAULT_PROFILE), help="Profil JSON (étapes, scénarios, chemins)")
+        parser.add_argument('--rate-scale', type=float, default=1.0, help="Multiplie les débits du profil")
+        parser.add_argument('--time-scale', type=float, default=1.0,
+                            help="Multiplie les durées du profil (ex. 0.1 pour un essai rapide)")
+        parser.add_argument('--concurrency', type=int, default=200, help="Connexions HTTP simultanées au plus")
+        parser.add_argument('--max-pending', type=int, default=None,
+                            help="Arrivées en attente d'une connexion avant abandon (défaut : 10 x concurrency)")
+        parser.add_argument('--timeout', type=float, default=30.0, help="Délai maximal par requête")
+        parser.add_argument('--seed', type=int, default=42, help="Graine des arrivées et des scénarios")
+        parser.add_argument('--allow-remote', action='store_true',
+                            help="Autorise une cible non locale (le profil par défaut écrit des pronostics)")
+        parser.add_argument('--prepare', action='store_true',
+                            help="Remplit la base configurée avec le jeu de données de benchmark puis s'arrête")
+        parser.add_argument('--scale', type=float, default=10.0, help="Volume du jeu de données (avec --prepare)")
+        parser.add_argument('--json', dest='json_output', help="Écrit le rapport JSON dans ce fichier")
+
+    def handle(self, *args, **options):
+        if options['prepare']:
+            return self.prepare(options)
+
+        host = urlsplit(options['base_url']).hostname
+        if host not in LOCAL_HOSTS and not options['allow_remote']:
+            raise CommandError(f"Cible non locale ({host}) : ajoutez --allow-remote pour confirmer.")
+        try:
+            profile = LoadProfile.load(options['profile'], rate_scale=options['rate_scale'],
+                                       time_scale=options['time_scale'])
+        except (OSError, KeyError, ValueError) as exc:
+            raise CommandError(f"Profil invalide {options['profile']} : {exc}")
+
+        limit = raise_open_files_limit(options['concurrency'] + 256)
+        if limit is not None and limit < options['concurrency'] + 16:
+            self.stderr.write(f"Limite de descripteurs ({limit}) inférieure à la concurrence demandée.")
+
+        runner = LoadRunner(
+            options['base_url'], profile, concurrency=options['concurrency'], max_pending=options['max_pending'],
+            timeout=options['timeout'], seed=options['seed'],
+            progress=lambda stage: self.stdout.write(
+                f"  {stage['label']} : {stage['duration']:.0f}s vers {stage['rate']:.0f} req/s"),
+        )
+        self.stdout.write(f"[{profile.name}] {profile.duration:.0f}s sur {options['base_url']}, "
+                          f"{options['concurrency']} connexions au plus")
+        try:
+            report = asyncio.run(runner.run())
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Cible injoignable ou vide : {exc}")
+
+        self.print_report(report)
+        if options['json_output']:
+            with open(options['json_output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+
+    def prepare(self, options):
+        # Import local : le module de seed importe les modèles de toutes les applications
+        from users.models import CustomUser
+        from wari.benchmark.seed import seed_dataset
+
+        if CustomUser.objects.filter(username='bench-admin').exists():
+            raise CommandError("Jeu de données de benchmark déjà présent dans la base configurée.")
+        counts = seed_dataset(seed=options['seed'], scale=options['scale'])
+        for model, count in counts.items():
+            self.stdout.write(f"  {model:<24}{count:>10}")
+
+    def print_report(self, report):
+        columns = [
+            ('requêtes', lambda r: r['requests']),
+            ('req/s', lambda r: r['throughput_rps']),
+            ('erreurs', lambda r: r['error_rate']),
+            ('p50 (ms)', lambda r: r['latency_ms']['p50']),
+            ('p95 (ms)', lambda r: r['latency_ms']['p95']),
+            ('p99 (ms)', lambda r: r['latency_ms']['p99']),
+            ('max (ms)', lambda r: r['latency_ms']['max']),
+        ]
+        rows = {**report['scenarios'], 'total': report['total']}
+        self.stdout.write(f"\n{'':<18}" + ''.join(f"{label:>12}" for label, _ in columns))
+        for name, row in rows.items():
+            self.stdout.write(f"{name:<18}" + ''.join(f"{str(getter(row)):>12}" for _, getter in columns))
+
+        statuses = ', '.join(f"{status}: {count}" for status, count in report['total']['statuses'].items())
+        errors = ', '.join(f"{name}: {count}" for name, count in report['total']['errors'].items())
+        self.stdout.write(f"\nStatuts : {statuses or '-'}")
+        self.stdout.write(f"Erreurs client : {errors or '-'}")
+
+        self.stdout.write("\nHistogramme des latences (total)")
+        total = report['total']['requests'] or 1
+        for bucket, count in report['total']['histogram'].items():
+            self.stdout.write(f"  {bucket:>10} {count:>8} {'#' * round(40 * count / total)}")
+
+        self.stdout.write(f"\n{'t (s)':>6}{'cible':>8}{'req/s':>8}{'erreurs':>9}{'p50':>9}{'p95':>9}")
+        for window in report['timeline']:
+            self.stdout.write(
+                f"{window['start_s']:>6}{window['target_rps']:>8}{window['throughput_rps']:>8}"
+                f"{window['error_rate']:>9}{str(window['p50_ms']):>9}{str(window['p95_ms']):>9}")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from wari.partitioning import maintain_partitions
+from wari.tasks import schedule_partition_maintenance
+
+
+class Command(BaseCommand):
+    """
+    Maintenance des partitions mensuelles des résultats et pronostics.
+
+    Exemples :
+        python manage.py maintain_partitions              # une passe immédiate
+        python manage.py maintain_partitions --schedule   # active la tâche quotidienne (runjobs)
+    """
+    help = "Crée les partitions à venir et archive les partitions au-delà de la rétention."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schedule', action='store_true',
+                            help="Met en file la tâche quotidienne au lieu d'exécuter une passe")
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            job = schedule_partition_maintenance()
+            self.stdout.write(f"Maintenance planifiée (tâche #{job.id}, {job.run_at.isoformat()}).")
+            return
+        for label, report in maintain_partitions().items():
+            self.stdout.write(
+                f"{label} : {len(report['created'])} créées ({', '.join(report['created']) or '-'}), "
+                f"{len(report['archived'])} archivées ({', '.join(report['archived']) or '-'})"
+            )
+            if report['default_rows']:
+                self.stderr.write(f"{label} : lignes dans la partition par défaut (maintenance en retard)")
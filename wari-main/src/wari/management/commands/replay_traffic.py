@@ -0,0 +1,121 @@
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from wari.httpbench import raise_open_files_limit
+from wari.replay import TrafficReplayer, compare, recorded_summary, regressions
+from wari.traffic import read_records
+
+LOCAL_HOSTS = {'127.0.0.1', 'localhost', '::1'}
+
+
+class Command(BaseCommand):
+    """
+    Rejoue le trafic enregistré (TRAFFIC_RECORD_ENABLED) contre un autre build et compare par endpoint.
+
+    Exemple (build candidat avec en-têtes de mesure, base remplie par le jeu de benchmark) :
+        TRAFFIC_TIMING_HEADERS=1 gunicorn wari.wsgi -w 4 -b 127.0.0.1:8000
+        python manage.py replay_traffic traffic/ --speed 2 --json main.json
+        python manage.py replay_traffic traffic/ --speed 2 --baseline main.json --max-p95-increase 20
+    """
+    help = "Rejoue le trafic enregistré et compare latences et requêtes SQL par endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('sources', nargs='*', help="Fichiers ou répertoires de trafic (défaut : TRAFFIC_RECORD_ROOT)")
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help="Racine du build cible")
+        parser.add_argument('--speed', type=float, default=1.0,
+                            help="Facteur de cadence (2 : deux fois plus vite ; 0 : sans attente)")
+        parser.add_argument('--concurrency', type=int, default=50, help="Connexions HTTP simultanées au plus")
+        parser.add_argument('--timeout', type=float, default=30.0, help="Délai maximal par requête")
+        parser.add_argument('--endpoint', action='append', default=None,
+                            help="Ne rejoue que les endpoints contenant ce texte, répétable (ex. client-result)")
+        parser.add_argument('--limit', type=int, default=None, help="Nombre maximal de requêtes rejouées")
+        parser.add_argument('--account', action='append', default=[],
+                            help="rôle=utilisateur:mot_de_passe, répétable (défaut : comptes de benchmark)")
+        parser.add_argument('--baseline', help="Rapport JSON d'un rejeu précédent (sinon : l'enregistrement)")
+        parser.add_argument('--max-p95-increase', type=float, default=None,
+                            help="Échoue si le p95 d'un endpoint augmente de plus de ce pourcentage")
+        parser.add_argument('--max-query-increase', type=float, default=None,
+                            help="Échoue si les requêtes SQL moyennes d'un endpoint augmentent de plus de ce nombre")
+        parser.add_argument('--min-count', type=int, default=20, help="Mesures minimales pour juger un p95")
+        parser.add_argument('--allow-remote', action='store_true', help="Autorise une cible non locale")
+        parser.add_argument('--json', dest='json_output', help="Écrit le rapport JSON dans ce fichier")
+
+    def handle(self, *args, **options):
+        host = urlsplit(options['base_url']).hostname
+        if host not in LOCAL_HOSTS and not options['allow_remote']:
+            raise CommandError(f"Cible non locale ({host}) : ajoutez --allow-remote pour confirmer.")
+        accounts = {}
+        for spec in options['account']:
+            role, sep, credentials = spec.partition('=')
+            username, sep2, password = credentials.partition(':')
+            if not sep or not sep2 or not username:
+                raise CommandError(f"Compte invalide '{spec}' : format attendu rôle=utilisateur:mot_de_passe")
+            accounts[role] = (username, password)
+
+        try:
+            records = read_records(options['sources'] or [settings.TRAFFIC_RECORD_ROOT])
+        except OSError as exc:
+            raise CommandError(f"Trafic enregistré illisible : {exc}")
+        if options['endpoint']:
+            records = [r for r in records if any(text in r['endpoint'] for text in options['endpoint'])]
+        records = records[:options['limit']] if options['limit'] else records
+        if not records:
+            raise CommandError("Aucune requête enregistrée à rejouer.")
+
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as fh:
+                    baseline, label = json.load(fh)['endpoints'], options['baseline']
+            except (OSError, KeyError, ValueError) as exc:
+                raise CommandError(f"Rapport de référence illisible {options['baseline']} : {exc}")
+        else:
+            baseline, label = recorded_summary(records), 'enregistrement'
+
+        limit = raise_open_files_limit(options['concurrency'] + 256)
+        if limit is not None and limit < options['concurrency'] + 16:
+            self.stderr.write(f"Limite de descripteurs ({limit}) inférieure à la concurrence demandée.")
+
+        span = records[-1]['ts'] - records[0]['ts']
+        self.stdout.write(f"{len(records)} requêtes enregistrées sur {span:.0f}s, rejouées vers {options['base_url']} "
+                          f"(vitesse {options['speed'] or 'maximale'})")
+        replayer = TrafficReplayer(
+            options['base_url'], records, speed=options['speed'], concurrency=options['concurrency'],
+            timeout=options['timeout'], accounts=accounts,
+            progress=lambda done, total: self.stdout.write(f"  {done}/{total}"),
+        )
+        report = asyncio.run(replayer.run())
+
+        report['baseline'] = label
+        report['diff'] = compare(baseline, report['endpoints'])
+        self.print_report(report)
+        if options['json_output']:
+            with open(options['json_output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+
+        found = regressions(report['diff'], options['max_p95_increase'], options['max_query_increase'],
+                            options['min_count'])
+        if found:
+            raise CommandError("Régressions par rapport à %s :\n  %s" % (label, '\n  '.join(found)))
+
+    def print_report(self, report):
+        self.stdout.write(f"\nRéférence : {report['baseline']}")
+        self.stdout.write(f"{'endpoint':<40}{'n':>7}{'p95 avant':>11}{'p95 après':>11}{'écart':>9}"
+                          f"{'SQL avant':>11}{'SQL après':>11}")
+        for key, row in report['diff'].items():
+            change = f"{row['p95_change_pct']:+}%" if row['p95_change_pct'] is not None else '-'
+            self.stdout.write(
+                f"{key[:39]:<40}{row['count']:>7}{str(row['p95_before_ms']):>11}{str(row['p95_after_ms']):>11}"
+                f"{change:>9}{str(row['queries_before']):>11}{str(row['queries_after']):>11}")
+
+        self.stdout.write(f"\n{report['replayed']} requêtes rejouées en {report['elapsed_s']}s "
+                          f"({report['throughput_rps']} req/s)")
+        for label, key in (('Ignorées', 'skipped'), ('Erreurs client', 'errors'), ('Statuts différents', 'status_mismatches')):
+            values = ', '.join(f"{name}: {count}" for name, count in report[key].items())
+            self.stdout.write(f"{label} : {values or '-'}")
+        if report['latency_source'].get('client'):
+            self.stderr.write("Server-Timing absent sur une partie des réponses : latences mesurées côté client "
+                              "(activer TRAFFIC_TIMING_HEADERS sur le build cible).")
@@ -0,0 +1,40 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from wari.publication import run_once, run_scheduler
+
+
+class Command(BaseCommand):
+    """
+    Planificateur de publication des programmes et pronostics.
+
+    Exemples :
+        python manage.py run_publication_scheduler            # boucle continue
+        python manage.py run_publication_scheduler --once     # une passe (cron)
+    """
+    help = "Publie et dépublie les programmes et pronostics à leurs échéances (publish_at / unpublish_at)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Effectue une seule passe puis s'arrête")
+        parser.add_argument('--max-sleep', type=float, default=60.0,
+                            help="Attente maximale entre deux passes sans notification (secondes)")
+
+    def handle(self, *args, **options):
+        if options['once']:
+            upcoming = run_once()
+            self.stdout.write(f"Prochaine échéance : {upcoming.isoformat() if upcoming else 'aucune'}")
+            return
+
+        stop_event = threading.Event()
+
+        def stop(*args):
+            stop_event.set()
+            raise KeyboardInterrupt
+
+        signal.signal(signal.SIGTERM, stop)
+        try:
+            run_scheduler(stop_event, max_sleep=options['max_sleep'])
+        except KeyboardInterrupt:
+            self.stdout.write("Planificateur arrêté.")
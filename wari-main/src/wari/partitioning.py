@@ -0,0 +1,466 @@
+"""
+Partitionnement mensuel (PostgreSQL, RANGE) des résultats et des pronostics.
+
+Conversion en ligne d'une table existante (`convert_to_partitioned`) :
+1. Index unique (id, clé) et contrainte de borne CHECK construits sans bloquer
+   les écritures (CREATE INDEX CONCURRENTLY, NOT VALID puis VALIDATE).
+2. Bascule dans une transaction courte : la table devient `<table>_legacy`, une
+   table partitionnée reprend son nom, ses index et ses contraintes, puis
+   l'ancienne table est attachée comme partition [MINVALUE, mois suivant).
+   Les index existants sont réutilisés et la contrainte validée évite tout
+   parcours de la table : le verrou exclusif ne dure que le temps du catalogue.
+
+La clé primaire devient (id, clé de partition) et `id` est alimenté par une
+séquence (les colonnes IDENTITY ne sont pas admises sur une table partitionnée
+avant PostgreSQL 17). Pour l'ORM, `id` reste la clé primaire.
+
+Les requêtes filtrant ou triant sur la clé (`-result_date`, `-predicted_at`,
+intervalles de dates) ne lisent que les partitions concernées ; la contrainte
+`unique_result_per_game_date` contient la clé et reste donc garantie.
+
+Maintenance (`maintain_partitions`, tâche quotidienne `wari.maintain_partitions`) :
+- Crée les partitions des PARTITION_PREMAKE_MONTHS prochains mois
+- Partition DEFAULT (`<table>_default`) : si la maintenance prend du retard, les
+  écritures hors des partitions mensuelles y sont reçues au lieu d'échouer ; ses lignes
+  sont déplacées dans la partition du mois à sa création, et une erreur est journalisée
+  tant qu'elle n'est pas vide
+- Détache les partitions plus anciennes que PARTITION_RETENTION_MONTHS et les déplace
+  dans le schéma d'archive : DETACH simple (DETACH ... CONCURRENTLY est refusé quand la
+  table a une partition DEFAULT), verrou bref sur un mois qui ne reçoit plus d'écritures
+- Partition historique de la conversion [MINVALUE, ...) : ses lignes au-delà de la
+  rétention sont archivées mois par mois (une table `<table>_pAAAA_MM` par mois dans le
+  schéma d'archive) ; une fois vide et hors rétention, elle est détachée comme les autres
+
+Index (`AddIndexConcurrentlyPartitioned`, `RemoveIndexConcurrentlyPartitioned`) :
+CREATE/DROP INDEX CONCURRENTLY sont refusés sur une table partitionnée. L'index
+parent est créé sur la seule table parente (ON ONLY, invalide), chaque partition
+est indexée sans bloquer les écritures puis son index attaché ; le parent devient
+valide quand toutes les partitions sont couvertes.
+"""
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+import logging
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+# Modèle -> colonne de partitionnement
+PARTITIONED_MODELS = {
+    'results.Result': 'result_date',
+    'predictions.Prediction': 'predicted_at',
+}
+
+BOUND_PATTERN = re.compile(r"FROM \((?P<lower>[^)]*)\) TO \((?P<upper>[^)]*)\)")
+KEY_PATTERN = re.compile(r"RANGE \((?P<column>\w+)\)")
+
+
+# 1. Outils de dates
+
+def month_start(value):
+    """Premier jour du mois (UTC) contenant `value`."""
+    value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def parse_bound(text):
+    """Borne d'une partition ('MINVALUE', 'MAXVALUE' ou horodatage) en datetime ou None."""
+    text = text.strip()
+    if text in ('MINVALUE', 'MAXVALUE'):
+        return None
+    return datetime.fromisoformat(text.strip("'"))
+
+
+def legacy_name(name, suffix='_legacy'):
+    """Nom renommé d'un objet de l'ancienne table (63 caractères au plus)."""
+    return f"{name[:63 - len(suffix)]}{suffix}"
+
+
+# 2. Inspection
+
+def is_partitioned(table, using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def list_partitions(table, using=DEFAULT_DB_ALIAS):
+    """Partitions d'une table : [(nom, borne basse, borne haute, détachement en attente)], par borne haute."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), i.inhdetachpending "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [table],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound, pending in rows:
+        match = BOUND_PATTERN.search(bound or '')
+        if match:
+            partitions.append((name, parse_bound(match['lower']), parse_bound(match['upper']), pending))
+    far_future = datetime.max.replace(tzinfo=dt_timezone.utc)
+    return sorted(partitions, key=lambda partition: partition[2] or far_future)
+
+
+def default_partition(table, using=DEFAULT_DB_ALIAS):
+    """Nom de la partition DEFAULT de `table`, ou None."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'",
+            [table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def partition_column(table, using=DEFAULT_DB_ALIAS):
+    """Colonne de partitionnement (RANGE) de `table`."""
+    with connections[using].cursor() as cursor:
+        cursor.execute("SELECT pg_get_partkeydef(%s::regclass)", [table])
+        return KEY_PATTERN.search(cursor.fetchone()[0])['column']
+
+
+def move_rows(cursor, source, target, column, start, end):
+    """Déplace (DELETE ... RETURNING puis INSERT) les lignes de [start, end) ; retourne leur nombre."""
+    qn = cursor.db.ops.quote_name
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {source} WHERE {qn(column)} >= %s AND {qn(column)} < %s RETURNING *) "
+        f"INSERT INTO {target} SELECT * FROM moved",
+        [start, end],
+    )
+    return cursor.rowcount
+
+
+# 3. Conversion en ligne
+
+def convert_to_partitioned(table, column, using=DEFAULT_DB_ALIAS, months_ahead=None):
+    """
+    Convertit `table` en table partitionnée par mois sur `column` (voir l'en-tête du module).
+    - Idempotent : sans effet si la table est déjà partitionnée
+    - À appeler hors transaction (migration non atomique) pour les étapes CONCURRENTLY
+    """
+    connection = connections[using]
+    if is_partitioned(table, using):
+        return False
+    qn = connection.ops.quote_name
+    legacy = legacy_name(table)
+    pk_index = legacy_name(table, '_legacy_pkey')
+    bound_check = legacy_name(table, '_legacy_bound')
+    sequence = f"{table}_id_seq"
+
+    with connection.cursor() as cursor:
+        # 1. Borne haute de l'ancienne table : début du mois suivant la dernière ligne (ou maintenant)
+        cursor.execute(f"SELECT max({qn(column)}) FROM {qn(table)}")
+        latest = cursor.fetchone()[0]
+        boundary = add_months(month_start(max(filter(None, [latest, timezone.now()]))), 1)
+
+        # 2. Index de la future clé primaire, construit sans bloquer les écritures
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {qn(pk_index)}")
+        cursor.execute(f"CREATE UNIQUE INDEX CONCURRENTLY {qn(pk_index)} ON {qn(table)} (id, {qn(column)})")
+
+        # 3. Contrainte de borne : ajout NOT VALID instantané, validation sans bloquer les écritures
+        cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT IF EXISTS {qn(bound_check)}")
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(bound_check)} "
+            f"CHECK ({qn(column)} IS NOT NULL AND {qn(column)} < '{boundary.isoformat()}'::timestamptz) NOT VALID"
+        )
+        cursor.execute(f"ALTER TABLE {qn(table)} VALIDATE CONSTRAINT {qn(bound_check)}")
+
+    # 4. Bascule : uniquement des opérations de catalogue sous verrou exclusif
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE")
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('u', 'f') ORDER BY contype DESC, conname",
+            [table],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid "
+            "WHERE x.indrelid = %s::regclass AND i.relname <> %s AND NOT EXISTS ("
+            "  SELECT 1 FROM pg_constraint c WHERE c.conrelid = x.indrelid AND c.conindid = x.indexrelid"
+            ") ORDER BY i.relname",
+            [table, pk_index],
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'", [table]
+        )
+        primary_key = cursor.fetchone()[0]
+
+        # Identifiants : séquence possédée par la colonne, reprise après le plus grand id
+        cursor.execute(f"SELECT coalesce(max(id), 0) + 1 FROM {qn(table)}")
+        next_id = cursor.fetchone()[0]
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id DROP IDENTITY IF EXISTS")
+        cursor.execute(f"CREATE SEQUENCE IF NOT EXISTS {qn(sequence)} AS bigint")
+        cursor.execute("SELECT setval(%s, %s, false)", [sequence, next_id])
+        cursor.execute(f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}'::regclass)")
+
+        # Ancienne table : clé primaire (id, clé) et noms libérés pour la table partitionnée
+        cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(primary_key)}")
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(pk_index)} PRIMARY KEY USING INDEX {qn(pk_index)}")
+        for name, definition in constraints:
+            if definition.startswith('UNIQUE'):
+                cursor.execute(f"ALTER TABLE {qn(table)} RENAME CONSTRAINT {qn(name)} TO {qn(legacy_name(name))}")
+        for name, _ in indexes:
+            cursor.execute(f"ALTER INDEX {qn(name)} RENAME TO {qn(legacy_name(name))}")
+        cursor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+
+        # Table partitionnée : mêmes colonnes, contraintes et index (instantané, elle est vide)
+        cursor.execute(
+            f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+            f"INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE ({qn(column)})"
+        )
+        cursor.execute(f"ALTER TABLE {qn(table)} DROP CONSTRAINT {qn(bound_check)}")
+        cursor.execute(f"ALTER SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.id")
+        cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(primary_key)} PRIMARY KEY (id, {qn(column)})")
+        for name, definition in constraints:
+            cursor.execute(f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}")
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+        # Rattachement : index et clés étrangères existants réutilisés, borne prouvée par la contrainte validée
+        cursor.execute(
+            f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(legacy)} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+        )
+        cursor.execute(f"ALTER TABLE {qn(legacy)} DROP CONSTRAINT {qn(bound_check)}")
+
+    ensure_partitions(table, months_ahead=months_ahead, using=using)
+    logger.info("Table %s partitionnée par mois sur %s (historique jusqu'au %s)", table, column, boundary.date())
+    return True
+
+
+# 4. Maintenance
+
+def ensure_default_partition(table, using=DEFAULT_DB_ALIAS):
+    """Crée la partition DEFAULT de `table` si besoin (vide : création instantanée) ; retourne son nom."""
+    name = default_partition(table, using)
+    if name is None:
+        qn = connections[using].ops.quote_name
+        name = f"{table}_default"
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {qn(name)} PARTITION OF {qn(table)} DEFAULT")
+        logger.info("%s : partition par défaut %s créée", table, name)
+    return name
+
+
+def ensure_partitions(table, months_ahead=None, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Crée la partition DEFAULT et les partitions mensuelles manquantes jusqu'à `months_ahead`
+    mois après le mois courant.
+    - Table créée à part puis attachée : verrou SHARE UPDATE EXCLUSIVE, lectures et écritures non bloquées
+      (la partition DEFAULT, vide en temps normal, est parcourue sous verrou le temps du rattachement)
+    - Lignes reçues par la partition DEFAULT dans l'intervalle : déplacées avant le rattachement
+    """
+    if months_ahead is None:
+        months_ahead = getattr(settings, 'PARTITION_PREMAKE_MONTHS', 3)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    default = ensure_default_partition(table, using)
+    column = partition_column(table, using)
+    partitions = list_partitions(table, using)
+    horizon = add_months(month_start(now or timezone.now()), months_ahead + 1)
+    start = partitions[-1][2] if partitions else month_start(now or timezone.now())
+    created = []
+    while start is not None and start < horizon:
+        end = add_months(start, 1)
+        name = f"{table}_p{start:%Y_%m}"
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+            )
+            moved = move_rows(cursor, qn(default), qn(name), column, start, end)
+            if moved:
+                logger.warning("%s : %s lignes de la partition par défaut déplacées dans %s", table, moved, name)
+            cursor.execute(
+                f"ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        created.append(name)
+        start = end
+    if created:
+        logger.info("%s : partitions créées %s", table, ', '.join(created))
+    return created
+
+
+def check_default_partition(table, using=DEFAULT_DB_ALIAS):
+    """Alerte si la partition DEFAULT contient des lignes (maintenance en retard ou dates hors plage)."""
+    name = default_partition(table, using)
+    if name is None:
+        return False
+    with connections[using].cursor() as cursor:
+        cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {connections[using].ops.quote_name(name)})")
+        filled = cursor.fetchone()[0]
+    if filled:
+        logger.error("%s : lignes hors des partitions mensuelles dans %s (maintenance des partitions en retard ?)",
+                     table, name)
+    return filled
+
+
+def archive_legacy_months(table, partition, cutoff, schema, tablespace=None, using=DEFAULT_DB_ALIAS):
+    """
+    Archive mois par mois les lignes de la partition historique antérieures à `cutoff`
+    (une transaction et une table d'archive `<table>_pAAAA_MM` par mois).
+    - Déplacement de lignes (verrous de ligne) : la partition reste attachée, lectures et écritures non bloquées
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    column = partition_column(table, using)
+    archived = []
+    while True:
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            # Mois le plus ancien restant (les mois vides sont sautés)
+            cursor.execute(f"SELECT min({qn(column)}) FROM {qn(partition)} WHERE {qn(column)} < %s", [cutoff])
+            oldest = cursor.fetchone()[0]
+            if oldest is None:
+                break
+            month = month_start(oldest)
+            name = f"{table}_p{month:%Y_%m}"
+            target = f"{qn(schema)}.{qn(name)}"
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {target} (LIKE {qn(partition)} INCLUDING ALL)")
+            if tablespace:
+                cursor.execute(f"ALTER TABLE {target} SET TABLESPACE {qn(tablespace)}")
+            move_rows(cursor, qn(partition), target, column, month, min(add_months(month, 1), cutoff))
+        archived.append(name)
+    return archived
+
+
+def archive_partitions(table, retention_months, now=None, using=DEFAULT_DB_ALIAS):
+    """
+    Détache les partitions entièrement antérieures à la rétention et les range dans le schéma d'archive.
+    - DETACH simple, une transaction par partition : CONCURRENTLY est incompatible avec la
+      partition DEFAULT ; le verrou ACCESS EXCLUSIVE ne dure que le temps du catalogue
+      (la partition est hors rétention, elle ne reçoit plus d'écritures)
+    - Un détachement CONCURRENTLY interrompu (versions précédentes) est finalisé
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    schema = getattr(settings, 'PARTITION_ARCHIVE_SCHEMA', 'archive')
+    tablespace = getattr(settings, 'PARTITION_ARCHIVE_TABLESPACE', None)
+    cutoff = add_months(month_start(now or timezone.now()), -retention_months)
+    archived = []
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {qn(schema)}")
+        for name, lower, upper, pending in list_partitions(table, using):
+            if lower is None and upper is not None and upper > cutoff:
+                # Partition historique encore dans la rétention : ses mois les plus anciens seulement
+                archived += archive_legacy_months(table, name, cutoff, schema, tablespace, using)
+                continue
+            if upper is None or upper > cutoff:
+                continue
+            with transaction.atomic(using=using):
+                mode = ' FINALIZE' if pending else ''
+                cursor.execute(f"ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}{mode}")
+                cursor.execute(f"ALTER TABLE {qn(name)} SET SCHEMA {qn(schema)}")
+                if tablespace:
+                    cursor.execute(f"ALTER TABLE {qn(schema)}.{qn(name)} SET TABLESPACE {qn(tablespace)}")
+            archived.append(name)
+    if archived:
+        logger.info("%s : partitions archivées dans %s : %s", table, schema, ', '.join(archived))
+    return archived
+
+
+def maintain_partitions(now=None, using=DEFAULT_DB_ALIAS):
+    """Crée les partitions à venir et archive les anciennes pour chaque modèle partitionné."""
+    if connections[using].vendor != 'postgresql':
+        return {}
+    retention = getattr(settings, 'PARTITION_RETENTION_MONTHS', {})
+    report = {}
+    for label in PARTITIONED_MODELS:
+        table = apps.get_model(label)._meta.db_table
+        if not is_partitioned(table, using):
+            continue
+        report[label] = {'created': ensure_partitions(table, now=now, using=using), 'archived': []}
+        # Alerte avant l'archivage : un échec de celui-ci ne la masque pas
+        report[label]['default_rows'] = check_default_partition(table, using)
+        if retention.get(label):
+            report[label]['archived'] = archive_partitions(table, retention[label], now=now, using=using)
+    return report
+
+
+# 5. Index des tables partitionnées
+
+def create_partitioned_index(model, index, schema_editor):
+    """Crée `index` sur une table partitionnée sans bloquer les écritures sur les partitions."""
+    table = model._meta.db_table
+    qn = schema_editor.quote_name
+    alias = schema_editor.connection.alias
+    parent = index.create_sql(model, schema_editor)
+    schema_editor.execute(str(parent).replace(f" ON {qn(table)} ", f" ON ONLY {qn(table)} ", 1))
+    partitions = [partition for partition, *_ in list_partitions(table, alias)]
+    default = default_partition(table, alias)
+    for partition in partitions + ([default] if default else []):
+        name = legacy_name(index.name, '_' + partition[len(table) + 1:])
+        statement = index.create_sql(model, schema_editor, concurrently=True)
+        statement.rename_table_references(table, partition)
+        statement.parts['name'] = qn(name)
+        # Une construction interrompue laisse un index invalide du même nom
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {qn(name)}")
+        schema_editor.execute(statement)
+        schema_editor.execute(f"ALTER INDEX {qn(index.name)} ATTACH PARTITION {qn(name)}")
+
+
+def drop_partitioned_index(model, index, schema_editor):
+    """Supprime un index partitionné (DROP INDEX simple : verrou bref sur chaque partition)."""
+    schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(index.name)}")
+
+
+def partitioned(schema_editor, model):
+    return schema_editor.connection.vendor == 'postgresql' and is_partitioned(
+        model._meta.db_table, schema_editor.connection.alias
+    )
+
+
+class AddIndexConcurrentlyPartitioned(AddIndexConcurrently):
+    """AddIndexConcurrently valable aussi pour une table partitionnée (index construit partition par partition)."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not partitioned(schema_editor, model):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        self._ensure_not_in_transaction(schema_editor)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            create_partitioned_index(model, self.index, schema_editor)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not partitioned(schema_editor, model):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            drop_partitioned_index(model, self.index, schema_editor)
+
+
+class RemoveIndexConcurrentlyPartitioned(RemoveIndexConcurrently):
+    """RemoveIndexConcurrently valable aussi pour une table partitionnée."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not partitioned(schema_editor, model):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            index = from_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+            drop_partitioned_index(model, index, schema_editor)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not partitioned(schema_editor, model):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        self._ensure_not_in_transaction(schema_editor)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            index = to_state.models[app_label, self.model_name_lower].get_index_by_name(self.name)
+            create_partitioned_index(model, index, schema_editor)
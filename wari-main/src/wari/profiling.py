@@ -0,0 +1,364 @@
+"""
+Profilage à la demande d'une requête (personnel uniquement) : CPU et mémoire.
+
+Déclenché par l'en-tête `X-Profile: 1` ou le paramètre `?profile=1`, et honoré
+seulement pour un utilisateur `is_staff` (session ou jeton JWT) :
+- CPU : échantillonnage de la pile du thread de la requête toutes les
+  PROFILING_INTERVAL secondes (vue, filtres, sérialiseur, rendu compris), piles
+  agrégées au format « folded » (flamegraph.pl, speedscope)
+- Mémoire : tracemalloc pendant la requête ; instantané des allocations encore
+  vivantes en fin de requête (`tracemalloc.Snapshot.load`), pic et principales lignes
+- Un seul profil à la fois (tracemalloc est global au processus) : une requête
+  demandée pendant un autre profil est servie normalement (`X-Profile: busy`)
+
+Profils écrits sous PROFILING_ROOT (un répertoire par profil), bornés en nombre
+(PROFILING_MAX_PROFILES) et en taille (PROFILING_MAX_BYTES) ; les plus anciens sont
+supprimés. Liste et téléchargement : /admin/profiles/.
+
+Requêtes non profilées : une lecture d'en-tête et une recherche dans la chaîne de
+requête, sans authentification supplémentaire.
+"""
+import json
+import logging
+import re
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+PROFILE_META = 'HTTP_X_PROFILE'
+PROFILE_PARAM = 'profile'
+_VALID_PROFILE_ID = re.compile(r'^\d{8}-\d{6}-[0-9a-f]{8}$')
+ARTIFACTS = {
+    'cpu.folded': 'text/plain; charset=utf-8',
+    'memory.json': 'application/json',
+    'memory.tracemalloc': 'application/octet-stream',
+}
+
+_profiling_lock = threading.Lock()  # Un profil à la fois dans le processus
+
+
+# 1. Échantillonnage CPU
+
+class StackSampler(threading.Thread):
+    """
+    Relève la pile d'un thread à intervalle fixe ; piles comptées de la racine à la feuille.
+    - `thread_id=None` : tous les threads du processus, la racine de chaque pile étant le nom du thread
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='wari-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self.stopped.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is not None:
+                frames = {self.thread_id: frames.get(self.thread_id)}
+            sampled = False
+            for thread_id, frame in frames.items():
+                if thread_id == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    if code.co_filename != __file__:  # Cadres du profileur exclus
+                        stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                if self.thread_id is None:
+                    if thread_id not in names:
+                        names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(stack))] += 1
+                sampled = True
+            self.samples += sampled
+
+    def stop(self):
+        self.stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def folded(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit=20):
+        """Fonctions les plus échantillonnées : en propre (feuille) et au total (présentes dans la pile)."""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return {
+            'self': [{'function': name, 'samples': count} for name, count in own.most_common(limit)],
+            'total': [{'function': name, 'samples': count} for name, count in total.most_common(limit)],
+        }
+
+
+# 2. Session de profilage
+
+class RequestProfile:
+    """Profil CPU et mémoire d'une requête, entre `start()` et `stop()`."""
+
+    def __init__(self, request, thread_id):
+        # `thread_id` : thread échantillonné (None : tous les threads)
+        self.id = f"{timezone.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.request = request
+        self.sampler = StackSampler(thread_id, settings.PROFILING_INTERVAL)
+        self.owns_tracemalloc = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(settings.PROFILING_TRACEMALLOC_FRAMES)
+            self.owns_tracemalloc = True
+        tracemalloc.reset_peak()
+        self.baseline = tracemalloc.get_traced_memory()[0]
+        self.started = time.perf_counter()
+        self.sampler.start()
+
+    def stop(self):
+        """Arrête l'échantillonnage et relève la mémoire (toujours appelé, même si la vue échoue)."""
+        self.sampler.stop()
+        self.duration = time.perf_counter() - self.started
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        if self.owns_tracemalloc:
+            tracemalloc.stop()
+        self.memory = {
+            'baseline_bytes': self.baseline,
+            'retained_bytes': current - self.baseline,
+            'peak_bytes': peak - self.baseline,
+            'top_lines': [
+                {'location': str(stat.traceback[0]), 'size': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:settings.PROFILING_TOP_LINES]
+            ],
+        }
+        self.snapshot = snapshot
+
+    def metadata(self):
+        user = getattr(self.request, 'profiling_user', None)
+        return {
+            'id': self.id,
+            'created_at': timezone.now().isoformat(),
+            'method': self.request.method,
+            'path': self.request.get_full_path(),
+            'user': user.get_username() if user is not None else None,
+            'request_id': getattr(self.request, 'request_id', None),
+            'status': self.status,
+            'duration_ms': round(self.duration * 1000, 2),
+            'samples': self.sampler.samples,
+            'interval_ms': settings.PROFILING_INTERVAL * 1000,
+            'peak_bytes': self.memory['peak_bytes'],
+            'retained_bytes': self.memory['retained_bytes'],
+            'top_functions': self.sampler.top_functions(),
+        }
+
+    def save(self, response):
+        self.status = response.status_code
+        directory = profile_root() / self.id
+        directory.mkdir(parents=True)
+        (directory / 'cpu.folded').write_text(self.sampler.folded(), encoding='utf-8')
+        (directory / 'memory.json').write_text(json.dumps(self.memory, indent=2), encoding='utf-8')
+        self.snapshot.dump(str(directory / 'memory.tracemalloc'))
+        # Métadonnées en dernier : un profil sans meta.json est incomplet et ignoré
+        (directory / 'meta.json').write_text(json.dumps(self.metadata(), indent=2, ensure_ascii=False),
+                                             encoding='utf-8')
+        prune_profiles()
+        return self.id
+
+
+# 3. Stockage borné
+
+def profile_root():
+    return Path(settings.PROFILING_ROOT)
+
+
+def profile_dir(profile_id):
+    """Répertoire d'un profil existant, ou None (identifiant inconnu ou invalide)."""
+    if not _VALID_PROFILE_ID.match(profile_id):
+        return None
+    directory = profile_root() / profile_id
+    if not (directory / 'meta.json').is_file():
+        return None
+    return directory
+
+
+def list_profiles():
+    """Métadonnées des profils, du plus récent au plus ancien."""
+    root = profile_root()
+    if not root.is_dir():
+        return []
+    profiles = []
+    for meta in root.glob('*/meta.json'):
+        try:
+            profiles.append(json.loads(meta.read_text(encoding='utf-8')))
+        except (OSError, ValueError):
+            continue
+    return sorted(profiles, key=lambda meta: meta['id'], reverse=True)
+
+
+def directory_size(directory):
+    return sum(path.stat().st_size for path in directory.iterdir() if path.is_file())
+
+
+def prune_profiles():
+    """Supprime les profils les plus anciens au-delà de PROFILING_MAX_PROFILES ou PROFILING_MAX_BYTES."""
+    root = profile_root()
+    directories = sorted((path for path in root.iterdir() if path.is_dir()), key=lambda path: path.name, reverse=True)
+    total = 0
+    for index, directory in enumerate(directories):
+        total += directory_size(directory)
+        if index >= settings.PROFILING_MAX_PROFILES or (index and total > settings.PROFILING_MAX_BYTES):
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+# 4. Middleware
+
+def profiling_requested(request):
+    """Déclencheur présent (en-tête ou paramètre) : test sans analyse de la chaîne de requête."""
+    if request.META.get(PROFILE_META):
+        return True
+    return f'{PROFILE_PARAM}=' in request.META.get('QUERY_STRING', '') and bool(request.GET.get(PROFILE_PARAM))
+
+
+def staff_user(request, user):
+    """Utilisateur `is_staff` de la requête : session, sinon jeton JWT (authentification DRF absente ici)."""
+    if user is not None and user.is_authenticated and user.is_staff:
+        return user
+    try:
+        authenticated = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    if authenticated is not None and authenticated[0].is_staff:
+        return authenticated[0]
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Profile les requêtes du personnel qui le demandent (à placer après AuthenticationMiddleware).
+    - Réponse : en-tête X-Profile-Id (identifiant du profil à télécharger)
+    - ASGI : l'échantillonnage porte sur le thread de la boucle d'événements, et la mémoire
+      sur tout le processus ; les autres requêtes concurrentes y figurent aussi
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.PROFILING_ENABLED or not profiling_requested(request):
+            return self.get_response(request)
+        request.profiling_user = staff_user(request, getattr(request, 'user', None))
+        if request.profiling_user is None:
+            return self.get_response(request)
+        return self.profile(request, self.get_response)
+
+    async def __acall__(self, request):
+        if not settings.PROFILING_ENABLED or not profiling_requested(request):
+            return await self.get_response(request)
+        user = await request.auser() if hasattr(request, 'auser') else None
+        request.profiling_user = await sync_to_async(staff_user)(request, user)
+        if request.profiling_user is None:
+            return await self.get_response(request)
+        if not _profiling_lock.acquire(blocking=False):
+            response = await self.get_response(request)
+            response[PROFILE_HEADER] = 'busy'
+            return response
+        try:
+            # Vues synchrones exécutées dans le pool de threads : tous les threads sont échantillonnés
+            profile = RequestProfile(request, None)
+            profile.start()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profile.stop()
+            return self.finish(profile, response)
+        finally:
+            _profiling_lock.release()
+
+    def profile(self, request, get_response):
+        if not _profiling_lock.acquire(blocking=False):
+            response = get_response(request)
+            response[PROFILE_HEADER] = 'busy'
+            return response
+        try:
+            profile = RequestProfile(request, threading.get_ident())
+            profile.start()
+            try:
+                response = get_response(request)
+            finally:
+                profile.stop()
+            return self.finish(profile, response)
+        finally:
+            _profiling_lock.release()
+
+    def finish(self, profile, response):
+        # Réponses en flux : le contenu est produit après la fin du profil
+        try:
+            response[PROFILE_ID_HEADER] = profile.save(response)
+        except OSError:
+            logger.exception("Échec de l'écriture du profil %s", profile.id)
+        else:
+            logger.info("Profil %s enregistré (%s %s)", profile.id, profile.request.method, profile.request.path)
+        return response
+
+
+# 5. Pages d'administration (/admin/profiles/)
+
+def profile_list_view(request):
+    """Liste des profils enregistrés, avec liens de téléchargement."""
+    from django.contrib import admin
+    from django.template.response import TemplateResponse
+
+    context = {
+        **admin.site.each_context(request),
+        'title': "Profils de requêtes",
+        'profiles': list_profiles(),
+        'artifacts': list(ARTIFACTS),
+        'profiling_enabled': settings.PROFILING_ENABLED,
+        'profile_header': PROFILE_HEADER,
+        'profile_param': PROFILE_PARAM,
+    }
+    return TemplateResponse(request, 'admin/profiles.html', context)
+
+
+def profile_download_view(request, profile_id, artifact):
+    """Téléchargement d'un fichier de profil (piles CPU, statistiques ou instantané mémoire)."""
+    from django.http import FileResponse, Http404
+
+    directory = profile_dir(profile_id)
+    if directory is None or artifact not in ARTIFACTS or not (directory / artifact).is_file():
+        raise Http404("Profil introuvable.")
+    return FileResponse(open(directory / artifact, 'rb'), as_attachment=True,
+                        filename=f"{profile_id}-{artifact}", content_type=ARTIFACTS[artifact])
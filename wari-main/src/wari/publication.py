@@ -0,0 +1,150 @@
+"""
+Planificateur de publication des programmes et pronostics.
+
+Les échéances `publish_at` / `unpublish_at` forment une file indexée (index partiels
+sur les seules lignes en attente). Le planificateur dort jusqu'à la prochaine
+échéance, puis bascule tous les objets échus d'un modèle en une seule requête
+UPDATE ... RETURNING par sens. Les vues client continuent de filtrer sur
+`is_published` sans jamais comparer chaque ligne à now().
+
+Une modification de la fenêtre de publication (is_published, publish_at, unpublish_at)
+envoie un NOTIFY PostgreSQL pour réveiller le planificateur immédiatement si la nouvelle
+échéance est plus proche.
+"""
+import select
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import Min
+from django.dispatch import Signal
+from django.utils import timezone
+import logging
+
+from outbox.domain import PUBLISHED_EVENTS, publish_transition
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+SCHEDULED_MODELS = ['programmes.Program', 'predictions.Prediction']
+NOTIFY_CHANNEL = 'wari_publication'
+# Règles de clean() à respecter par la publication en masse (condition SQL par modèle, `%(now)s` : date de la passe)
+PUBLISH_REQUIREMENTS = {
+    'programmes.Program': 'event_date >= %(now)s',  # Un programme passé ne peut pas être publié
+    'predictions.Prediction': 'author_id IS NOT NULL',  # Un pronostic publié doit avoir un auteur
+}
+# Champs de la fenêtre de publication (relus avant mise à jour par outbox.domain)
+WINDOW_FIELDS = ('is_published', 'publish_at', 'unpublish_at')
+
+# Émis après commit : sender=modèle, published=[ids], unpublished=[ids]
+publication_changed = Signal()
+
+
+def scheduled_models():
+    return [apps.get_model(label) for label in SCHEDULED_MODELS]
+
+
+# 1. Bascule des objets échus
+
+def flip_due(model, now=None):
+    """
+    Publie et dépublie les objets échus d'un modèle :
+    - Une requête UPDATE ... RETURNING par sens, quel que soit le nombre de lignes
+    - L'échéance traitée est effacée pour qu'une action manuelle ultérieure ne soit pas annulée
+    - Les événements de publication (outbox) sont écrits dans la même transaction
+    - Objets ne respectant pas PUBLISH_REQUIREMENTS (ex. programme passé, pronostic sans auteur) :
+      échéance effacée sans publier, comme save() les refuserait
+    """
+    now = now or timezone.now()
+    table = connection.ops.quote_name(model._meta.db_table)
+    requirement = PUBLISH_REQUIREMENTS.get(model._meta.label, 'TRUE')
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET is_published = TRUE, publish_at = NULL, updated_at = %(now)s "
+            f"WHERE is_published = FALSE AND publish_at <= %(now)s "
+            f"AND (unpublish_at IS NULL OR unpublish_at > %(now)s) AND {requirement} RETURNING id",
+            {'now': now},
+        )
+        published = [row[0] for row in cursor.fetchall()]
+        publish_transition(model, PUBLISHED_EVENTS[model._meta.label], published)
+        cursor.execute(
+            f"UPDATE {table} SET is_published = FALSE, unpublish_at = NULL, updated_at = %(now)s "
+            f"WHERE is_published = TRUE AND unpublish_at <= %(now)s RETURNING id",
+            {'now': now},
+        )
+        unpublished = [row[0] for row in cursor.fetchall()]
+        # Fenêtre déjà close avant publication, ou objet non publiable : échéances effacées sans publier
+        cursor.execute(
+            f"UPDATE {table} SET publish_at = NULL, unpublish_at = NULL, updated_at = %(now)s "
+            f"WHERE is_published = FALSE AND publish_at <= %(now)s "
+            f"AND (unpublish_at <= %(now)s OR NOT ({requirement})) RETURNING id",
+            {'now': now},
+        )
+        skipped = [row[0] for row in cursor.fetchall()]
+        if published or unpublished:
+            transaction.on_commit(lambda: publication_changed.send(
+                sender=model, published=published, unpublished=unpublished
+            ))
+    if published or unpublished:
+        logger.info("%s : %s publiés, %s dépubliés", model._meta.label, len(published), len(unpublished))
+    if skipped:
+        logger.warning("%s : publication programmée abandonnée (fenêtre close ou objet non publiable) : %s",
+                       model._meta.label, skipped)
+    return published, unpublished
+
+
+def next_due(model):
+    """Prochaine échéance d'un modèle (lecture des deux index partiels), ou None."""
+    publish = model.objects.filter(is_published=False, publish_at__isnull=False).aggregate(at=Min('publish_at'))['at']
+    unpublish = model.objects.filter(is_published=True, unpublish_at__isnull=False).aggregate(at=Min('unpublish_at'))['at']
+    due = [at for at in (publish, unpublish) if at is not None]
+    return min(due) if due else None
+
+
+def run_once(now=None):
+    """Bascule les objets échus de tous les modèles planifiés et retourne la prochaine échéance."""
+    for model in scheduled_models():
+        flip_due(model, now)
+    due = [at for at in (next_due(model) for model in scheduled_models()) if at is not None]
+    return min(due) if due else None
+
+
+# 2. Boucle du planificateur
+
+def window_changed(instance, created):
+    """Fenêtre de publication avec une échéance, nouvelle ou modifiée par la sauvegarde."""
+    if not (instance.publish_at or instance.unpublish_at):
+        return False
+    # Valeurs précédentes relues par le pre_save d'outbox.domain (aucune requête supplémentaire)
+    previous = None if created else getattr(instance, '_outbox_previous', None)
+    return previous is None or any(previous[name] != getattr(instance, name) for name in WINDOW_FIELDS)
+
+
+def notify_schedule_change(sender, instance, created=False, raw=False, **kwargs):
+    """Réveille le planificateur (NOTIFY délivré au commit) quand la fenêtre de publication change."""
+    if connection.vendor == 'postgresql' and not raw and window_changed(instance, created):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, '')", [NOTIFY_CHANNEL])
+
+
+def run_scheduler(stop_event, max_sleep=60.0):
+    """
+    Boucle du planificateur :
+    - Dort jusqu'à la prochaine échéance (au plus `max_sleep` secondes)
+    - Réveil anticipé sur NOTIFY quand une échéance est ajoutée ou modifiée
+    """
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+    raw = connection.connection
+
+    while not stop_event.is_set():
+        upcoming = run_once()
+        timeout = max_sleep
+        if upcoming is not None:
+            timeout = min(max_sleep, max((upcoming - timezone.now()).total_seconds(), 0.0))
+        if timeout <= 0:
+            continue
+        ready, _, _ = select.select([raw], [], [], timeout)
+        if ready:
+            raw.poll()
+            raw.notifies.clear()
@@ -0,0 +1,174 @@
+"""
+Sérialisation compilée des listes client (lecture seule).
+
+Un `CompiledReader` est construit une fois à partir d'un sérialiseur DRF : chaque champ
+lisible devient une colonne de `values_list()` et une fonction d'extraction précalculée.
+Une page est alors sérialisée depuis des tuples, sans instance de modèle ni de sérialiseur
+par ligne :
+- Champs de modèle : valeur brute quand la représentation DRF est l'identité (entiers,
+  textes, booléens, JSON), sinon `to_representation` du champ DRF lié (dates, choix)
+- `GameSlugField` : slug lu dans le cache de référence (colonne `game_id`)
+- `SlugRelatedField` : colonne `<relation>__<champ>` (jointure dans la même requête)
+- Sérialiseurs imbriqués : compilés avec le préfixe de leur relation
+- Champs calculés et ajouts de `to_representation` : `overrides` (par chemin, ex.
+  'country.game_count') et `extras` (clés ajoutées en fin d'objet, omises si SKIP)
+- `finalize(items)` : complète une page (agrégats en une requête pour toute la page)
+
+La sortie est identique octet pour octet à celle du sérialiseur (tests de référence
+dans les tests des applications) ; `FAST_READ_SERIALIZERS = False` rétablit le chemin DRF.
+"""
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+SKIP = object()  # Valeur d'un extra à ne pas ajouter (clé absente de la sortie DRF)
+
+# Champs DRF dont la représentation d'une valeur lue en base est la valeur elle-même
+IDENTITY_FIELDS = (serializers.IntegerField, serializers.CharField, serializers.BooleanField)
+
+
+class CompiledReader:
+    """
+    Sérialiseur de lecture compilé :
+    - `columns` : colonnes de `values_list()` (chemins ORM)
+    - `rows(queryset)` : queryset de tuples, paginable comme le queryset d'origine
+    - `serialize(rows)` : liste d'objets identique à `serializer_class(..., many=True).data`
+    """
+
+    def __init__(self, serializer_class, overrides=None, extras=None, finalize=None):
+        self.serializer_class = serializer_class
+        self.overrides = overrides or {}
+        self.extras = extras or {}
+        self.finalize = finalize
+        self.columns = None
+        self._compiled = None
+        self._pending = []
+        self.lock = threading.Lock()
+
+    def compile(self):
+        """Compilé au premier usage : les champs d'un ModelSerializer exigent le registre d'applications."""
+        if self._compiled is None:
+            with self.lock:
+                if self._compiled is None:
+                    self._pending = []
+                    builders = self.compile_fields(self.serializer_class(), '', '')
+                    extras = [(key, self.extractor(columns, func)) for key, (columns, func) in self.extras.items()]
+                    self.columns = tuple(self._pending)
+                    self._compiled = (builders, extras)
+        return self._compiled
+
+    def column(self, path):
+        if path not in self._pending:
+            self._pending.append(path)
+        return self._pending.index(path)
+
+    def extractor(self, columns, func):
+        """Fonction d'une ligne appliquant `func` aux valeurs des colonnes `columns`."""
+        indexes = [self.column(path) for path in columns]
+        if len(indexes) == 1:
+            index = indexes[0]
+            return lambda row: func(row[index])
+        return lambda row: func(*[row[index] for index in indexes])
+
+    def compile_fields(self, serializer, prefix, path):
+        builders = []
+        for field in serializer._readable_fields:
+            name = f"{path}{field.field_name}"
+            if name in self.overrides:
+                columns, func = self.overrides[name]
+                builders.append((field.field_name, self.extractor([prefix + column for column in columns], func)))
+            else:
+                builders.append((field.field_name, self.compile_field(field, prefix, name)))
+        return builders
+
+    def compile_field(self, field, prefix, name):
+        from games.serializers import GameSlugField
+
+        if isinstance(field, serializers.BaseSerializer):
+            nested = self.compile_fields(field, f"{prefix}{field.source}__", f"{name}.")
+            index = self.column(f"{prefix}{field.source}__id")
+            return lambda row: None if row[index] is None else {key: build(row) for key, build in nested}
+        if isinstance(field, GameSlugField):
+            return self.extractor([f"{prefix}{field.source}_id"], game_slug)
+        if isinstance(field, serializers.SlugRelatedField):
+            index = self.column(f"{prefix}{field.source}__{field.slug_field}")
+            return lambda row: row[index]
+        if isinstance(field, serializers.SerializerMethodField) or '.' in field.source or field.source == '*':
+            raise ImproperlyConfigured(f"{self.serializer_class.__name__}.{name} : champ non compilable, voir `overrides`.")
+        index = self.column(prefix + field.source)
+        if isinstance(field, IDENTITY_FIELDS) or (isinstance(field, serializers.JSONField) and not field.binary):
+            return lambda row: row[index]
+        represent = field.to_representation
+        return lambda row: None if row[index] is None else represent(row[index])
+
+    def rows(self, queryset):
+        self.compile()
+        return queryset.values_list(*self.columns)
+
+    def serialize(self, rows):
+        builders, extras = self.compile()
+        items = []
+        for row in rows:
+            item = {key: build(row) for key, build in builders}
+            for key, extract in extras:
+                value = extract(row)
+                if value is not SKIP:
+                    item[key] = value
+            items.append(item)
+        if self.finalize is not None:
+            self.finalize(items)
+        return items
+
+
+# Extracteurs communs
+
+def game_slug(game_id):
+    from games.models import Game
+    from games.refcache import reference_data
+
+    if game_id is None:
+        return None
+    game = reference_data().games.get(game_id)
+    if game is None:
+        return Game.objects.filter(pk=game_id).values_list('slug', flat=True).first()
+    return game.slug
+
+
+def game_name(game_id):
+    """`game_name` ajouté par les sérialiseurs de programmes et de pronostics."""
+    from games.models import Game
+    from games.refcache import reference_data
+
+    if not game_id:
+        return SKIP
+    game = reference_data().games.get(game_id)
+    return game.name if game else Game.objects.filter(pk=game_id).values_list('name', flat=True).first()
+
+
+def constant(value):
+    return (), lambda *args: value
+
+
+# Vues
+
+class CompiledListMixin:
+    """
+    Liste d'un ViewSet sérialisée par `reader` (mêmes filtres, pagination et sortie JSON) :
+    seules les colonnes nécessaires sont lues, sans instance par ligne.
+    """
+    reader = None
+
+    def list(self, request, *args, **kwargs):
+        if self.reader is None or not settings.FAST_READ_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+        return self.compiled_list(self.filter_queryset(self.get_queryset()))
+
+    def compiled_list(self, queryset):
+        rows = self.reader.rows(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.reader.serialize(page))
+        return Response(self.reader.serialize(rows))
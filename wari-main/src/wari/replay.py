@@ -0,0 +1,214 @@
+"""
+Rejeu du trafic enregistré (wari.traffic) contre un build, et comparaison par endpoint.
+
+- Mêmes méthodes, chemins, paramètres (empreintes comprises) et rôles que l'enregistrement
+- Cadence d'origine à `speed` près (2.0 : deux fois plus vite) ; `speed=0` : au plus vite,
+  limité par `concurrency`
+- Rôles authentifiés : jeton JWT obtenu une fois par rôle (comptes du jeu de données de benchmark
+  par défaut) ; sans jeton, les requêtes du rôle sont ignorées et comptées
+- Requêtes d'écriture ignorées : les corps ne sont pas enregistrés
+- Latence : durée Server-Timing du build cible si exposée (TRAFFIC_TIMING_HEADERS), sinon
+  latence mesurée par le client ; requêtes SQL : en-tête X-DB-Queries
+"""
+import asyncio
+import json
+import re
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from .httpbench import AsyncHTTPConnection, percentile
+from .traffic import QUERY_COUNT_HEADER, TIMING_HEADER
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+DEFAULT_ACCOUNTS = {
+    'staff': ('bench-admin', 'benchmark'),
+    'admin': ('bench-admin', 'benchmark'),
+    'editor': ('bench-editor-0', 'benchmark'),
+    'viewer': ('bench-viewer', 'benchmark'),
+}
+_TIMING_DURATION = re.compile(r'dur=([0-9.]+)')
+
+
+# 1. Agrégation par endpoint
+
+def distribution(durations_ms, queries):
+    """Résumé d'une série de mesures : nombre, p50/p95 (ms) et requêtes SQL moyennes."""
+    values = sorted(durations_ms)
+    return {
+        'count': len(values),
+        'p50_ms': round(percentile(values, 0.50), 2) if values else None,
+        'p95_ms': round(percentile(values, 0.95), 2) if values else None,
+        'queries': round(statistics.mean(queries), 2) if queries else None,
+    }
+
+
+def recorded_summary(records):
+    """Résumé par endpoint de l'enregistrement lui-même (durées et requêtes SQL côté serveur)."""
+    groups = {}
+    for record in records:
+        group = groups.setdefault(endpoint_key(record), ([], []))
+        group[0].append(record['duration_ms'])
+        group[1].append(record['queries'])
+    return {key: distribution(durations, queries) for key, (durations, queries) in sorted(groups.items())}
+
+
+def endpoint_key(record):
+    return f"{record['method']} {record['endpoint']}"
+
+
+def compare(baseline, candidate):
+    """Écarts par endpoint : p95 (en %) et requêtes SQL moyennes (différence absolue)."""
+    diff = {}
+    for key in sorted(set(baseline) & set(candidate)):
+        before, after = baseline[key], candidate[key]
+        p95_change = None
+        if before['p95_ms'] and after['p95_ms'] is not None:
+            p95_change = round((after['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100, 1)
+        queries_change = None
+        if before['queries'] is not None and after['queries'] is not None:
+            queries_change = round(after['queries'] - before['queries'], 2)
+        diff[key] = {
+            'count': min(before['count'], after['count']),
+            'p95_before_ms': before['p95_ms'], 'p95_after_ms': after['p95_ms'], 'p95_change_pct': p95_change,
+            'queries_before': before['queries'], 'queries_after': after['queries'], 'queries_change': queries_change,
+        }
+    return diff
+
+
+def regressions(diff, max_p95_increase=None, max_query_increase=None, min_count=20):
+    """Endpoints dépassant les seuils (p95 en %, sur `min_count` mesures au moins ; requêtes SQL moyennes)."""
+    found = []
+    for key, row in diff.items():
+        if (max_p95_increase is not None and row['count'] >= min_count and row['p95_change_pct'] is not None
+                and row['p95_change_pct'] > max_p95_increase):
+            found.append(f"{key} : p95 {row['p95_before_ms']} -> {row['p95_after_ms']} ms ({row['p95_change_pct']:+}%)")
+        if max_query_increase is not None and row['queries_change'] is not None and row['queries_change'] > max_query_increase:
+            found.append(f"{key} : requêtes SQL {row['queries_before']} -> {row['queries_after']}")
+    return found
+
+
+# 2. Rejeu
+
+class TrafficReplayer:
+    """
+    Rejoue `records` (triés par horodatage) contre `base_url` :
+    - `speed` : facteur de cadence (0 : sans attente)
+    - `concurrency` : connexions HTTP persistantes au plus
+    - `accounts` : {rôle: (utilisateur, mot de passe)} pour les rôles authentifiés
+    """
+
+    def __init__(self, base_url, records, speed=1.0, concurrency=50, timeout=30.0, accounts=None,
+                 token_path='/api/token/', progress=None):
+        self.base_url = base_url
+        self.records = records
+        self.speed = speed
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.accounts = {**DEFAULT_ACCOUNTS, **(accounts or {})}
+        self.token_path = token_path
+        self.progress = progress
+        self.tokens = {}
+        self.skipped = Counter()
+        self.errors = Counter()
+        self.measures = {}  # Endpoint -> (durées ms, requêtes SQL)
+        self.status_mismatches = Counter()
+        self.latency_sources = Counter()
+
+    async def authenticate(self, connection, roles):
+        for role in sorted(roles - {'anonymous'}):
+            username, password = self.accounts.get(role, (None, None))
+            if username is None:
+                continue
+            body = json.dumps({'username': username, 'password': password}).encode()
+            try:
+                status, _, response = await connection.request(
+                    'POST', self.token_path, {'Content-Type': 'application/json'}, body)
+            except Exception:
+                continue
+            if status == 200:
+                self.tokens[role] = json.loads(response).get('access')
+
+    async def run(self):
+        started = time.perf_counter()
+        pool = asyncio.Queue()
+        connections = [AsyncHTTPConnection(self.base_url, timeout=self.timeout) for _ in range(self.concurrency)]
+        for connection in connections:
+            pool.put_nowait(connection)
+        await self.authenticate(connections[0], {record['role'] for record in self.records})
+
+        origin = self.records[0]['ts'] if self.records else 0
+        tasks = set()
+        for index, record in enumerate(self.records):
+            if record['method'] not in SAFE_METHODS:
+                self.skipped['write'] += 1
+                continue
+            if record['role'] != 'anonymous' and record['role'] not in self.tokens:
+                self.skipped[f"role:{record['role']}"] += 1
+                continue
+            if self.speed > 0:
+                delay = started + (record['ts'] - origin) / self.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            connection = await pool.get()  # Contre-pression : pas plus de `concurrency` requêtes en vol
+            task = asyncio.create_task(self.replay(pool, connection, record))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            if self.progress and index and index % 1000 == 0:
+                self.progress(index, len(self.records))
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for connection in connections:
+            await connection.close()
+        return self.report(time.perf_counter() - started)
+
+    async def replay(self, pool, connection, record):
+        try:
+            await self.send(connection, record)
+        finally:
+            pool.put_nowait(connection)
+
+    async def send(self, connection, record):
+        headers = {}
+        token = self.tokens.get(record['role'])
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        query = [tuple(pair) for pair in record['query']]  # Paires JSON -> tuples (ordre et doublons conservés)
+        target = record['path'] + (f"?{urlencode(query)}" if query else '')
+        started = time.perf_counter()
+        try:
+            status, response_headers, _ = await connection.request(record['method'], target, headers)
+        except Exception as exc:
+            self.errors[type(exc).__name__] += 1
+            return
+        latency_ms = (time.perf_counter() - started) * 1000
+        timing = _TIMING_DURATION.search(response_headers.get(TIMING_HEADER.lower(), ''))
+        if timing:
+            latency_ms = float(timing.group(1))
+        self.latency_sources['server' if timing else 'client'] += 1
+        durations, queries = self.measures.setdefault(endpoint_key(record), ([], []))
+        durations.append(latency_ms)
+        count = response_headers.get(QUERY_COUNT_HEADER.lower())
+        if count is not None:
+            queries.append(int(count))
+        if status != record['status']:
+            self.status_mismatches[f"{record['status']}->{status}"] += 1
+
+    def report(self, elapsed):
+        replayed = {key: distribution(*values) for key, values in sorted(self.measures.items())}
+        requests = sum(row['count'] for row in replayed.values())
+        return {
+            'base_url': self.base_url,
+            'speed': self.speed,
+            'records': len(self.records),
+            'replayed': requests,
+            'elapsed_s': round(elapsed, 2),
+            'throughput_rps': round(requests / elapsed, 2) if elapsed else 0.0,
+            'skipped': dict(self.skipped),
+            'errors': dict(self.errors),
+            'status_mismatches': dict(self.status_mismatches),
+            'latency_source': dict(self.latency_sources),
+            'endpoints': replayed,
+        }
@@ -0,0 +1,169 @@
+"""
+Schéma OpenAPI précalculé, servi comme un fichier statique.
+
+La génération (introspection de tous les ViewSets et sérialiseurs) coûte plusieurs
+centaines de millisecondes de CPU ; Swagger UI la redemande à chaque affichage.
+- `python manage.py build_schema` écrit le schéma une fois par déploiement
+  (YAML et JSON) dans OPENAPI_SCHEMA_ROOT, avec un manifeste contenant son empreinte
+- `/api/schema/` sert le fichier correspondant au format négocié, avec un ETag dérivé
+  de l'empreinte (réponse 304 si inchangé) et des en-têtes de cache longs
+- `/api/docs/` référence `/api/schema/?v=<empreinte>` : URL immuable, mise en cache un an
+- Génération à la volée seulement si OPENAPI_SCHEMA_STATIC est faux (développement)
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from drf_spectacular.plumbing import set_query_parameters
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView, SpectacularSwaggerView
+from rest_framework.exceptions import APIException
+import logging
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+SCHEMA_FILES = {'yaml': 'schema.yaml', 'json': 'schema.json'}
+VERSIONED_MAX_AGE = 365 * 24 * 3600
+
+
+class SchemaUnavailable(APIException):
+    status_code = 503
+    default_detail = "Schéma OpenAPI non généré (python manage.py build_schema)."
+    default_code = 'schema_unavailable'
+
+
+# 1. Génération (au déploiement)
+
+def schema_root():
+    return Path(settings.OPENAPI_SCHEMA_ROOT)
+
+
+def generate_schema():
+    """Schéma de l'API rendu dans chaque format : {format: octets}."""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS()
+    schema = generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+    return {
+        'yaml': OpenApiYamlRenderer().render(schema, renderer_context={}),
+        'json': OpenApiJsonRenderer().render(schema, renderer_context={}),
+    }
+
+
+def schema_digest(rendered):
+    # Le JSON porte tout le contenu du schéma : une seule empreinte pour les deux formats
+    return hashlib.sha256(rendered['json']).hexdigest()[:20]
+
+
+def write_schema(rendered, root=None):
+    """
+    Écrit les fichiers puis le manifeste, chacun par renommage atomique : un processus
+    qui lit le manifeste trouve toujours des fichiers complets et cohérents.
+    """
+    root = Path(root or schema_root())
+    root.mkdir(parents=True, exist_ok=True)
+    digest = schema_digest(rendered)
+    for fmt, name in SCHEMA_FILES.items():
+        _write_atomic(root / name, rendered[fmt])
+    manifest = {'digest': digest, 'generated_at': timezone.now().isoformat(), 'files': SCHEMA_FILES}
+    _write_atomic(root / MANIFEST_NAME, json.dumps(manifest, indent=2).encode('utf-8'))
+    return manifest
+
+
+def _write_atomic(path, content):
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(content)
+    os.replace(tmp, path)
+
+
+def read_manifest(root=None):
+    path = Path(root or schema_root()) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+# 2. Chargement (par processus)
+
+class _Artifact:
+    """Fichiers du schéma en mémoire, rechargés quand le manifeste est réécrit."""
+
+    def __init__(self):
+        self.mtime = None
+        self.digest = None
+        self.files = {}
+
+    def load(self):
+        """Retourne (empreinte, {format: octets}) ; None si le schéma n'a pas été généré."""
+        path = schema_root() / MANIFEST_NAME
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime != self.mtime:
+            manifest = json.loads(path.read_text(encoding='utf-8'))
+            self.files = {fmt: (path.parent / name).read_bytes() for fmt, name in manifest['files'].items()}
+            self.digest, self.mtime = manifest['digest'], mtime
+        return self.digest, self.files
+
+
+_artifact = _Artifact()
+
+
+def static_schema():
+    return _artifact.load() if settings.OPENAPI_SCHEMA_STATIC else None
+
+
+# 3. Vues
+
+class StaticSchemaView(SpectacularAPIView):
+    """
+    `/api/schema/` servi depuis les fichiers générés au déploiement :
+    - Format choisi par négociation de contenu, comme SpectacularAPIView
+    - ETag = empreinte du schéma ; 304 si le client possède déjà cette version
+    - Cache immuable si l'URL porte l'empreinte courante (`?v=`), sinon OPENAPI_SCHEMA_MAX_AGE
+    - Variantes `lang` / `version` et mode développement : génération à la volée
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if not settings.OPENAPI_SCHEMA_STATIC or request.GET.get('lang') or request.GET.get('version'):
+            return super().get(request, *args, **kwargs)
+        loaded = _artifact.load()
+        if loaded is None:
+            logger.error("Schéma OpenAPI absent de %s : exécuter 'python manage.py build_schema'", schema_root())
+            raise SchemaUnavailable()
+        digest, files = loaded
+        renderer, _ = self.perform_content_negotiation(request)
+        fmt = 'yaml' if renderer.format == 'yaml' else 'json'
+        etag = f'"{digest}-{fmt}"'
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(files[fmt], content_type=renderer.media_type)
+            response['Content-Disposition'] = f'inline; filename="{spectacular_settings.TITLE or "schema"}.{fmt}"'
+        response['ETag'] = etag
+        response['Vary'] = 'Accept'
+        if request.GET.get('v') == digest:
+            patch_cache_control(response, public=True, max_age=VERSIONED_MAX_AGE, immutable=True)
+        else:
+            patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+        return response
+
+
+class SchemaSwaggerView(SpectacularSwaggerView):
+    """Swagger UI pointant vers l'URL versionnée (immuable) du schéma précalculé."""
+
+    def _get_schema_url(self, request):
+        url = super()._get_schema_url(request)
+        loaded = static_schema()
+        if loaded is None or request.GET.get('lang') or request.GET.get('version'):
+            return url
+        return set_query_parameters(url=url, v=loaded[0])
@@ -46,17 +46,28 @@ INSTALLED_APPS = [
     'predictions',
     'programmes',
     'results',
+    'jobs',
+    'outbox',
+    'sync',
+    'bundles',
+    'leaderboard',
+    'analytics',
+    'slowqueries',
     'wari',
 ]
 
 
 MIDDLEWARE = [
+    'wari.log.RequestIdMiddleware',  # Identifiant de requête (journaux, en-tête X-Request-ID)
+    'wari.traffic.TrafficRecordingMiddleware',  # Échantillon anonymisé du trafic (rejeu de performance)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Ajout du middleware CORS
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'wari.profiling.ProfilingMiddleware',  # Profil CPU et mémoire à la demande (personnel)
+    'slowqueries.capture.SlowQueryOriginMiddleware',  # Origine (vue, action, filtres) des requêtes SQL lentes
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,6 +92,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'wari.wsgi.application'
+ASGI_APPLICATION = 'wari.asgi.application'  # Vues client asynchrones : /api/client/async/
 
 
 # Database
@@ -98,6 +110,143 @@ DATABASES = {
     }
 }
 
+# Cache (LocMem par défaut ; utiliser un cache partagé en production multi-processus)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'wari-default',
+    }
+}
+COUNTRY_FEED_CACHE_TIMEOUT = 300  # Durée de vie des flux pays (secondes)
+REFERENCE_CACHE_CHECK_INTERVAL = 2  # Intervalle de vérification de la version des données de référence (secondes)
+
+# Tâches de fond (python manage.py runjobs)
+JOBS_RETRY_BASE_DELAY = 10  # Délai de la première nouvelle tentative (secondes), doublé à chaque échec
+JOBS_RETRY_MAX_DELAY = 3600  # Délai maximal entre deux tentatives (secondes)
+JOBS_HEARTBEAT_INTERVAL = 30  # Renouvellement du signe de vie d'une tâche en cours (secondes)
+JOBS_LOCK_TIMEOUT = 300  # Sans signe de vie depuis ce délai, une tâche en cours est reprise (secondes)
+
+# Outbox des événements métier (python manage.py run_outbox)
+OUTBOX_BATCH_SIZE = 100  # Événements livrés par lot et par consommateur
+OUTBOX_POLL_INTERVAL = 5  # Attente maximale sans notification (secondes)
+OUTBOX_RETENTION_DAYS = 7  # Conservation des événements livrés à tous les consommateurs (jours)
+OUTBOX_ALERT_ATTEMPTS = 5  # Échecs consécutifs d'un consommateur journalisés en erreur
+
+# Synchronisation incrémentale des clients (/api/client/sync/)
+SYNC_PAGE_SIZE = 500  # Changements par page par défaut
+SYNC_MAX_PAGE_SIZE = 2000  # Valeur maximale du paramètre `limit`
+SYNC_SETTLE_SECONDS = 5  # Marge avant l'horizon de lecture (écarts d'horloge) ; transactions longues : cf. sync.streams
+SYNC_TOMBSTONE_RETENTION_DAYS = 30  # Conservation du journal des suppressions ; au-delà, resynchronisation complète
+
+# Fil chronologique d'un jeu (/api/client/games/{slug}/timeline/)
+TIMELINE_PAGE_SIZE = 20  # Éléments par page par défaut
+TIMELINE_MAX_PAGE_SIZE = 100  # Valeur maximale du paramètre `limit`
+
+# Listes client sérialisées depuis des tuples (wari.readers) ; False : sérialiseurs DRF
+FAST_READ_SERIALIZERS = True
+
+# Récurrences de programmes (occurrences calculées à la demande)
+PROGRAM_SCHEDULE_HORIZON_DAYS = 30  # Occurrences listées par /api/client/programs/ à partir de maintenant
+
+# Paquets statiques par pays et type de jeu (python manage.py build_bundles, servis par le proxy frontal)
+BUNDLE_ROOT = config('BUNDLE_ROOT', default=str(BASE_DIR / 'bundles_static'))
+BUNDLE_ITEMS_PER_GAME = 10  # Programmes, résultats et pronostics retenus par jeu
+BUNDLE_DEBOUNCE_SECONDS = 10  # Modifications regroupées avant régénération (secondes)
+BUNDLE_REFRESH_INTERVAL = 900  # Passe complète périodique (secondes)
+BUNDLE_KEEP_SECONDS = 3600  # Conservation des versions remplacées (téléchargements en cours)
+BUNDLE_MAX_AGE = 30  # Cache des URL stables et de l'API de secours (secondes), revalidé par ETag
+
+# Requêtes groupées (/api/client/batch/)
+BATCH_MAX_REQUESTS = 30  # Nombre maximal de sous-requêtes par lot
+BATCH_MAX_WORKERS = 8  # Sous-requêtes exécutées en parallèle
+
+# Partitionnement mensuel des résultats et pronostics (wari.partitioning)
+PARTITION_PREMAKE_MONTHS = 3  # Partitions créées à l'avance (mois)
+PARTITION_RETENTION_MONTHS = {  # Au-delà, les partitions sont détachées vers le schéma d'archive
+    'results.Result': 36,
+    'predictions.Prediction': 24,
+}
+PARTITION_ARCHIVE_SCHEMA = 'archive'
+PARTITION_ARCHIVE_TABLESPACE = None  # Tablespace de stockage froid (optionnel)
+
+# Export analytique Parquet (python manage.py export_analytics)
+ANALYTICS_EXPORT_ROOT = config('ANALYTICS_EXPORT_ROOT', default=str(BASE_DIR / 'exports' / 'analytics'))
+ANALYTICS_EXPORT_BATCH_SIZE = 5000  # Lignes lues par lot
+ANALYTICS_EXPORT_LAG = 60  # Les lignes modifiées plus récemment attendent le passage suivant (secondes)
+ANALYTICS_EXPORT_INTERVAL = 3600  # Période de l'export planifié (secondes)
+
+# Schéma OpenAPI précalculé (python manage.py build_schema, à chaque déploiement)
+OPENAPI_SCHEMA_ROOT = config('OPENAPI_SCHEMA_ROOT', default=str(BASE_DIR / 'openapi'))
+OPENAPI_SCHEMA_STATIC = config('OPENAPI_SCHEMA_STATIC', default=not DEBUG, cast=bool)  # Sinon génération à la volée
+OPENAPI_SCHEMA_MAX_AGE = 3600  # Cache client de /api/schema/ sans empreinte (secondes), revalidé par ETag
+
+# Profilage à la demande (wari.profiling) : en-tête X-Profile ou ?profile=1, personnel uniquement
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=True, cast=bool)
+PROFILING_ROOT = config('PROFILING_ROOT', default=str(BASE_DIR / 'profiles'))
+PROFILING_INTERVAL = 0.001  # Période d'échantillonnage de la pile (secondes)
+PROFILING_TRACEMALLOC_FRAMES = 25  # Profondeur des traces d'allocation
+PROFILING_TOP_LINES = 30  # Lignes d'allocation retenues dans memory.json
+PROFILING_MAX_PROFILES = 50  # Au-delà, les profils les plus anciens sont supprimés
+PROFILING_MAX_BYTES = 200 * 1024 * 1024  # Taille totale maximale des profils (octets)
+
+# Requêtes SQL lentes (slowqueries), consultables dans l'administration
+SLOW_QUERY_ENABLED = config('SLOW_QUERY_ENABLED', default=True, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=float)  # Seuil de relevé
+SLOW_QUERY_EXPLAIN_RATE = 0.1  # Part des requêtes lentes réexécutées avec EXPLAIN (ANALYZE, BUFFERS)
+SLOW_QUERY_EXPLAIN_INTERVAL = 600  # Au plus un EXPLAIN par empreinte et par période (secondes)
+SLOW_QUERY_EXPLAIN_DATABASE = config('SLOW_QUERY_EXPLAIN_DATABASE', default=None)  # Alias d'un réplica (sinon transaction annulée)
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = 10000  # Durée maximale d'un EXPLAIN ANALYZE
+SLOW_QUERY_EXPLAIN_WRITES = False  # INSERT/UPDATE/DELETE réexécutés (effets de bord : séquences, triggers)
+SLOW_QUERY_SEQ_SCAN_ROWS = 1000  # Lignes lues au-delà desquelles un filtre non indexé est signalé
+SLOW_QUERY_FLUSH_INTERVAL = 5  # Période d'enregistrement des relevés (secondes)
+SLOW_QUERY_QUEUE_SIZE = 1000  # Relevés en attente ; au-delà, perdus et comptés
+SLOW_QUERY_DURATIONS_KEPT = 500  # Durées conservées par empreinte (percentiles)
+SLOW_QUERY_SAMPLES_KEPT = 10  # Occurrences conservées par empreinte
+
+# Enregistrement échantillonné du trafic (wari.traffic), rejoué par python manage.py replay_traffic
+TRAFFIC_RECORD_ENABLED = config('TRAFFIC_RECORD_ENABLED', default=False, cast=bool)  # Activation explicite par déploiement
+TRAFFIC_RECORD_RATE = config('TRAFFIC_RECORD_RATE', default=0.05, cast=float)  # Part des requêtes enregistrées
+TRAFFIC_RECORD_ROOT = config('TRAFFIC_RECORD_ROOT', default=str(BASE_DIR / 'traffic'))
+TRAFFIC_RECORD_PREFIXES = ['/api/']  # Chemins enregistrés
+TRAFFIC_RECORD_PARAMS = [  # Paramètres gardés en clair ; les autres valeurs sont remplacées par une empreinte
+    'game__slug', 'game__country__slug', 'game__game_type__slug', 'country__slug', 'game_type__slug',
+    'status', 'result_date', 'predicted_at', 'event_date', 'is_published', 'is_active',
+    'search', 'page', 'page_size', 'ordering', 'format',
+]
+TRAFFIC_RECORD_MAX_BYTES = 20 * 1024 * 1024  # Taille d'un fichier avant rotation (octets)
+TRAFFIC_RECORD_MAX_FILES = 20  # Fichiers tournés conservés (tous processus confondus), hors journaux actifs
+TRAFFIC_TIMING_HEADERS = config('TRAFFIC_TIMING_HEADERS', default=DEBUG, cast=bool)  # Server-Timing et X-DB-Queries
+
+# Journalisation : JSON, écrite par un thread dédié (wari.log)
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_QUEUE_SIZE = 10000  # Enregistrements en attente d'écriture ; au-delà, perdus et comptés
+LOG_DUPLICATE_WINDOW = 60  # Fenêtre de suppression des avertissements et erreurs répétés (secondes)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'request_id': {'()': 'wari.log.RequestIdFilter'},
+        'duplicates': {'()': 'wari.log.DuplicateFilter', 'window': LOG_DUPLICATE_WINDOW},
+    },
+    'formatters': {
+        'json': {'()': 'wari.log.JsonFormatter'},
+    },
+    'handlers': {
+        'background': {
+            '()': 'wari.log.BackgroundQueueHandler',
+            'stream': 'ext://sys.stderr',
+            'maxsize': LOG_QUEUE_SIZE,
+            'formatter': 'json',
+            'filters': ['request_id', 'duplicates'],
+        },
+    },
+    'root': {'handlers': ['background'], 'level': LOG_LEVEL},
+    'loggers': {
+        # Les handlers par défaut de Django écriraient de façon synchrone
+        'django': {'handlers': ['background'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -0,0 +1,19 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobs.registry import enqueue, task
+from .partitioning import maintain_partitions
+
+
+@task('wari.maintain_partitions', max_attempts=3)
+def maintain_partitions_daily():
+    """Se replanifie pour le lendemain (même en cas d'échec), puis crée et archive les partitions."""
+    schedule_partition_maintenance(delay=timedelta(days=1))
+    maintain_partitions()
+
+
+def schedule_partition_maintenance(delay=None):
+    """Planifie la maintenance des partitions (une seule occurrence par jour d'exécution)."""
+    run_at = timezone.now() + (delay or timedelta())
+    return enqueue('wari.maintain_partitions', run_at=run_at, dedup_key=f"partitions:{run_at:%Y-%m-%d}")
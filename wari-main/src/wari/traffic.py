@@ -0,0 +1,230 @@
+"""
+Enregistrement échantillonné du trafic réel, pour le rejeu de performance (python manage.py replay_traffic).
+
+Chaque requête retenue (`TRAFFIC_RECORD_RATE`, chemins `TRAFFIC_RECORD_PREFIXES`) produit une ligne JSON :
+- ts, méthode, chemin, paramètres de requête, rôle de l'utilisateur, endpoint (nom de la route)
+- statut, durée côté serveur (ms), nombre de requêtes SQL
+Anonymisation : ni en-têtes, ni corps, ni identifiant d'utilisateur ; seuls les paramètres de
+`TRAFFIC_RECORD_PARAMS` (filtres publics, pagination) sont gardés en clair, les autres valeurs
+sont remplacées par une empreinte HMAC stable (`~` + 12 caractères hexadécimaux).
+
+Fichiers : un journal par processus (traffic-<pid>.jsonl) dans `TRAFFIC_RECORD_ROOT`, avec rotation
+par taille (traffic-<pid>.jsonl.N) ; les fichiers tournés les plus anciens sont supprimés au-delà de
+`TRAFFIC_RECORD_MAX_FILES`, jamais le journal actif d'un processus.
+
+Avec `TRAFFIC_TIMING_HEADERS`, chaque réponse porte Server-Timing (durée) et X-DB-Queries
+(requêtes SQL) : le rejeu compare ainsi un build à l'enregistrement ou à un autre build.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.crypto import salted_hmac
+
+# Configuration du logger pour le suivi des événements
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = 'X-DB-Queries'
+TIMING_HEADER = 'Server-Timing'
+LOG_PATTERN = 'traffic-*.jsonl*'
+ROTATED_PATTERN = 'traffic-*.jsonl.*'  # Fichiers tournés, sans écrivain
+
+# Compteur de requêtes SQL de la requête HTTP en cours (liste partagée avec les threads de sync_to_async)
+_query_count = ContextVar('traffic_query_count', default=None)
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+# 1. Comptage des requêtes SQL
+
+def query_counter(execute, sql, params, many, context):
+    counter = _query_count.get()
+    if counter is not None:
+        counter[0] += 1
+    return execute(sql, params, many, context)
+
+
+def install_counter(sender=None, connection=None, **kwargs):
+    """Récepteur de connection_created : comptage des requêtes SQL de la connexion."""
+    if query_counter not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, query_counter)
+
+
+# 2. Anonymisation
+
+def anonymize_value(key, value):
+    """Valeur gardée en clair (paramètre public) ou remplacée par une empreinte HMAC stable."""
+    if key in settings.TRAFFIC_RECORD_PARAMS:
+        return value
+    return '~' + salted_hmac('wari.traffic', f"{key}={value}").hexdigest()[:12]
+
+
+def anonymize_query(query_string):
+    return [[key, anonymize_value(key, value)] for key, value in parse_qsl(query_string, keep_blank_values=True)]
+
+
+def user_role(user):
+    """Rôle enregistré à la place de l'utilisateur : anonymous, staff ou rôle applicatif."""
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    if user.is_staff or user.is_superuser:
+        return 'staff'
+    return getattr(user, 'role', None) or 'user'
+
+
+# 3. Fichiers de trafic
+
+def traffic_root():
+    return Path(settings.TRAFFIC_RECORD_ROOT)
+
+
+def prune_logs(root, keep):
+    """
+    Supprime les fichiers tournés les plus anciens au-delà de `keep`.
+    - Les journaux traffic-<pid>.jsonl ne sont jamais supprimés : un autre worker peut y écrire
+    """
+    files = []
+    for path in root.glob(ROTATED_PATTERN):
+        try:
+            files.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue  # Renommé ou supprimé entre-temps (rotation d'un autre processus)
+    for _, path in sorted(files, reverse=True)[keep:]:
+        path.unlink(missing_ok=True)
+
+
+def recorder():
+    """Logger dédié du processus (fichier traffic-<pid>.jsonl avec rotation), créé à la première écriture."""
+    global _recorder
+    with _recorder_lock:
+        if _recorder is None or _recorder.pid != os.getpid():
+            root = traffic_root()
+            root.mkdir(parents=True, exist_ok=True)
+            prune_logs(root, settings.TRAFFIC_RECORD_MAX_FILES)
+            handler = RotatingFileHandler(
+                root / f"traffic-{os.getpid()}.jsonl", maxBytes=settings.TRAFFIC_RECORD_MAX_BYTES,
+                backupCount=max(settings.TRAFFIC_RECORD_MAX_FILES - 1, 0), encoding='utf-8',
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            _recorder = logging.getLogger(f"{__name__}.records.{os.getpid()}")
+            _recorder.handlers[:] = [handler]
+            _recorder.propagate = False  # Hors journaux applicatifs
+            _recorder.setLevel(logging.INFO)
+            _recorder.pid = os.getpid()
+        return _recorder
+
+
+def traffic_record(request, response, started, duration, queries, user):
+    match = getattr(request, 'resolver_match', None)
+    return {
+        'ts': round(started, 6),
+        'method': request.method,
+        'path': request.path,
+        'query': anonymize_query(request.META.get('QUERY_STRING', '')),
+        'role': user_role(user),
+        'endpoint': match.view_name if match and match.view_name else request.path,
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 3),
+        'queries': queries,
+    }
+
+
+def read_records(sources):
+    """Lignes de trafic des fichiers ou répertoires `sources`, triées par horodatage."""
+    records = []
+    for source in map(Path, sources):
+        files = sorted(source.glob(LOG_PATTERN)) if source.is_dir() else [source]
+        for path in files:
+            with path.open(encoding='utf-8') as fh:
+                for line in fh:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # Ligne tronquée (rotation, arrêt brutal)
+    records.sort(key=lambda record: record['ts'])
+    return records
+
+
+# 4. Middleware
+
+class TrafficRecordingMiddleware:
+    """
+    Enregistre un échantillon anonymisé des requêtes (à placer en tête de MIDDLEWARE, durée complète) :
+    - Rôle lu après la réponse : authentification DRF (JWT) comprise
+    - En-têtes Server-Timing et X-DB-Queries si `TRAFFIC_TIMING_HEADERS`
+    - Compatible WSGI et ASGI
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install_counter, dispatch_uid='wari-traffic-install-counter')
+        for connection in connections.all(initialized_only=True):
+            install_counter(connection=connection)
+
+    def sampled(self, request):
+        if not settings.TRAFFIC_RECORD_ENABLED or not request.path.startswith(tuple(settings.TRAFFIC_RECORD_PREFIXES)):
+            return False
+        return random.random() < settings.TRAFFIC_RECORD_RATE
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sampled = self.sampled(request)
+        if not sampled and not settings.TRAFFIC_TIMING_HEADERS:
+            return self.get_response(request)
+        counter = [0]
+        token = _query_count.set(counter)
+        started, clock = time.time(), time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _query_count.reset(token)
+        duration = time.perf_counter() - clock
+        if sampled:
+            self.record(request, response, started, duration, counter[0])
+        return self.finish(response, duration, counter[0])
+
+    async def __acall__(self, request):
+        sampled = self.sampled(request)
+        if not sampled and not settings.TRAFFIC_TIMING_HEADERS:
+            return await self.get_response(request)
+        counter = [0]
+        token = _query_count.set(counter)
+        started, clock = time.time(), time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _query_count.reset(token)
+        duration = time.perf_counter() - clock
+        if sampled:
+            # request.user (session non chargée ou utilisateur DRF) : lecture hors de la boucle d'événements
+            await sync_to_async(self.record)(request, response, started, duration, counter[0])
+        return self.finish(response, duration, counter[0])
+
+    def record(self, request, response, started, duration, queries):
+        user = getattr(request, 'user', None)
+        try:
+            recorder().info(json.dumps(traffic_record(request, response, started, duration, queries, user)))
+        except OSError:
+            logger.exception("Échec de l'enregistrement du trafic (%s)", request.path)
+
+    def finish(self, response, duration, queries):
+        if settings.TRAFFIC_TIMING_HEADERS:
+            response[TIMING_HEADER] = f"app;dur={duration * 1000:.3f}"
+            response[QUERY_COUNT_HEADER] = str(queries)
+        return response
@@ -1,9 +1,21 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from games.views import AsyncClientGameView, CountryFeedView, GameTimelineView
+from programmes.views import AsyncClientProgramView
+from predictions.views import AsyncClientPredictionView
+from results.views import AsyncClientResultView
+from bundles.views import BundleView
+from sync.views import SyncView
+from wari.batch import BatchView
+from wari.profiling import profile_download_view, profile_list_view
+from wari.schema import SchemaSwaggerView, StaticSchemaView
 
 urlpatterns = [
+    # Profils de requêtes (wari.profiling), réservés au personnel
+    path('admin/profiles/', admin.site.admin_view(profile_list_view), name='admin-profiles'),
+    path('admin/profiles/<str:profile_id>/<str:artifact>', admin.site.admin_view(profile_download_view),
+         name='admin-profile-download'),
     path('admin/', admin.site.urls, name='admin'),
     path('api/admin/', include([
         path('', include('games.urls')),
@@ -11,15 +23,37 @@ urlpatterns = [
         path('', include('predictions.urls')),
         path('', include('results.urls')),  # Changement de 'results' à 'results'
         path('', include('users.urls')),
+        path('', include('jobs.urls')),
+        path('', include('analytics.urls')),
     ])),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    # Vues client asynchrones (ORM asynchrone), à servir via ASGI (wari.asgi)
+    path('api/client/async/', include([
+        path('games/', AsyncClientGameView.as_view(), name='async-client-game-list'),
+        path('games/<int:pk>/', AsyncClientGameView.as_view(), name='async-client-game-detail'),
+        path('programs/', AsyncClientProgramView.as_view(), name='async-client-program-list'),
+        path('programs/<int:pk>/', AsyncClientProgramView.as_view(), name='async-client-program-detail'),
+        path('predictions/', AsyncClientPredictionView.as_view(), name='async-client-prediction-list'),
+        path('predictions/<int:pk>/', AsyncClientPredictionView.as_view(), name='async-client-prediction-detail'),
+        path('results/', AsyncClientResultView.as_view(), name='async-client-result-list'),
+        path('results/<int:pk>/', AsyncClientResultView.as_view(), name='async-client-result-detail'),
+    ])),
     path('api/client/', include([
+        path('batch/', BatchView.as_view(), name='client-batch'),  # Requêtes GET groupées
+        path('sync/', SyncView.as_view(), name='client-sync'),  # Synchronisation incrémentale (hors ligne)
+        # Paquets statiques de secours (sans accès à la base)
+        path('bundles/', BundleView.as_view(), name='client-bundle-manifest'),
+        path('bundles/<slug:country>/<slug:game_type>/', BundleView.as_view(), name='client-bundle'),
+        path('countries/<slug:slug>/feed/', CountryFeedView.as_view(), name='country-feed'),  # Flux d'accueil par pays
+        path('games/<slug:slug>/timeline/', GameTimelineView.as_view(), name='game-timeline'),  # Historique d'un jeu
         path('', include('games.urls')),
         path('', include('programmes.urls')),
         path('', include('predictions.urls')),
         path('', include('results.urls')),  # Changement de 'results' à 'results'
+        path('', include('leaderboard.urls')),
     ])),
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
-    path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
+    # Schéma précalculé au déploiement (python manage.py build_schema)
+    path('api/schema/', StaticSchemaView.as_view(), name='schema'),
+    path('api/docs/', SchemaSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
 ]
\ No newline at end of file